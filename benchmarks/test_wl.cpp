@@ -4,6 +4,8 @@
 #include "mem_alloc.h"
 #include "index_hash.h"
 #include "index_btree.h"
+#include "index_mbtree.h"
+#include "index_array.h"
 #include "thread.h"
 
 RC TestWorkload::init() {
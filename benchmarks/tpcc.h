@@ -31,13 +31,18 @@ public:
 	INDEX * 	i_customer_last;
 	INDEX * 	i_stock;
 	INDEX * 	i_order; // key = (w_id, d_id, o_id)
-	INDEX * 	i_orderline; // key = (w_id, d_id, o_id)
-	INDEX * 	i_orderline_wd; // key = (w_id, d_id). 
+	INDEX * 	i_order_cust; // key = (w_id, d_id, c_id, o_id)
+	INDEX * 	i_neworder; // key = (w_id, d_id, o_id)
+	INDEX * 	i_orderline; // key = (w_id, d_id, o_id, ol_number)
 	
-	bool ** delivering;
+	// a delivery txn is running on the warehouse. Indexed by w_id.
+	volatile bool ** delivering;
+	// the cumulative weight of each TPCCTxnType in the mix, from 0 to 1.
+	double 		mix[TPCC_STOCK_LEVEL + 1];
 	uint32_t next_tid;
 private:
 	uint64_t num_wh;
+	void init_mix();
 	void init_tab_item();
 	void init_tab_wh(uint32_t wid);
 	void init_tab_dist(uint64_t w_id);
@@ -10,12 +10,21 @@ uint64_t custKey(uint64_t c_id, uint64_t c_d_id, uint64_t c_w_id) {
 	return (distKey(c_d_id, c_w_id) * g_cust_per_dist + c_id);
 }
 
-uint64_t orderlineKey(uint64_t w_id, uint64_t d_id, uint64_t o_id) {
-	return distKey(d_id, w_id) * g_cust_per_dist + o_id; 
+// o_id keeps growing past g_cust_per_dist as orders are inserted, so it
+// gets the low 32 bits.
+uint64_t orderPrimaryKey(uint64_t w_id, uint64_t d_id, uint64_t o_id) {
+	assert(o_id <= UINT32_MAX);
+	return (distKey(d_id, w_id) << 32) + o_id; 
 }
 
-uint64_t orderPrimaryKey(uint64_t w_id, uint64_t d_id, uint64_t o_id) {
-	return orderlineKey(w_id, d_id, o_id); 
+uint64_t orderlineKey(uint64_t w_id, uint64_t d_id, uint64_t o_id, uint64_t ol_number) {
+	assert(ol_number < 16);
+	return (orderPrimaryKey(w_id, d_id, o_id) << 4) + ol_number; 
+}
+
+uint64_t orderCustKey(uint64_t w_id, uint64_t d_id, uint64_t c_id, uint64_t o_id) {
+	assert(o_id <= UINT32_MAX);
+	return (custKey(c_id, d_id, w_id) << 32) + (UINT32_MAX - o_id);
 }
 
 uint64_t custNPKey(char * c_last, uint64_t c_d_id, uint64_t c_w_id) {
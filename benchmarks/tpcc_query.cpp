@@ -7,13 +7,61 @@
 #include "table.h"
 
 void tpcc_query::init(uint64_t thd_id, workload * h_wl) {
+	double * mix = ((tpcc_wl *) h_wl)->mix;
 	double x = (double)(rand() % 100) / 100.0;
 	part_to_access = (uint64_t *) 
 		mem_allocator.alloc(sizeof(uint64_t) * g_part_cnt, thd_id);
-	if (x < g_perc_payment)
+	if (x < mix[TPCC_PAYMENT])
 		gen_payment(thd_id);
-	else 
+	else if (x < mix[TPCC_NEW_ORDER])
 		gen_new_order(thd_id);
+	else if (x < mix[TPCC_ORDER_STATUS])
+		gen_order_status(thd_id);
+	else if (x < mix[TPCC_DELIVERY])
+		gen_delivery(thd_id);
+	else
+		gen_stock_level(thd_id);
+}
+
+// the txn type, the common input, then the input of the txn type. Only
+// the txns that write are logged.
+uint32_t tpcc_query::get_log_size() {
+	uint32_t size = sizeof(uint32_t) + sizeof(uint64_t) * 3;
+	if (type == TPCC_PAYMENT)
+		size += sizeof(uint64_t) * 3 + LASTNAME_LEN + sizeof(double) + sizeof(bool);
+	else if (type == TPCC_NEW_ORDER)
+		size += sizeof(uint64_t) * 2 + sizeof(bool) * 2 + sizeof(Item_no) * ol_cnt;
+	else {
+		assert(type == TPCC_DELIVERY);
+		size += sizeof(uint64_t) * 2;
+	}
+	return size;
+}
+
+void tpcc_query::write_log(char * buf) {
+	uint32_t txn_type = type;
+	LOG_FIELD(buf, txn_type);
+	LOG_FIELD(buf, w_id);
+	LOG_FIELD(buf, d_id);
+	LOG_FIELD(buf, c_id);
+	if (type == TPCC_PAYMENT) {
+		LOG_FIELD(buf, d_w_id);
+		LOG_FIELD(buf, c_w_id);
+		LOG_FIELD(buf, c_d_id);
+		memcpy(buf, c_last, LASTNAME_LEN);
+		buf += LASTNAME_LEN;
+		LOG_FIELD(buf, h_amount);
+		LOG_FIELD(buf, by_last_name);
+	} else if (type == TPCC_NEW_ORDER) {
+		LOG_FIELD(buf, ol_cnt);
+		LOG_FIELD(buf, o_entry_d);
+		LOG_FIELD(buf, rbk);
+		LOG_FIELD(buf, remote);
+		memcpy(buf, items, sizeof(Item_no) * ol_cnt);
+	} else {
+		LOG_FIELD(buf, o_carrier_id);
+		LOG_FIELD(buf, ol_delivery_d);
+	}
 }
 
 void tpcc_query::gen_payment(uint64_t thd_id) {
@@ -122,6 +170,8 @@ tpcc_query::gen_order_status(uint64_t thd_id) {
 	d_id = URand(1, DIST_PER_WARE, w_id-1);
 	c_w_id = w_id;
 	c_d_id = d_id;
+	part_to_access[0] = wh_to_part(w_id);
+	part_num = 1;
 	int y = URand(1, 100, w_id-1);
 	if(y <= 60) {
 		// by last name
@@ -133,3 +183,29 @@ tpcc_query::gen_order_status(uint64_t thd_id) {
 		c_id = NURand(1023, 1, g_cust_per_dist, w_id-1);
 	}
 }
+
+void 
+tpcc_query::gen_delivery(uint64_t thd_id) {
+	type = TPCC_DELIVERY;
+	if (FIRST_PART_LOCAL)
+		w_id = thd_id % g_num_wh + 1;
+	else
+		w_id = URand(1, g_num_wh, thd_id % g_num_wh);
+	part_to_access[0] = wh_to_part(w_id);
+	part_num = 1;
+	o_carrier_id = URand(1, 10, w_id-1);
+	ol_delivery_d = 2013;
+}
+
+void 
+tpcc_query::gen_stock_level(uint64_t thd_id) {
+	type = TPCC_STOCK_LEVEL;
+	if (FIRST_PART_LOCAL)
+		w_id = thd_id % g_num_wh + 1;
+	else
+		w_id = URand(1, g_num_wh, thd_id % g_num_wh);
+	d_id = URand(1, DIST_PER_WARE, w_id-1);
+	part_to_access[0] = wh_to_part(w_id);
+	part_num = 1;
+	threshold = URand(10, 20, w_id-1);
+}
@@ -17,9 +17,11 @@ struct Item_no {
 class tpcc_query : public base_query {
 public:
 	void init(uint64_t thd_id, workload * h_wl);
+	uint32_t get_log_size();
+	void write_log(char * buf);
 	TPCCTxnType type;
 	/**********************************************/	
-	// common txn input for both payment & new-order
+	// common txn input of all the txns
 	/**********************************************/	
 	uint64_t w_id;
 	uint64_t d_id;
@@ -41,11 +43,15 @@ public:
 	bool remote;
 	uint64_t ol_cnt;
 	uint64_t o_entry_d;
-	// Input for delivery
+	/**********************************************/	
+	// txn input for delivery
+	/**********************************************/	
 	uint64_t o_carrier_id;
 	uint64_t ol_delivery_d;
-	// for order-status
-
+	/**********************************************/	
+	// txn input for stock-level
+	/**********************************************/	
+	uint64_t threshold;
 
 private:
 	// warehouse id to partition id mapping
@@ -53,6 +59,8 @@ private:
 	void gen_payment(uint64_t thd_id);
 	void gen_new_order(uint64_t thd_id);
 	void gen_order_status(uint64_t thd_id);
+	void gen_delivery(uint64_t thd_id);
+	void gen_stock_level(uint64_t thd_id);
 };
 
 #endif
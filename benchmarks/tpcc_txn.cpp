@@ -8,7 +8,10 @@
 #include "row.h"
 #include "index_hash.h"
 #include "index_btree.h"
+#include "index_mbtree.h"
+#include "index_array.h"
 #include "tpcc_const.h"
+#include <algorithm>
 
 void tpcc_txn_man::init(thread_t * h_thd, workload * h_wl, uint64_t thd_id) {
 	txn_man::init(h_thd, h_wl, thd_id);
@@ -16,21 +19,39 @@ void tpcc_txn_man::init(thread_t * h_thd, workload * h_wl, uint64_t thd_id) {
 }
 
 RC tpcc_txn_man::run_txn(base_query * query) {
+	RC rc = RCOK;
 	tpcc_query * m_query = (tpcc_query *) query;
+	read_only = (m_query->type == TPCC_ORDER_STATUS || m_query->type == TPCC_STOCK_LEVEL);
+#if LOG_COMMAND
+	log_query = query;
+#endif
+	uint64_t starttime = get_sys_clock();
 	switch (m_query->type) {
 		case TPCC_PAYMENT :
-			return run_payment(m_query); break;
+			rc = run_payment(m_query); break;
 		case TPCC_NEW_ORDER :
-			return run_new_order(m_query); break;
-/*		case TPCC_ORDER_STATUS :
-			return run_order_status(m_query); break;
+			rc = run_new_order(m_query); break;
+		case TPCC_ORDER_STATUS :
+			rc = run_order_status(m_query); break;
 		case TPCC_DELIVERY :
-			return run_delivery(m_query); break;
+			rc = run_delivery(m_query); break;
 		case TPCC_STOCK_LEVEL :
-			return run_stock_level(m_query); break;*/
+			rc = run_stock_level(m_query); break;
 		default:
 			assert(false);
 	}
+#if CC_ALG == CALVIN
+	// the recon run only collects the read/write set.
+	if (calvin_recon)
+		return rc;
+#endif
+	INC_STATS(get_thd_id(), tpcc_time[m_query->type], get_sys_clock() - starttime);
+	if (rc == RCOK) {
+		INC_STATS(get_thd_id(), tpcc_txn_cnt[m_query->type], 1);
+	} else if (rc == Abort) {
+		INC_STATS(get_thd_id(), tpcc_abort_cnt[m_query->type], 1);
+	}
+	return rc;
 }
 
 RC tpcc_txn_man::run_payment(tpcc_query * query) {
@@ -77,6 +98,7 @@ RC tpcc_txn_man::run_payment(tpcc_query * query) {
 	char * tmp_str = r_wh_local->get_value(W_NAME);
 	memcpy(w_name, tmp_str, 10);
 	w_name[10] = '\0';
+	retire_row(r_wh);
 	/*=====================================================+
 		EXEC SQL UPDATE district SET d_ytd = d_ytd + :h_amount
 		WHERE d_w_id=:w_id AND d_id=:d_id;
@@ -97,6 +119,7 @@ RC tpcc_txn_man::run_payment(tpcc_query * query) {
 	tmp_str = r_dist_local->get_value(D_NAME);
 	memcpy(d_name, tmp_str, 10);
 	d_name[10] = '\0';
+	retire_row(r_dist);
 
 	/*====================================================================+
 		EXEC SQL SELECT d_street_1, d_street_2, d_city, d_state, d_zip, d_name
@@ -219,21 +242,24 @@ RC tpcc_txn_man::run_payment(tpcc_query * query) {
 	  history (h_c_d_id, h_c_w_id, h_c_id, h_d_id, h_w_id, h_date, h_amount, h_data)
 	  VALUES (:c_d_id, :c_w_id, :c_id, :d_id, :w_id, :datetime, :h_amount, :h_data);
 	  +=============================================================================*/
-//	row_t * r_hist;
-//	uint64_t row_id;
-//	_wl->t_history->get_new_row(r_hist, 0, row_id);
-//	r_hist->set_value(H_C_ID, c_id);
-//	r_hist->set_value(H_C_D_ID, c_d_id);
-//	r_hist->set_value(H_C_W_ID, c_w_id);
-//	r_hist->set_value(H_D_ID, d_id);
-//	r_hist->set_value(H_W_ID, w_id);
-//	int64_t date = 2013;		
-//	r_hist->set_value(H_DATE, date);
-//	r_hist->set_value(H_AMOUNT, h_amount);
+	row_t * r_hist;
+	uint64_t row_id;
+	_wl->t_history->get_new_row(r_hist, wh_to_part(w_id), row_id, false);
+	r_hist->set_primary_key(0);
+	uint64_t c_id;
+	r_cust_local->get_value(C_ID, c_id);
+	r_hist->set_value(H_C_ID, c_id);
+	r_hist->set_value(H_C_D_ID, query->c_d_id);
+	r_hist->set_value(H_C_W_ID, c_w_id);
+	r_hist->set_value(H_D_ID, query->d_id);
+	r_hist->set_value(H_W_ID, w_id);
+	int64_t date = 2013;		
+	r_hist->set_value(H_DATE, date);
+	r_hist->set_value(H_AMOUNT, query->h_amount);
 #if !TPCC_SMALL
-//	r_hist->set_value(H_DATA, h_data);
+	r_hist->set_value(H_DATA, h_data);
 #endif
-//	insert_row(r_hist, _wl->t_history);
+	insert_row(r_hist, _wl->t_history);
 
 	assert( rc == RCOK );
 	return finish(rc);
@@ -304,40 +330,49 @@ RC tpcc_txn_man::run_new_order(tpcc_query * query) {
 	int64_t o_id;
 	//d_tax = *(double *) r_dist_local->get_value(D_TAX);
 	o_id = *(int64_t *) r_dist_local->get_value(D_NEXT_O_ID);
-	o_id ++;
-	r_dist_local->set_value(D_NEXT_O_ID, o_id);
+	int64_t next_o_id = o_id + 1;
+	r_dist_local->set_value(D_NEXT_O_ID, next_o_id);
+	retire_row(r_dist);
 
 	/*========================================================================================+
 	EXEC SQL INSERT INTO ORDERS (o_id, o_d_id, o_w_id, o_c_id, o_entry_d, o_ol_cnt, o_all_local)
 		VALUES (:o_id, :d_id, :w_id, :c_id, :datetime, :o_ol_cnt, :o_all_local);
 	+========================================================================================*/
-//	row_t * r_order;
-//	uint64_t row_id;
-//	_wl->t_order->get_new_row(r_order, 0, row_id);
-//	r_order->set_value(O_ID, o_id);
-//	r_order->set_value(O_C_ID, c_id);
-//	r_order->set_value(O_D_ID, d_id);
-//	r_order->set_value(O_W_ID, w_id);
-//	r_order->set_value(O_ENTRY_D, o_entry_d);
-//	r_order->set_value(O_OL_CNT, ol_cnt);
-//	int64_t all_local = (remote? 0 : 1);
-//	r_order->set_value(O_ALL_LOCAL, all_local);
-//	insert_row(r_order, _wl->t_order);
+	uint64_t part_id = wh_to_part(w_id);
+	row_t * r_order;
+	uint64_t row_id;
+	_wl->t_order->get_new_row(r_order, part_id, row_id, false);
+	r_order->set_primary_key(orderPrimaryKey(w_id, d_id, o_id));
+	r_order->set_value(O_ID, o_id);
+	r_order->set_value(O_C_ID, c_id);
+	r_order->set_value(O_D_ID, d_id);
+	r_order->set_value(O_W_ID, w_id);
+	r_order->set_value(O_ENTRY_D, query->o_entry_d);
+	int64_t o_carrier_id = 0;
+	r_order->set_value(O_CARRIER_ID, o_carrier_id);
+	r_order->set_value(O_OL_CNT, ol_cnt);
+	int64_t all_local = (remote? 0 : 1);
+	r_order->set_value(O_ALL_LOCAL, all_local);
+	insert_row(r_order, _wl->t_order);
+	insert_index(_wl->i_order, orderPrimaryKey(w_id, d_id, o_id), r_order, part_id);
+	insert_index(_wl->i_order_cust, orderCustKey(w_id, d_id, c_id, o_id), r_order, part_id);
 	/*=======================================================+
     EXEC SQL INSERT INTO NEW_ORDER (no_o_id, no_d_id, no_w_id)
         VALUES (:o_id, :d_id, :w_id);
     +=======================================================*/
-//	row_t * r_no;
-//	_wl->t_neworder->get_new_row(r_no, 0, row_id);
-//	r_no->set_value(NO_O_ID, o_id);
-//	r_no->set_value(NO_D_ID, d_id);
-//	r_no->set_value(NO_W_ID, w_id);
-//	insert_row(r_no, _wl->t_neworder);
-	for (UInt32 ol_number = 0; ol_number < ol_cnt; ol_number++) {
-
-		uint64_t ol_i_id = query->items[ol_number].ol_i_id;
-		uint64_t ol_supply_w_id = query->items[ol_number].ol_supply_w_id;
-		uint64_t ol_quantity = query->items[ol_number].ol_quantity;
+	row_t * r_no;
+	_wl->t_neworder->get_new_row(r_no, part_id, row_id, false);
+	r_no->set_primary_key(orderPrimaryKey(w_id, d_id, o_id));
+	r_no->set_value(NO_O_ID, o_id);
+	r_no->set_value(NO_D_ID, d_id);
+	r_no->set_value(NO_W_ID, w_id);
+	insert_row(r_no, _wl->t_neworder);
+	insert_index(_wl->i_neworder, orderPrimaryKey(w_id, d_id, o_id), r_no, part_id);
+	for (uint64_t ol_number = 1; ol_number <= ol_cnt; ol_number++) {
+
+		uint64_t ol_i_id = query->items[ol_number - 1].ol_i_id;
+		uint64_t ol_supply_w_id = query->items[ol_number - 1].ol_supply_w_id;
+		uint64_t ol_quantity = query->items[ol_number - 1].ol_quantity;
 		/*===========================================+
 		EXEC SQL SELECT i_price, i_name , i_data
 			INTO :i_price, :i_name, :i_data
@@ -422,22 +457,24 @@ RC tpcc_txn_man::run_new_order(tpcc_query * query) {
 				:ol_quantity, :ol_amount, :ol_dist_info);
 		+====================================================*/
 		// XXX district info is not inserted.
-//		row_t * r_ol;
-//		uint64_t row_id;
-//		_wl->t_orderline->get_new_row(r_ol, 0, row_id);
-//		r_ol->set_value(OL_O_ID, &o_id);
-//		r_ol->set_value(OL_D_ID, &d_id);
-//		r_ol->set_value(OL_W_ID, &w_id);
-//		r_ol->set_value(OL_NUMBER, &ol_number);
-//		r_ol->set_value(OL_I_ID, &ol_i_id);
+		row_t * r_ol;
+		_wl->t_orderline->get_new_row(r_ol, part_id, row_id, false);
+		r_ol->set_primary_key(orderlineKey(w_id, d_id, o_id, ol_number));
+		r_ol->set_value(OL_O_ID, o_id);
+		r_ol->set_value(OL_D_ID, d_id);
+		r_ol->set_value(OL_W_ID, w_id);
+		r_ol->set_value(OL_NUMBER, ol_number);
+		r_ol->set_value(OL_I_ID, ol_i_id);
 #if !TPCC_SMALL
-//		int w_tax=1, d_tax=1;
-//		int64_t ol_amount = ol_quantity * i_price * (1 + w_tax + d_tax) * (1 - c_discount);
-//		r_ol->set_value(OL_SUPPLY_W_ID, &ol_supply_w_id);
-//		r_ol->set_value(OL_QUANTITY, &ol_quantity);
-//		r_ol->set_value(OL_AMOUNT, &ol_amount);
+		int64_t ol_delivery_d = 0;
+		double ol_amount = ol_quantity * i_price;
+		r_ol->set_value(OL_SUPPLY_W_ID, ol_supply_w_id);
+		r_ol->set_value(OL_DELIVERY_D, ol_delivery_d);
+		r_ol->set_value(OL_QUANTITY, ol_quantity);
+		r_ol->set_value(OL_AMOUNT, ol_amount);
 #endif		
-//		insert_row(r_ol, _wl->t_orderline);
+		insert_row(r_ol, _wl->t_orderline);
+		insert_index(_wl->i_orderline, orderlineKey(w_id, d_id, o_id, ol_number), r_ol, part_id);
 	}
 	assert( rc == RCOK );
 	return finish(rc);
@@ -445,7 +482,11 @@ RC tpcc_txn_man::run_new_order(tpcc_query * query) {
 
 RC 
 tpcc_txn_man::run_order_status(tpcc_query * query) {
-/*	row_t * r_cust;
+	uint64_t w_id = query->w_id;
+	uint64_t d_id = query->d_id;
+	uint64_t part_id = wh_to_part(w_id);
+	itemid_t * item;
+	row_t * r_cust;
 	if (query->by_last_name) {
 		// EXEC SQL SELECT count(c_id) INTO :namecnt FROM customer
 		// WHERE c_last=:c_last AND c_d_id=:d_id AND c_w_id=:w_id;
@@ -463,9 +504,8 @@ tpcc_txn_man::run_order_status(tpcc_query * query) {
 		uint64_t key = custNPKey(query->c_last, query->c_d_id, query->c_w_id);
 		// XXX: the list is not sorted. But let's assume it's sorted... 
 		// The performance won't be much different.
-		INDEX * index = _wl->i_customer_last;
-		uint64_t thd_id = get_thd_id();
-		itemid_t * item = index_read(index, key, wh_to_part(query->c_w_id));
+		item = index_read(_wl->i_customer_last, key, part_id);
+		assert(item != NULL);
 		int cnt = 0;
 		itemid_t * it = item;
 		itemid_t * mid = item;
@@ -482,50 +522,43 @@ tpcc_txn_man::run_order_status(tpcc_query * query) {
 		// FROM customer
 		// WHERE c_id=:c_id AND c_d_id=:d_id AND c_w_id=:w_id;
 		uint64_t key = custKey(query->c_id, query->c_d_id, query->c_w_id);
-		INDEX * index = _wl->i_customer_id;
-		itemid_t * item = index_read(index, key, wh_to_part(query->c_w_id));
+		item = index_read(_wl->i_customer_id, key, part_id);
+		assert(item != NULL);
 		r_cust = (row_t *) item->location;
 	}
-#if TPCC_ACCESS_ALL
-
 	row_t * r_cust_local = get_row(r_cust, RD);
 	if (r_cust_local == NULL) {
 		return finish(Abort);
 	}
+	uint64_t c_id;
 	double c_balance;
+	r_cust_local->get_value(C_ID, c_id);
 	r_cust_local->get_value(C_BALANCE, c_balance);
+#if TPCC_ACCESS_ALL
 	char * c_first = r_cust_local->get_value(C_FIRST);
 	char * c_middle = r_cust_local->get_value(C_MIDDLE);
 	char * c_last = r_cust_local->get_value(C_LAST);
 #endif
+
 	// EXEC SQL SELECT o_id, o_carrier_id, o_entry_d
 	// INTO :o_id, :o_carrier_id, :entdate FROM orders
 	// ORDER BY o_id DESC;
-	uint64_t key = custKey(query->c_id, query->c_d_id, query->c_w_id);
-	INDEX * index = _wl->i_order;
-	itemid_t * item = index_read(index, key, wh_to_part(query->c_w_id));
-	row_t * r_order = (row_t *) item->location;
-	row_t * r_order_local = get_row(r_order, RD);
+	// the order-cust key stores o_id descending, so the latest order comes first.
+	uint64_t cnt = 1;
+	index_read_range(_wl->i_order_cust, orderCustKey(w_id, d_id, c_id, UINT32_MAX), 
+		orderCustKey(w_id, d_id, c_id, 0), part_id, &item, cnt);
+	assert(cnt == 1);
+	row_t * r_order_local = get_row((row_t *) item->location, RD);
 	if (r_order_local == NULL) {
-		assert(false); 
 		return finish(Abort);
 	}
-
-	uint64_t o_id, o_entry_d, o_carrier_id;
+	uint64_t o_id;
 	r_order_local->get_value(O_ID, o_id);
 #if TPCC_ACCESS_ALL
+	uint64_t o_entry_d, o_carrier_id;
 	r_order_local->get_value(O_ENTRY_D, o_entry_d);
 	r_order_local->get_value(O_CARRIER_ID, o_carrier_id);
 #endif
-#if DEBUG_ASSERT
-	itemid_t * it = item;
-	while (it != NULL && it->next != NULL) {
-		uint64_t o_id_1, o_id_2;
-		((row_t *)it->location)->get_value(O_ID, o_id_1);
-		((row_t *)it->next->location)->get_value(O_ID, o_id_2);
-		assert(o_id_1 > o_id_2);
-	}
-#endif
 
 	// EXEC SQL DECLARE c_line CURSOR FOR SELECT ol_i_id, ol_supply_w_id, ol_quantity,
 	// ol_amount, ol_delivery_d
@@ -539,92 +572,198 @@ tpcc_txn_man::run_order_status(tpcc_query * query) {
 	//		EXEC SQL FETCH c_line
 	//		INTO :ol_i_id[i], :ol_supply_w_id[i], :ol_quantity[i], :ol_amount[i], :ol_delivery_d[i];
 	// }
-	key = orderlineKey(query->w_id, query->d_id, o_id);
-	index = _wl->i_orderline;
-	item = index_read(index, key, wh_to_part(query->w_id));
-	assert(item != NULL);
-#if TPCC_ACCESS_ALL
-	// TODO the rows are simply read without any locking mechanism
-	while (item != NULL) {
-		row_t * r_orderline = (row_t *) item->location;
-		int64_t ol_i_id, ol_supply_w_id, ol_quantity, ol_amount, ol_delivery_d;
-		r_orderline->get_value(OL_I_ID, ol_i_id);
-		r_orderline->get_value(OL_SUPPLY_W_ID, ol_supply_w_id);
-		r_orderline->get_value(OL_QUANTITY, ol_quantity);
-		r_orderline->get_value(OL_AMOUNT, ol_amount);
-		r_orderline->get_value(OL_DELIVERY_D, ol_delivery_d);
-		item = item->next;
-	}
+	itemid_t * items[15];
+	cnt = 15;
+	index_read_range(_wl->i_orderline, orderlineKey(w_id, d_id, o_id, 0), 
+		orderlineKey(w_id, d_id, o_id, 15), part_id, items, cnt);
+	for (uint64_t i = 0; i < cnt; i++) {
+		row_t * r_ol_local = get_row((row_t *) items[i]->location, RD);
+		if (r_ol_local == NULL) {
+			return finish(Abort);
+		}
+		int64_t ol_i_id;
+		r_ol_local->get_value(OL_I_ID, ol_i_id);
+#if !TPCC_SMALL
+		int64_t ol_supply_w_id, ol_quantity, ol_delivery_d;
+		double ol_amount;
+		r_ol_local->get_value(OL_SUPPLY_W_ID, ol_supply_w_id);
+		r_ol_local->get_value(OL_QUANTITY, ol_quantity);
+		r_ol_local->get_value(OL_AMOUNT, ol_amount);
+		r_ol_local->get_value(OL_DELIVERY_D, ol_delivery_d);
 #endif
-
-final:
-	assert( rc == RCOK );
-	return finish(rc)*/
-	return RCOK;
+	}
+	return finish(RCOK);
 }
 
-
-//TODO concurrency for index related operations is not completely supported yet.
-// In correct states may happen with the current code.
-
 RC 
 tpcc_txn_man::run_delivery(tpcc_query * query) {
-/*
-	// XXX HACK if another delivery txn is running on this warehouse, simply commit.
-	if ( !ATOM_CAS(_wl->delivering[query->w_id], false, true) )
-		return finish(RCOK);
-
-	for (int d_id = 1; d_id <= DIST_PER_WARE; d_id++) {
-		uint64_t key = distKey(d_id, query->w_id);
-		INDEX * index = _wl->i_orderline_wd;
-		itemid_t * item = index_read(index, key, wh_to_part(query->w_id));
-		assert(item != NULL);
-		while (item->next != NULL) {
-#if DEBUG_ASSERT
-			uint64_t o_id_1, o_id_2;
-			((row_t *)item->location)->get_value(OL_O_ID, o_id_1);
-			((row_t *)item->next->location)->get_value(OL_O_ID, o_id_2);
-			assert(o_id_1 > o_id_2);
+	uint64_t w_id = query->w_id;
+	uint64_t part_id = wh_to_part(w_id);
+	RC rc = RCOK;
+#if CC_ALG != HSTORE
+	// deliveries of a warehouse run one at a time, otherwise two of them 
+	// may pick the same new-order row of a district. HSTORE already 
+	// serializes them.
+	while ( !ATOM_CAS(*_wl->delivering[w_id], false, true) )
+		PAUSE
 #endif
-			item = item->next;
+	for (uint64_t d_id = 1; d_id <= DIST_PER_WARE; d_id++) {
+		/*=====================================================+
+			EXEC SQL DECLARE c_no CURSOR FOR
+			SELECT no_o_id FROM new_order
+			WHERE no_d_id = :d_id AND no_w_id = :w_id
+			ORDER BY no_o_id ASC;
+			EXEC SQL FETCH c_no INTO :no_o_id;
+			EXEC SQL DELETE FROM new_order WHERE CURRENT OF c_no;
+		+=====================================================*/
+		itemid_t * item;
+		uint64_t cnt = 1;
+		index_read_range(_wl->i_neworder, orderPrimaryKey(w_id, d_id, 0), 
+			orderPrimaryKey(w_id, d_id, UINT32_MAX), part_id, &item, cnt);
+		// no undelivered order in this district.
+		if (cnt == 0)
+			continue;
+		// only the deliveries of this warehouse remove new-order rows and
+		// they run one at a time, so a read is enough.
+		row_t * r_no = (row_t *) item->location;
+		row_t * r_no_local = get_row(r_no, RD);
+		if (r_no_local == NULL) {
+			rc = Abort;
+			break;
 		}
 		uint64_t no_o_id;
-		row_t * r_orderline = (row_t *)item->location;
-		r_orderling->get_value(OL_O_ID, no_o_id);
-		// TODO the orderline row should be removed from the table and indexes.
-		
-		index = _wl->i_order;
-		key = orderPrimaryKey(query->w_id, d_id, no_o_id);
-		itemid_t * item = index_read(index, key, wh_to_part(query->w_id));
-		row_t * r_order = (row_t *)item->location;
-		row_t * r_order_local = get_row(r_order, WR);
+		r_no_local->get_value(NO_O_ID, no_o_id);
+		uint64_t key = orderPrimaryKey(w_id, d_id, no_o_id);
+		remove_index(_wl->i_neworder, key, item, part_id);
+		remove_row(r_no);
 
+		/*=====================================================+
+			EXEC SQL SELECT o_c_id INTO :c_id FROM orders
+			WHERE o_id = :no_o_id AND o_d_id = :d_id AND o_w_id = :w_id;
+			EXEC SQL UPDATE orders SET o_carrier_id = :o_carrier_id
+			WHERE o_id = :no_o_id AND o_d_id = :d_id AND o_w_id = :w_id;
+		+=====================================================*/
+		item = index_read(_wl->i_order, key, part_id);
+		assert(item != NULL);
+		row_t * r_order_local = get_row((row_t *) item->location, WR);
+		if (r_order_local == NULL) {
+			rc = Abort;
+			break;
+		}
 		uint64_t o_c_id;
 		r_order_local->get_value(O_C_ID, o_c_id);
 		r_order_local->set_value(O_CARRIER_ID, query->o_carrier_id);
 
-		item = index_read(_wl->i_order_line, orderlineKey(query->w_id, d_id, no_o_id));
-		double sum_ol_amount;
-		double ol_amount;
-		while (item != NULL) {
-			// TODO the row is not locked
-			row_t * r_orderline = (row_t *)item->location;
-			r_orderline->set_value(OL_DELIVERY_D, query->ol_delivery_d);
-			r_orderline->get_value(OL_AMOUNT, ol_amount);
-			sum_ol_amount += ol_amount;
+		/*=====================================================+
+			EXEC SQL UPDATE order_line SET ol_delivery_d = :datetime
+			WHERE ol_o_id = :no_o_id AND ol_d_id = :d_id AND ol_w_id = :w_id;
+			EXEC SQL SELECT SUM(ol_amount) INTO :ol_total FROM order_line
+			WHERE ol_o_id = :no_o_id AND ol_d_id = :d_id AND ol_w_id = :w_id;
+		+=====================================================*/
+		double ol_total = 0;
+#if !TPCC_SMALL
+		itemid_t * items[15];
+		cnt = 15;
+		index_read_range(_wl->i_orderline, orderlineKey(w_id, d_id, no_o_id, 0), 
+			orderlineKey(w_id, d_id, no_o_id, 15), part_id, items, cnt);
+		for (uint64_t i = 0; i < cnt; i++) {
+			row_t * r_ol_local = get_row((row_t *) items[i]->location, WR);
+			if (r_ol_local == NULL) {
+				rc = Abort;
+				break;
+			}
+			double ol_amount;
+			r_ol_local->set_value(OL_DELIVERY_D, query->ol_delivery_d);
+			r_ol_local->get_value(OL_AMOUNT, ol_amount);
+			ol_total += ol_amount;
+		}
+		if (rc == Abort)
+			break;
+#endif
+
+		/*=====================================================+
+			EXEC SQL UPDATE customer SET c_balance = c_balance + :ol_total,
+				c_delivery_cnt = c_delivery_cnt + 1
+			WHERE c_id = :c_id AND c_d_id = :d_id AND c_w_id = :w_id;
+		+=====================================================*/
+		item = index_read(_wl->i_customer_id, custKey(o_c_id, d_id, w_id), part_id);
+		assert(item != NULL);
+		row_t * r_cust_local = get_row((row_t *) item->location, WR);
+		if (r_cust_local == NULL) {
+			rc = Abort;
+			break;
 		}
-		
-		key = custKey(o_c_id, d_id, query->w_id);
-		itemid_t * item = index_read(_wl->i_customer_id, key, wh_to_part(query->w_id));
-		row_t * r_cust = (row_t *)item->location;
 		double c_balance;
+		r_cust_local->get_value(C_BALANCE, c_balance);
+		c_balance += ol_total;
+		r_cust_local->set_value(C_BALANCE, c_balance);
+#if !TPCC_SMALL
 		uint64_t c_delivery_cnt;
+		r_cust_local->get_value(C_DELIVERY_CNT, c_delivery_cnt);
+		c_delivery_cnt ++;
+		r_cust_local->set_value(C_DELIVERY_CNT, c_delivery_cnt);
+#endif
 	}
-*/
-	return RCOK;
+	rc = finish(rc);
+#if CC_ALG != HSTORE
+	*_wl->delivering[w_id] = false;
+#endif
+	return rc;
 }
 
 RC 
 tpcc_txn_man::run_stock_level(tpcc_query * query) {
-	return RCOK;
+	uint64_t w_id = query->w_id;
+	uint64_t d_id = query->d_id;
+	uint64_t part_id = wh_to_part(w_id);
+	/*=====================================================+
+		EXEC SQL SELECT d_next_o_id INTO :o_id FROM district
+		WHERE d_w_id = :w_id AND d_id = :d_id;
+	+=====================================================*/
+	itemid_t * item = index_read(_wl->i_district, distKey(d_id, w_id), part_id);
+	assert(item != NULL);
+	row_t * r_dist_local = get_row((row_t *) item->location, RD);
+	if (r_dist_local == NULL) {
+		return finish(Abort);
+	}
+	int64_t o_id;
+	r_dist_local->get_value(D_NEXT_O_ID, o_id);
+
+	/*=====================================================+
+		EXEC SQL SELECT COUNT(DISTINCT (s_i_id)) INTO :stock_count
+		FROM order_line, stock
+		WHERE ol_w_id = :w_id AND ol_d_id = :d_id
+			AND ol_o_id < :o_id AND ol_o_id >= :o_id - 20
+			AND s_w_id = :w_id AND s_i_id = ol_i_id
+			AND s_quantity < :threshold;
+	+=====================================================*/
+	itemid_t * items[20 * 15];
+	uint64_t ol_i_ids[20 * 15];
+	uint64_t cnt = 20 * 15;
+	index_read_range(_wl->i_orderline, orderlineKey(w_id, d_id, o_id - 20, 0), 
+		orderlineKey(w_id, d_id, o_id - 1, 15), part_id, items, cnt);
+	for (uint64_t i = 0; i < cnt; i++) {
+		row_t * r_ol_local = get_row((row_t *) items[i]->location, RD);
+		if (r_ol_local == NULL) {
+			return finish(Abort);
+		}
+		r_ol_local->get_value(OL_I_ID, ol_i_ids[i]);
+	}
+	std::sort(ol_i_ids, ol_i_ids + cnt);
+	cnt = std::unique(ol_i_ids, ol_i_ids + cnt) - ol_i_ids;
+	uint64_t stock_count = 0;
+	for (uint64_t i = 0; i < cnt; i++) {
+		item = index_read(_wl->i_stock, stockKey(ol_i_ids[i], w_id), part_id);
+		assert(item != NULL);
+		row_t * r_stock_local = get_row((row_t *) item->location, RD);
+		if (r_stock_local == NULL) {
+			return finish(Abort);
+		}
+		int64_t s_quantity;
+		r_stock_local->get_value(S_QUANTITY, s_quantity);
+		if (s_quantity < (int64_t) query->threshold)
+			stock_count ++;
+	}
+	assert(stock_count <= cnt);
+	return finish(RCOK);
 }
@@ -6,6 +6,8 @@
 #include "table.h"
 #include "index_hash.h"
 #include "index_btree.h"
+#include "index_mbtree.h"
+#include "index_array.h"
 #include "tpcc_helper.h"
 #include "row.h"
 #include "query.h"
@@ -24,11 +26,57 @@ RC tpcc_wl::init() {
 	cout << "reading schema file: " << path << endl;
 	init_schema( path.c_str() );
 	cout << "TPCC schema initialized" << endl;
-	init_table();
 	next_tid = 0;
+	init_table();
+	init_mix();
+	delivering = new volatile bool * [g_num_wh + 1];
+	for (uint32_t wid = 1; wid <= g_num_wh; wid ++) {
+		delivering[wid] = (volatile bool *) _mm_malloc(CL_SIZE, CL_SIZE);
+		*delivering[wid] = false;
+	}
 	return RCOK;
 }
 
+void tpcc_wl::init_mix() {
+	double weights[TPCC_STOCK_LEVEL + 1];
+	memset(weights, 0, sizeof(weights));
+	if (strlen(g_tpcc_mix) == 0) {
+		weights[TPCC_PAYMENT] = g_perc_payment;
+		weights[TPCC_NEW_ORDER] = 1 - g_perc_payment;
+	} else {
+		// in the order of silo's mix, new-order first.
+		TPCCTxnType order[] = {TPCC_NEW_ORDER, TPCC_PAYMENT, TPCC_ORDER_STATUS,
+			TPCC_DELIVERY, TPCC_STOCK_LEVEL};
+		istringstream in(g_tpcc_mix);
+		string token;
+		uint32_t n = 0;
+		while (getline(in, token, ',')) {
+			M_ASSERT(n < 5, "TPCC_MIX has more than 5 weights\n");
+			weights[order[n ++]] = atof(token.c_str());
+		}
+	}
+	double total = 0;
+	for (int type = TPCC_PAYMENT; type <= TPCC_STOCK_LEVEL; type ++)
+		total += weights[type];
+	M_ASSERT(total > 0, "TPCC_MIX has no weight\n");
+#if INDEX_STRUCT != IDX_BTREE && INDEX_STRUCT != IDX_MBTREE
+	// they read ranges of the order indexes.
+	M_ASSERT(weights[TPCC_ORDER_STATUS] == 0 && weights[TPCC_DELIVERY] == 0
+		&& weights[TPCC_STOCK_LEVEL] == 0,
+		"order-status, delivery and stock-level need an ordered index\n");
+#endif
+	double sum = 0;
+	mix[TPCC_ALL] = 0;
+	for (int type = TPCC_PAYMENT; type <= TPCC_STOCK_LEVEL; type ++) {
+		sum += weights[type];
+		mix[type] = sum / total;
+	}
+	printf("TPCC mix: payment=%f, new_order=%f, order_status=%f, delivery=%f, stock_level=%f\n",
+		weights[TPCC_PAYMENT] / total, weights[TPCC_NEW_ORDER] / total,
+		weights[TPCC_ORDER_STATUS] / total, weights[TPCC_DELIVERY] / total,
+		weights[TPCC_STOCK_LEVEL] / total);
+}
+
 RC tpcc_wl::init_schema(const char * schema_file) {
 	workload::init_schema(schema_file);
 	t_warehouse = tables["WAREHOUSE"];
@@ -47,6 +95,21 @@ RC tpcc_wl::init_schema(const char * schema_file) {
 	i_customer_id = indexes["CUSTOMER_ID_IDX"];
 	i_customer_last = indexes["CUSTOMER_LAST_IDX"];
 	i_stock = indexes["STOCK_IDX"];
+	i_order = indexes["ORDER_IDX"];
+	i_order_cust = indexes["ORDER_CUST_IDX"];
+	i_neworder = indexes["NEWORDER_IDX"];
+	i_orderline = indexes["ORDERLINE_IDX"];
+
+	// [HTAP] the stock on hand, and the quantities and amounts ordered.
+	const char * stock_cols[] = {"S_QUANTITY"};
+	add_scan("STOCK", 1, stock_cols);
+#if TPCC_SMALL
+	const char * orderline_cols[] = {"OL_I_ID"};
+	add_scan("ORDER-LINE", 1, orderline_cols);
+#else
+	const char * orderline_cols[] = {"OL_QUANTITY", "OL_AMOUNT"};
+	add_scan("ORDER-LINE", 2, orderline_cols);
+#endif
 	return RCOK;
 }
 
@@ -170,7 +233,8 @@ void tpcc_wl::init_tab_dist(uint64_t wid) {
     	double w_ytd=30000.00;
 		row->set_value(D_TAX, tax);
 		row->set_value(D_YTD, w_ytd);
-		row->set_value(D_NEXT_O_ID, 3001);
+		int64_t next_o_id = g_cust_per_dist + 1;
+		row->set_value(D_NEXT_O_ID, next_o_id);
 		
 		index_insert(i_district, distKey(did, wid), row, wh_to_part(wid));
 	}
@@ -218,7 +282,7 @@ void tpcc_wl::init_tab_stock(uint64_t wid) {
 
 void tpcc_wl::init_tab_cust(uint64_t did, uint64_t wid) {
 	assert(g_cust_per_dist >= 1000);
-	for (UInt32 cid = 1; cid <= g_cust_per_dist; cid++) {
+	for (uint64_t cid = 1; cid <= g_cust_per_dist; cid++) {
 		row_t * row;
 		uint64_t row_id;
 		t_customer->get_new_row(row, 0, row_id);
@@ -257,7 +321,8 @@ void tpcc_wl::init_tab_cust(uint64_t did, uint64_t wid) {
 		row->set_value(C_PHONE, phone);
 		row->set_value(C_SINCE, 0);
 		row->set_value(C_CREDIT_LIM, 50000);
-		row->set_value(C_DELIVERY_CNT, 0);
+		uint64_t c_delivery_cnt = 0;
+		row->set_value(C_DELIVERY_CNT, c_delivery_cnt);
 		char c_data[500];
         MakeAlphaString(300, 500, c_data, wid-1);
 		row->set_value(C_DATA, c_data);
@@ -304,11 +369,11 @@ void tpcc_wl::init_tab_hist(uint64_t c_id, uint64_t d_id, uint64_t w_id) {
 void tpcc_wl::init_tab_order(uint64_t did, uint64_t wid) {
 	uint64_t perm[g_cust_per_dist]; 
 	init_permutation(perm, wid); /* initialize permutation of customer numbers */
-	for (UInt32 oid = 1; oid <= g_cust_per_dist; oid++) {
+	for (uint64_t oid = 1; oid <= g_cust_per_dist; oid++) {
 		row_t * row;
 		uint64_t row_id;
 		t_order->get_new_row(row, 0, row_id);
-		row->set_primary_key(oid);
+		row->set_primary_key(orderPrimaryKey(wid, did, oid));
 		uint64_t o_ol_cnt = 1;
 		uint64_t cid = perm[oid - 1]; //get_permutation();
 		row->set_value(O_ID, oid);
@@ -317,43 +382,52 @@ void tpcc_wl::init_tab_order(uint64_t did, uint64_t wid) {
 		row->set_value(O_W_ID, wid);
 		uint64_t o_entry = 2013;
 		row->set_value(O_ENTRY_D, o_entry);
+		uint64_t o_carrier_id = 0;
 		if (oid < 2101)
-			row->set_value(O_CARRIER_ID, URand(1, 10, wid-1));
-		else 
-			row->set_value(O_CARRIER_ID, 0);
+			o_carrier_id = URand(1, 10, wid-1);
+		row->set_value(O_CARRIER_ID, o_carrier_id);
 		o_ol_cnt = URand(5, 15, wid-1);
 		row->set_value(O_OL_CNT, o_ol_cnt);
-		row->set_value(O_ALL_LOCAL, 1);
+		int64_t all_local = 1;
+		row->set_value(O_ALL_LOCAL, all_local);
+		index_insert(i_order, orderPrimaryKey(wid, did, oid), row, wh_to_part(wid));
+		index_insert(i_order_cust, orderCustKey(wid, did, cid, oid), row, wh_to_part(wid));
 		
 		// ORDER-LINE	
 #if !TPCC_SMALL
-		for (uint32_t ol = 1; ol <= o_ol_cnt; ol++) {
+		for (uint64_t ol = 1; ol <= o_ol_cnt; ol++) {
 			t_orderline->get_new_row(row, 0, row_id);
+			row->set_primary_key(orderlineKey(wid, did, oid, ol));
 			row->set_value(OL_O_ID, oid);
 			row->set_value(OL_D_ID, did);
 			row->set_value(OL_W_ID, wid);
 			row->set_value(OL_NUMBER, ol);
 			row->set_value(OL_I_ID, URand(1, 100000, wid-1));
 			row->set_value(OL_SUPPLY_W_ID, wid);
-			if (oid < 2101) {
-				row->set_value(OL_DELIVERY_D, o_entry);
-				row->set_value(OL_AMOUNT, 0);
-			} else {
-				row->set_value(OL_DELIVERY_D, 0);
-				row->set_value(OL_AMOUNT, (double)URand(1, 999999, wid-1)/100);
-			}
-			row->set_value(OL_QUANTITY, 5);
+			uint64_t ol_delivery_d = 0;
+			double ol_amount = 0;
+			if (oid < 2101)
+				ol_delivery_d = o_entry;
+			else
+				ol_amount = (double)URand(1, 999999, wid-1)/100;
+			row->set_value(OL_DELIVERY_D, ol_delivery_d);
+			row->set_value(OL_AMOUNT, ol_amount);
+			uint64_t ol_quantity = 5;
+			row->set_value(OL_QUANTITY, ol_quantity);
 			char ol_dist_info[24];
 	        MakeAlphaString(24, 24, ol_dist_info, wid-1);
 			row->set_value(OL_DIST_INFO, ol_dist_info);
+			index_insert(i_orderline, orderlineKey(wid, did, oid, ol), row, wh_to_part(wid));
 		}
 #endif
 		// NEW ORDER
 		if (oid > 2100) {
 			t_neworder->get_new_row(row, 0, row_id);
+			row->set_primary_key(orderPrimaryKey(wid, did, oid));
 			row->set_value(NO_O_ID, oid);
 			row->set_value(NO_D_ID, did);
 			row->set_value(NO_W_ID, wid);
+			index_insert(i_neworder, orderPrimaryKey(wid, did, oid), row, wh_to_part(wid));
 		}
 	}
 }
@@ -392,6 +466,7 @@ void * tpcc_wl::threadInitWarehouse(void * This) {
 	tpcc_buffer[tid] = (drand48_data *) _mm_malloc(sizeof(drand48_data), 64);
 	assert((uint64_t)tid < g_num_wh);
 	srand48_r(wid, tpcc_buffer[tid]);
+	set_part_affinity(wh_to_part(wid));
 	
 	if (tid == 0)
 		wl->init_tab_item();
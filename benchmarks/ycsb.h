@@ -7,6 +7,7 @@
 #include "helper.h"
 
 class ycsb_query;
+class ycsb_request;
 
 class ycsb_wl : public workload {
 public :
@@ -15,9 +16,16 @@ public :
 	RC init_schema(string schema_file);
 	RC get_txn_man(txn_man *& txn_manager, thread_t * h_thd);
 	int key_to_part(uint64_t key);
+	// maps a dense row key to its index key under g_key_space. the loader
+	// and the query generator both go through it.
+	static uint64_t map_key(uint64_t key);
+	// sets the key of a pending request: the next new row of its partition
+	// for an insert, or the row at its distance from the newest one.
+	void pick_key(ycsb_request * req);
 	INDEX * the_index;
 	table_t * the_table;
 private:
+	void init_mix();
 	void init_table_parallel();
 	void * init_table_slice();
 	static void * threadInitTable(void * This) {
@@ -25,6 +33,8 @@ private:
 		return NULL;
 	}
 	pthread_mutex_t insert_lock;
+	// the rows inserted into each partition, one cache line each.
+	volatile uint64_t ** insert_cnt;
 	//  For parallel initialization
 	static int next_tid;
 };
@@ -34,9 +44,17 @@ class ycsb_txn_man : public txn_man
 public:
 	void init(thread_t * h_thd, workload * h_wl, uint64_t part_id); 
 	RC run_txn(base_query * query);
+	RC run_txn_co(base_query * query);
 private:
+	RC access_rows(ycsb_query * m_query, ycsb_request * req, itemid_t * m_item);
+	void insert_req(ycsb_request * req);
 	uint64_t row_cnt;
 	ycsb_wl * _wl;
+	// coroutine state for run_txn_co
+	enum CoState { CO_PROBE, CO_FETCH, CO_ACCESS };
+	CoState _co_state;
+	uint32_t _co_rid;
+	itemid_t * _co_item;
 };
 
 #endif
@@ -20,6 +20,25 @@ void ycsb_query::init(uint64_t thd_id, workload * h_wl, Query_thd * query_thd) {
 	gen_requests(thd_id, h_wl);
 }
 
+uint32_t ycsb_query::get_log_size() {
+	return sizeof(request_cnt) + request_cnt * (sizeof(uint32_t)
+		+ sizeof(uint64_t) + sizeof(char) + sizeof(UInt32) + 2 * sizeof(bool));
+}
+
+void ycsb_query::write_log(char * buf) {
+	LOG_FIELD(buf, request_cnt);
+	for (uint32_t rid = 0; rid < request_cnt; rid ++) {
+		ycsb_request * req = &requests[rid];
+		uint32_t rtype = req->rtype;
+		LOG_FIELD(buf, rtype);
+		LOG_FIELD(buf, req->key);
+		LOG_FIELD(buf, req->value);
+		LOG_FIELD(buf, req->scan_len);
+		LOG_FIELD(buf, req->insert);
+		LOG_FIELD(buf, req->rmw);
+	}
+}
+
 void 
 ycsb_query::calculateDenom()
 {
@@ -94,13 +113,27 @@ void ycsb_query::gen_requests(uint64_t thd_id, workload * h_wl) {
 		double r;
 		drand48_r(&_query_thd->buffer, &r);
 		ycsb_request * req = &requests[rid];
+		req->insert = false;
+		req->rmw = false;
+		req->pending = false;
 		if (r < g_read_perc) {
 			req->rtype = RD;
-		} else if (r >= g_read_perc && r <= g_write_perc + g_read_perc) {
+		} else if (r < g_read_perc + g_write_perc) {
+			req->rtype = WR;
+		} else if (r < g_read_perc + g_write_perc + g_rmw_perc) {
 			req->rtype = WR;
+			req->rmw = true;
+		} else if (r < g_read_perc + g_write_perc + g_rmw_perc + g_insert_perc) {
+			req->rtype = WR;
+			req->insert = true;
 		} else {
 			req->rtype = SCAN;
 			req->scan_len = SCAN_LEN;
+			if (g_scan_len_uniform) {
+				int64_t len;
+				lrand48_r(&_query_thd->buffer, &len);
+				req->scan_len = len % SCAN_LEN + 1;
+			}
 		}
 
 		// the request will access part_id.
@@ -111,12 +144,31 @@ void ycsb_query::gen_requests(uint64_t thd_id, workload * h_wl) {
 		uint64_t row_id = zipf(table_size - 1, g_zipf_theta);
 		assert(row_id < table_size);
 		uint64_t primary_key = row_id * g_virtual_part_cnt + part_id;
-		req->key = primary_key;
+		if (req->insert || g_request_dist == DIST_LATEST) {
+			// the new rows are only known at runtime.
+			req->pending = true;
+			req->key = row_id - 1;
+			req->part_id = part_id % g_part_cnt;
+		} else {
+			req->key = ycsb_wl::map_key(primary_key);
+			req->part_id = ((ycsb_wl *) h_wl)->key_to_part(primary_key);
+		}
 		int64_t rint64;
 		lrand48_r(&_query_thd->buffer, &rint64);
 		req->value = rint64 % (1<<8);
 		// Make sure a single row is not accessed twice
-		if (req->rtype == RD || req->rtype == WR) {
+		if (req->insert) {
+			// a new row every time.
+			access_cnt ++;
+		} else if (req->pending) {
+			// the same distance picks the same row unless rows are
+			// inserted in between. get_row() reuses the access then.
+			uint64_t dist_key = req->key * g_part_cnt + req->part_id;
+			if (all_keys.find(dist_key) == all_keys.end()) {
+				all_keys.insert(dist_key);
+				access_cnt ++;
+			} else continue;
+		} else if (req->rtype == RD || req->rtype == WR) {
 			if (all_keys.find(req->key) == all_keys.end()) {
 				all_keys.insert(req->key);
 				access_cnt ++;
@@ -124,7 +176,7 @@ void ycsb_query::gen_requests(uint64_t thd_id, workload * h_wl) {
 		} else {
 			bool conflict = false;
 			for (UInt32 i = 0; i < req->scan_len; i++) {
-				primary_key = (row_id + i) * g_part_cnt + part_id;
+				primary_key = ycsb_wl::map_key((row_id + i) * g_part_cnt + part_id);
 				if (all_keys.find( primary_key )
 					!= all_keys.end())
 					conflict = true;
@@ -132,13 +184,17 @@ void ycsb_query::gen_requests(uint64_t thd_id, workload * h_wl) {
 			if (conflict) continue;
 			else {
 				for (UInt32 i = 0; i < req->scan_len; i++)
-					all_keys.insert( (row_id + i) * g_part_cnt + part_id);
-				access_cnt += SCAN_LEN;
+					all_keys.insert( ycsb_wl::map_key((row_id + i) * g_part_cnt + part_id) );
+				access_cnt += req->scan_len;
 			}
 		}
 		rid ++;
 	}
 	request_cnt = rid;
+	read_only = true;
+	for (UInt32 i = 0; i < request_cnt; i++)
+		if (requests[i].rtype == WR)
+			read_only = false;
 
 	// Sort the requests in key order.
 	if (g_key_order) {
@@ -149,8 +205,10 @@ void ycsb_query::gen_requests(uint64_t thd_id, workload * h_wl) {
 					requests[j] = requests[j + 1];
 					requests[j + 1] = tmp;
 				}
+		// the keys of pending requests are not known yet.
 		for (UInt32 i = 0; i < request_cnt - 1; i++)
-			assert(requests[i].key < requests[i + 1].key);
+			assert(requests[i].pending || requests[i + 1].pending
+				|| requests[i].key < requests[i + 1].key);
 	}
 
 }
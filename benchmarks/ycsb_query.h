@@ -13,10 +13,19 @@ class Query_thd;
 class ycsb_request {
 public:
 	access_t rtype; 
+	// the index key, see ycsb_wl::map_key()
 	uint64_t key;
+	uint64_t part_id;
 	char value;
 	// only for (qtype == SCAN)
 	UInt32 scan_len;
+	// an insert adds the row of key and a read-modify-write reads the
+	// field before it writes it. Both are WR.
+	bool insert;
+	bool rmw;
+	// the key is picked when the txn first runs, see ycsb_wl::pick_key().
+	// Until then key is the distance from the newest row of part_id.
+	bool pending;
 };
 
 class ycsb_query : public base_query {
@@ -24,9 +33,13 @@ public:
 	void init(uint64_t thd_id, workload * h_wl) { assert(false); };
 	void init(uint64_t thd_id, workload * h_wl, Query_thd * query_thd);
 	static void calculateDenom();
+	uint32_t get_log_size();
+	void write_log(char * buf);
 
 	uint64_t request_cnt;
 	ycsb_request * requests;
+	// no request is a WR.
+	bool read_only;
 
 private:
 	void gen_requests(uint64_t thd_id, workload * h_wl);
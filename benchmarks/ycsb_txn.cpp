@@ -8,6 +8,8 @@
 #include "row.h"
 #include "index_hash.h"
 #include "index_btree.h"
+#include "index_mbtree.h"
+#include "index_array.h"
 #include "catalog.h"
 #include "manager.h"
 #include "row_lock.h"
@@ -19,69 +21,175 @@
 void ycsb_txn_man::init(thread_t * h_thd, workload * h_wl, uint64_t thd_id) {
 	txn_man::init(h_thd, h_wl, thd_id);
 	_wl = (ycsb_wl *) h_wl;
+	_co_state = CO_PROBE;
+	_co_rid = 0;
+	_co_item = NULL;
 }
 
 RC ycsb_txn_man::run_txn(base_query * query) {
 	RC rc;
 	ycsb_query * m_query = (ycsb_query *) query;
-	ycsb_wl * wl = (ycsb_wl *) h_wl;
 	itemid_t * m_item = NULL;
   	row_cnt = 0;
+	read_only = m_query->read_only;
+#if LOG_COMMAND
+	log_query = query;
+#endif
 
 	for (uint32_t rid = 0; rid < m_query->request_cnt; rid ++) {
 		ycsb_request * req = &m_query->requests[rid];
-		int part_id = wl->key_to_part( req->key );
-		bool finish_req = false;
-		UInt32 iteration = 0;
-		while ( !finish_req ) {
-			if (iteration == 0) {
-				m_item = index_read(_wl->the_index, req->key, part_id);
-			} 
-#if INDEX_STRUCT == IDX_BTREE
-			else {
-				_wl->the_index->index_next(get_thd_id(), m_item);
-				if (m_item == NULL)
-					break;
-			}
-#endif
-			row_t * row = ((row_t *)m_item->location);
-			row_t * row_local; 
-			access_t type = req->rtype;
-			
-			row_local = get_row(row, type);
-			if (row_local == NULL) {
-				rc = Abort;
-				goto final;
-			}
-
-			// Computation //
-			// Only do computation when there are more than 1 requests.
-            if (m_query->request_cnt > 1) {
-                if (req->rtype == RD || req->rtype == SCAN) {
-//                  for (int fid = 0; fid < schema->get_field_cnt(); fid++) {
-						int fid = 0;
-						char * data = row_local->get_data();
-						__attribute__((unused)) uint64_t fval = *(uint64_t *)(&data[fid * 10]);
-//                  }
-                } else {
-                    assert(req->rtype == WR);
-//					for (int fid = 0; fid < schema->get_field_cnt(); fid++) {
-						int fid = 0;
-						char * data = row->get_data();
-						*(uint64_t *)(&data[fid * 10]) = 0;
-//					}
-                } 
-            }
+		if (req->pending)
+			_wl->pick_key(req);
+		if (req->insert) {
+			insert_req(req);
+			continue;
+		}
+		int part_id = req->part_id;
+		m_item = index_read(_wl->the_index, req->key, part_id);
+		rc = access_rows(m_query, req, m_item);
+		if (rc == Abort)
+			goto final;
+	}
+	rc = RCOK;
+final:
+	rc = finish(rc);
+	return rc;
+}
 
+// Same as run_txn, but split into steps. Before every index probe and row
+// fetch a prefetch is issued and WAIT is returned, so the worker can run
+// other in-flight txns while the cache line arrives. A scan is not split
+// since the btree cursor is per thread.
+RC ycsb_txn_man::run_txn_co(base_query * query) {
+	RC rc = RCOK;
+	ycsb_query * m_query = (ycsb_query *) query;
+	if (_co_state == CO_PROBE && _co_rid == 0) {
+		row_cnt = 0;
+		read_only = m_query->read_only;
+#if LOG_COMMAND
+		log_query = query;
+#endif
+	}
 
-			iteration ++;
-			if (req->rtype == RD || req->rtype == WR || iteration == req->scan_len)
-				finish_req = true;
+	while (_co_rid < m_query->request_cnt) {
+		ycsb_request * req = &m_query->requests[_co_rid];
+		int part_id = req->part_id;
+		switch (_co_state) {
+		case CO_PROBE :
+			if (req->pending)
+				_wl->pick_key(req);
+			if (req->insert) {
+				insert_req(req);
+				_co_rid ++;
+				break;
+			}
+			_wl->the_index->index_prefetch(req->key, part_id);
+			_co_state = CO_FETCH;
+			return WAIT;
+		case CO_FETCH :
+			_co_item = index_read(_wl->the_index, req->key, part_id);
+			if (_co_item != NULL)
+				PREFETCH(_co_item->location);
+			_co_state = CO_ACCESS;
+			return WAIT;
+		case CO_ACCESS :
+			rc = access_rows(m_query, req, _co_item);
+			_co_state = CO_PROBE;
+			if (rc == Abort)
+				goto final;
+			_co_rid ++;
+			break;
 		}
 	}
 	rc = RCOK;
 final:
+	_co_rid = 0;
+	_co_item = NULL;
 	rc = finish(rc);
 	return rc;
 }
 
+// the row is added to the index at commit.
+void ycsb_txn_man::insert_req(ycsb_request * req) {
+	row_t * new_row = NULL;
+	uint64_t row_id;
+	RC rc = _wl->the_table->get_new_row(new_row, req->part_id, row_id, false);
+	assert(rc == RCOK);
+	new_row->set_primary_key(req->key);
+	Catalog * schema = _wl->the_table->get_schema();
+	for (UInt32 fid = 0; fid < schema->get_field_cnt(); fid ++) {
+		char value[schema->get_field_size(fid)];
+		memset(value, req->value, sizeof(value));
+		new_row->set_value(fid, value);
+	}
+	insert_row(new_row, _wl->the_table);
+	insert_index(_wl->the_index, req->key, new_row, req->part_id);
+}
+
+RC ycsb_txn_man::access_rows(ycsb_query * m_query, ycsb_request * req, itemid_t * m_item) {
+	if (m_item == NULL) {
+		// only a latest read (see ycsb_wl::pick_key()) may pick a row whose
+		// insert has not committed. Every other key is loaded.
+		assert(g_request_dist == DIST_LATEST);
+		return RCOK;
+	}
+	bool finish_req = false;
+	UInt32 iteration = 0;
+#if INDEX_STRUCT == IDX_MBTREE
+	itemid_t * scan_items[SCAN_LEN];
+	uint64_t scan_cnt = 1;
+	if (req->rtype == SCAN) {
+		scan_cnt = req->scan_len;
+		_wl->the_index->index_read_range(req->key, UINT64_MAX - 1, scan_items, 
+			scan_cnt, req->part_id);
+	}
+#endif
+	while ( !finish_req ) {
+#if INDEX_STRUCT == IDX_BTREE
+		if (iteration > 0) {
+			_wl->the_index->index_next(get_thd_id(), m_item);
+			if (m_item == NULL)
+				break;
+		}
+#elif INDEX_STRUCT == IDX_MBTREE
+		if (iteration > 0) {
+			if (iteration >= scan_cnt)
+				break;
+			m_item = scan_items[iteration];
+		}
+#endif
+		row_t * row = ((row_t *)m_item->location);
+		row_t * row_local; 
+		access_t type = req->rtype;
+		// a request only touches one field.
+		int fid = 0;
+		
+		row_local = get_row(row, type, 1UL << fid);
+		if (row_local == NULL)
+			return Abort;
+
+		// Computation //
+		// Only do computation when there are more than 1 requests.
+        if (m_query->request_cnt > 1) {
+            if (req->rtype == RD || req->rtype == SCAN) {
+					char * data = row_local->get_value(fid);
+					__attribute__((unused)) uint64_t fval = *(uint64_t *)data;
+            } 
+        }
+		// updates and read-modify-writes always write. The write goes to 
+		// the local copy, which TICTOC and SILO install at commit. 
+		// set_value() keeps the undo log of the lock-based schemes.
+		if (req->rtype == WR) {
+			uint64_t fval = 0;
+			if (req->rmw)
+				fval = *(uint64_t *)row_local->get_value(fid) + 1;
+			row_local->set_value(fid, &fval, sizeof(fval));
+		}
+
+
+		iteration ++;
+		if (req->rtype == RD || req->rtype == WR || iteration == req->scan_len)
+			finish_req = true;
+	}
+	return RCOK;
+}
@@ -8,6 +8,8 @@
 #include "row.h"
 #include "index_hash.h"
 #include "index_btree.h"
+#include "index_mbtree.h"
+#include "index_array.h"
 #include "catalog.h"
 #include "manager.h"
 #include "row_lock.h"
@@ -15,12 +17,19 @@
 #include "row_mvcc.h"
 #include "mem_alloc.h"
 #include "query.h"
+#include "ycsb_query.h"
 
 int ycsb_wl::next_tid;
 
 RC ycsb_wl::init() {
 	workload::init();
 	next_tid = 0;
+	init_mix();
+	insert_cnt = new volatile uint64_t * [g_part_cnt];
+	for (uint32_t part_id = 0; part_id < g_part_cnt; part_id ++) {
+		insert_cnt[part_id] = (volatile uint64_t *) _mm_malloc(CL_SIZE, CL_SIZE);
+		*insert_cnt[part_id] = 0;
+	}
 	string path = "./benchmarks/YCSB_schema.txt";
 	init_schema( path );
 	
@@ -29,19 +38,130 @@ RC ycsb_wl::init() {
 	return RCOK;
 }
 
+void ycsb_wl::init_mix() {
+	if (strlen(g_ycsb_workload) > 0) {
+		// the core workloads, with the zipfian constant of YCSB.
+		char w = toupper(g_ycsb_workload[0]);
+		M_ASSERT(strlen(g_ycsb_workload) == 1 && w >= 'A' && w <= 'F',
+			"YCSB_WORKLOAD is one of A to F\n");
+		g_read_perc = 0;
+		g_write_perc = 0;
+		g_rmw_perc = 0;
+		g_insert_perc = 0;
+		g_scan_len_uniform = false;
+		g_request_dist = DIST_ZIPFIAN;
+		g_zipf_theta = 0.99;
+		switch (w) {
+		case 'A' :
+			g_read_perc = 0.5; g_write_perc = 0.5; break;
+		case 'B' :
+			g_read_perc = 0.95; g_write_perc = 0.05; break;
+		case 'C' :
+			g_read_perc = 1; break;
+		case 'D' :
+			g_read_perc = 0.95; g_insert_perc = 0.05;
+			g_request_dist = DIST_LATEST; break;
+		case 'E' :
+			g_insert_perc = 0.05; g_scan_len_uniform = true; break;
+		case 'F' :
+			g_read_perc = 0.5; g_rmw_perc = 0.5; break;
+		}
+	}
+	double scan_perc = 1 - g_read_perc - g_write_perc - g_rmw_perc - g_insert_perc;
+	if (scan_perc < 1e-9)
+		scan_perc = 0;
+#if INDEX_STRUCT != IDX_BTREE && INDEX_STRUCT != IDX_MBTREE
+	M_ASSERT(scan_perc == 0, "scans need an ordered index\n");
+#endif
+#if CC_ALG == VLL
+	// VLL locks the rows before the txn runs.
+	M_ASSERT(g_insert_perc == 0 && g_request_dist != DIST_LATEST,
+		"VLL does not support inserts or the latest distribution\n");
+#endif
+	printf("YCSB mix: read=%f, update=%f, rmw=%f, insert=%f, scan=%f, dist=%s, theta=%f\n",
+		g_read_perc, g_write_perc, g_rmw_perc, g_insert_perc, scan_perc,
+		g_request_dist == DIST_LATEST? "latest" : "zipfian", g_zipf_theta);
+}
+
 RC ycsb_wl::init_schema(string schema_file) {
 	workload::init_schema(schema_file);
 	the_table = tables["MAIN_TABLE"]; 	
 	the_index = indexes["MAIN_INDEX"];
+	// [HTAP] aggregate the whole table.
+	add_scan("MAIN_TABLE", 0, NULL);
 	return RCOK;
 }
 	
 int 
 ycsb_wl::key_to_part(uint64_t key) {
 	uint64_t rows_per_part = g_synth_table_size / g_part_cnt;
+	// the inserted rows are striped over the partitions.
+	if (key >= g_synth_table_size)
+		return (key - g_synth_table_size) % g_part_cnt;
 	return key / rows_per_part;
 }
 
+// the rows of a partition in insert order are its loaded rows and then the
+// n-th row inserted into it, with key SYNTH_TABLE_SIZE + n * PART_CNT + part_id.
+void ycsb_wl::pick_key(ycsb_request * req) {
+	assert(req->pending);
+	uint64_t part_id = req->part_id;
+	uint64_t rows_per_part = g_synth_table_size / g_part_cnt;
+	uint64_t pos;
+	if (req->insert)
+		pos = rows_per_part + ATOM_FETCH_ADD(*insert_cnt[part_id], 1);
+	else {
+		// the newest row may not be committed yet, then it is not found.
+		uint64_t row_cnt = rows_per_part + *insert_cnt[part_id];
+		pos = row_cnt - 1 - min(req->key, row_cnt - 1);
+	}
+	uint64_t key;
+	if (pos < rows_per_part)
+		key = part_id * rows_per_part + pos;
+	else
+		key = g_synth_table_size + (pos - rows_per_part) * g_part_cnt + part_id;
+	assert((uint64_t)key_to_part(key) == part_id);
+	req->key = map_key(key);
+	req->pending = false;
+}
+
+// FNV-1a over the 8 bytes of the key, as FNVhash64 in YCSB.
+static uint64_t fnv_hash64(uint64_t key) {
+	uint64_t hash = 0xCBF29CE484222325UL;
+	for (int i = 0; i < 8; i++) {
+		hash ^= key & 0xff;
+		hash *= 1099511628211UL;
+		key >>= 8;
+	}
+	return hash;
+}
+
+// the murmur3 finalizer. it is a bijection, so keys never collide.
+static uint64_t mix_hash64(uint64_t key) {
+	key ^= key >> 33;
+	key *= 0xFF51AFD7ED558CCDUL;
+	key ^= key >> 33;
+	key *= 0xC4CEB9FE1A85EC53UL;
+	key ^= key >> 33;
+	return key;
+}
+
+uint64_t ycsb_wl::map_key(uint64_t key) {
+	switch (g_key_space) {
+	case KEY_DENSE :
+		return key;
+	case KEY_FNV :
+		return fnv_hash64(key);
+	case KEY_SPARSE :
+		return key * KEY_SPARSE_GAP + fnv_hash64(key) % KEY_SPARSE_GAP;
+	case KEY_RAND64 :
+		return mix_hash64(key);
+	default :
+		assert(false);
+	}
+	return key;
+}
+
 RC ycsb_wl::init_table() {
 	RC rc;
     uint64_t total_row = 0;
@@ -55,7 +175,7 @@ RC ycsb_wl::init_table() {
             // TODO insertion of last row may fail after the table_size
             // is updated. So never access the last record in a table
 			assert(rc == RCOK);
-			uint64_t primary_key = total_row;
+			uint64_t primary_key = map_key(total_row);
 			new_row->set_primary_key(primary_key);
             new_row->set_value(0, &primary_key);
 			Catalog * schema = the_table->get_schema();
@@ -105,8 +225,6 @@ void ycsb_wl::init_table_parallel() {
 
 void * ycsb_wl::init_table_slice() {
 	UInt32 tid = ATOM_FETCH_ADD(next_tid, 1);
-	// set cpu affinity
-	set_affinity(tid);
 
 	mem_allocator.register_thread(tid);
 	RC rc;
@@ -115,6 +233,7 @@ void * ycsb_wl::init_table_slice() {
 	while ((UInt32)ATOM_FETCH_ADD(next_tid, 0) < g_init_parallelism) {}
 	assert((UInt32)ATOM_FETCH_ADD(next_tid, 0) == g_init_parallelism);
 	uint64_t slice_size = g_synth_table_size / g_init_parallelism;
+	int cur_part = -1;
 	for (uint64_t key = slice_size * tid; 
 			key < slice_size * (tid + 1); 
 			key ++
@@ -122,9 +241,15 @@ void * ycsb_wl::init_table_slice() {
 		row_t * new_row = NULL;
 		uint64_t row_id;
 		int part_id = key_to_part(key);
+		// partitions are key ranges, so a slice moves to the next
+		// partition's node only at its boundary.
+		if (part_id != cur_part) {
+			set_part_affinity(part_id);
+			cur_part = part_id;
+		}
 		rc = the_table->get_new_row(new_row, part_id, row_id); 
 		assert(rc == RCOK);
-		uint64_t primary_key = key;
+		uint64_t primary_key = map_key(key);
 		new_row->set_primary_key(primary_key);
 		new_row->set_value(0, &primary_key);
 		Catalog * schema = the_table->get_schema();
@@ -0,0 +1,179 @@
+#include "calvin.h"
+#include "txn.h"
+#include "row.h"
+#include "row_calvin.h"
+#include "thread.h"
+#include "query.h"
+#include "wl.h"
+#include "epoch.h"
+
+#if CC_ALG == CALVIN
+
+void
+Calvin::init() {
+	_batch_size = g_thread_cnt * CALVIN_BATCH_PER_THD;
+	_batch = (CalvinTxn *) _mm_malloc(sizeof(CalvinTxn) * _batch_size, 64);
+	for (uint32_t i = 0; i < _batch_size; i++) {
+		_batch[i].query = NULL;
+		_batch[i].stale = false;
+	}
+	_cur = (CalvinTxn **) _mm_malloc(sizeof(CalvinTxn *) * g_thread_cnt, 64);
+	_lock_thd_cnt = min((uint32_t) CALVIN_LOCK_THD_CNT, g_thread_cnt);
+	_epoch = 0;
+	_next = 0;
+	_busy[0] = 0;
+	_busy[1] = 0;
+	pthread_barrier_init(&_barrier, NULL, g_thread_cnt);
+}
+
+RC
+Calvin::run(thread_t * thd, txn_man * txn) {
+	uint64_t thd_id = thd->get_thd_id();
+	uint64_t seq_target = warmup_finish? MAX_TXN_PER_PART : WARMUP / g_thread_cnt;
+	uint64_t seq_cnt = 0;
+	uint64_t thd_txn_id = 0;
+	// all threads run the same # of epochs. They stop once no thread has a
+	// query left to sequence or to sequence again.
+	bool done = false;
+	while (!done) {
+		uint64_t starttime = get_sys_clock();
+		epoch_man.announce(thd_id, epoch_man.get_epoch());
+		if (thd_id == 0) {
+			_epoch ++;
+			_next = 0;
+		}
+		for (uint32_t i = 0; i < CALVIN_BATCH_PER_THD; i++) {
+			CalvinTxn * entry = &_batch[thd_id * CALVIN_BATCH_PER_THD + i];
+			// a stale txn keeps its slot.
+			if (!entry->stale) {
+				entry->query = NULL;
+				if (seq_cnt == seq_target)
+					continue;
+				entry->query = query_queue->get_next_query(thd_id);
+				seq_cnt ++;
+			}
+			entry->stale = false;
+			recon(txn, entry);
+		}
+		pthread_barrier_wait(&_barrier);
+		uint64_t epoch = _epoch;
+		// every thread has read the count of the last epoch.
+		if (thd_id == 0)
+			_busy[(epoch + 1) % 2] = 0;
+
+		uint64_t lock_start = get_sys_clock();
+		if (thd_id < _lock_thd_cnt)
+			lock(thd_id);
+		INC_STATS(thd_id, time_man, get_sys_clock() - lock_start);
+		pthread_barrier_wait(&_barrier);
+
+		while (true) {
+			uint32_t idx = ATOM_FETCH_ADD(_next, 1);
+			if (idx >= _batch_size)
+				break;
+			if (_batch[idx].query == NULL)
+				continue;
+			txn->set_txn_id(thd_id + thd_txn_id * g_thread_cnt);
+			thd_txn_id ++;
+			RC rc = execute(txn, &_batch[idx]);
+			INC_STATS(thd_id, latency, get_sys_clock() - starttime);
+			if (rc == RCOK) {
+				INC_STATS(thd_id, txn_cnt, 1);
+				stats.commit(thd_id);
+			} else {
+				INC_STATS(thd_id, abort_cnt, 1);
+				stats.abort(thd_id);
+			}
+		}
+		epoch_man.quiesce(thd_id);
+		pthread_barrier_wait(&_barrier);
+		// the stale flags of this thread's slots were set before the barrier.
+		bool busy = (seq_cnt < seq_target);
+		for (uint32_t i = 0; i < CALVIN_BATCH_PER_THD; i++)
+			if (_batch[thd_id * CALVIN_BATCH_PER_THD + i].stale)
+				busy = true;
+		if (busy)
+			ATOM_ADD(_busy[epoch % 2], 1);
+		pthread_barrier_wait(&_barrier);
+		done = (_busy[epoch % 2] == 0);
+		INC_STATS(thd_id, run_time, get_sys_clock() - starttime);
+	}
+	if (!warmup_finish)
+		stats.clear(thd_id);
+	else 
+		thd->_wl->sim_done = true;
+	return FINISH;
+}
+
+void
+Calvin::recon(txn_man * txn, CalvinTxn * entry) {
+	txn->calvin_recon = true;
+	txn->run_txn(entry->query);
+	entry->row_cnt = txn->row_cnt;
+	for (int i = 0; i < txn->row_cnt; i++) {
+		entry->accesses[i].row = txn->accesses[i]->orig_row;
+		entry->accesses[i].type = txn->accesses[i]->type;
+	}
+	// drop the private copies and the inserts of the run.
+	txn->cleanup(Abort);
+	txn->calvin_recon = false;
+}
+
+void
+Calvin::lock(uint64_t lock_thd) {
+	for (uint32_t i = 0; i < _batch_size; i++) {
+		CalvinTxn * entry = &_batch[i];
+		if (entry->query == NULL)
+			continue;
+		for (int j = 0; j < entry->row_cnt; j++) {
+			CalvinAccess * access = &entry->accesses[j];
+			if (get_lock_thd(access->row) == lock_thd)
+				access->wait_cnt = access->row->manager->lock(access->type, _epoch);
+		}
+	}
+}
+
+RC
+Calvin::execute(txn_man * txn, CalvinTxn * entry) {
+	uint64_t thd_id = txn->get_thd_id();
+	// every txn before this one in the batch is running or done, so the
+	// waits always make progress.
+	uint64_t wait_start = get_sys_clock();
+	for (int i = 0; i < entry->row_cnt; i++) {
+		CalvinAccess * access = &entry->accesses[i];
+		while (!access->row->manager->is_granted(access->wait_cnt))
+			PAUSE
+	}
+	uint64_t wait_time = get_sys_clock() - wait_start;
+	INC_STATS(thd_id, time_wait, wait_time);
+	INC_STATS(thd_id, time_man, wait_time);
+	_cur[thd_id] = entry;
+	txn->calvin_stale = false;
+	RC rc = txn->run_txn(entry->query);
+	// [OLLP] the txn aborted before it touched a row it did not lock.
+	if (txn->calvin_stale) {
+		assert(rc == Abort);
+		entry->stale = true;
+	}
+	for (int i = 0; i < entry->row_cnt; i++)
+		entry->accesses[i].row->manager->release();
+	return rc;
+}
+
+bool
+Calvin::covers(txn_man * txn, row_t * row, access_t type) {
+	CalvinTxn * entry = _cur[txn->get_thd_id()];
+	for (int i = 0; i < entry->row_cnt; i++) {
+		CalvinAccess * access = &entry->accesses[i];
+		if (access->row == row)
+			return (access->type == WR || type != WR);
+	}
+	return false;
+}
+
+uint64_t
+Calvin::get_lock_thd(row_t * row) {
+	return (((uint64_t) row >> 6) * 0x9E3779B97F4A7C15UL >> 32) % _lock_thd_cnt;
+}
+
+#endif
@@ -0,0 +1,63 @@
+#pragma once 
+
+#include "global.h"
+#include "helper.h"
+
+class txn_man;
+class thread_t;
+class base_query;
+class row_t;
+
+// [CALVIN] Deterministic batched execution. Each epoch has three phases,
+// separated by barriers:
+// 1. sequence: every thread adds CALVIN_BATCH_PER_THD queries to the batch,
+//    which is ordered by (thread, position). Each query is first run on
+//    private copies of its rows (the reconnaissance run), which yields its
+//    read/write set.
+// 2. lock: CALVIN_LOCK_THD_CNT threads queue the accesses of the batch on
+//    the rows, in batch order. Each row belongs to one lock thread, so no
+//    two lock threads touch the same row.
+// 3. execute: the threads take txns in batch order. A txn waits until its
+//    locks are granted, runs on private copies of the rows, writes them 
+//    back at commit and releases the locks. It never aborts on a conflict.
+// The read/write set may change between the recon run and the execution
+// (OLLP). A txn that accesses a row it did not lock aborts and is 
+// sequenced again in the next epoch.
+class Calvin {
+public:
+	void 			init();
+	// the loop of a worker. Returns FINISH once the thread has sequenced
+	// all its queries for this run.
+	RC 				run(thread_t * thd, txn_man * txn);
+	// true if the locks of the txn being executed cover the access.
+	bool 			covers(txn_man * txn, row_t * row, access_t type);
+private:
+	struct CalvinAccess {
+		row_t * 	row;
+		access_t 	type;
+		uint32_t 	wait_cnt;
+	};
+	struct CalvinTxn {
+		base_query * 	query;
+		// the execution left the read/write set of the recon run.
+		bool 			stale;
+		int 			row_cnt;
+		CalvinAccess 	accesses[MAX_ROW_PER_TXN];
+	};
+	void 			recon(txn_man * txn, CalvinTxn * entry);
+	void 			lock(uint64_t lock_thd);
+	RC 				execute(txn_man * txn, CalvinTxn * entry);
+	uint64_t 		get_lock_thd(row_t * row);
+
+	CalvinTxn * 	_batch;
+	// the txn each thread is executing.
+	CalvinTxn ** 	_cur;
+	uint32_t 		_batch_size;
+	uint32_t 		_lock_thd_cnt;
+	// written by thread 0 in the sequence phase only.
+	uint64_t 		_epoch;
+	volatile uint32_t _next;
+	// # of threads with queries left, by epoch parity.
+	volatile uint32_t _busy[2];
+	pthread_barrier_t _barrier;
+};
@@ -7,14 +7,57 @@
 #include "mem_alloc.h"
 
 /********************************************************/
-// The current txn aborts itself only if it holds less
-// locks than all the other txns on the loop. 
-// In other words, the victim should be the txn that 
-// performs the least amount of work
+// A background thread looks for cycles in the wait-for
+// graph every g_dl_loop_detect. On each loop the txn that
+// holds the least locks is aborted. In other words, the
+// victim should be the txn that performs the least amount
+// of work. Waiters only publish their edges and spin on
+// lock_abort.
 /********************************************************/
 void DL_detect::init() {
-	dependency = new DepThd[g_thread_cnt];
 	V = g_thread_cnt;
+	W = (V + 63) / 64;
+	dependency = (DepThd *) _mm_malloc(sizeof(DepThd) * V, 64);
+	for (int i = 0; i < V; i++) {
+		dependency[i].version = 0;
+		dependency[i].txnid = -1;
+		dependency[i].num_locks = 0;
+		dependency[i].waits_for = (uint64_t *) _mm_malloc(sizeof(uint64_t) * W, 64);
+		memset(dependency[i].waits_for, 0, sizeof(uint64_t) * W);
+		dependency[i].dep_txnid = (uint64_t *) _mm_malloc(sizeof(uint64_t) * V, 64);
+	}
+	_bits = (uint64_t *) _mm_malloc(sizeof(uint64_t) * V * W, 64);
+	_txnid = (int64_t *) _mm_malloc(sizeof(int64_t) * V, 64);
+	_num_locks = (int *) _mm_malloc(sizeof(int) * V, 64);
+	_state = (uint8_t *) _mm_malloc(sizeof(uint8_t) * V, 64);
+	_stack = (int *) _mm_malloc(sizeof(int) * V, 64);
+	_cursor = (int *) _mm_malloc(sizeof(int) * V, 64);
+	_stop = false;
+}
+
+void DL_detect::start() {
+	if (g_no_dl)
+		return;
+	_stop = false;
+	pthread_create(&_thd, NULL, run, this);
+}
+
+void DL_detect::stop() {
+	if (g_no_dl)
+		return;
+	_stop = true;
+	pthread_join(_thd, NULL);
+}
+
+void * DL_detect::run(void * arg) {
+	DL_detect * detector = (DL_detect *) arg;
+	while (!detector->_stop) {
+		// sleep between the rounds, so the detector does not take a core
+		// from the workers.
+		usleep(g_dl_loop_detect / 1000 + 1);
+		detector->detect();
+	}
+	return NULL;
 }
 
 int
@@ -22,134 +65,136 @@ DL_detect::add_dep(uint64_t txnid1, uint64_t * txnids, int cnt, int num_locks) {
 	if (g_no_dl)
 		return 0;
 	int thd1 = get_thdid_from_txnid(txnid1);
-	pthread_mutex_lock( &dependency[thd1].lock );
-	dependency[thd1].txnid = txnid1;
-	dependency[thd1].num_locks = num_locks;
-	
-	for (int i = 0; i < cnt; i++) 
-		dependency[thd1].adj.push_back(txnids[i]);
-	
-	pthread_mutex_unlock( &dependency[thd1].lock );
+	DepThd * dep = &dependency[thd1];
+	dep->version ++;
+	COMPILER_BARRIER
+	memset(dep->waits_for, 0, sizeof(uint64_t) * W);
+	for (int i = 0; i < cnt; i++) {
+		int thd = get_thdid_from_txnid(txnids[i]);
+		dep->waits_for[thd / 64] |= 1UL << (thd % 64);
+		dep->dep_txnid[thd] = txnids[i];
+	}
+	dep->num_locks = num_locks;
+	dep->txnid = txnid1;
+	COMPILER_BARRIER
+	dep->version ++;
 	return 0;
 }
 
-bool 
-DL_detect::nextNode(uint64_t txnid, DetectData * detect_data) {
+void DL_detect::clear_dep(uint64_t txnid) {
+	if (g_no_dl)
+		return;
 	int thd = get_thdid_from_txnid(txnid);
-	assert( !detect_data->visited[thd] );
-	detect_data->visited[thd] = true;
-	detect_data->recStack[thd] = true;
-	
-	pthread_mutex_lock( &dependency[thd].lock );
-	
-	int lock_num = dependency[thd].num_locks;
-	int txnid_num = dependency[thd].adj.size();
-	uint64_t txnids[ txnid_num ];
-	int n = 0;
-	
-	if (dependency[thd].txnid != (SInt64)txnid) {
-		detect_data->recStack[thd] = false;
-		pthread_mutex_unlock( &dependency[thd].lock );
-		return false;
-	}
-	
-	for(list<uint64_t>::iterator i = dependency[thd].adj.begin(); i != dependency[thd].adj.end(); ++i) {
-		txnids[n++] = *i;
-	}
-	
-	pthread_mutex_unlock( &dependency[thd].lock );
-
-	for (n = 0; n < txnid_num; n++) {
-		int nextthd = get_thdid_from_txnid( txnids[n] );
+	DepThd * dep = &dependency[thd];
+	if (dep->txnid == -1)
+		return;
+	dep->version ++;
+	COMPILER_BARRIER
+	dep->txnid = -1;
+	dep->num_locks = 0;
+	COMPILER_BARRIER
+	dep->version ++;
+}
 
-		// next node not visited and txnid is not stale
-		if ( detect_data->recStack[nextthd] ) {
-			if ((SInt32)txnids[n] == dependency[nextthd].txnid) {
-				detect_data->loop = true;
-				detect_data->onloop = true;
-				detect_data->loopstart = nextthd;
-				break;
-			}
-		} 
-		if ( !detect_data->visited[nextthd] && 
-			dependency[nextthd].txnid == (SInt64) txnids[n] && 
-			nextNode(txnids[n], detect_data)) 
-		{
-			break;
+bool
+DL_detect::snapshot(int thd) {
+	DepThd * dep = &dependency[thd];
+	uint64_t version = dep->version;
+	COMPILER_BARRIER
+	if (version % 2 == 1 || dep->txnid != _txnid[thd])
+		return false;
+	uint64_t * bits = &_bits[thd * W];
+	for (int w = 0; w < W; w++) {
+		bits[w] = dep->waits_for[w];
+		uint64_t word = bits[w];
+		// drop the edges to txns that are no longer waiting.
+		while (word != 0) {
+			int bit = __builtin_ctzll(word);
+			word &= word - 1;
+			int next = w * 64 + bit;
+			if (_txnid[next] == -1 || (int64_t) dep->dep_txnid[next] != _txnid[next])
+				bits[w] &= ~(1UL << bit);
 		}
 	}
-	detect_data->recStack[thd] = false;
-	if (detect_data->loop 
-			&& detect_data->onloop 
-			&& lock_num < detect_data->min_lock_num) {
-		detect_data->min_lock_num = lock_num;
-		detect_data->min_txnid = txnid;
-	}
-	if (thd == detect_data->loopstart) {
-		detect_data->onloop = false;
-	}
-	return detect_data->loop;
+	_num_locks[thd] = dep->num_locks;
+	COMPILER_BARRIER
+	return dep->version == version;
 }
 
-// isCycle returns true if there is a loop AND the current txn holds the least 
-// number of locks on that loop.
-bool DL_detect::isCyclic(uint64_t txnid, DetectData * detect_data) {
-	return nextNode(txnid, detect_data);
-}
-
-int
-DL_detect::detect_cycle(uint64_t txnid) {
-	if (g_no_dl)
-		return 0;
+void
+DL_detect::detect() {
 	uint64_t starttime = get_sys_clock();
 	INC_GLOB_STATS(cycle_detect, 1);
-	bool deadlock = false;
-
-	int thd = get_thdid_from_txnid(txnid);
-	DetectData * detect_data = (DetectData *)
-		mem_allocator.alloc(sizeof(DetectData), thd);
-	detect_data->visited = (bool * )
-		mem_allocator.alloc(sizeof(bool) * V, thd);
-	detect_data->recStack = (bool * )
-		mem_allocator.alloc(sizeof(bool) * V, thd);	
-	for(int i = 0; i < V; i++) {
-        detect_data->visited[i] = false;
-		detect_data->recStack[i] = false;
+	// a victim that has not noticed yet is already out of the graph.
+	for (int i = 0; i < V; i++) {
+		_txnid[i] = dependency[i].txnid;
+		if (_txnid[i] != -1 && glob_manager->get_txn_man(i)->lock_abort)
+			_txnid[i] = -1;
 	}
+	for (int i = 0; i < V; i++) {
+		_state[i] = 0;
+		if (_txnid[i] != -1 && !snapshot(i))
+			_txnid[i] = -1;
+	}
+	for (int i = 0; i < V; i++)
+		if (_txnid[i] == -1)
+			_state[i] = 2;
 
-	detect_data->min_lock_num = 1000;
-	detect_data->min_txnid = -1;
-	detect_data->loop = false;
-
-	if ( isCyclic(txnid, detect_data) ){ 
-		deadlock = true;
-		INC_GLOB_STATS(deadlock, 1);
-		int thd_to_abort = get_thdid_from_txnid(detect_data->min_txnid);
-		if (dependency[thd_to_abort].txnid == (SInt64) detect_data->min_txnid) {
-			txn_man * txn = glob_manager->get_txn_man(thd_to_abort);
-			txn->lock_abort = true;
+	for (int root = 0; root < V; root++) {
+		if (_state[root] != 0)
+			continue;
+		int top = 0;
+		_stack[0] = root;
+		_cursor[root] = 0;
+		_state[root] = 1;
+		while (top >= 0) {
+			int thd = _stack[top];
+			uint64_t * bits = &_bits[thd * W];
+			int next = -1;
+			while (_cursor[thd] < V) {
+				int w = _cursor[thd] / 64;
+				uint64_t word = bits[w] & (~0UL << (_cursor[thd] % 64));
+				if (word == 0) {
+					_cursor[thd] = (w + 1) * 64;
+					continue;
+				}
+				next = w * 64 + __builtin_ctzll(word);
+				_cursor[thd] = next + 1;
+				if (_state[next] != 2)
+					break;
+				next = -1;
+			}
+			if (next == -1) {
+				_state[thd] = 2;
+				top --;
+			} else if (_state[next] == 0) {
+				_state[next] = 1;
+				_cursor[next] = 0;
+				_stack[++top] = next;
+			} else {
+				// _stack[pos..top] is a loop.
+				INC_GLOB_STATS(deadlock, 1);
+				int pos = top;
+				while (_stack[pos] != next)
+					pos --;
+				int vpos = pos;
+				for (int i = pos; i <= top; i++)
+					if (_num_locks[_stack[i]] < _num_locks[_stack[vpos]])
+						vpos = i;
+				int victim = _stack[vpos];
+				if (dependency[victim].txnid == _txnid[victim]) {
+					txn_man * txn = glob_manager->get_txn_man(victim);
+					txn->lock_abort = true;
+				}
+				// the victim leaves the graph, which breaks this loop. The
+				// nodes above it are searched again from a later root or
+				// in the next round.
+				for (int i = vpos + 1; i <= top; i++)
+					_state[_stack[i]] = 0;
+				_state[victim] = 2;
+				top = vpos - 1;
+			}
 		}
-	} 
-	
-	mem_allocator.free(detect_data->visited, sizeof(bool)*V);
-	mem_allocator.free(detect_data->recStack, sizeof(bool)*V);
-	mem_allocator.free(detect_data, sizeof(DetectData));
-	uint64_t timespan = get_sys_clock() - starttime;
-	INC_GLOB_STATS(dl_detect_time, timespan);
-	if (deadlock) return 1;
-	else return 0;
-}
-
-void DL_detect::clear_dep(uint64_t txnid) {
-	if (g_no_dl)
-		return;
-	int thd = get_thdid_from_txnid(txnid);
-	pthread_mutex_lock( &dependency[thd].lock );
-	
-	dependency[thd].adj.clear();
-	dependency[thd].txnid = -1;
-	dependency[thd].num_locks = 0;
-	
-	pthread_mutex_unlock( &dependency[thd].lock );
+	}
+	INC_GLOB_STATS(dl_detect_time, get_sys_clock() - starttime);
 }
-
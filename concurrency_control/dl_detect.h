@@ -2,60 +2,59 @@
 #define _DL_DETECT_
 
 #include <limits.h>
-#include <list>
 #include <stdint.h>
 #include "pthread.h"
 #include "config.h"
 //#include "global.h"
 //#include "helper.h"
 
-// The denpendency information per thread
+// The denpendency information per thread. Only the waiting thread writes
+// it; the detector reads it under the seqlock version (odd while writing).
 struct DepThd {
-    std::list<uint64_t> adj;    // Pointer to an array containing adjacency lists
-	pthread_mutex_t lock; 
-	volatile int64_t txnid; 				// -1 means invalid
+	volatile uint64_t version;
+	volatile int64_t txnid; 				// -1 means not waiting
 	int num_locks;				// the # of locks that txn is currently holding
-	char pad[2 * CL_SIZE - sizeof(int64_t) - sizeof(pthread_mutex_t) - sizeof(std::list<uint64_t>) - sizeof(int)];
-};
-
-// shared data for a particular deadlock detection
-struct DetectData {
-	bool * visited;
-	bool * recStack;
-	bool loop;
-	bool onloop;		// the current node is on the loop
-	int loopstart;		// the starting point of the loop
-	int min_lock_num; 	// the min lock num for txn in the loop
-	uint64_t min_txnid; // the txnid that holds the min lock num
+	// bit i is set if the txn waits for thread i, whose txn is dep_txnid[i].
+	uint64_t * waits_for;
+	uint64_t * dep_txnid;
+	char pad[CL_SIZE - 2 * sizeof(uint64_t) - sizeof(int) - 2 * sizeof(uint64_t *)];
 };
 
 class DL_detect {
 public:
 	void init();
-	// return values: 
-	// 	0: no deadlocks
-	//  1: deadlock exists
-	int detect_cycle(uint64_t txnid);
+	// start/stop the background detector thread.
+	void start();
+	void stop();
 	// txn1 (txn_id) dependes on txns (containing cnt txns)
 	// return values:
 	//	0: succeed.
-	//	16: cannot get lock
 	int add_dep(uint64_t txnid, uint64_t * txnids, int cnt, int num_locks);
 	// remove all outbound dependencies for txnid.
-	// will wait for the lock until acquired.
 	void clear_dep(uint64_t txnid);
 private:
 	int V;    // No. of vertices
+	int W;    // No. of 64-bit words in a bitset of V vertices
 	DepThd * dependency;
-	
+
 	///////////////////////////////////////////
-	// For deadlock detection
+	// For deadlock detection. Only touched by the detector thread and
+	// allocated once in init().
 	///////////////////////////////////////////
-	// dl_lock is the global lock. Only used when deadlock detection happens
-	pthread_mutex_t _lock;
-	// return value: whether a loop is detected.
-	bool nextNode(uint64_t txnid, DetectData * detect_data);
-	bool isCyclic(uint64_t txnid, DetectData * detect_data); // return if "thd" is causing a cycle
+	pthread_t 		_thd;
+	volatile bool 	_stop;
+	static void * 	run(void * arg);
+	// one round: snapshot the graph, then abort a victim on each cycle.
+	void 			detect();
+	// return value: whether a consistent copy was taken.
+	bool 			snapshot(int thd);
+	uint64_t * 		_bits;			// V x W snapshot of waits_for
+	int64_t * 		_txnid;
+	int * 			_num_locks;
+	// iterative DFS
+	uint8_t * 		_state;			// 0: unvisited, 1: on stack, 2: done
+	int * 			_stack;
+	int * 			_cursor;		// next bit to scan for the node on the stack
 };
 
 #endif
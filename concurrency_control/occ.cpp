@@ -5,6 +5,13 @@
 #include "manager.h"
 #include "mem_alloc.h"
 #include "row_occ.h"
+#include "row.h"
+#include "epoch.h"
+#include <algorithm>
+
+static bool access_lt(Access * a, Access * b) {
+	return row_t::order_lt(a->orig_row, b->orig_row);
+}
 
 
 set_ent::set_ent() {
@@ -15,13 +22,18 @@ set_ent::set_ent() {
 }
 
 void OptCC::init() {
-	tnc = 0;
-	his_len = 0;
-	active_len = 0;
-	active = NULL;
+	history = NULL;
+	active = (ActiveSlot *) _mm_malloc(sizeof(ActiveSlot) * g_thread_cnt, 64);
+	for (UInt32 i = 0; i < g_thread_cnt; i++)
+		active[i].wset = NULL;
 	lock_all = false;
 }
 
+uint64_t OptCC::get_tn() {
+	set_ent * his = history;
+	return his? his->tn : 0;
+}
+
 RC OptCC::validate(txn_man * txn) {
 	RC rc;
 #if PER_ROW_VALID
@@ -29,6 +41,10 @@ RC OptCC::validate(txn_man * txn) {
 #else
 	rc = central_validate(txn);
 #endif
+	INC_STATS(txn->get_thd_id(), occ_validate_cnt, 1);
+	if (rc == Abort) {
+		INC_STATS(txn->get_thd_id(), occ_validate_abort_cnt, 1);
+	}
 	return rc;
 }
 
@@ -36,40 +52,33 @@ RC
 OptCC::per_row_validate(txn_man * txn) {
 	RC rc = RCOK;
 #if CC_ALG == OCC
-	// sort all rows accessed in primary key order.
+	// sort all rows accessed in row order.
 	// TODO for migration, should first sort by partition id
-	for (int i = txn->row_cnt - 1; i > 0; i--) {
-		for (int j = 0; j < i; j ++) {
-			int tabcmp = strcmp(txn->accesses[j]->orig_row->get_table_name(), 
-			txn->accesses[j+1]->orig_row->get_table_name());
-			if (tabcmp > 0 || (tabcmp == 0 && txn->accesses[j]->orig_row->get_primary_key() > txn->accesses[j+1]->orig_row->get_primary_key())) {
-				Access * tmp = txn->accesses[j]; 
-				txn->accesses[j] = txn->accesses[j+1];
-				txn->accesses[j+1] = tmp;
-			}
-		}
-	}
+	std::sort(txn->accesses, txn->accesses + txn->row_cnt, access_lt);
 #if DEBUG_ASSERT
-	for (int i = txn->row_cnt - 1; i > 0; i--) {
-		int tabcmp = strcmp(txn->accesses[i-1]->orig_row->get_table_name(), 
-		txn->accesses[i]->orig_row->get_table_name());
-		assert(tabcmp < 0 || tabcmp == 0 && txn->accesses[i]->orig_row->get_primary_key() > 
-		txn->accesses[i-1]->orig_row->get_primary_key());
-	}
+	for (int i = txn->row_cnt - 1; i > 0; i--)
+		assert(access_lt(txn->accesses[i-1], txn->accesses[i]));
 #endif
-	// lock all rows in the readset and writeset.
-	// Validate each access
+	// lock the writeset in row order, so the waits cannot form a loop.
+	// The readset is validated without a latch. A row locked by another
+	// writer fails validation.
+	int row_cnt = txn->row_cnt;
+	for (int i = 0; i < row_cnt; i++)
+		if (txn->accesses[i]->type == WR)
+			txn->accesses[i]->orig_row->manager->lock();
+	COMPILER_BARRIER
 	bool ok = true;
-	int lock_cnt = 0;
-	for (int i = 0; i < txn->row_cnt && ok; i++) {
-		lock_cnt ++;
-		txn->accesses[i]->orig_row->manager->latch();
-		ok = txn->accesses[i]->orig_row->manager->validate( txn->start_ts );
+	for (int i = 0; i < row_cnt && ok; i++) {
+		bool in_write_set = (txn->accesses[i]->type == WR);
+		ok = txn->accesses[i]->orig_row->manager->validate(
+			txn->start_ts, in_write_set);
 	}
 	if (ok) {
 		// Validation passed.
-		// advance the global timestamp and get the end_ts
-		txn->end_ts = glob_manager->get_ts( txn->get_thd_id() );
+		// advance the global timestamp and get the end_ts. A read-only txn
+		// writes nothing, so it does not need one.
+		if (txn->wr_cnt > 0)
+			txn->end_ts = glob_manager->get_ts( txn->get_thd_id() );
 		// write to each row and update wts
 		txn->cleanup(RCOK);
 		rc = RCOK;
@@ -78,18 +87,18 @@ OptCC::per_row_validate(txn_man * txn) {
 		rc = Abort;
 	}
 
-	for (int i = 0; i < lock_cnt; i++) 
-		txn->accesses[i]->orig_row->manager->release();
+	// cleanup() resets row_cnt but leaves the accesses in place.
+	for (int i = 0; i < row_cnt; i++) 
+		if (txn->accesses[i]->type == WR)
+			txn->accesses[i]->orig_row->manager->release();
 #endif
 	return rc;
 }
 
 RC OptCC::central_validate(txn_man * txn) {
 	RC rc;
+	uint64_t thd_id = txn->get_thd_id();
 	uint64_t start_tn = txn->start_ts;
-	uint64_t finish_tn;
-	set_ent ** finish_active;
-	uint64_t f_active_len;
 	bool valid = true;
 	// OptCC is centralized. No need to do per partition malloc.
 	set_ent * wset;
@@ -97,72 +106,55 @@ RC OptCC::central_validate(txn_man * txn) {
 	get_rw_set(txn, rset, wset);
 	bool readonly = (wset->set_size == 0);
 	set_ent * his;
-	set_ent * ent;
-	int n = 0;
 
-	pthread_mutex_lock( &latch );
-	finish_tn = tnc;
-	ent = active;
-	f_active_len = active_len;
-	finish_active = (set_ent**) mem_allocator.alloc(sizeof(set_ent *) * f_active_len, 0);
-	while (ent != NULL) {
-		finish_active[n++] = ent;
-		ent = ent->next;
-	}
 	if ( !readonly ) {
-		active_len ++;
-		STACK_PUSH(active, wset);
-	}
-	his = history;
-	pthread_mutex_unlock( &latch );
-	if (finish_tn > start_tn) {
-		while (his && his->tn > finish_tn) 
-			his = his->next;
-		while (his && his->tn > start_tn) {
-			valid = test_valid(his, rset);
-			if (!valid) 
-				goto final;
-			his = his->next;
-		}
+		active[thd_id].wset = wset;
+		// the slot must be visible before the other slots are read.
+		__sync_synchronize();
 	}
-
-	for (UInt32 i = 0; i < f_active_len; i++) {
-		set_ent * wact = finish_active[i];
+	for (UInt32 i = 0; i < g_thread_cnt; i++) {
+		set_ent * wact = active[i].wset;
+		if (i == thd_id || wact == NULL)
+			continue;
 		valid = test_valid(wact, rset);
 		if (valid) {
 			valid = test_valid(wact, wset);
 		} if (!valid)
 			goto final;
 	}
+	// a txn that left its slot before the scan has pushed its write set
+	// already, so it is found here.
+	his = history;
+	while (his && his->tn > start_tn) {
+		valid = test_valid(his, rset);
+		if (!valid) 
+			goto final;
+		his = his->next;
+	}
 final:
 	if (valid) 
 		txn->cleanup(RCOK);
+	mem_allocator.free(rset->rows, sizeof(row_t *) * rset->set_size);
 	mem_allocator.free(rset, sizeof(set_ent));
 
 	if (!readonly) {
-		// only update active & tnc for non-readonly transactions
-		pthread_mutex_lock( &latch );
-		set_ent * act = active;
-		set_ent * prev = NULL;
-		while (act->txn != txn) {
-			prev = act;
-			act = act->next;
-		}
-		assert(act->txn == txn);
-		if (prev != NULL)
-			prev->next = act->next;
-		else
-			active = act->next;
-		active_len --;
+		// only update history for non-readonly transactions
 		if (valid) {
-			if (history)
-				assert(history->tn == tnc);
-			tnc ++;
-			wset->tn = tnc;
-			STACK_PUSH(history, wset);
-			his_len ++;
+			do {
+				his = history;
+				wset->tn = his? his->tn + 1 : 1;
+				wset->next = his;
+			} while (!ATOM_CAS(history, his, wset));
 		}
-		pthread_mutex_unlock( &latch );
+		active[thd_id].wset = NULL;
+		if (!valid) {
+			// other validating txns may still be reading it.
+			epoch_man.retire(thd_id, wset->rows, RETIRE_BLOCK);
+			epoch_man.retire(thd_id, wset, RETIRE_BLOCK);
+		}
+	} else {
+		mem_allocator.free(wset->rows, 0);
+		mem_allocator.free(wset, sizeof(set_ent));
 	}
 	if (valid) {
 		rc = RCOK;
@@ -8,6 +8,8 @@
 //		history head -> hist_1 -> hist_2 -> hist_3 -> ... -> hist_n
 //    The head is always the latest and the tail the youngest. 
 // 	  When history is traversed, always go from head -> tail order.
+// 3. a committed write set is pushed with a CAS and numbered one above the
+//    head it replaces, so the head's tn is the transaction number counter.
 
 class txn_man;
 
@@ -25,6 +27,9 @@ class OptCC {
 public:
 	void init();
 	RC validate(txn_man * txn);
+	// the tn of the latest committed write set. A txn started now under
+	// central validation checks the history above it.
+	uint64_t get_tn();
 	volatile bool lock_all;
 	uint64_t lock_txn_id;
 private:
@@ -38,10 +43,13 @@ private:
 	RC get_rw_set(txn_man * txni, set_ent * &rset, set_ent *& wset);
 	
 	// "history" stores write set of transactions with tn >= smallest running tn
-	set_ent * history;
-	set_ent * active;
-	uint64_t his_len;
-	uint64_t active_len;
-	volatile uint64_t tnc; // transaction number counter
-	pthread_mutex_t latch;
+	set_ent * volatile history;
+	// the write set of the txn each thread is validating, NULL if none.
+	// A validating txn publishes its own slot before it reads the others,
+	// so of two txns validating at the same time at least one sees the other.
+	struct ActiveSlot {
+		set_ent * volatile wset;
+		char _pad[CL_SIZE - sizeof(set_ent *)];
+	};
+	ActiveSlot * active;
 };
@@ -0,0 +1,226 @@
+#include "part_router.h"
+#include "txn.h"
+#include "thread.h"
+#include "query.h"
+#include "wl.h"
+#include "mem_alloc.h"
+#include "epoch.h"
+#include <algorithm>
+
+#if CC_ALG == HSTORE && PART_ROUTING
+
+void
+PartRouter::init() {
+	_parts = new PartQueue * [g_part_cnt];
+	for (UInt32 i = 0; i < g_part_cnt; i++) {
+		PartQueue * q = (PartQueue *) _mm_malloc(sizeof(PartQueue), 64);
+		pthread_mutex_init(&q->latch, NULL);
+		q->entries = (RouteEntry *)
+			_mm_malloc(sizeof(RouteEntry) * PART_QUEUE_SIZE, 64);
+		q->head = 0;
+		q->tail = 0;
+		q->arrived = false;
+		q->txn_cnt = 0;
+		q->mp_cnt = 0;
+		q->queue_time = 0;
+		q->exec_time = 0;
+		_parts[i] = q;
+	}
+	_thds = new RouterThd * [g_thread_cnt];
+	for (UInt32 i = 0; i < g_thread_cnt; i++) {
+		_thds[i] = (RouterThd *) _mm_malloc(sizeof(RouterThd), 64);
+		_thds[i]->pending = NULL;
+		_thds[i]->gen_cnt = 0;
+		_thds[i]->thd_txn_id = 0;
+		_thds[i]->parts = new uint64_t [g_part_cnt];
+	}
+	_warmup_done = false;
+}
+
+RC
+PartRouter::run(thread_t * thd, txn_man * txn) {
+	assert(WORKLOAD != TEST);
+	uint64_t thd_id = thd->get_thd_id();
+	RouterThd * rt = _thds[thd_id];
+	// every query is run by some owner, so some owner runs txn_target of
+	// them before the threads run out of queries.
+	uint64_t txn_target = warmup_finish? MAX_TXN_PER_PART : WARMUP / g_thread_cnt;
+	uint64_t gen_target = WARMUP / g_thread_cnt;
+	if (warmup_finish)
+		gen_target += MAX_TXN_PER_PART;
+	volatile bool * done = warmup_finish? &thd->_wl->sim_done : &_warmup_done;
+	uint64_t txn_cnt = 0;
+	uint64_t wait_start = 0;
+	while (!*done) {
+		uint64_t starttime = get_sys_clock();
+		bool progress = false;
+		if (rt->pending == NULL && rt->gen_cnt < gen_target) {
+			rt->pending = query_queue->get_next_query(thd_id);
+			rt->gen_cnt ++;
+		}
+		if (rt->pending != NULL && route(rt, rt->pending)) {
+			rt->pending = NULL;
+			progress = true;
+		}
+		for (uint64_t part_id = thd_id; part_id < g_part_cnt; part_id += g_thread_cnt) {
+			bool exec = false;
+			RC rc = RCOK;
+			if (serve(thd, txn, part_id, exec, rc) == SERVE_DONE)
+				progress = true;
+			if (exec && rc == RCOK)
+				txn_cnt ++;
+		}
+		if (txn_cnt >= txn_target)
+			ATOM_CAS(*done, false, true);
+		if (progress) {
+			if (wait_start != 0) {
+				INC_STATS(thd_id, time_wait, starttime - wait_start);
+				INC_STATS(thd_id, time_man, starttime - wait_start);
+				wait_start = 0;
+			}
+		} else {
+			// the partitions of this thread are empty or held off by a
+			// multi-partition txn, and its queries are routed.
+			if (wait_start == 0)
+				wait_start = starttime;
+			PAUSE
+		}
+		INC_STATS(thd_id, run_time, get_sys_clock() - starttime);
+	}
+	if (!warmup_finish) {
+		stats.clear(thd_id);
+		for (uint64_t part_id = thd_id; part_id < g_part_cnt; part_id += g_thread_cnt) {
+			PartQueue * q = _parts[part_id];
+			q->txn_cnt = 0;
+			q->mp_cnt = 0;
+			q->queue_time = 0;
+			q->exec_time = 0;
+		}
+	}
+	return FINISH;
+}
+
+bool
+PartRouter::route(RouterThd * rt, base_query * query) {
+	uint64_t part_cnt = query->part_num;
+	uint64_t * parts = rt->parts;
+	memcpy(parts, query->part_to_access, sizeof(uint64_t) * part_cnt);
+	// latch the queues in partition order, so two multi-partition txns are
+	// pushed in the same order to every queue they share.
+	std::sort(parts, parts + part_cnt);
+	for (UInt32 i = 0; i < part_cnt; i++)
+		pthread_mutex_lock(&_parts[parts[i]]->latch);
+	bool full = false;
+	for (UInt32 i = 0; i < part_cnt && !full; i++) {
+		PartQueue * q = _parts[parts[i]];
+		full = (q->tail - q->head == PART_QUEUE_SIZE);
+	}
+	if (!full) {
+		RouteMP * mp = NULL;
+		if (part_cnt > 1) {
+			mp = (RouteMP *) mem_allocator.alloc(sizeof(RouteMP), parts[0]);
+			mp->part_cnt = part_cnt;
+			mp->arrive_cnt = 0;
+			mp->leave_cnt = 0;
+			mp->done = false;
+		}
+		uint64_t now = get_sys_clock();
+		for (UInt32 i = 0; i < part_cnt; i++) {
+			PartQueue * q = _parts[parts[i]];
+			RouteEntry * entry = &q->entries[q->tail % PART_QUEUE_SIZE];
+			entry->query = query;
+			entry->enq_time = now;
+			entry->mp = mp;
+			COMPILER_BARRIER
+			q->tail ++;
+		}
+	}
+	for (UInt32 i = 0; i < part_cnt; i++)
+		pthread_mutex_unlock(&_parts[parts[i]]->latch);
+	return !full;
+}
+
+PartRouter::ServeResult
+PartRouter::serve(thread_t * thd, txn_man * txn, uint64_t part_id,
+	bool & exec, RC & rc)
+{
+	PartQueue * q = _parts[part_id];
+	if (q->head == q->tail)
+		return SERVE_EMPTY;
+	COMPILER_BARRIER
+	RouteEntry * entry = &q->entries[q->head % PART_QUEUE_SIZE];
+	RouteMP * mp = entry->mp;
+	uint64_t starttime;
+	uint64_t endtime;
+	if (mp == NULL) {
+		starttime = get_sys_clock();
+		rc = execute(thd, txn, entry->query);
+		endtime = get_sys_clock();
+		exec = true;
+	} else {
+		if (!q->arrived) {
+			q->arrived = true;
+			if (ATOM_ADD_FETCH(mp->arrive_cnt, 1) == mp->part_cnt) {
+				// the other owners hold off their partitions, so the txn
+				// runs alone.
+				mp->start_time = get_sys_clock();
+				rc = execute(thd, txn, entry->query);
+				mp->end_time = get_sys_clock();
+				exec = true;
+				COMPILER_BARRIER
+				mp->done = true;
+			}
+		}
+		if (!mp->done)
+			return SERVE_HELD;
+		starttime = mp->start_time;
+		endtime = mp->end_time;
+		q->arrived = false;
+		q->mp_cnt ++;
+	}
+	q->txn_cnt ++;
+	q->queue_time += starttime - entry->enq_time;
+	q->exec_time += endtime - starttime;
+	if (exec)
+		INC_STATS(thd->get_thd_id(), latency, endtime - entry->enq_time);
+	COMPILER_BARRIER
+	q->head ++;
+	if (mp != NULL && ATOM_ADD_FETCH(mp->leave_cnt, 1) == mp->part_cnt)
+		mem_allocator.free(mp, sizeof(RouteMP));
+	return SERVE_DONE;
+}
+
+RC
+PartRouter::execute(thread_t * thd, txn_man * txn, base_query * query) {
+	uint64_t thd_id = thd->get_thd_id();
+	RouterThd * rt = _thds[thd_id];
+	txn->set_txn_id(thd_id + rt->thd_txn_id * g_thread_cnt);
+	rt->thd_txn_id ++;
+	epoch_man.announce(thd_id, epoch_man.get_epoch());
+	RC rc = txn->run_txn(query);
+	epoch_man.quiesce(thd_id);
+	if (rc == RCOK) {
+		INC_STATS(thd_id, txn_cnt, 1);
+		stats.commit(thd_id);
+	} else {
+		INC_STATS(thd_id, abort_cnt, 1);
+		stats.abort(thd_id);
+	}
+	return rc;
+}
+
+void
+PartRouter::print() {
+	for (UInt32 i = 0; i < g_part_cnt; i++) {
+		PartQueue * q = _parts[i];
+		printf("[part] part_id=%d, txn_cnt=%ld, mp_cnt=%ld, queue_time=%f, "
+			"exec_time=%f, avg_queue_time=%f, avg_exec_time=%f\n",
+			i, q->txn_cnt, q->mp_cnt,
+			q->queue_time / 1e9, q->exec_time / 1e9,
+			q->txn_cnt == 0? 0 : q->queue_time / 1e9 / q->txn_cnt,
+			q->txn_cnt == 0? 0 : q->exec_time / 1e9 / q->txn_cnt
+		);
+	}
+}
+
+#endif
@@ -0,0 +1,84 @@
+#pragma once
+
+#include "global.h"
+#include "helper.h"
+
+class txn_man;
+class thread_t;
+class base_query;
+
+// [HSTORE, PART_ROUTING] Partition-affine routing.
+// Partition p is owned by thread p % g_thread_cnt. Each thread routes the
+// queries it generates to the queues of the partitions they access, and
+// runs the txns in the queues of the partitions it owns, in queue order.
+// A single-partition txn runs at its owner. No other thread touches the
+// partition meanwhile, so it needs no partition lock.
+// A multi-partition txn is pushed to the queues of all its partitions while
+// their latches are held in partition order, so any two of them are in the
+// same order in every queue. An owner that reaches it holds off that
+// partition. The owner that arrives last runs it alone, and the others
+// move on once it is done. A thread whose partitions are all held off keeps
+// routing new queries; it only waits when it has nothing to route either.
+class PartRouter {
+public:
+	void 			init();
+	// the loop of a worker. Returns FINISH at the end of the run.
+	RC 				run(thread_t * thd, txn_man * txn);
+	// queueing delay and execution time per partition.
+	void 			print();
+private:
+	// a multi-partition txn, shared by the queue entries of its partitions.
+	struct RouteMP {
+		uint32_t 		part_cnt;
+		volatile uint32_t arrive_cnt;
+		volatile uint32_t leave_cnt;
+		volatile bool 	done;
+		uint64_t 		start_time;
+		uint64_t 		end_time;
+	};
+	struct RouteEntry {
+		base_query * 	query;
+		uint64_t 		enq_time;
+		// NULL for a single-partition txn.
+		RouteMP * 		mp;
+	};
+	struct PartQueue {
+		// held by the threads that push. The owner pops without it.
+		pthread_mutex_t latch;
+		RouteEntry * 	entries;
+		volatile uint64_t head;
+		volatile uint64_t tail;
+		// the owner has arrived at the multi-partition txn at head.
+		bool 			arrived;
+		// only written by the owner.
+		uint64_t 		txn_cnt;
+		uint64_t 		mp_cnt;
+		uint64_t 		queue_time;
+		uint64_t 		exec_time;
+		char 			_pad[CL_SIZE];
+	};
+	struct RouterThd {
+		// a generated query whose queues were full.
+		base_query * 	pending;
+		uint64_t 		gen_cnt;
+		uint64_t 		thd_txn_id;
+		// scratch for the sorted partitions of a query.
+		uint64_t * 		parts;
+		char 			_pad[CL_SIZE];
+	};
+	enum ServeResult {SERVE_EMPTY, SERVE_HELD, SERVE_DONE};
+
+	// returns false if a queue of the query is full.
+	bool 			route(RouterThd * rt, base_query * query);
+	// runs or passes the txn at the head of part_id's queue. exec is set if
+	// this thread ran it.
+	ServeResult 	serve(thread_t * thd, txn_man * txn, uint64_t part_id,
+						bool & exec, RC & rc);
+	RC 				execute(thread_t * thd, txn_man * txn, base_query * query);
+	uint64_t 		get_owner(uint64_t part_id) { return part_id % g_thread_cnt; }
+
+	PartQueue ** 	_parts;
+	RouterThd ** 	_thds;
+	// ends the warmup run for every thread.
+	volatile bool 	_warmup_done;
+};
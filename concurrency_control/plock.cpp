@@ -104,7 +104,8 @@ RC Plock::lock(txn_man * txn, uint64_t * parts, uint64_t part_cnt) {
 	}
 	if (txn->ready_part > 0) {
 		ts_t t = get_sys_clock();
-		while (txn->ready_part > 0) {}
+		while (txn->ready_part > 0)
+			PAUSE
 		INC_TMP_STATS(txn->get_thd_id(), time_wait, get_sys_clock() - t);
 	}
 	assert(txn->ready_part == 0);
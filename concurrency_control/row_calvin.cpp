@@ -0,0 +1,41 @@
+#include "row.h"
+#include "row_calvin.h"
+#include "global.h"
+#include "helper.h"
+
+#if CC_ALG == CALVIN
+
+void 
+Row_calvin::init(row_t * row) {
+	_row = row;
+	_epoch = 0;
+	_req_cnt = 0;
+	_rd_wait_cnt = 0;
+	_done_cnt = 0;
+}
+
+uint32_t
+Row_calvin::lock(access_t type, uint64_t epoch) {
+	// no access of the last epoch is still running.
+	if (_epoch != epoch) {
+		_epoch = epoch;
+		_req_cnt = 0;
+		_rd_wait_cnt = 0;
+		_done_cnt = 0;
+	}
+	uint32_t wait_cnt;
+	if (type == WR) {
+		wait_cnt = _req_cnt;
+		_rd_wait_cnt = _req_cnt + 1;
+	} else 
+		wait_cnt = _rd_wait_cnt;
+	_req_cnt ++;
+	return wait_cnt;
+}
+
+void 
+Row_calvin::release() {
+	ATOM_ADD(_done_cnt, 1);
+}
+
+#endif
@@ -0,0 +1,26 @@
+#pragma once 
+
+class row_t;
+
+// [CALVIN] The lock queue of a row within one epoch. The accesses of a
+// batch are queued in batch order by the lock thread that owns the row,
+// so lock() needs no latch. An access may run once every earlier
+// conflicting access has completed, which the workers count in _done_cnt.
+class Row_calvin {
+public:
+	void 				init(row_t * row);
+	// queue an access of the given epoch. Returns the # of completed
+	// accesses the access waits for.
+	uint32_t 			lock(access_t type, uint64_t epoch);
+	bool 				is_granted(uint32_t wait_cnt) { return _done_cnt >= wait_cnt; }
+	void 				release();
+private:
+	row_t * 			_row;
+	// the epoch the counters below belong to.
+	uint64_t 			_epoch;
+	uint32_t 			_req_cnt;
+	// the readers queued now wait for the last writer, i.e. for every
+	// access before it and the writer itself.
+	uint32_t 			_rd_wait_cnt;
+	volatile uint32_t 	_done_cnt;
+};
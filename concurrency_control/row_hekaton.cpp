@@ -3,11 +3,14 @@
 #include "manager.h"
 #include "row_hekaton.h"
 #include "mem_alloc.h"
+#include "epoch.h"
+#include "version_gc.h"
 #include <mm_malloc.h>
 
 #if CC_ALG == HEKATON
 
 void Row_hekaton::init(row_t * row) {
+	_row = row;
 	_his_len = 4;
 
 	_write_history = (WriteHisEntry *) _mm_malloc(sizeof(WriteHisEntry) * _his_len, 64);
@@ -54,6 +57,9 @@ RC Row_hekaton::access(txn_man * txn, TsType type, row_t * row) {
 		PAUSE
 	assert(_write_history[_his_latest].end == INF || _write_history[_his_latest].end_txn);
 	if (type == R_REQ) {
+		INC_STATS(txn->get_thd_id(), ver_read_cnt, 1);
+		INC_STATS(txn->get_thd_id(), ver_chain_len, 
+			(_his_latest + _his_len - _his_oldest) % _his_len + 1);
 		if (ISOLATION_LEVEL == REPEATABLE_READ) {
 			rc = RCOK;
 			txn->cur_row = _write_history[_his_latest].row;
@@ -112,15 +118,8 @@ Row_hekaton::reserveRow(txn_man * txn)
 	// Garbage Collection
 	uint32_t idx;
 	ts_t min_ts = glob_manager->get_min_ts(txn->get_thd_id());
-	if ((_his_latest + 1) % _his_len == _his_oldest // history is full
-		&& min_ts > _write_history[_his_oldest].end) 
-	{
-		while (_write_history[_his_oldest].end < min_ts) 
-		{
-			assert(_his_oldest != _his_latest);
-			_his_oldest = (_his_oldest + 1) % _his_len;
-		}
-	}
+	if ((_his_latest + 1) % _his_len == _his_oldest) // history is full
+		reclaim(txn->get_thd_id(), min_ts, false);
 	
 	if ((_his_latest + 1) % _his_len != _his_oldest) 
 		// _write_history is not full, return the next entry.
@@ -135,6 +134,7 @@ Row_hekaton::reserveRow(txn_man * txn)
 			// _his_len is too large, should replace the oldest history
 			idx = _his_oldest;
 			_his_oldest = (_his_oldest + 1) % _his_len;
+			INC_STATS(txn->get_thd_id(), ver_reclaim_cnt, 1);
 		}
 	}
 
@@ -196,10 +196,37 @@ Row_hekaton::post_process(txn_man * txn, ts_t commit_ts, RC rc)
 		entry->end = INF;
 		_his_latest = (_his_latest + 1) % _his_len;
 		assert(_his_latest != _his_oldest);
+		INC_STATS(txn->get_thd_id(), ver_create_cnt, 1);
 	} else 
 		_write_history[ _his_latest ].end = INF;
 	
 	blatch = false;
+	if (rc == RCOK)
+		version_gc.add(txn->get_thd_id(), _row, commit_ts);
+}
+
+void
+Row_hekaton::gc(uint64_t thd_id, ts_t min_ts)
+{
+	while (!ATOM_CAS(blatch, false, true))
+		PAUSE
+	reclaim(thd_id, min_ts, true);
+	blatch = false;
+}
+
+void
+Row_hekaton::reclaim(uint64_t thd_id, ts_t min_ts, bool free_rows)
+{
+	// no txn from min_ts on can read a version that ended before it.
+	while (_his_oldest != _his_latest && _write_history[_his_oldest].end < min_ts) {
+		WriteHisEntry * entry = &_write_history[_his_oldest];
+		if (free_rows && entry->row != _row) {
+			epoch_man.retire(thd_id, entry->row, RETIRE_VERSION);
+			entry->row = NULL;
+		}
+		_his_oldest = (_his_oldest + 1) % _his_len;
+		INC_STATS(thd_id, ver_reclaim_cnt, 1);
+	}
 }
 
 #endif
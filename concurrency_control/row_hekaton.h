@@ -27,11 +27,19 @@ public:
 	RC 				access(txn_man * txn, TsType type, row_t * row);
 	RC 				prepare_read(txn_man * txn, row_t * row, ts_t commit_ts);
 	void 			post_process(txn_man * txn, ts_t commit_ts, RC rc);
+	// drop the versions that ended before min_ts (cf. VersionGC).
+	void 			gc(uint64_t thd_id, ts_t min_ts);
 
 private:
 	volatile bool 	blatch;
 	uint32_t 		reserveRow(txn_man * txn);
 	void 			doubleHistory();
+	// with free_rows, the rows of the dropped versions are retired.
+	// Otherwise they stay in their entries to be reused.
+	void 			reclaim(uint64_t thd_id, ts_t min_ts, bool free_rows);
+
+	// the row in the table. It is never freed.
+	row_t * 		_row;
 
 	uint32_t 		_his_latest;
 	uint32_t 		_his_oldest;
@@ -17,7 +17,11 @@ void Row_lock::init(row_t * row) {
 	
 	lock_type = LOCK_NONE;
 	blatch = false;
-
+#if LOCK_RETIRE
+	retired_head = NULL;
+	retired_tail = NULL;
+	retired_cnt = 0;
+#endif
 }
 
 RC Row_lock::lock_get(lock_t type, txn_man * txn) {
@@ -27,14 +31,11 @@ RC Row_lock::lock_get(lock_t type, txn_man * txn) {
 }
 
 RC Row_lock::lock_get(lock_t type, txn_man * txn, uint64_t* &txnids, int &txncnt) {
-	assert (CC_ALG == DL_DETECT || CC_ALG == NO_WAIT || CC_ALG == WAIT_DIE);
+	assert (CC_ALG == DL_DETECT || CC_ALG == NO_WAIT || CC_ALG == WAIT_DIE || CC_ALG == WOUND_WAIT);
 	RC rc;
 	int part_id =_row->get_part_id();
-	if (g_central_man)
-		glob_manager->lock_row(_row);
-	else 
-		pthread_mutex_lock( latch );
-	assert(owner_cnt <= g_thread_cnt);
+	latch_row();
+	assert(owner_cnt <= g_thread_cnt * g_interleave_cnt);
 	assert(waiter_cnt < g_thread_cnt);
 #if DEBUG_ASSERT
 	if (owners != NULL)
@@ -59,10 +60,19 @@ RC Row_lock::lock_get(lock_t type, txn_man * txn, uint64_t* &txnids, int &txncnt
 #endif
 
 	bool conflict = conflict_lock(lock_type, type);
+#if LOCK_RETIRE
+	if (!conflict && retired_head != NULL && !can_follow(txn))
+		conflict = true;
+#endif
 	if (CC_ALG == WAIT_DIE && !conflict) {
 		if (waiters_head && txn->get_ts() < waiters_head->txn->get_ts())
 			conflict = true;
 	}
+	// Do not pass an older waiter, which would then wait for a younger owner.
+	if (CC_ALG == WOUND_WAIT && !conflict) {
+		if (waiters_head && txn->get_ts() > waiters_head->txn->get_ts())
+			conflict = true;
+	}
 	// Some txns coming earlier is waiting. Should also wait.
 	if (CC_ALG == DL_DETECT && waiters_head != NULL)
 		conflict = true;
@@ -98,6 +108,12 @@ RC Row_lock::lock_get(lock_t type, txn_man * txn, uint64_t* &txnids, int &txncnt
 				}
 				en = en->next;
 			}
+#if LOCK_RETIRE
+			// txn would also wait for the retired owners to commit.
+			for (en = retired_head; canwait && en != NULL; en = en->next)
+				if (en->txn->get_ts() < txn->get_ts())
+					canwait = false;
+#endif
 			if (canwait) {
 				// insert txn to the right position
 				// the waiter list is always in timestamp order
@@ -119,7 +135,38 @@ RC Row_lock::lock_get(lock_t type, txn_man * txn, uint64_t* &txnids, int &txncnt
             }
             else 
                 rc = Abort;
-        }
+        } else if (CC_ALG == WOUND_WAIT) {
+            ///////////////////////////////////////////////////////////
+            //  - T is the txn currently running
+			//	T wounds every conflicting owner younger than T
+			//	T waits
+            //////////////////////////////////////////////////////////
+			// A wounded txn aborts at its next get_row() or while it waits,
+			// and its locks are then handed to the waiters. One that already
+			// finished its accesses commits and releases them anyway.
+			LockEntry * en;
+			if (conflict_lock(lock_type, type)) {
+				for (en = owners; en != NULL; en = en->next)
+					if (en->txn->get_ts() > txn->get_ts())
+						en->txn->lock_abort = true;
+			}
+			// the waiter list is in timestamp order, oldest first.
+			LockEntry * entry = get_entry();
+			entry->txn = txn;
+			entry->type = type;
+			en = waiters_head;
+			while (en != NULL && en->txn->get_ts() < txn->get_ts())
+				en = en->next;
+			if (en) {
+				LIST_INSERT_BEFORE(en, entry);
+				if (en == waiters_head)
+					waiters_head = entry;
+			} else 
+				LIST_PUT_TAIL(waiters_head, waiters_tail, entry);
+			waiter_cnt ++;
+			txn->lock_ready = false;
+			rc = WAIT;
+		}
 	} else {
 		LockEntry * entry = get_entry();
 		entry->type = type;
@@ -129,6 +176,12 @@ RC Row_lock::lock_get(lock_t type, txn_man * txn, uint64_t* &txnids, int &txncnt
 		lock_type = type;
 		if (CC_ALG == DL_DETECT) 
 			ASSERT(waiters_head == NULL);
+#if LOCK_RETIRE
+		if (retired_head != NULL) {
+			txn->lv_follow = true;
+			INC_STATS(txn->get_thd_id(), retire_follow_cnt, 1);
+		}
+#endif
         rc = RCOK;
 	}
 final:
@@ -136,7 +189,11 @@ final:
 	if (rc == WAIT && CC_ALG == DL_DETECT) {
 		// Update the waits-for graph
 		ASSERT(waiters_tail->txn == txn);
-		txnids = (uint64_t *) mem_allocator.alloc(sizeof(uint64_t) * (owner_cnt + waiter_cnt), part_id);
+		uint64_t txnid_cnt = owner_cnt + waiter_cnt;
+#if LOCK_RETIRE
+		txnid_cnt += retired_cnt;
+#endif
+		txnids = (uint64_t *) mem_allocator.alloc(sizeof(uint64_t) * txnid_cnt, part_id);
 		txncnt = 0;
 		LockEntry * en = waiters_tail->prev;
 		while (en != NULL) {
@@ -150,24 +207,21 @@ final:
 				txnids[txncnt++] = en->txn->get_txn_id();
 				en = en->next;
 			}
+#if LOCK_RETIRE
+		for (en = retired_head; en != NULL; en = en->next)
+			txnids[txncnt++] = en->txn->get_txn_id();
+#endif
 		ASSERT(txncnt > 0);
 	}
 
-	if (g_central_man)
-		glob_manager->release_row(_row);
-	else
-		pthread_mutex_unlock( latch );
-
+	unlatch_row();
 	return rc;
 }
 
 
 RC Row_lock::lock_release(txn_man * txn) {	
 
-	if (g_central_man)
-		glob_manager->lock_row(_row);
-	else 
-		pthread_mutex_lock( latch );
+	latch_row();
 
 	// Try to find the entry in the owners
 	LockEntry * en = owners;
@@ -185,6 +239,24 @@ RC Row_lock::lock_release(txn_man * txn) {
 		if (owner_cnt == 0)
 			lock_type = LOCK_NONE;
 	} else {
+#if LOCK_RETIRE
+		// a retired owner that commits or has rolled back.
+		en = retired_head;
+		while (en != NULL && en->txn != txn)
+			en = en->next;
+		if (en) {
+			LIST_REMOVE(en);
+			if (en == retired_head)
+				retired_head = en->next;
+			if (en == retired_tail)
+				retired_tail = en->prev;
+			return_entry(en);
+			retired_cnt --;
+			grant_waiters();
+			unlatch_row();
+			return RCOK;
+		}
+#endif
 		// Not in owners list, try waiters list.
 		en = waiters_head;
 		while (en != NULL && en->txn != txn)
@@ -204,28 +276,120 @@ RC Row_lock::lock_release(txn_man * txn) {
 #if DEBUG_ASSERT && CC_ALG == WAIT_DIE 
 		for (en = waiters_head; en != NULL && en->next != NULL; en = en->next)
 			assert(en->next->txn->get_ts() < en->txn->get_ts());
+#elif DEBUG_ASSERT && CC_ALG == WOUND_WAIT
+		for (en = waiters_head; en != NULL && en->next != NULL; en = en->next)
+			assert(en->next->txn->get_ts() > en->txn->get_ts());
 #endif
 
+	grant_waiters();
+	unlatch_row();
+	return RCOK;
+}
+
+void Row_lock::grant_waiters() {
 	LockEntry * entry;
 	// If any waiter can join the owners, just do it!
 	while (waiters_head && !conflict_lock(lock_type, waiters_head->type)) {
+#if LOCK_RETIRE
+		if (retired_head != NULL && !can_follow(waiters_head->txn))
+			break;
+#endif
 		LIST_GET_HEAD(waiters_head, waiters_tail, entry);
 		STACK_PUSH(owners, entry);
 		owner_cnt ++;
 		waiter_cnt --;
 		ASSERT(entry->txn->lock_ready == false);
+#if LOCK_RETIRE
+		if (retired_head != NULL) {
+			entry->txn->lv_follow = true;
+			INC_STATS(entry->txn->get_thd_id(), retire_follow_cnt, 1);
+		}
+#endif
 		entry->txn->lock_ready = true;
 		lock_type = entry->type;
 	} 
 	ASSERT((owners == NULL) == (owner_cnt == 0));
+}
 
-	if (g_central_man)
-		glob_manager->release_row(_row);
-	else
-		pthread_mutex_unlock( latch );
+#if LOCK_RETIRE
+void Row_lock::lock_retire(txn_man * txn) {
+	latch_row();
+	assert(lock_type == LOCK_EX && owner_cnt == 1 && owners->txn == txn);
+	LockEntry * en = owners;
+	owners = NULL;
+	owner_cnt = 0;
+	lock_type = LOCK_NONE;
+	en->aborting = false;
+	LIST_PUT_TAIL(retired_head, retired_tail, en);
+	retired_cnt ++;
+	grant_waiters();
+	unlatch_row();
+}
 
-	return RCOK;
+bool Row_lock::can_follow(txn_man * txn) {
+	for (LockEntry * en = retired_head; en != NULL; en = en->next) {
+		if (en->aborting)
+			return false;
+#if CC_ALG == WAIT_DIE
+		// waiting for a retired owner to commit is a wait, so only an older
+		// txn may do it.
+		if (txn->get_ts() > en->txn->get_ts())
+			return false;
+#else
+		// a txn only waits for a retired owner with a lower txn_id, so the
+		// waits cannot form a loop.
+		if (txn->get_txn_id() < en->txn->get_txn_id())
+			return false;
+#endif
+	}
+	return true;
+}
+
+bool Row_lock::retired_ahead(txn_man * txn, uint64_t &txnid) {
+	latch_row();
+	LockEntry * en = retired_head;
+	while (en != NULL && en->txn != txn)
+		en = en->next;
+	// an owner waits for every retired owner, a retired owner for the ones
+	// that retired before it.
+	LockEntry * ahead = en? en->prev : retired_tail;
+	if (ahead)
+		txnid = ahead->txn->get_txn_id();
+	unlatch_row();
+	return ahead != NULL;
+}
+
+void Row_lock::cascade_abort(txn_man * txn) {
+	latch_row();
+	LockEntry * en = retired_head;
+	while (en != NULL && en->txn != txn)
+		en = en->next;
+	assert(en != NULL);
+	en->aborting = true;
+	// every txn that took the lock after txn retired it has seen its write.
+	uint64_t cascade_cnt = 0;
+	for (LockEntry * dep = en->next; dep != NULL; dep = dep->next)
+		if (!dep->txn->lock_abort) {
+			dep->txn->lock_abort = true;
+			cascade_cnt ++;
+		}
+	for (LockEntry * dep = owners; dep != NULL; dep = dep->next)
+		if (!dep->txn->lock_abort) {
+			dep->txn->lock_abort = true;
+			cascade_cnt ++;
+		}
+	INC_STATS(txn->get_thd_id(), retire_cascade_cnt, cascade_cnt);
+	bool done = (en->next == NULL && owners == NULL);
+	unlatch_row();
+	// they roll back before txn restores the row.
+	while (!done) {
+		PAUSE
+		latch_row();
+		done = (en->next == NULL && owners == NULL);
+		unlatch_row();
+	}
 }
+#endif
 
 bool Row_lock::conflict_lock(lock_t l1, lock_t l2) {
 	if (l1 == LOCK_NONE || l2 == LOCK_NONE)
@@ -236,6 +400,20 @@ bool Row_lock::conflict_lock(lock_t l1, lock_t l2) {
 		return false;
 }
 
+void Row_lock::latch_row() {
+	if (g_central_man)
+		glob_manager->lock_row(_row);
+	else 
+		pthread_mutex_lock( latch );
+}
+
+void Row_lock::unlatch_row() {
+	if (g_central_man)
+		glob_manager->release_row(_row);
+	else
+		pthread_mutex_unlock( latch );
+}
+
 LockEntry * Row_lock::get_entry() {
 	LockEntry * entry = (LockEntry *) 
 		mem_allocator.alloc(sizeof(LockEntry), _row->get_part_id());
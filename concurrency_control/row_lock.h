@@ -6,6 +6,10 @@ struct LockEntry {
     txn_man * txn;
 	LockEntry * next;
 	LockEntry * prev;
+#if LOCK_RETIRE
+	// a retired owner that aborts. No txn may take the lock after it.
+	bool aborting;
+#endif
 };
 
 class Row_lock {
@@ -15,6 +19,17 @@ public:
     RC lock_get(lock_t type, txn_man * txn);
     RC lock_get(lock_t type, txn_man * txn, uint64_t* &txnids, int &txncnt);
     RC lock_release(txn_man * txn);
+#if LOCK_RETIRE
+	// txn holds the lock exclusively and will not touch the row again.
+	// Later txns may take the lock; they commit after txn and abort with it.
+	void lock_retire(txn_man * txn);
+	// whether a retired owner ahead of txn has not committed yet. txnid is
+	// the one txn waits for.
+	bool retired_ahead(txn_man * txn, uint64_t &txnid);
+	// txn retired the lock and aborts. Abort the txns that took the lock
+	// after it and wait until they roll back and leave.
+	void cascade_abort(txn_man * txn);
+#endif
 	
 private:
     pthread_mutex_t * latch;
@@ -23,6 +38,14 @@ private:
 	bool 		conflict_lock(lock_t l1, lock_t l2);
 	LockEntry * get_entry();
 	void 		return_entry(LockEntry * entry);
+	void 		latch_row();
+	void 		unlatch_row();
+	// move the waiters that can join the owners.
+	void 		grant_waiters();
+#if LOCK_RETIRE
+	// whether txn may take the lock past the retired owners.
+	bool 		can_follow(txn_man * txn);
+#endif
 	row_t * _row;
     lock_t lock_type;
     UInt32 owner_cnt;
@@ -35,6 +58,13 @@ private:
 	LockEntry * owners;	
 	LockEntry * waiters_head;
 	LockEntry * waiters_tail;
+#if LOCK_RETIRE
+	// retired owners, a double linked list in the order they retired. The
+	// retired locks are all exclusive.
+	LockEntry * retired_head;
+	LockEntry * retired_tail;
+	UInt32 retired_cnt;
+#endif
 };
 
 #endif
@@ -4,6 +4,8 @@
 #include "manager.h"
 #include "row_mvcc.h"
 #include "mem_alloc.h"
+#include "epoch.h"
+#include "version_gc.h"
 #include <mm_malloc.h>
 
 #if CC_ALG == MVCC
@@ -117,6 +119,8 @@ INC_STATS(txn->get_thd_id(), debug4, t2 - t1);
 		}
 #endif
 	if (type == R_REQ) {
+		INC_STATS(txn->get_thd_id(), ver_read_cnt, 1);
+		INC_STATS(txn->get_thd_id(), ver_chain_len, _num_versions + 1);
 		if (ts < _oldest_wts)
 			// the version was already recycled... This should be very rare
 			rc = Abort;
@@ -177,6 +181,7 @@ INC_STATS(txn->get_thd_id(), debug4, t2 - t1);
 		_latest_row = row;
 		_exists_prewrite = false;
 		_num_versions ++;
+		INC_STATS(txn->get_thd_id(), ver_create_cnt, 1);
 		update_buffer(txn, W_REQ);
 	} else if (type == XP_REQ) {
 		assert(row == _write_history[_prewrite_his_id].row);
@@ -192,49 +197,73 @@ INC_STATS(txn->get_thd_id(), debug3, get_sys_clock() - t2);
 	else
 		blatch = false;
 		//pthread_mutex_unlock( latch );	
+	if (type == W_REQ)
+		version_gc.add(txn->get_thd_id(), _row, ts);
 		
 	return rc;
 }
 
+void
+Row_mvcc::gc(uint64_t thd_id, ts_t min_ts)
+{
+	if (g_central_man)
+		glob_manager->lock_row(_row);
+	else
+		while (!ATOM_CAS(blatch, false, true))
+			PAUSE
+	reclaim(thd_id, min_ts);
+	if (g_central_man)
+		glob_manager->release_row(_row);
+	else
+		blatch = false;
+}
+
+void
+Row_mvcc::reclaim(uint64_t thd_id, ts_t min_ts)
+{
+	if (_oldest_wts >= min_ts)
+		return;
+	ts_t max_recycle_ts = 0;
+	uint32_t idx = _his_len;
+	for (uint32_t i = 0; i < _his_len; i++) {
+		if (_write_history[i].valid
+			&& _write_history[i].ts < min_ts
+			&& _write_history[i].ts > max_recycle_ts)		
+		{
+			max_recycle_ts = _write_history[i].ts;
+			idx = i;
+		}
+	}
+	if (idx == _his_len)
+		return;
+	// copy rather than swap, so that _row stays the row in the table.
+	_row->copy(_write_history[idx].row);
+	if (_latest_wts == max_recycle_ts)
+		_latest_row = _row;
+	_oldest_wts = max_recycle_ts;
+	for (uint32_t i = 0; i < _his_len; i++) {
+		if (_write_history[i].valid
+			&& _write_history[i].ts <= max_recycle_ts)
+		{
+			assert(_write_history[i].row);
+			epoch_man.retire(thd_id, _write_history[i].row, RETIRE_VERSION);
+			_write_history[i].valid = false;
+			_write_history[i].reserved = false;
+			_write_history[i].row = NULL;
+			_num_versions --;
+			INC_STATS(thd_id, ver_reclaim_cnt, 1);
+		}
+	}
+}
+
 row_t *
 Row_mvcc::reserveRow(ts_t ts, txn_man * txn)
 {
 	assert(!_exists_prewrite);
 	
 	// Garbage Collection
-	ts_t min_ts = glob_manager->get_min_ts(txn->get_thd_id());
-	if (_oldest_wts < min_ts && 
-		_num_versions == _his_len)
-	{
-		ts_t max_recycle_ts = 0;
-		ts_t idx = _his_len;
-		for (uint32_t i = 0; i < _his_len; i++) {
-			if (_write_history[i].valid
-				&& _write_history[i].ts < min_ts
-				&& _write_history[i].ts > max_recycle_ts)		
-			{
-				max_recycle_ts = _write_history[i].ts;
-				idx = i;
-			}
-		}
-		// some entries can be garbage collected.
-		if (idx != _his_len) {
-			row_t * temp = _row;
-			_row = _write_history[idx].row;
-			_write_history[idx].row = temp;
-			_oldest_wts = max_recycle_ts;
-			for (uint32_t i = 0; i < _his_len; i++) {
-				if (_write_history[i].valid
-					&& _write_history[i].ts <= max_recycle_ts)
-				{
-					_write_history[i].valid = false;
-					_write_history[i].reserved = false;
-					assert(_write_history[i].row);
-					_num_versions --;
-				}
-			}
-		}
-	}
+	if (_num_versions == _his_len)
+		reclaim(txn->get_thd_id(), glob_manager->get_min_ts(txn->get_thd_id()));
 	
 #if DEBUG_CC
 	uint32_t his_size = 0;
@@ -266,7 +295,6 @@ Row_mvcc::reserveRow(ts_t ts, txn_man * txn)
 		}
 		assert(idx < _his_len);
 	}
-	row_t * row;
 	if (idx == _his_len) { 
 		if (_his_len >= g_thread_cnt) {
 			// all entries are taken. recycle the oldest version if _his_len is too long already
@@ -279,11 +307,11 @@ Row_mvcc::reserveRow(ts_t ts, txn_man * txn)
 			}
 			assert(min_ts > _oldest_wts);
 			assert(_write_history[idx].row);
-			row = _row;
-			_row = _write_history[idx].row;
-			_write_history[idx].row = row;
+			// the oldest version moves into _row and its entry is reused.
+			_row->copy(_write_history[idx].row);
 			_oldest_wts = min_ts;
 			_num_versions --;
+			INC_STATS(txn->get_thd_id(), ver_reclaim_cnt, 1);
 		} else {
 			// double the history size. 
 			double_list(0);
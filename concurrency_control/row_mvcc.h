@@ -29,10 +29,13 @@ class Row_mvcc {
 public:
 	void init(row_t * row);
 	RC access(txn_man * txn, TsType type, row_t * row);
+	// drop the versions hidden by a version older than min_ts (cf. VersionGC).
+	void gc(uint64_t thd_id, ts_t min_ts);
 private:
  	pthread_mutex_t * latch;
 	volatile bool blatch;
 
+	// the row in the table. It holds the oldest version and is never freed.
 	row_t * _row;
 
 	RC conflict(TsType type, ts_t ts, uint64_t thd_id = 0);
@@ -64,6 +67,9 @@ private:
 	// list = 1: _requests
 	void double_list(uint32_t list);
 	row_t * reserveRow(ts_t ts, txn_man * txn);
+	// the newest version older than min_ts becomes _row. The versions it
+	// hides are retired.
+	void reclaim(uint64_t thd_id, ts_t min_ts);
 };
 
 #endif
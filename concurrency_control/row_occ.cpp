@@ -3,55 +3,72 @@
 #include "row_occ.h"
 #include "mem_alloc.h"
 
-void 
+#if CC_ALG == OCC
+
+void
 Row_occ::init(row_t * row) {
 	_row = row;
-	int part_id = row->get_part_id();
-	_latch = (pthread_mutex_t *) 
-		mem_allocator.alloc(sizeof(pthread_mutex_t), part_id);
-	pthread_mutex_init( _latch, NULL );
-	wts = 0;
-	blatch = false;
+	_tid_word = 0;
 }
 
 RC
 Row_occ::access(txn_man * txn, TsType type) {
-	RC rc = RCOK;
-	pthread_mutex_lock( _latch );
-	if (type == R_REQ) {
-		if (txn->start_ts < wts)
-			rc = Abort;
-		else { 
-			txn->cur_row->copy(_row);
-			rc = RCOK;
+	assert(type == R_REQ);
+	uint64_t v = 0;
+	uint64_t v2 = 1;
+	while (v2 != v) {
+		v = _tid_word;
+		while (v & LOCK_BIT) {
+			PAUSE
+			v = _tid_word;
 		}
-	} else 
-		assert(false);
-	pthread_mutex_unlock( _latch );
-	return rc;
+		txn->cur_row->copy(_row);
+		COMPILER_BARRIER
+		v2 = _tid_word;
+	}
+	if (txn->start_ts < (v & (~LOCK_BIT)))
+		return Abort;
+	return RCOK;
 }
 
 void
-Row_occ::latch() {
-	pthread_mutex_lock( _latch );
+Row_occ::lock() {
+	uint64_t v = _tid_word;
+	while ((v & LOCK_BIT) || !ATOM_CAS(_tid_word, v, v | LOCK_BIT)) {
+		PAUSE
+		v = _tid_word;
+	}
 }
 
 bool
-Row_occ::validate(uint64_t ts) {
-	if (ts < wts) return false;
-	else return true;
+Row_occ::validate(uint64_t ts, bool in_write_set) {
+	uint64_t v = _tid_word;
+	// a writer holding the row may commit before this txn.
+	if ((v & LOCK_BIT) && !in_write_set)
+		return false;
+	return ts >= (v & (~LOCK_BIT));
 }
 
 void
 Row_occ::write(row_t * data, uint64_t ts) {
-	_row->copy(data);
 	if (PER_ROW_VALID) {
-		assert(ts > wts);
-		wts = ts;
+		assert((_tid_word & LOCK_BIT) && ts > (_tid_word & (~LOCK_BIT)));
+		_row->copy(data);
+		COMPILER_BARRIER
+		_tid_word = ts | LOCK_BIT;
+	} else {
+		// central validation does not lock rows, but the readers still
+		// need the bit to see a consistent copy.
+		lock();
+		_row->copy(data);
+		release();
 	}
 }
 
 void
 Row_occ::release() {
-	pthread_mutex_unlock( _latch );
+	assert(_tid_word & LOCK_BIT);
+	_tid_word = _tid_word & (~LOCK_BIT);
 }
+
+#endif
@@ -6,22 +6,25 @@ class Catalog;
 class txn_man;
 struct TsReqEntry;
 
+#if CC_ALG == OCC
+#define LOCK_BIT (1UL << 63)
+#endif
+
 class Row_occ {
 public:
 	void 				init(row_t * row);
 	RC 					access(txn_man * txn, TsType type);
-	void 				latch();
-	// ts is the start_ts of the validating txn 
-	bool				validate(uint64_t ts);
+	// only the validating txn's write set is locked, in row order.
+	void 				lock();
+	// ts is the start_ts of the validating txn
+	bool				validate(uint64_t ts, bool in_write_set);
 	void				write(row_t * data, uint64_t ts);
 	void 				release();
 private:
- 	pthread_mutex_t * 	_latch;
-	bool 				blatch;
-
 	row_t * 			_row;
-	// the last update time
-	ts_t 				wts;
+	// the last update time, and LOCK_BIT while a writer holds the row.
+	// Readers copy the row without a latch and retry if the word changed.
+	volatile uint64_t 	_tid_word;
 };
 
 #endif
@@ -16,10 +16,15 @@ Row_silo::init(row_t * row)
 	pthread_mutex_init( _latch, NULL );
 	_tid = 0;
 #endif
+#if SILO_HYBRID
+	_hlock = 0;
+	_temp = 0;
+	_temp_time = 0;
+#endif
 }
 
 RC
-Row_silo::access(txn_man * txn, TsType type, row_t * local_row) {
+Row_silo::access(txn_man * txn, TsType type, row_t * local_row, cols_t cols) {
 #if ATOMIC_WORD
 	uint64_t v = 0;
 	uint64_t v2 = 1;
@@ -29,14 +34,14 @@ Row_silo::access(txn_man * txn, TsType type, row_t * local_row) {
 			PAUSE
 			v = _tid_word;
 		}
-		local_row->copy(_row);
+		local_row->copy(_row, cols);
 		COMPILER_BARRIER
 		v2 = _tid_word;
 	} 
 	txn->last_tid = v & (~LOCK_BIT);
 #else 
 	lock();
-	local_row->copy(_row);
+	local_row->copy(_row, cols);
 	txn->last_tid = _tid;
 	release();
 #endif
@@ -68,8 +73,8 @@ Row_silo::validate(ts_t tid, bool in_write_set) {
 }
 
 void
-Row_silo::write(row_t * data, uint64_t tid) {
-	_row->copy(data);
+Row_silo::write(row_t * data, uint64_t tid, cols_t cols) {
+	_row->copy(data, cols);
 #if ATOMIC_WORD
 	uint64_t v = _tid_word;
 	M_ASSERT(tid > (v & (~LOCK_BIT)) && (v & LOCK_BIT), "tid=%ld, v & LOCK_BIT=%ld, v & (~LOCK_BIT)=%ld\n", tid, (v & LOCK_BIT), (v & (~LOCK_BIT)));
@@ -115,6 +120,52 @@ Row_silo::try_lock()
 #endif
 }
 
+#if SILO_HYBRID
+bool
+Row_silo::is_hot()
+{
+	uint64_t now = get_sys_clock();
+	if (now - _temp_time > HYBRID_TEMP_DECAY) {
+		_temp_time = now;
+		_temp /= 2;
+	}
+	return _temp >= HYBRID_HOT_TEMP;
+}
+
+void
+Row_silo::heat()
+{
+	_temp ++;
+}
+
+bool
+Row_silo::hybrid_lock(lock_t type, bool wait)
+{
+	while (true) {
+		int32_t v = _hlock;
+		bool free = (type == LOCK_EX)? (v == 0) : (v >= 0);
+		if (free && __sync_bool_compare_and_swap(&_hlock, v, 
+				(type == LOCK_EX)? -1 : v + 1))
+			return true;
+		if (!free && !wait)
+			return false;
+		PAUSE
+	}
+}
+
+void
+Row_silo::hybrid_release(lock_t type)
+{
+	if (type == LOCK_EX) {
+		assert(_hlock == -1);
+		_hlock = 0;
+	} else {
+		assert(_hlock > 0);
+		__sync_fetch_and_sub(&_hlock, 1);
+	}
+}
+#endif
+
 uint64_t 
 Row_silo::get_tid()
 {
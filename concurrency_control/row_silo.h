@@ -11,10 +11,11 @@ struct TsReqEntry;
 class Row_silo {
 public:
 	void 				init(row_t * row);
-	RC 					access(txn_man * txn, TsType type, row_t * local_row);
+	RC 					access(txn_man * txn, TsType type, row_t * local_row,
+							cols_t cols = COLS_ALL);
 	
 	bool				validate(ts_t tid, bool in_write_set);
-	void				write(row_t * data, uint64_t tid);
+	void				write(row_t * data, uint64_t tid, cols_t cols = COLS_ALL);
 	
 	void 				lock();
 	void 				release();
@@ -22,6 +23,15 @@ public:
 	uint64_t 			get_tid();
 
 	void 				assert_lock() {assert(_tid_word & LOCK_BIT); }
+#if SILO_HYBRID
+	bool 				is_hot();
+	// the row caused an abort.
+	void 				heat();
+	// a reader-writer lock apart from the TID word. Only hot rows take it,
+	// at access. The TID word is still validated at commit.
+	bool 				hybrid_lock(lock_t type, bool wait);
+	void 				hybrid_release(lock_t type);
+#endif
 private:
 #if ATOMIC_WORD
 	volatile uint64_t	_tid_word;
@@ -30,6 +40,13 @@ private:
 	ts_t 				_tid;
 #endif
 	row_t * 			_row;
+#if SILO_HYBRID
+	// -1: exclusive, otherwise the # of shared owners.
+	volatile int32_t 	_hlock;
+	// a hint, so updates may race.
+	uint32_t 			_temp;
+	uint64_t 			_temp_time;
+#endif
 };
 
 #endif
@@ -19,13 +19,18 @@ Row_tictoc::init(row_t * row)
 	_rts = 0;
 #endif
 #if TICTOC_MV
-	_hist_wts = 0;
+	_hist = NULL;
+	_hist_next = 0;
 #endif
 }
 	
 RC
-Row_tictoc::access(txn_man * txn, TsType type, row_t * local_row)
+Row_tictoc::access(txn_man * txn, TsType type, row_t * local_row, cols_t cols)
 {
+#if TICTOC_MV
+	if (txn->read_only)
+		return access_snapshot(txn, local_row, cols);
+#endif
 #if ATOMIC_WORD
 	uint64_t v = 0;
 	uint64_t v2 = 1;
@@ -39,7 +44,7 @@ Row_tictoc::access(txn_man * txn, TsType type, row_t * local_row)
 			PAUSE
 			v = _ts_word;
 		}
-		local_row->copy(_row);
+		local_row->copy(_row, cols);
 		COMPILER_BARRIER
 		v2 = _ts_word;
   #if WRITE_PERMISSION_LOCK
@@ -55,37 +60,155 @@ Row_tictoc::access(txn_man * txn, TsType type, row_t * local_row)
 	lock();
 	txn->last_wts = _wts;
 	txn->last_rts = _rts;
-	local_row->copy(_row); 
+	local_row->copy(_row, cols); 
 	release();
 #endif
 	return RCOK;
 }
 
+#if TICTOC_MV
+RC
+Row_tictoc::access_snapshot(txn_man * txn, row_t * local_row, cols_t cols)
+{
+#if ATOMIC_WORD
+	uint64_t lock_mask = LOCK_BIT | WRITE_BIT;
+	while (true) {
+		uint64_t v = _ts_word;
+		if (v & lock_mask) {
+			PAUSE
+			continue;
+		}
+		ts_t wts = v & WTS_MASK;
+		// the snapshot is taken at the first read, no older than the
+		// txns this thread has committed.
+		if (txn->snapshot_ts == 0)
+			txn->snapshot_ts = max(txn->get_max_wts(), max(wts, (ts_t) 1));
+		ts_t ts = txn->snapshot_ts;
+		if (wts > ts)
+			return read_history(txn, ts, local_row, cols);
+		local_row->copy(_row, cols);
+		COMPILER_BARRIER
+		if ((_ts_word | RTS_MASK) != (v | RTS_MASK))
+			continue;
+		// extend the lease to ts, so no later write is installed below it.
+		ts_t new_rts;
+		if (!try_renew(wts, ts, new_rts, txn->get_thd_id()))
+			continue;
+		txn->last_wts = wts;
+		txn->last_rts = ts;
+		return RCOK;
+	}
+#else
+	lock();
+	if (txn->snapshot_ts == 0)
+		txn->snapshot_ts = max(txn->get_max_wts(), max(_wts, (ts_t) 1));
+	ts_t ts = txn->snapshot_ts;
+	if (_wts <= ts) {
+		if (_rts < ts)
+			_rts = ts;
+		txn->last_wts = _wts;
+		txn->last_rts = ts;
+		local_row->copy(_row, cols);
+		release();
+		return RCOK;
+	}
+	release();
+	return read_history(txn, ts, local_row, cols);
+#endif
+}
+
+RC
+Row_tictoc::read_history(txn_man * txn, ts_t ts, row_t * local_row, cols_t cols)
+{
+	HistEntry * hist = _hist;
+	if (hist == NULL)
+		return Abort;
+	for (uint32_t i = 0; i < TICTOC_MV_VERSIONS; i++) {
+		HistEntry * entry = &hist[i];
+		ts_t end = entry->end;
+		COMPILER_BARRIER
+		ts_t wts = entry->wts;
+		if (end == 0 || wts > ts || ts >= end)
+			continue;
+		local_row->copy(entry->data, cols);
+		COMPILER_BARRIER
+		// the slot was recycled. The older versions are gone as well.
+		if (entry->end != end || entry->wts != wts)
+			return Abort;
+		txn->last_wts = wts;
+		txn->last_rts = ts;
+		return RCOK;
+	}
+	return Abort;
+}
+
+void
+Row_tictoc::push_history(ts_t wts, ts_t end)
+{
+	if (_hist == NULL) {
+		HistEntry * hist = (HistEntry *)
+			_mm_malloc(sizeof(HistEntry) * TICTOC_MV_VERSIONS, 64);
+		for (uint32_t i = 0; i < TICTOC_MV_VERSIONS; i++) {
+			hist[i].wts = 0;
+			hist[i].end = 0;
+			hist[i].data = (row_t *) _mm_malloc(sizeof(row_t), 64);
+			hist[i].data->init(_row->get_tuple_size());
+			hist[i].data->switch_schema(_row->get_table());
+		}
+		COMPILER_BARRIER
+		_hist = hist;
+	}
+	HistEntry * entry = &_hist[_hist_next];
+	_hist_next = (_hist_next + 1) % TICTOC_MV_VERSIONS;
+	entry->end = 0;
+	COMPILER_BARRIER
+	entry->wts = wts;
+	entry->data->copy(_row);
+	COMPILER_BARRIER
+	entry->end = end;
+}
+
+bool
+Row_tictoc::in_history(ts_t wts, ts_t rts)
+{
+	HistEntry * hist = _hist;
+	if (hist == NULL)
+		return false;
+	for (uint32_t i = 0; i < TICTOC_MV_VERSIONS; i++) {
+		ts_t end = hist[i].end;
+		COMPILER_BARRIER
+		if (end != 0 && hist[i].wts == wts && rts < end)
+			return true;
+	}
+	return false;
+}
+#endif
+
 void 
-Row_tictoc::write_data(row_t * data, ts_t wts)
+Row_tictoc::write_data(row_t * data, ts_t wts, cols_t cols)
 {
 #if ATOMIC_WORD
   	uint64_t v = _ts_word;
-  #if TICTOC_MV
-	_hist_wts = v & WTS_MASK;
-  #endif
   #if WRITE_PERMISSION_LOCK
 	assert(__sync_bool_compare_and_swap(&_ts_word, v, v | LOCK_BIT));
+  #endif
+  #if TICTOC_MV
+	push_history(v & WTS_MASK, wts);
   #endif
   	v &= ~(RTS_MASK | WTS_MASK); // clear wts and rts.
 	v |= wts;
 	_ts_word = v;
-	_row->copy(data);
+	_row->copy(data, cols);
   #if WRITE_PERMISSION_LOCK
 	_ts_word &= (~LOCK_BIT);
   #endif
 #else 
   #if TICTOC_MV
-	_hist_wts = _wts;
+	push_history(_wts, wts);
   #endif
 	_wts = wts;
 	_rts = wts;
-	_row->copy(data);
+	_row->copy(data, cols);
 #endif
 }
 
@@ -95,7 +218,7 @@ Row_tictoc::renew_lease(ts_t wts, ts_t rts)
 #if !ATOMIC_WORD
 	if (_wts != wts) {
   #if TICTOC_MV
-		if (wts == _hist_wts && rts < _wts) 
+		if (in_history(wts, rts))
 			return true;
   #endif
 		return false;
@@ -116,15 +239,8 @@ Row_tictoc::try_renew(ts_t wts, ts_t rts, ts_t &new_rts, uint64_t thd_id)
 	if (v & lock_mask)
 		return false; 
   #if TICTOC_MV
-  	COMPILER_BARRIER
-  	uint64_t hist_wts = _hist_wts;
-	if (wts != (v & WTS_MASK)) {
-		if (wts == hist_wts && rts < (v & WTS_MASK)) {
-			return true;
-		} else {
-			return false;
-		}
-	}
+	if (wts != (v & WTS_MASK))
+		return in_history(wts, rts);
   #else
 	if (wts != (v & WTS_MASK)) 
 		return false;
@@ -157,7 +273,7 @@ Row_tictoc::try_renew(ts_t wts, ts_t rts, ts_t &new_rts, uint64_t thd_id)
 	return false;
 #else
   #if TICTOC_MV
-	if (wts < _hist_wts)
+	if (wts != _wts && !in_history(wts, rts))
 		return false;
   #else 
 	if (wts != _wts)
@@ -169,7 +285,7 @@ Row_tictoc::try_renew(ts_t wts, ts_t rts, ts_t &new_rts, uint64_t thd_id)
 
 	if (wts != _wts) { 
   #if TICTOC_MV
-		if (wts == _hist_wts && rts < _wts) {
+		if (in_history(wts, rts)) {
 			pthread_mutex_unlock( _latch );
 			return true;
 		}
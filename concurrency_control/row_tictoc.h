@@ -30,11 +30,17 @@ class row_t;
 class Row_tictoc {
 public:
 	void 				init(row_t * row);
-	RC 					access(txn_man * txn, TsType type, row_t * local_row);
+	RC 					access(txn_man * txn, TsType type, row_t * local_row,
+							cols_t cols = COLS_ALL);
+#if TICTOC_MV
+	// a read-only txn reads the version valid at txn->snapshot_ts, from
+	// the history if the row was overwritten since.
+	RC 					access_snapshot(txn_man * txn, row_t * local_row, cols_t cols);
+#endif
 #if SPECULATE
 	RC					write_speculate(row_t * data, ts_t version, bool spec_read); 
 #endif
-	void				write_data(row_t * data, ts_t wts);
+	void				write_data(row_t * data, ts_t wts, cols_t cols = COLS_ALL);
 	void				write_ptr(row_t * data, ts_t wts, char *& data_to_free);
 	bool 				renew_lease(ts_t wts, ts_t rts);
 	bool 				try_renew(ts_t wts, ts_t rts, ts_t &new_rts, uint64_t thd_id);
@@ -56,7 +62,21 @@ private:
 	pthread_mutex_t * 	_latch;
 #endif
 #if TICTOC_MV
-	volatile ts_t 		_hist_wts;
+	// The last TICTOC_MV_VERSIONS versions replaced by a write, as a ring.
+	// A version is valid in [wts, end). The slot is reused in place, so
+	// end is 0 while it is rewritten and readers check it after copying.
+	struct HistEntry {
+		volatile ts_t 	wts;
+		volatile ts_t 	end;
+		row_t * 		data;
+	};
+	HistEntry * volatile _hist;
+	uint32_t 			_hist_next;
+	// only called by the writer, which holds the row lock.
+	void 				push_history(ts_t wts, ts_t end);
+	// whether version wts was still valid at rts.
+	bool 				in_history(ts_t wts, ts_t rts);
+	RC 					read_history(txn_man * txn, ts_t ts, row_t * local_row, cols_t cols);
 #endif
 };
 
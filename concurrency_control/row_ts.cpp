@@ -94,7 +94,9 @@ TsReqEntry * Row_ts::debuffer_req( TsType type, txn_man * txn, ts_t ts ) {
 	TsReqEntry * req = *queue;
 	TsReqEntry * prev_req = NULL;
 	if (txn != NULL) {
-		while (req != NULL && req->txn != txn) {		
+		// a txn_man may still have the buffered writes of its earlier txns
+		// on this row. ts picks the request of one of them.
+		while (req != NULL && (req->txn != txn || (ts != UINT64_MAX && req->ts != ts))) {
 			prev_req = req;
 			req = req->next;
 		}
@@ -186,6 +188,10 @@ RC Row_ts::access(txn_man * txn, TsType type, row_t * row) {
 			}
 #endif
 		}
+		// the write is applied to the whole row at commit, so the local 
+		// copy starts from the current value.
+		if (rc == RCOK)
+			txn->cur_row->copy(_row);
 	} else if (type == W_REQ) {
 		// write requests are always accepted.
 		rc = RCOK;
@@ -248,7 +254,6 @@ void Row_ts::update_buffer() {
 		else break; // min_pts is not updated.
 		// debuffer readreq. ready_read can be a list
 		TsReqEntry * ready_read = debuffer_req(R_REQ, min_pts);
-		if (ready_read == NULL) break;
 		// for each debuffered readreq, perform read.
 		TsReqEntry * req = ready_read;
 		while (req != NULL) {			
@@ -264,15 +269,15 @@ void Row_ts::update_buffer() {
 		ts_t new_min_rts = cal_min(R_REQ);
 		if (new_min_rts > min_rts)
 			min_rts = new_min_rts;
-		else break;
-		// debuffer writereq
-		TsReqEntry * ready_write = debuffer_req(W_REQ, min_rts);
+		// debuffer writereq. A write buffered behind an older prewrite is
+		// ready once that prewrite is gone, even if no read was waiting.
+		TsReqEntry * ready_write = debuffer_req(W_REQ, min(min_rts, min_pts));
 		if (ready_write == NULL) break;
 		ts_t young_ts = UINT64_MAX;
 		TsReqEntry * young_req = NULL;
 		req = ready_write;
 		while (req != NULL) {
-			TsReqEntry * tmp_req = debuffer_req(P_REQ, req->txn);
+			TsReqEntry * tmp_req = debuffer_req(P_REQ, req->txn, req->ts);
 			assert(tmp_req != NULL);
 			return_req_entry(tmp_req);
 			if (req->ts < young_ts) {
@@ -4,11 +4,17 @@
 
 #if CC_ALG == SILO
 
+#if SILO_HYBRID
+#define HYBRID_HEAT(row) (row)->manager->heat()
+#else
+#define HYBRID_HEAT(row)
+#endif
+
 RC
 txn_man::validate_silo()
 {
 	RC rc = RCOK;
-	// lock write tuples in the primary key order.
+	// lock write tuples in row order.
 	int write_set[wr_cnt];
 	int cur_wr_idx = 0;
 	int read_set[row_cnt - wr_cnt];
@@ -20,18 +26,7 @@ txn_man::validate_silo()
 			read_set[cur_rd_idx ++] = rid;
 	}
 
-	// bubble sort the write_set, in primary key order 
-	for (int i = wr_cnt - 1; i >= 1; i--) {
-		for (int j = 0; j < i; j++) {
-			if (accesses[ write_set[j] ]->orig_row->get_primary_key() > 
-				accesses[ write_set[j + 1] ]->orig_row->get_primary_key())
-			{
-				int tmp = write_set[j];
-				write_set[j] = write_set[j+1];
-				write_set[j+1] = tmp;
-			}
-		}
-	}
+	sort_accesses(write_set, wr_cnt);
 
 	int num_locks = 0;
 	ts_t max_tid = 0;
@@ -40,6 +35,7 @@ txn_man::validate_silo()
 		for (int i = 0; i < wr_cnt; i++) {
 			row_t * row = accesses[ write_set[i] ]->orig_row;
 			if (row->manager->get_tid() != accesses[write_set[i]]->tid) {
+				HYBRID_HEAT(row);
 				rc = Abort;
 				goto final;
 			}	
@@ -47,6 +43,7 @@ txn_man::validate_silo()
 		for (int i = 0; i < row_cnt - wr_cnt; i ++) {
 			Access * access = accesses[ read_set[i] ];
 			if (access->orig_row->manager->get_tid() != accesses[read_set[i]]->tid) {
+				HYBRID_HEAT(access->orig_row);
 				rc = Abort;
 				goto final;
 			}
@@ -65,6 +62,7 @@ txn_man::validate_silo()
 				num_locks ++;
 				if (row->manager->get_tid() != accesses[write_set[i]]->tid)
 				{
+					HYBRID_HEAT(row);
 					rc = Abort;
 					goto final;
 				}
@@ -79,6 +77,7 @@ txn_man::validate_silo()
 					for (int i = 0; i < wr_cnt; i++) {
 						row_t * row = accesses[ write_set[i] ]->orig_row;
 						if (row->manager->get_tid() != accesses[write_set[i]]->tid) {
+							HYBRID_HEAT(row);
 							rc = Abort;
 							goto final;
 						}	
@@ -86,6 +85,7 @@ txn_man::validate_silo()
 					for (int i = 0; i < row_cnt - wr_cnt; i ++) {
 						Access * access = accesses[ read_set[i] ];
 						if (access->orig_row->manager->get_tid() != accesses[read_set[i]]->tid) {
+							HYBRID_HEAT(access->orig_row);
 							rc = Abort;
 							goto final;
 						}
@@ -100,6 +100,7 @@ txn_man::validate_silo()
 			row->manager->lock();
 			num_locks++;
 			if (row->manager->get_tid() != accesses[write_set[i]]->tid) {
+				HYBRID_HEAT(row);
 				rc = Abort;
 				goto final;
 			}
@@ -112,6 +113,7 @@ txn_man::validate_silo()
 		Access * access = accesses[ read_set[i] ];
 		bool success = access->orig_row->manager->validate(access->tid, false);
 		if (!success) {
+			HYBRID_HEAT(access->orig_row);
 			rc = Abort;
 			goto final;
 		}
@@ -123,6 +125,7 @@ txn_man::validate_silo()
 		Access * access = accesses[ write_set[i] ];
 		bool success = access->orig_row->manager->validate(access->tid, true);
 		if (!success) {
+			HYBRID_HEAT(access->orig_row);
 			rc = Abort;
 			goto final;
 		}
@@ -142,11 +145,35 @@ final:
 		for (int i = 0; i < wr_cnt; i++) {
 			Access * access = accesses[ write_set[i] ];
 			access->orig_row->manager->write( 
-				access->data, _cur_tid );
+				access->data, _cur_tid, access->cols );
 			accesses[ write_set[i] ]->orig_row->manager->release();
 		}
 		cleanup(rc);
 	}
 	return rc;
 }
+
+#if SILO_HYBRID
+RC
+txn_man::hybrid_lock(row_t * row, access_t type, lock_t &hlock)
+{
+	hlock = LOCK_NONE;
+	if (!row->manager->is_hot()) {
+		INC_STATS(get_thd_id(), hybrid_opt_cnt, 1);
+		return RCOK;
+	}
+	lock_t type_lock = (type == WR)? LOCK_EX : LOCK_SH;
+	bool wait = (_hybrid_last == NULL || row_t::order_lt(_hybrid_last, row));
+	if (!row->manager->hybrid_lock(type_lock, wait)) {
+		INC_STATS(get_thd_id(), hybrid_lock_abort_cnt, 1);
+		row->manager->heat();
+		return Abort;
+	}
+	INC_STATS(get_thd_id(), hybrid_lock_cnt, 1);
+	if (wait)
+		_hybrid_last = row;
+	hlock = type_lock;
+	return RCOK;
+}
+#endif
 #endif
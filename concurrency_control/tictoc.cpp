@@ -9,6 +9,15 @@ RC
 txn_man::validate_tictoc()
 {
 	RC rc = RCOK;
+#if TICTOC_MV
+	// every read was valid at snapshot_ts when it was made.
+	if (read_only) {
+		if (snapshot_ts > _max_wts)
+			_max_wts = snapshot_ts;
+		cleanup(rc);
+		return rc;
+	}
+#endif
 	int write_set[wr_cnt];
 	int read_set[row_cnt - wr_cnt];
 	int cur_rd_idx = 0;
@@ -20,41 +29,19 @@ txn_man::validate_tictoc()
 			read_set[cur_rd_idx ++] = rid;
 	}
 #if WR_VALIDATION_SEPARATE 
-	// bubble sort the write_set, in primary key order 
-	for (int i = wr_cnt - 1; i >= 1; i--) {
-		for (int j = 0; j < i; j++) {
-			if (accesses[ write_set[j] ]->orig_row->get_primary_key() > 
-				accesses[ write_set[j + 1] ]->orig_row->get_primary_key())
-			{
-				int tmp = write_set[j];
-				write_set[j] = write_set[j+1];
-				write_set[j+1] = tmp;
-			}
-		}
-	}
+	sort_accesses(write_set, wr_cnt);
 #else
 	int sorted_set[row_cnt];
 	for (int i = 0; i < row_cnt; i ++) 
 		sorted_set[ i ] = i;
-
-	for (int i = row_cnt - 1; i >= 1; i--) {
-		for (int j = 0; j < i; j++) {
-			if (accesses[ sorted_set[j] ]->orig_row->get_primary_key() > 
-				accesses[ sorted_set[j + 1] ]->orig_row->get_primary_key())
-			{
-				int tmp = sorted_set[j];
-				sorted_set[j] = sorted_set[j+1];
-				sorted_set[j+1] = tmp;
-			}
-		}
-	}
+	sort_accesses(sorted_set, row_cnt);
 #endif
 	int num_locks = 0;
 	ts_t commit_rts = 0;
 	ts_t commit_wts = 0;
 	for (int i = 0; i < row_cnt; i ++) {
 		Access * access = accesses[ i ];
-		if (access->type == RD && access->wts > commit_rts)
+		if (access->type != WR && access->wts > commit_rts)
 			commit_rts = access->wts;
 		else if (access->type == WR && access->rts + 1 > commit_wts)
 			commit_wts = access->rts + 1;
@@ -238,7 +225,7 @@ final:
 			for (int i = 0; i < wr_cnt; i++) {
 				Access * access = accesses[ write_set[i] ];
 				access->orig_row->manager->write_data( 
-					access->data, commit_wts);
+					access->data, commit_wts, access->cols);
 				access->orig_row->manager->release();
 			}
 #else 
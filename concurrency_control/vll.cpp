@@ -25,7 +25,7 @@ VLLMan::vllMainLoop(txn_man * txn, base_query * query) {
 	for (int rid = 0; rid < m_query->request_cnt; rid ++) {
 		ycsb_request * req = &m_query->requests[rid];
 		ycsb_wl * wl = (ycsb_wl *) txn->get_wl();
-		int part_id = wl->key_to_part( req->key );
+		int part_id = req->part_id;
 		INDEX * index = wl->the_index;
 		itemid_t * item;
 		item = txn->index_read(index, req->key, part_id);
@@ -5,6 +5,9 @@
 // Simulation + Hardware
 /***********************************************/
 #define THREAD_CNT					4
+// # of in-flight txns each worker interleaves. When > 1, txns run as coroutines that
+// prefetch and yield at index probes and row fetches (YCSB, non-blocking CC only).
+#define INTERLEAVE_CNT				1
 #define PART_CNT					1 
 // each transaction only accesses 1 virtual partition. But the lock/ts manager and index are not aware of such partitioning. VIRTUAL_PART_CNT describes the request distribution and is only used to generate queries. For HSTORE, VIRTUAL_PART_CNT should be the same as PART_CNT.
 #define VIRTUAL_PART_CNT			1
@@ -12,6 +15,11 @@
 #define CL_SIZE						64
 // CPU_FREQ is used to get accurate timing info 
 #define CPU_FREQ 					2 	// in GHz/s
+// how threads are pinned to cpus: PIN_NONE, PIN_COMPACT (hyperthreads of a
+// core first), PIN_SCATTER (round robin over NUMA nodes) or PIN_CORE (one
+// thread per physical core). Loaders are pinned like the owner of the
+// partition they load, so its data sits on the owner's NUMA node.
+#define PIN_POLICY					PIN_NONE
 
 // # of transactions to run for warmup
 #define WARMUP						0
@@ -39,7 +47,7 @@
 /***********************************************/
 // Concurrency Control
 /***********************************************/
-// WAIT_DIE, NO_WAIT, DL_DETECT, TIMESTAMP, MVCC, HEKATON, HSTORE, OCC, VLL, TICTOC, SILO
+// WAIT_DIE, WOUND_WAIT, NO_WAIT, DL_DETECT, TIMESTAMP, MVCC, HEKATON, HSTORE, OCC, VLL, TICTOC, SILO, CALVIN
 // TODO TIMESTAMP does not work at this moment
 #define CC_ALG 						TICTOC
 #define ISOLATION_LEVEL 			SERIALIZABLE
@@ -48,10 +56,22 @@
 #define KEY_ORDER					false
 // transaction roll back changes after abort
 #define ROLL_BACK					true
+// [ROLL_BACK] initial size in bytes of a txn's undo log. It doubles when full.
+#define UNDO_BUF_INIT_SIZE			16384
+// [DL_DETECT, NO_WAIT, WAIT_DIE] controlled lock violation. A txn retires its
+// exclusive lock on a hot row after its last access to the row, and later txns
+// may take the lock. They commit after the retiring txn and abort with it.
+#define LOCK_VIOLATION				false
 // per-row lock/ts management or central lock/ts management
 #define CENTRAL_MAN					false
 #define BUCKET_CNT					31
 #define ABORT_PENALTY 				100000
+// how long an aborted txn backs off before it restarts, up to ABORT_PENALTY times:
+// BACKOFF_FIXED: rand. BACKOFF_EXP: rand * 2^(aborts of the txn - 1).
+// BACKOFF_ADAPTIVE: rand * aborts per commit at the thread's recent abort rate.
+#define ABORT_BACKOFF				BACKOFF_FIXED
+// the backoff is at most 2^ABORT_BACKOFF_MAX_EXP * ABORT_PENALTY
+#define ABORT_BACKOFF_MAX_EXP		10
 #define ABORT_BUFFER_SIZE			10
 #define ABORT_BUFFER_ENABLE			true
 // [ INDEX ]
@@ -60,10 +80,12 @@
 #define CENTRAL_MANAGER 			false
 #define INDEX_STRUCT				IDX_HASH
 #define BTREE_ORDER 				16
+// # of blocks a thread retires before it tries to advance the epoch and free
+#define EPOCH_RECLAIM_BATCH			64
 
 // [DL_DETECT] 
-#define DL_LOOP_DETECT				1000 	// 100 us
-#define DL_LOOP_TRIAL				100	// 1 us
+// how often the background detector looks for loops
+#define DL_LOOP_DETECT				1000 	// 1 us
 #define NO_DL						KEY_ORDER
 #define TIMEOUT						1000000 // 1ms
 // [TIMESTAMP]
@@ -71,6 +93,8 @@
 #define TS_ALLOC					TS_CAS
 #define TS_BATCH_ALLOC				false
 #define TS_BATCH_NUM				1
+// [TS_EPOCH] how often the global epoch advances
+#define TS_EPOCH_INTVL				1000000 // 1ms
 // [MVCC]
 // when read/write history is longer than HIS_RECYCLE_LEN
 // the history should be recycled.
@@ -84,6 +108,8 @@
 // [TICTOC]
 #define WRITE_COPY_FORM				"data" // ptr or data
 #define TICTOC_MV					false
+// the versions each row keeps for snapshot reads, when TICTOC_MV is on.
+#define TICTOC_MV_VERSIONS			4
 #define WR_VALIDATION_SEPARATE		true
 #define WRITE_PERMISSION_LOCK		false
 #define ATOMIC_TIMESTAMP			"false"
@@ -91,27 +117,80 @@
 #define VALIDATION_LOCK				"no-wait" // no-wait or waiting
 #define PRE_ABORT					"true"
 #define ATOMIC_WORD					true
+// [SILO]
+// MOCC-style hybrid. A row's temperature goes up on every validation
+// failure it causes and halves every HYBRID_TEMP_DECAY. A row at or above
+// HYBRID_HOT_TEMP is locked when accessed; the other rows are only validated.
+#define SILO_HYBRID					false
+#define HYBRID_HOT_TEMP				8
+#define HYBRID_TEMP_DECAY			1000000 // 1 ms. In nanoseconds
 // [HSTORE]
 // when set to true, hstore will not access the global timestamp.
 // This is fine for single partition transactions. 
 #define HSTORE_LOCAL_TS				false
+// route each txn to the threads that own its partitions (part_id %
+// THREAD_CNT) instead of locking partitions. A single-partition txn runs at
+// its owner without partition locks. A multi-partition txn is queued at all
+// its partitions and run by the owner that reaches it last.
+#define PART_ROUTING				false
+// [PART_ROUTING] the # of txns a partition's inbound queue holds.
+#define PART_QUEUE_SIZE				64
 // [VLL] 
 #define TXN_QUEUE_SIZE_LIMIT		THREAD_CNT
+// [CALVIN]
+// the # of txns each thread adds to an epoch's batch.
+#define CALVIN_BATCH_PER_THD		16
+// the # of threads that queue the batch's locks, each on its share of the rows.
+#define CALVIN_LOCK_THD_CNT			THREAD_CNT
 
 /***********************************************/
 // Logging
 /***********************************************/
+// log the input of each committed txn (LOG_COMMAND) or the rows it wrote
+// (LOG_REDO). A commit is acknowledged once its epoch is durable.
 #define LOG_COMMAND					false
 #define LOG_REDO					false
+// the group commit epoch. The loggers fdatasync once per epoch.
 #define LOG_BATCH_TIME				10 // in ms
+// the # of logger threads. Worker i is logged by logger i % LOG_THD_CNT.
+#define LOG_THD_CNT					1
+// the bytes of each worker's log buffer.
+#define LOG_BUF_SIZE				(1UL << 22)
+// logger i writes LOG_DIR/log_<i>.dat
+#define LOG_DIR						"."
+
+/***********************************************/
+// Checkpoint
+/***********************************************/
+// a background thread writes an image of every table every CKPT_INTVL ms,
+// and samples the throughput every CKPT_SAMPLE_INTVL ms. Not supported by
+// MVCC and HEKATON, whose latest version is not the base row.
+#define CHECKPOINT					false
+// CKPT_FUZZY copies the rows while txns run. CKPT_CONSISTENT pauses the
+// workers between txns until the copy is done.
+#define CKPT_MODE					CKPT_FUZZY
+#define CKPT_INTVL					1000 // in ms
+#define CKPT_SAMPLE_INTVL			100 // in ms
+// the bytes of each write to the checkpoint file.
+#define CKPT_WRITE_SIZE				(1UL << 20)
+// the max write rate in MB/s. 0 for no limit.
+#define CKPT_RATE_LIMIT				0
+// checkpoint i is written to CKPT_DIR/ckpt_<i % 2>.dat
+#define CKPT_DIR					"."
 
 /***********************************************/
 // Benchmark
 /***********************************************/
-// max number of rows touched per transaction
-#define MAX_ROW_PER_TXN				64
+// max number of rows touched per transaction. [TPCC] a stock-level txn
+// reads up to 1 + 300 + 300 rows.
+#define MAX_ROW_PER_TXN				1024
 #define QUERY_INTVL 				1UL
 #define MAX_TXN_PER_PART 			100000
+// [HTAP] the last HTAP_THD_CNT of the THREAD_CNT threads scan the tables
+// of the workload and sum some of their columns, instead of running txns.
+#define HTAP_THD_CNT				0
+// the rows each read-only scan txn reads. At most MAX_ROW_PER_TXN.
+#define HTAP_SCAN_BATCH				32
 #define FIRST_PART_LOCAL 			true
 #define MAX_TUPLE_SIZE				1024 // in bytes
 // ==== [YCSB] ====
@@ -122,10 +201,29 @@
 #define WRITE_PERC 					0.1
 #define SCAN_PERC 					0
 #define SCAN_LEN					20
+// the requests after READ_PERC and WRITE_PERC (blind updates) are
+// read-modify-writes, inserts and then scans.
+#define RMW_PERC					0
+#define INSERT_PERC					0
+// scans read a uniform 1 to SCAN_LEN rows instead of SCAN_LEN.
+#define SCAN_LEN_UNIFORM			false
+// which rows the requests pick: DIST_ZIPFIAN (ZIPF_THETA skew over the loaded
+// rows) or DIST_LATEST (the same skew counted back from the newest row of the
+// partition, so the inserted rows are the hottest)
+#define REQUEST_DIST				DIST_ZIPFIAN
+// one of the YCSB core workloads "A" to "F". It sets the request mix, the
+// distribution and ZIPF_THETA (0.99), overriding the knobs above. Empty to
+// run the knobs.
+#define YCSB_WORKLOAD				""
 #define PART_PER_TXN 				1
 #define PERC_MULTI_PART				1
 #define REQ_PER_QUERY				16
 #define FIELD_PER_TUPLE				10
+// how row ids map to index keys: KEY_DENSE (0..SYNTH_TABLE_SIZE-1),
+// KEY_FNV (FNV-1a hashed, as in YCSB), KEY_SPARSE (ordered with random
+// gaps of up to KEY_SPARSE_GAP) or KEY_RAND64 (64-bit random, no collisions)
+#define KEY_SPACE					KEY_DENSE
+#define KEY_SPARSE_GAP				16
 // ==== [TPCC] ====
 // For large warehouse count, the tables do not fit in memory
 // small tpcc schemas shrink the table size.
@@ -147,6 +245,10 @@ extern TPCCTxnType 					g_tpcc_txn_type;
 
 //#define TXN_TYPE					TPCC_ALL
 #define PERC_PAYMENT 				0.5
+// the weights of new-order, payment, order-status, delivery and stock-level
+// (e.g. "45,43,4,4,4", the standard mix). If empty, PERC_PAYMENT of the txns
+// are payment and the others new-order.
+#define TPCC_MIX					""
 #define FIRSTNAME_MINLEN 			8
 #define FIRSTNAME_LEN 				16
 #define LASTNAME_LEN 				16
@@ -191,6 +293,8 @@ extern TestCases					g_test_case;
 // INDEX_STRUCT
 #define IDX_HASH 					1
 #define IDX_BTREE					2
+#define IDX_MBTREE					3
+#define IDX_ARRAY					4
 // WORKLOAD
 #define YCSB						1
 #define TPCC						2
@@ -207,6 +311,8 @@ extern TestCases					g_test_case;
 #define SILO						9
 #define VLL							10
 #define HEKATON 					11
+#define WOUND_WAIT					12
+#define CALVIN						13
 //Isolation Levels 
 #define SERIALIZABLE				1
 #define SNAPSHOT					2
@@ -216,5 +322,27 @@ extern TestCases					g_test_case;
 #define TS_CAS						2
 #define TS_HW						3
 #define TS_CLOCK					4
+#define TS_EPOCH					5
+#define TS_HLC						6
+// Abort backoff
+#define BACKOFF_FIXED				1
+#define BACKOFF_EXP					2
+#define BACKOFF_ADAPTIVE			3
+// YCSB key space
+#define KEY_DENSE					1
+#define KEY_FNV						2
+#define KEY_SPARSE					3
+#define KEY_RAND64					4
+// YCSB request distribution
+#define DIST_ZIPFIAN				1
+#define DIST_LATEST					2
+// Thread pinning
+#define PIN_NONE					1
+#define PIN_COMPACT					2
+#define PIN_SCATTER					3
+#define PIN_CORE					4
+// Checkpoint mode
+#define CKPT_FUZZY					1
+#define CKPT_CONSISTENT				2
 
 #endif
@@ -90,7 +90,7 @@ scalability_exp = [
         "INDEX_STRUCT": index,
     }
     for workload in ["YCSB", "TPCC"]
-    for alg in ["DL_DETECT", "NO_WAIT", "HEKATON", "SILO", "TICTOC"]
+    for alg in ["DL_DETECT", "NO_WAIT", "WOUND_WAIT", "HEKATON", "SILO", "TICTOC", "CALVIN"]
     for index in ["IDX_BTREE", "IDX_HASH"]
     # for num_threads in [2 ** i for i in range(0, 8)]
     for num_threads in [2 ** i for i in range(0, 6)]
@@ -140,7 +140,7 @@ def plot_scalability_1():
 def plot_scalability_2():
     def subplot_func(items):
         item = items[0]
-        col_label = ["DL_DETECT", "NO_WAIT", "HEKATON", "SILO", "TICTOC"]
+        col_label = ["DL_DETECT", "NO_WAIT", "WOUND_WAIT", "HEKATON", "SILO", "TICTOC", "CALVIN"]
         row_label = ["TPCC", "YCSB"]
 
         row_idx = row_label.index(item["WORKLOAD"])
@@ -151,8 +151,8 @@ def plot_scalability_2():
     plot(
         results_dir=RESULTS_DIR / "scalability",
         figname="scalability-2",
-        figsize=(20, 8),
-        subplot_size=(2, 5),
+        figsize=(28, 8),
+        subplot_size=(2, 7),
         x_log_base=2,
         groupby_keys=["CC_ALG", "INDEX_STRUCT", "WORKLOAD"],
         label_func=lambda items: items[0]["INDEX_STRUCT"],
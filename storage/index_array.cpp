@@ -0,0 +1,107 @@
+#include "global.h"
+#include "index_array.h"
+#include "mem_alloc.h"
+#include "table.h"
+#include "epoch.h"
+
+RC IndexArray::init(uint64_t part_cnt, uint64_t size) {
+	_locked = false;
+	_size = size;
+	_arr = (itemid_t **) mem_allocator.alloc(sizeof(itemid_t *) * size, 0);
+	for (uint64_t i = 0; i < size; i++)
+		_arr[i] = NULL;
+	return RCOK;
+}
+
+RC IndexArray::init(uint64_t part_cnt, table_t * table, uint64_t size) {
+	init(part_cnt, size);
+	this->table = table;
+	return RCOK;
+}
+
+void IndexArray::get_latch() {
+	while (!ATOM_CAS(_locked, false, true))
+		PAUSE
+}
+
+void IndexArray::release_latch() {
+	bool ok = ATOM_CAS(_locked, true, false);
+	assert(ok);
+}
+
+bool IndexArray::index_exist(idx_key_t key, int part_id) {
+	return (key < _size && _arr[key] != NULL);
+}
+
+RC IndexArray::index_insert(idx_key_t key, itemid_t * item, int part_id) {
+	get_latch();
+	if (key >= _size) {
+		uint64_t new_size = (key + 1) * 2;
+		itemid_t ** new_arr = (itemid_t **)
+			mem_allocator.alloc(sizeof(itemid_t *) * new_size, 0);
+		memcpy(new_arr, _arr, sizeof(itemid_t *) * _size);
+		for (uint64_t i = _size; i < new_size; i++)
+			new_arr[i] = NULL;
+		// the old array is not freed since readers do not latch. Doubling
+		// bounds the waste to the size of the current array.
+		COMPILER_BARRIER
+		_arr = new_arr;
+		_size = new_size;
+	}
+	item->next = _arr[key];
+	_arr[key] = item;
+	release_latch();
+	return RCOK;
+}
+
+RC IndexArray::index_read(idx_key_t key, itemid_t * &item, int part_id) {
+	return index_read(key, item, part_id, 0);
+}
+
+RC IndexArray::index_read(idx_key_t key, itemid_t * &item,
+						int part_id, int thd_id) {
+	if (key >= _size) {
+		item = NULL;
+		return ERROR;
+	}
+	item = _arr[key];
+	return (item == NULL)? ERROR : RCOK;
+}
+
+RC IndexArray::index_remove(idx_key_t key, itemid_t * item,
+						int part_id, int thd_id) {
+	get_latch();
+	if (key >= _size || _arr[key] == NULL) {
+		release_latch();
+		return ERROR;
+	}
+	if (item == NULL) {
+		for (itemid_t * it = _arr[key]; it != NULL; it = it->next)
+			epoch_man.retire(thd_id, it, RETIRE_BLOCK);
+		_arr[key] = NULL;
+		release_latch();
+		return RCOK;
+	}
+	itemid_t * prev = NULL;
+	itemid_t * cur = _arr[key];
+	while (cur != NULL && cur != item) {
+		prev = cur;
+		cur = cur->next;
+	}
+	if (cur == NULL) {
+		release_latch();
+		return ERROR;
+	}
+	if (prev == NULL)
+		_arr[key] = item->next;
+	else
+		prev->next = item->next;
+	epoch_man.retire(thd_id, item, RETIRE_BLOCK);
+	release_latch();
+	return RCOK;
+}
+
+void IndexArray::index_prefetch(idx_key_t key, int part_id) {
+	if (key < _size)
+		PREFETCH(&_arr[key]);
+}
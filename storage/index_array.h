@@ -0,0 +1,30 @@
+#pragma once
+
+#include "global.h"
+#include "helper.h"
+#include "index_base.h"
+
+// A direct-mapped index: key k lives in slot k. Only suitable for dense
+// keys (YCSB). Items sharing a key are chained through itemid_t::next.
+class IndexArray : public index_base
+{
+public:
+	RC 			init(uint64_t part_cnt, uint64_t size);
+	RC 			init(uint64_t part_cnt, table_t * table, uint64_t size);
+	bool 		index_exist(idx_key_t key, int part_id=-1);
+	RC 			index_insert(idx_key_t key, itemid_t * item, int part_id=-1);
+	RC	 		index_read(idx_key_t key, itemid_t * &item, int part_id=-1);
+	RC	 		index_read(idx_key_t key, itemid_t * &item,
+							int part_id=-1, int thd_id=0);
+	RC 			index_remove(idx_key_t key, itemid_t * item,
+							int part_id=-1, int thd_id=0);
+	void 		index_prefetch(idx_key_t key, int part_id=-1);
+private:
+	void 		get_latch();
+	void 		release_latch();
+
+	// only writers latch. readers go straight to the array.
+	volatile bool 		_locked;
+	itemid_t ** volatile _arr;
+	volatile uint64_t 	_size;
+};
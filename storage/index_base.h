@@ -9,7 +9,7 @@ public:
 	virtual RC 			init() { return RCOK; };
 	virtual RC 			init(uint64_t size) { return RCOK; };
 
-	virtual bool 		index_exist(idx_key_t key)=0; // check if the key exist.
+	virtual bool 		index_exist(idx_key_t key, int part_id=-1)=0; // check if the key exist.
 
 	virtual RC 			index_insert(idx_key_t key, 
 							itemid_t * item, 
@@ -23,8 +23,22 @@ public:
 							itemid_t * &item,
 							int part_id=-1, int thd_id=0)=0;
 
-	// TODO implement index_remove
-	virtual RC 			index_remove(idx_key_t key) { return RCOK; };
+	// issue a prefetch for the memory a later index_read() on key touches.
+	virtual void 		index_prefetch(idx_key_t key, int part_id=-1) {};
+
+	// returns up to count items with key in [min_key, max_key] in key order.
+	// only the ordered indexes support it.
+	virtual RC 			index_read_range(idx_key_t min_key, idx_key_t max_key,
+							itemid_t ** items, uint64_t &count, int part_id=-1) {
+		assert(false);
+		return ERROR;
+	};
+
+	// remove item from key, or the key with all its items if item is NULL.
+	// the removed memory is retired to epoch_man. returns ERROR if not found.
+	virtual RC 			index_remove(idx_key_t key,
+							itemid_t * item,
+							int part_id=-1, int thd_id=0)=0;
 	
 	// the index in on "table". The key is the merged key of "fields"
 	table_t * 			table;
@@ -1,14 +1,16 @@
 #include "mem_alloc.h"
 #include "index_btree.h"
 #include "row.h"
+#include "epoch.h"
 
 #define DEBUG_PRINT(fmt, args...) fprintf(stderr, "DEBUG: %s:%d:%s(): " fmt "\n", \
     __FILE__, __LINE__, __func__, ##args);
 
 // ref: Partitioned B-Trees: https://database.cs.wisc.edu/cidr/cidr2003/program/p1.pdf
-RC index_btree::init(uint64_t part_cnt) {
+RC index_btree::init(uint64_t part_cnt, UInt32 order) {
+	assert(order >= 3);
 	this->part_cnt = part_cnt;
-	order = BTREE_ORDER; // fanout of each B-tree node
+	this->order = order; // fanout of each B-tree node
 	// these pointers can be mapped anywhere. They won't be changed
 	roots = (bt_node **) malloc(part_cnt * sizeof(bt_node *));
 	// "cur_xxx_per_thd" is only for SCAN queries.
@@ -34,21 +36,18 @@ bt_node * index_btree::find_root(uint64_t part_id) {
 	return roots[part_id];
 }
 
-bool index_btree::index_exist(idx_key_t key) {
-	// TODO: implement this
-	assert(false); // part_id is not correct now.
+bool index_btree::index_exist(idx_key_t key, int part_id) {
 	glob_param params;
-	params.part_id = key_to_part(key) % part_cnt;
+	if (part_id == -1)
+		part_id = key_to_part(key) % part_cnt;
+	params.part_id = part_id;
 	bt_node * leaf;
 	// does not matter which thread check existence
-	find_leaf(params, key, INDEX_NONE, leaf);
-	if (leaf == NULL) return false;
-	for (UInt32 i = 0; i < leaf->num_keys; i++)
-		if (leaf->keys[i] == key) {
-			// the record is found!
-			return true;
-		}
-	return false;
+	while (find_leaf(params, key, INDEX_READ, leaf) != RCOK)
+		PAUSE
+	bool exist = (leaf_has_key(leaf, key) >= 0);
+	release_latch(leaf);
+	return exist;
 }
 
 RC index_btree::index_next(uint64_t thd_id, itemid_t * &item, bool samekey) {
@@ -96,7 +95,9 @@ RC index_btree::index_read(idx_key_t key, itemid_t *& item,
 	assert(part_id != -1);
 	params.part_id = part_id;
 	bt_node * leaf;
-	find_leaf(params, key, INDEX_READ, leaf);
+	// a concurrent insert may hold a latch on the path. retry.
+	while (find_leaf(params, key, INDEX_READ, leaf) != RCOK)
+		PAUSE
 	if (leaf == NULL)
 		M_ASSERT(false, "the leaf does not exist!");
 	for (UInt32 i = 0; i < leaf->num_keys; i++) 
@@ -107,13 +108,105 @@ RC index_btree::index_read(idx_key_t key, itemid_t *& item,
 			*cur_idx_per_thd[thd_id] = i;
 			return RCOK;
 		}
-	// release the latch after reading the node
-
-	printf("key = %ld\n", key);
-	M_ASSERT(false, "the key does not exist!");
+	// the key does not exist or has been removed.
+	release_latch(leaf);
+	item = NULL;
+	rc = ERROR;
 	return rc;
 }
 
+RC index_btree::index_read_range(idx_key_t min_key, idx_key_t max_key,
+	itemid_t ** items, uint64_t &count, int part_id)
+{
+	glob_param params;
+	assert(part_id != -1);
+	assert(max_key != UINT64_MAX);
+	params.part_id = part_id;
+	uint64_t cnt = 0;
+	// the smallest key not read yet.
+	idx_key_t key = min_key;
+	bt_node * leaf = NULL;
+	while (cnt < count && key <= max_key) {
+		if (leaf == NULL) {
+			// a concurrent insert may hold a latch on the path. retry.
+			while (find_leaf(params, key, INDEX_READ, leaf) != RCOK)
+				PAUSE
+		}
+		for (UInt32 i = 0; i < leaf->num_keys && cnt < count; i++) {
+			if (leaf->keys[i] < key)
+				continue;
+			if (leaf->keys[i] > max_key) {
+				key = max_key + 1;
+				break;
+			}
+			items[cnt ++] = (itemid_t *) leaf->pointers[i];
+			key = leaf->keys[i] + 1;
+		}
+		bt_node * next = leaf->next;
+		if (cnt == count || key > max_key || next == NULL) {
+			release_latch(leaf);
+			break;
+		}
+		// the next leaf is latched before this one is released, so a split
+		// cannot move keys behind the scan. If an insert or a remove holds
+		// it, search the tree again from key.
+		if (!latch_node(next, LATCH_SH))
+			next = NULL;
+		release_latch(leaf);
+		leaf = next;
+	}
+	count = cnt;
+	return RCOK;
+}
+
+RC index_btree::index_remove(idx_key_t key, itemid_t * item, 
+	int part_id, int thd_id)
+{
+	glob_param params;
+	assert(part_id != -1);
+	params.part_id = part_id;
+	bt_node * leaf;
+	// the leaf is ex latched. retry if another reader holds it.
+	while (find_leaf(params, key, INDEX_REMOVE, leaf) != RCOK)
+		PAUSE
+	int idx = leaf_has_key(leaf, key);
+	if (idx < 0) {
+		release_latch(leaf);
+		return ERROR;
+	}
+	itemid_t * head = (itemid_t *) leaf->pointers[idx];
+	if (item != NULL && (item != head || item->next != NULL)) {
+		// other items share the key, only unlink this one.
+		itemid_t * prev = NULL;
+		itemid_t * cur = head;
+		while (cur != NULL && cur != item) {
+			prev = cur;
+			cur = cur->next;
+		}
+		if (cur == NULL) {
+			release_latch(leaf);
+			return ERROR;
+		}
+		if (prev == NULL)
+			leaf->pointers[idx] = item->next;
+		else
+			prev->next = item->next;
+		epoch_man.retire(thd_id, item, RETIRE_BLOCK);
+		release_latch(leaf);
+		return RCOK;
+	}
+	for (UInt32 i = idx; i < leaf->num_keys - 1; i++) {
+		leaf->keys[i] = leaf->keys[i + 1];
+		leaf->pointers[i] = leaf->pointers[i + 1];
+	}
+	leaf->num_keys --;
+	leaf->pointers[leaf->num_keys] = NULL;
+	for (itemid_t * it = head; it != NULL; it = it->next)
+		epoch_man.retire(thd_id, it, RETIRE_BLOCK);
+	release_latch(leaf);
+	return RCOK;
+}
+
 RC index_btree::index_insert(idx_key_t key, itemid_t * item, int part_id) {
 	glob_param params;
 	if (WORKLOAD == TPCC) assert(part_id != -1);
@@ -200,6 +293,7 @@ RC index_btree::make_node(uint64_t part_id, bt_node *& node) {
 //	new_node->locked = false;
 	new_node->latch = false;
 	new_node->latch_type = LATCH_NONE;
+	new_node->share_cnt = 0;
 
 	node = new_node;
 	return RCOK;
@@ -381,8 +475,8 @@ RC index_btree::find_leaf(glob_param params, idx_key_t key, idx_acc_t access_typ
 	// c is leaf
 	// at this point, if the access is a read, then only the leaf is latched by LATCH_SH
 	// if the access is an insertion, then the leaf is sh latched and related nodes in the tree
-	// are ex latched.
-	if (access_type == INDEX_INSERT) {
+	// are ex latched. A removal only ex latches the leaf.
+	if (access_type == INDEX_INSERT || access_type == INDEX_REMOVE) {
 		if (upgrade_latch(c) != RCOK) {
 			release_latch(c);
 			cleanup(c, last_ex);
@@ -445,8 +539,11 @@ RC index_btree::split_lf_insert(glob_param params, bt_node * leaf, idx_key_t key
 
 	M_ASSERT(leaf->num_keys == order - 1, "trying to split non-full leaf!");
 
-	idx_key_t temp_keys[BTREE_ORDER];
-	itemid_t * temp_pointers[BTREE_ORDER];
+	// the split buffers are sized by the runtime order.
+	idx_key_t * temp_keys = (idx_key_t *)
+		mem_allocator.alloc(order * sizeof(idx_key_t), part_id);
+	itemid_t ** temp_pointers = (itemid_t **)
+		mem_allocator.alloc(order * sizeof(itemid_t *), part_id);
 
 	// find the location to insert
 	insertion_index = 0;
@@ -485,8 +582,8 @@ RC index_btree::split_lf_insert(glob_param params, bt_node * leaf, idx_key_t key
 		M_ASSERT( (leaf->num_keys < order), "too many keys in leaf" );
 	}
 	
-//	delete temp_pointers;
-//	delete temp_keys;
+	mem_allocator.free(temp_pointers, order * sizeof(itemid_t *));
+	mem_allocator.free(temp_keys, order * sizeof(idx_key_t));
 
 	new_leaf->next = leaf->next;
 	leaf->next = new_leaf;
@@ -520,7 +617,7 @@ RC index_btree::insert_into_parent(
 
 	// find insert index
 	int insert_idx = 0;
-	while (parent->keys[insert_idx] < key && insert_idx < parent->num_keys)
+	while (insert_idx < (int) parent->num_keys && parent->keys[insert_idx] < key)
 		insert_idx++;
 
 	// the parent has enough space, just insert into it
@@ -579,6 +676,7 @@ RC index_btree::split_nl_insert(
 //	btUInt32 temp_pointers;
 	uint64_t part_id = params.part_id;
 	rc = make_node(part_id, new_node);
+	if (rc != RCOK) return rc;
 
 	/* First create a temporary set of keys and pointers
 	 * to hold everything in order, including
@@ -589,8 +687,11 @@ RC index_btree::split_nl_insert(
 	 * the other half to the new.
 	 */
 
-	idx_key_t temp_keys[BTREE_ORDER];
-	bt_node * temp_pointers[BTREE_ORDER + 1];
+	// the split buffers are sized by the runtime order.
+	idx_key_t * temp_keys = (idx_key_t *)
+		mem_allocator.alloc(order * sizeof(idx_key_t), part_id);
+	bt_node ** temp_pointers = (bt_node **)
+		mem_allocator.alloc((order + 1) * sizeof(bt_node *), part_id);
 	for (i = 0, j = 0; i < old_node->num_keys + 1; i++, j++) {
 		if (j == left_index + 1) j++;
 //		new_node->pointers[j] = (bt_node *)old_node->pointers[i];
@@ -614,7 +715,6 @@ RC index_btree::split_nl_insert(
 	 */
 	split = cut(order);
 //	printf("will make_node(). part_id=%lld, key=%lld\n", part_id, key);
-	if (rc != RCOK) return rc;
 
 	old_node->num_keys = 0;
 	for (i = 0; i < split - 1; i++) {
@@ -643,8 +743,8 @@ RC index_btree::split_nl_insert(
 	}
 	new_node->pointers[j] = temp_pointers[i];
 //	new_node->pointers[j] = new_node->pointers[i];
-//	delete temp_pointers;
-//	delete temp_keys;
+	mem_allocator.free(temp_pointers, (order + 1) * sizeof(bt_node *));
+	mem_allocator.free(temp_keys, order * sizeof(idx_key_t));
 	new_node->parent = old_node->parent;
 	for (i = 0; i <= new_node->num_keys; i++) {
 		child = (bt_node *)new_node->pointers[i];
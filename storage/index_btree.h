@@ -26,15 +26,22 @@ struct glob_param {
 
 class index_btree : public index_base {
 public:
-	RC			init(uint64_t part_cnt);
+	RC			init(uint64_t part_cnt, UInt32 order = BTREE_ORDER);
 	RC			init(uint64_t part_cnt, table_t * table);
-	bool 		index_exist(idx_key_t key); // check if the key exist. 
+	bool 		index_exist(idx_key_t key, int part_id = -1); // check if the key exist. 
 	RC 			index_insert(idx_key_t key, itemid_t * item, int part_id = -1);
 	RC	 		index_read(idx_key_t key, itemid_t * &item, 
 					int thd_id, int part_id = -1);
 	RC	 		index_read(idx_key_t key, itemid_t * &item, int part_id = -1);
 	RC	 		index_read(idx_key_t key, itemid_t * &item);
 	RC 			index_next(uint64_t thd_id, itemid_t * &item, bool samekey = false);
+	// returns up to count items with key in [min_key, max_key] in key order.
+	RC 			index_read_range(idx_key_t min_key, idx_key_t max_key,
+					itemid_t ** items, uint64_t &count, int part_id = -1);
+	// nodes are never merged. An emptied leaf stays in the tree and is
+	// reused by later inserts into its key range.
+	RC 			index_remove(idx_key_t key, itemid_t * item, 
+					int part_id = -1, int thd_id = 0);
 
 private:
 	// index structures may have part_cnt = 1 or PART_CNT.
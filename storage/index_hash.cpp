@@ -2,16 +2,22 @@
 #include "index_hash.h"
 #include "mem_alloc.h"
 #include "table.h"
+#include "epoch.h"
+#include "topology.h"
 
 RC IndexHash::init(uint64_t bucket_cnt, int part_cnt) {
 	_bucket_cnt = bucket_cnt;
+	_part_cnt = part_cnt;
 	_bucket_cnt_per_part = bucket_cnt / part_cnt;
 	_buckets = new BucketHeader * [part_cnt];
 	for (int i = 0; i < part_cnt; i++) {
+		// first touch the buckets on the node of the partition's owner.
+		topology.pin_part(i);
 		_buckets[i] = (BucketHeader *) _mm_malloc(sizeof(BucketHeader) * _bucket_cnt_per_part, 64);
 		for (uint32_t n = 0; n < _bucket_cnt_per_part; n ++)
 			_buckets[i][n].init();
 	}
+	topology.unpin();
 	return RCOK;
 }
 
@@ -22,8 +28,13 @@ IndexHash::init(int part_cnt, table_t * table, uint64_t bucket_cnt) {
 	return RCOK;
 }
 
-bool IndexHash::index_exist(idx_key_t key) {
-	assert(false);
+bool IndexHash::index_exist(idx_key_t key, int part_id) {
+	if (part_id == -1)
+		part_id = key_to_part(key) % _part_cnt;
+	BucketHeader * cur_bkt = &_buckets[part_id][hash(key)];
+	itemid_t * item;
+	cur_bkt->read_item(key, item, table->get_table_name());
+	return (item != NULL);
 }
 
 void 
@@ -54,6 +65,18 @@ RC IndexHash::index_insert(idx_key_t key, itemid_t * item, int part_id) {
 	return rc;
 }
 
+RC IndexHash::index_remove(idx_key_t key, itemid_t * item, 
+						int part_id, int thd_id) {
+	uint64_t bkt_idx = hash(key);
+	assert(bkt_idx < _bucket_cnt_per_part);
+	BucketHeader * cur_bkt = &_buckets[part_id][bkt_idx];
+	// readers do not latch the bucket. They are protected by epoch_man.
+	get_latch(cur_bkt);
+	RC rc = cur_bkt->remove_item(key, item, thd_id);
+	release_latch(cur_bkt);
+	return rc;
+}
+
 RC IndexHash::index_read(idx_key_t key, itemid_t * &item, int part_id) {
 	uint64_t bkt_idx = hash(key);
 	assert(bkt_idx < _bucket_cnt_per_part);
@@ -64,6 +87,8 @@ RC IndexHash::index_read(idx_key_t key, itemid_t * &item, int part_id) {
 	cur_bkt->read_item(key, item, table->get_table_name());
 	// 3. release the latch
 //	release_latch(cur_bkt);
+	if (item == NULL)
+		rc = ERROR;
 	return rc;
 
 }
@@ -79,9 +104,15 @@ RC IndexHash::index_read(idx_key_t key, itemid_t * &item,
 	cur_bkt->read_item(key, item, table->get_table_name());
 	// 3. release the latch
 //	release_latch(cur_bkt);
+	if (item == NULL)
+		rc = ERROR;
 	return rc;
 }
 
+void IndexHash::index_prefetch(idx_key_t key, int part_id) {
+	PREFETCH(&_buckets[part_id][hash(key)]);
+}
+
 /************** BucketHeader Operations ******************/
 
 void BucketHeader::init() {
@@ -128,6 +159,52 @@ void BucketHeader::read_item(idx_key_t key, itemid_t * &item, const char * tname
 			break;
 		cur_node = cur_node->next;
 	}
-	M_ASSERT(cur_node->key == key, "Key does not exist!");
+	// the key does not exist or has been removed.
+	if (cur_node == NULL) {
+		item = NULL;
+		return;
+	}
 	item = cur_node->items;
 }
+
+RC BucketHeader::remove_item(idx_key_t key, itemid_t * item, int thd_id)
+{
+	BucketNode * cur_node = first_node;
+	BucketNode * prev_node = NULL;
+	while (cur_node != NULL) {
+		if (cur_node->key == key)
+			break;
+		prev_node = cur_node;
+		cur_node = cur_node->next;
+	}
+	if (cur_node == NULL)
+		return ERROR;
+	if (item != NULL) {
+		itemid_t * prev_item = NULL;
+		itemid_t * cur_item = cur_node->items;
+		while (cur_item != NULL && cur_item != item) {
+			prev_item = cur_item;
+			cur_item = cur_item->next;
+		}
+		if (cur_item == NULL)
+			return ERROR;
+		// the removed item keeps its next pointer for concurrent readers.
+		if (prev_item == NULL)
+			cur_node->items = item->next;
+		else
+			prev_item->next = item->next;
+		epoch_man.retire(thd_id, item, RETIRE_BLOCK);
+		if (cur_node->items != NULL)
+			return RCOK;
+	} else {
+		for (itemid_t * it = cur_node->items; it != NULL; it = it->next)
+			epoch_man.retire(thd_id, it, RETIRE_BLOCK);
+	}
+	// the node is empty, unlink it from the chain.
+	if (prev_node == NULL)
+		first_node = cur_node->next;
+	else
+		prev_node->next = cur_node->next;
+	epoch_man.retire(thd_id, cur_node, RETIRE_BLOCK);
+	return RCOK;
+}
@@ -27,6 +27,8 @@ public:
 	void init();
 	void insert_item(idx_key_t key, itemid_t * item, int part_id);
 	void read_item(idx_key_t key, itemid_t * &item, const char * tname);
+	// unlinks the item (or the whole node if item is NULL) and retires it.
+	RC remove_item(idx_key_t key, itemid_t * item, int thd_id);
 	BucketNode * 	first_node;
 	uint64_t 		node_cnt;
 	bool 			locked;
@@ -40,12 +42,15 @@ public:
 	RC 			init(int part_cnt, 
 					table_t * table, 
 					uint64_t bucket_cnt);
-	bool 		index_exist(idx_key_t key); // check if the key exist.
+	bool 		index_exist(idx_key_t key, int part_id=-1); // check if the key exist.
 	RC 			index_insert(idx_key_t key, itemid_t * item, int part_id=-1);
 	// the following call returns a single item
 	RC	 		index_read(idx_key_t key, itemid_t * &item, int part_id=-1);	
 	RC	 		index_read(idx_key_t key, itemid_t * &item,
 							int part_id=-1, int thd_id=0);
+	RC 			index_remove(idx_key_t key, itemid_t * item,
+							int part_id=-1, int thd_id=0);
+	void 		index_prefetch(idx_key_t key, int part_id=-1);
 private:
 	void get_latch(BucketHeader * bucket);
 	void release_latch(BucketHeader * bucket);
@@ -55,5 +60,6 @@ private:
 	
 	BucketHeader ** 	_buckets;
 	uint64_t	 		_bucket_cnt;
+	int 				_part_cnt;
 	uint64_t 			_bucket_cnt_per_part;
 };
@@ -0,0 +1,169 @@
+#include "config.h"
+#if INDEX_STRUCT == IDX_MBTREE
+// silo goes first: global.h pulls in namespace std, which clashes with
+// silo's own allocator and lock_guard.
+#define CONFIG_H "silo/config/config-perf.h"
+#define NDB_MASSTREE 1
+#include "silo/masstree/config.h"
+#include "silo/masstree_btree.h"
+
+#include "global.h"
+#include "index_mbtree.h"
+#include "mem_alloc.h"
+#include "table.h"
+#include "epoch.h"
+
+struct mbtree_params : public Masstree::nodeparams<> {
+	typedef itemid_t * value_type;
+	typedef Masstree::value_print<value_type> value_print_type;
+	typedef simple_threadinfo threadinfo_type;
+	// every tree operation enters its own rcu region, so the rest of the
+	// engine does not need to know about silo's rcu.
+	enum { RcuRespCaller = false };
+};
+
+typedef mbtree<mbtree_params> concurrent_mbtree;
+
+#define LATCH_CNT 1024
+
+class IndexMBTree_cb : public concurrent_mbtree::low_level_search_range_callback {
+public:
+	IndexMBTree_cb(itemid_t ** items, uint64_t count)
+		: _items(items), _count(count), _n(0) {}
+	void on_resp_node(const concurrent_mbtree::node_opaque_t * n, uint64_t version) {}
+	bool invoke(const concurrent_mbtree::string_type & k,
+			concurrent_mbtree::value_type v,
+			const concurrent_mbtree::node_opaque_t * n, uint64_t version) {
+		_items[_n ++] = v;
+		return _n < _count;
+	}
+	uint64_t get_cnt() { return _n; }
+private:
+	itemid_t ** _items;
+	uint64_t 	_count;
+	uint64_t 	_n;
+};
+
+RC IndexMBTree::init(uint64_t part_cnt, table_t * table) {
+	this->table = table;
+	_part_cnt = part_cnt;
+	_trees = new void * [part_cnt];
+	for (uint64_t part_id = 0; part_id < part_cnt; part_id ++) {
+		concurrent_mbtree * t = (concurrent_mbtree *)
+			_mm_malloc(sizeof(concurrent_mbtree), 64);
+		new (t) concurrent_mbtree;
+		_trees[part_id] = t;
+	}
+	_latches = (volatile bool *) _mm_malloc(sizeof(bool) * LATCH_CNT, 64);
+	for (uint32_t i = 0; i < LATCH_CNT; i++)
+		_latches[i] = false;
+	return RCOK;
+}
+
+void IndexMBTree::get_latch(idx_key_t key) {
+	while (!ATOM_CAS(_latches[key % LATCH_CNT], false, true))
+		PAUSE
+}
+
+void IndexMBTree::release_latch(idx_key_t key) {
+	bool ok = ATOM_CAS(_latches[key % LATCH_CNT], true, false);
+	assert(ok);
+}
+
+bool IndexMBTree::index_exist(idx_key_t key, int part_id) {
+	if (part_id == -1)
+		part_id = key_to_part(key) % _part_cnt;
+	itemid_t * item;
+	return (index_read(key, item, part_id, 0) == RCOK);
+}
+
+RC IndexMBTree::index_insert(idx_key_t key, itemid_t * item, int part_id) {
+	assert(part_id != -1);
+	concurrent_mbtree * tree = (concurrent_mbtree *) _trees[part_id];
+	u64_varkey mbtree_key(key);
+	item->next = NULL;
+	get_latch(key);
+	if (!tree->insert_if_absent(mbtree_key, item)) {
+		// the key exists. chain the item behind the stored one.
+		itemid_t * head;
+		bool found = tree->search(mbtree_key, head);
+		assert(found);
+		item->next = head->next;
+		COMPILER_BARRIER
+		head->next = item;
+	}
+	release_latch(key);
+	return RCOK;
+}
+
+RC IndexMBTree::index_read(idx_key_t key, itemid_t * &item, int part_id) {
+	return index_read(key, item, part_id, 0);
+}
+
+RC IndexMBTree::index_read(idx_key_t key, itemid_t * &item,
+						int part_id, int thd_id) {
+	if (part_id == -1)
+		part_id = key_to_part(key) % _part_cnt;
+	concurrent_mbtree * tree = (concurrent_mbtree *) _trees[part_id];
+	u64_varkey mbtree_key(key);
+	if (!tree->search(mbtree_key, item)) {
+		item = NULL;
+		return ERROR;
+	}
+	return RCOK;
+}
+
+RC IndexMBTree::index_remove(idx_key_t key, itemid_t * item,
+						int part_id, int thd_id) {
+	if (part_id == -1)
+		part_id = key_to_part(key) % _part_cnt;
+	concurrent_mbtree * tree = (concurrent_mbtree *) _trees[part_id];
+	u64_varkey mbtree_key(key);
+	RC rc = RCOK;
+	get_latch(key);
+	itemid_t * head;
+	if (!tree->search(mbtree_key, head)) {
+		release_latch(key);
+		return ERROR;
+	}
+	if (item == NULL || (item == head && head->next == NULL)) {
+		tree->remove(mbtree_key);
+		for (itemid_t * it = head; it != NULL; it = it->next)
+			epoch_man.retire(thd_id, it, RETIRE_BLOCK);
+	} else if (item == head) {
+		// the next item becomes the stored value.
+		tree->insert(mbtree_key, head->next);
+		epoch_man.retire(thd_id, item, RETIRE_BLOCK);
+	} else {
+		itemid_t * prev = head;
+		while (prev->next != NULL && prev->next != item)
+			prev = prev->next;
+		if (prev->next == NULL)
+			rc = ERROR;
+		else {
+			prev->next = item->next;
+			epoch_man.retire(thd_id, item, RETIRE_BLOCK);
+		}
+	}
+	release_latch(key);
+	return rc;
+}
+
+RC IndexMBTree::index_read_range(idx_key_t min_key, idx_key_t max_key,
+						itemid_t ** items, uint64_t &count, int part_id) {
+	if (count == 0)
+		return RCOK;
+	// the range may span partitions.
+	assert(part_id != -1);
+	concurrent_mbtree * tree = (concurrent_mbtree *) _trees[part_id];
+	u64_varkey mbtree_key_min(min_key);
+	// mbtree's range is right-open.
+	assert(max_key != UINT64_MAX);
+	u64_varkey mbtree_key_max(max_key + 1);
+	IndexMBTree_cb cb(items, count);
+	tree->search_range_call(mbtree_key_min, &mbtree_key_max, cb);
+	count = cb.get_cnt();
+	return RCOK;
+}
+
+#endif
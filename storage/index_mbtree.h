@@ -0,0 +1,34 @@
+#pragma once
+
+#include "global.h"
+#include "helper.h"
+#include "index_base.h"
+
+// Masstree from silo (masstree/libs/silo). Only built when
+// INDEX_STRUCT == IDX_MBTREE; see the Makefile.
+// Masstree keeps one value per key. Items sharing a key are chained
+// behind the stored item through itemid_t::next.
+class IndexMBTree : public index_base
+{
+public:
+	RC 			init(uint64_t part_cnt, table_t * table);
+	bool 		index_exist(idx_key_t key, int part_id=-1);
+	RC 			index_insert(idx_key_t key, itemid_t * item, int part_id=-1);
+	RC	 		index_read(idx_key_t key, itemid_t * &item, int part_id=-1);
+	RC	 		index_read(idx_key_t key, itemid_t * &item,
+							int part_id=-1, int thd_id=0);
+	RC 			index_remove(idx_key_t key, itemid_t * item,
+							int part_id=-1, int thd_id=0);
+	// returns up to count items with key in [min_key, max_key] in key order.
+	RC 			index_read_range(idx_key_t min_key, idx_key_t max_key,
+							itemid_t ** items, uint64_t &count, int part_id=-1);
+private:
+	// writers of the same key serialize on a striped latch. readers do not latch.
+	void 		get_latch(idx_key_t key);
+	void 		release_latch(idx_key_t key);
+
+	uint64_t 	_part_cnt;
+	// concurrent_mbtree *, one per partition
+	void ** 	_trees;
+	volatile bool * _latches;
+};
@@ -12,6 +12,7 @@
 #include "row_tictoc.h"
 #include "row_silo.h"
 #include "row_vll.h"
+#include "row_calvin.h"
 #include "mem_alloc.h"
 #include "manager.h"
 
@@ -19,16 +20,23 @@ RC
 row_t::init(table_t * host_table, uint64_t part_id, uint64_t row_id) {
 	_row_id = row_id;
 	_part_id = part_id;
+	_order_key = (uint64_t) host_table->get_table_id() << 56;
 	this->table = host_table;
 	Catalog * schema = host_table->get_schema();
 	int tuple_size = schema->get_tuple_size();
 	data = (char *) _mm_malloc(sizeof(char) * tuple_size, 64);
+#if UNDO_LOG
+	undo_txn = NULL;
+#endif
 	return RCOK;
 }
 void 
 row_t::init(int size) 
 {
 	data = (char *) _mm_malloc(size, 64);
+#if UNDO_LOG
+	undo_txn = NULL;
+#endif
 }
 
 RC 
@@ -38,7 +46,7 @@ row_t::switch_schema(table_t * host_table) {
 }
 
 void row_t::init_manager(row_t * row) {
-#if CC_ALG == DL_DETECT || CC_ALG == NO_WAIT || CC_ALG == WAIT_DIE
+#if CC_ALG == DL_DETECT || CC_ALG == NO_WAIT || CC_ALG == WAIT_DIE || CC_ALG == WOUND_WAIT
     manager = (Row_lock *) mem_allocator.alloc(sizeof(Row_lock), _part_id);
 #elif CC_ALG == TIMESTAMP
     manager = (Row_ts *) mem_allocator.alloc(sizeof(Row_ts), _part_id);
@@ -54,6 +62,8 @@ void row_t::init_manager(row_t * row) {
 	manager = (Row_silo *) _mm_malloc(sizeof(Row_silo), 64);
 #elif CC_ALG == VLL
     manager = (Row_vll *) mem_allocator.alloc(sizeof(Row_vll), _part_id);
+#elif CC_ALG == CALVIN
+	manager = (Row_calvin *) _mm_malloc(sizeof(Row_calvin), 64);
 #endif
 
 #if CC_ALG != HSTORE
@@ -82,12 +92,15 @@ uint64_t row_t::get_field_cnt() {
 
 void row_t::set_value(int id, void * ptr) {
 	int datasize = get_schema()->get_field_size(id);
-	int pos = get_schema()->get_field_index(id);
-	memcpy( &data[pos], ptr, datasize);
+	set_value(id, ptr, datasize);
 }
 
 void row_t::set_value(int id, void * ptr, int size) {
 	int pos = get_schema()->get_field_index(id);
+#if UNDO_LOG
+	if (undo_txn != NULL)
+		undo_txn->log_undo(this, pos, size);
+#endif
 	memcpy( &data[pos], ptr, size);
 }
 
@@ -128,13 +141,37 @@ void row_t::copy(row_t * src) {
 	set_data(src->get_data(), src->get_tuple_size());
 }
 
+void row_t::copy(row_t * src, cols_t cols) {
+	if (cols == COLS_ALL) {
+		copy(src);
+		return;
+	}
+	Catalog * schema = get_schema();
+	uint64_t field_cnt = schema->get_field_cnt();
+	assert(field_cnt <= 64);
+	uint64_t fid = 0;
+	while (fid < field_cnt) {
+		if (!(cols & (1UL << fid))) {
+			fid ++;
+			continue;
+		}
+		// a run of adjacent columns is one memcpy.
+		uint64_t start = schema->get_field_index(fid);
+		while (fid < field_cnt && (cols & (1UL << fid)))
+			fid ++;
+		uint64_t end = (fid == field_cnt)? 
+			schema->get_tuple_size() : schema->get_field_index(fid);
+		memcpy(&data[start], &src->data[start], end - start);
+	}
+}
+
 void row_t::free_row() {
 	free(data);
 }
 
-RC row_t::get_row(access_t type, txn_man * txn, row_t *& row) {
+RC row_t::get_row(access_t type, txn_man * txn, row_t *& row, cols_t cols) {
 	RC rc = RCOK;
-#if CC_ALG == WAIT_DIE || CC_ALG == NO_WAIT || CC_ALG == DL_DETECT
+#if CC_ALG == WAIT_DIE || CC_ALG == NO_WAIT || CC_ALG == DL_DETECT || CC_ALG == WOUND_WAIT
 	uint64_t thd_id = txn->get_thd_id();
 	lock_t lt = (type == RD || type == SCAN)? LOCK_SH : LOCK_EX;
 #if CC_ALG == DL_DETECT
@@ -149,54 +186,37 @@ RC row_t::get_row(access_t type, txn_man * txn, row_t *& row) {
 		row = this;
 	} else if (rc == Abort) {} 
 	else if (rc == WAIT) {
-		ASSERT(CC_ALG == WAIT_DIE || CC_ALG == DL_DETECT);
+		ASSERT(CC_ALG == WAIT_DIE || CC_ALG == DL_DETECT || CC_ALG == WOUND_WAIT);
 		uint64_t starttime = get_sys_clock();
-#if CC_ALG == DL_DETECT	
-		bool dep_added = false;
-#endif
 		uint64_t endtime;
+#if CC_ALG != WOUND_WAIT && !LOCK_RETIRE
+		// under WOUND_WAIT, lock_abort is a wound and stays set until the
+		// txn finishes. So is a cascade from a retired lock.
 		txn->lock_abort = false;
+#endif
 		INC_STATS(txn->get_thd_id(), wait_cnt, 1);
+#if CC_ALG == DL_DETECT
+		// the background detector sets lock_abort if this txn is on a loop.
+		dl_detector.add_dep(txn->get_txn_id(), txnids, txncnt, txn->row_cnt);
+		mem_allocator.free(txnids, sizeof(uint64_t) * txncnt);
+#endif
 		while (!txn->lock_ready && !txn->lock_abort) 
 		{
 #if CC_ALG == WAIT_DIE 
 			continue;
+#elif CC_ALG == WOUND_WAIT
+			PAUSE
 #elif CC_ALG == DL_DETECT	
-			uint64_t last_detect = starttime;
-			uint64_t last_try = starttime;
-
-			uint64_t now = get_sys_clock();
-			if (now - starttime > g_timeout ) {
+			if (get_sys_clock() - starttime > g_timeout ) {
 				txn->lock_abort = true;
 				break;
 			}
-			if (g_no_dl) {
-				PAUSE
-				continue;
-			}
-			int ok = 0;
-			if ((now - last_detect > g_dl_loop_detect) && (now - last_try > DL_LOOP_TRIAL)) {
-				if (!dep_added) {
-					ok = dl_detector.add_dep(txn->get_txn_id(), txnids, txncnt, txn->row_cnt);
-					if (ok == 0)
-						dep_added = true;
-					else if (ok == 16)
-						last_try = now;
-				}
-				if (dep_added) {
-					ok = dl_detector.detect_cycle(txn->get_txn_id());
-					if (ok == 16)  // failed to lock the deadlock detector
-						last_try = now;
-					else if (ok == 0) 
-						last_detect = now;
-					else if (ok == 1) {
-						last_detect = now;
-					}
-				}
-			} else 
-				PAUSE
+			PAUSE
 #endif
 		}
+#if CC_ALG == DL_DETECT
+		dl_detector.clear_dep(txn->get_txn_id());
+#endif
 		if (txn->lock_ready) 
 			rc = RCOK;
 		else if (txn->lock_abort) { 
@@ -222,7 +242,7 @@ RC row_t::get_row(access_t type, txn_man * txn, row_t *& row) {
   #endif
 
 	// TODO need to initialize the table/catalog information.
-	TsType ts_type = (type == RD)? R_REQ : P_REQ; 
+	TsType ts_type = (type == RD || type == SCAN)? R_REQ : P_REQ;
 	rc = this->manager->access(txn, ts_type, row);
 	if (rc == RCOK ) {
 		row = txn->cur_row;
@@ -249,12 +269,17 @@ RC row_t::get_row(access_t type, txn_man * txn, row_t *& row) {
 #elif CC_ALG == TICTOC || CC_ALG == SILO
 	// like OCC, tictoc also makes a local copy for each read/write
 	row->table = get_table();
-	TsType ts_type = (type == RD)? R_REQ : P_REQ; 
-	rc = this->manager->access(txn, ts_type, row);
+	TsType ts_type = (type == RD || type == SCAN)? R_REQ : P_REQ;
+	rc = this->manager->access(txn, ts_type, row, cols);
 	return rc;
 #elif CC_ALG == HSTORE || CC_ALG == VLL
 	row = this;
 	return rc;
+#elif CC_ALG == CALVIN
+	// the txn works on a private copy. The locks are already held.
+	row->table = get_table();
+	row->copy(this);
+	return rc;
 #else
 	assert(false);
 #endif
@@ -268,11 +293,9 @@ RC row_t::get_row(access_t type, txn_man * txn, row_t *& row) {
 // For TIMESTAMP, the row will be explicity deleted at the end of access().
 // (cf. row_ts.cpp)
 void row_t::return_row(access_t type, txn_man * txn, row_t * row) {	
-#if CC_ALG == WAIT_DIE || CC_ALG == NO_WAIT || CC_ALG == DL_DETECT
-	assert (row == NULL || row == this || type == XP);
-	if (ROLL_BACK && type == XP) {// recover from previous writes.
-		this->copy(row);
-	}
+#if CC_ALG == WAIT_DIE || CC_ALG == NO_WAIT || CC_ALG == DL_DETECT || CC_ALG == WOUND_WAIT
+	// with ROLL_BACK, the txn has replayed its undo log before an XP.
+	assert (row == NULL || row == this);
 	this->manager->lock_release(txn);
 #elif CC_ALG == TIMESTAMP || CC_ALG == MVCC 
 	// for RD or SCAN or XP, the row should be deleted.
@@ -304,6 +327,11 @@ void row_t::return_row(access_t type, txn_man * txn, row_t * row) {
 	return;
 #elif CC_ALG == HSTORE || CC_ALG == VLL
 	return;
+#elif CC_ALG == CALVIN
+	// a committed write. The recon run always aborts.
+	if (type == WR)
+		copy(row);
+	return;
 #else 
 	assert(false);
 #endif
@@ -20,6 +20,8 @@
 		value = *(type *)&data[pos];\
 	}
 
+#define ORDER_KEY_MASK ((1UL << 56) - 1)
+
 class table_t;
 class Catalog;
 class txn_man;
@@ -31,6 +33,7 @@ class Row_occ;
 class Row_tictoc;
 class Row_silo;
 class Row_vll;
+class Row_calvin;
 
 class row_t
 {
@@ -50,9 +53,21 @@ public:
 	uint64_t get_row_id() { return _row_id; };
 
 	void copy(row_t * src);
+	// only copy the given columns from src
+	void copy(row_t * src, cols_t cols);
 
-	void 		set_primary_key(uint64_t key) { _primary_key = key; };
+	void 		set_primary_key(uint64_t key) { 
+		_primary_key = key; 
+		_order_key = (_order_key & ~ORDER_KEY_MASK) | (key & ORDER_KEY_MASK);
+	};
 	uint64_t 	get_primary_key() {return _primary_key; };
+	// the global order in which a txn locks or validates its rows: the table
+	// id in the top byte, then the primary key. ties go to the address.
+	uint64_t 	get_order_key() { return _order_key; };
+	static bool order_lt(row_t * a, row_t * b) {
+		return a->_order_key < b->_order_key 
+			|| (a->_order_key == b->_order_key && a < b);
+	}
 	uint64_t 	get_part_id() { return _part_id; };
 
 	void set_value(int id, void * ptr);
@@ -80,10 +95,11 @@ public:
 	void free_row();
 
 	// for concurrency control. can be lock, timestamp etc.
-	RC get_row(access_t type, txn_man * txn, row_t *& row);
+	// TICTOC and SILO only copy the columns in cols into the local row.
+	RC get_row(access_t type, txn_man * txn, row_t *& row, cols_t cols = COLS_ALL);
 	void return_row(access_t type, txn_man * txn, row_t * row);
 	
-  #if CC_ALG == DL_DETECT || CC_ALG == NO_WAIT || CC_ALG == WAIT_DIE
+  #if CC_ALG == DL_DETECT || CC_ALG == NO_WAIT || CC_ALG == WAIT_DIE || CC_ALG == WOUND_WAIT
     Row_lock * manager;
   #elif CC_ALG == TIMESTAMP
    	Row_ts * manager;
@@ -99,12 +115,19 @@ public:
   	Row_silo * manager;
   #elif CC_ALG == VLL
   	Row_vll * manager;
+  #elif CC_ALG == CALVIN
+  	Row_calvin * manager;
   #endif
 	char * data;
 	table_t * table;
+#if UNDO_LOG
+	// the txn holding the row in WR. set_value() logs to its undo log.
+	txn_man * undo_txn;
+#endif
 private:
 	// primary key should be calculated from the data stored in the row.
 	uint64_t 		_primary_key;
+	uint64_t 		_order_key;
 	uint64_t		_part_id;
 	uint64_t 		_row_id;
 };
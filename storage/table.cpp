@@ -5,9 +5,13 @@
 #include "row.h"
 #include "mem_alloc.h"
 
-void table_t::init(Catalog * schema) {
+void table_t::init(Catalog * schema, uint32_t table_id) {
 	this->table_name = schema->table_name;
+	this->table_id = table_id;
 	this->schema = schema;
+	cur_tab_size = 0;
+	_segs = (row_t ** volatile *) _mm_malloc(sizeof(row_t **) * TABLE_SEG_CNT, 64);
+	memset((void *)_segs, 0, sizeof(row_t **) * TABLE_SEG_CNT);
 }
 
 RC table_t::get_new_row(row_t *& row) {
@@ -17,13 +21,38 @@ RC table_t::get_new_row(row_t *& row) {
 }
 
 // the row is not stored locally. the pointer must be maintained by index structure.
-RC table_t::get_new_row(row_t *& row, uint64_t part_id, uint64_t &row_id) {
+// the table only keeps it in the directory, at slot row_id.
+RC table_t::get_new_row(row_t *& row, uint64_t part_id, uint64_t &row_id,
+	bool publish)
+{
 	RC rc = RCOK;
-	cur_tab_size ++;
+	row_id = ATOM_FETCH_ADD(cur_tab_size, 1);
 	
 	row = (row_t *) _mm_malloc(sizeof(row_t), 64);
 	rc = row->init(this, part_id, row_id);
 	row->init_manager(row);
 
+	uint64_t seg_id = row_id / TABLE_SEG_SIZE;
+	assert(seg_id < TABLE_SEG_CNT);
+	if (_segs[seg_id] == NULL) {
+		row_t ** seg = (row_t **) _mm_malloc(sizeof(row_t *) * TABLE_SEG_SIZE, 64);
+		memset(seg, 0, sizeof(row_t *) * TABLE_SEG_SIZE);
+		if (!ATOM_CAS(_segs[seg_id], NULL, seg))
+			_mm_free(seg);
+	}
+	if (publish)
+		publish_row(row);
 	return rc;
 }
+
+void table_t::publish_row(row_t * row) {
+	uint64_t row_id = row->get_row_id();
+	// a scan only finds the row once it is initialized.
+	COMPILER_BARRIER
+	_segs[row_id / TABLE_SEG_SIZE][row_id % TABLE_SEG_SIZE] = row;
+}
+
+void table_t::remove_row(row_t * row) {
+	uint64_t row_id = row->get_row_id();
+	_segs[row_id / TABLE_SEG_SIZE][row_id % TABLE_SEG_SIZE] = NULL;
+}
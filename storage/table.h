@@ -2,30 +2,50 @@
 
 #include "global.h"
 
-// TODO sequential scan is not supported yet.
-// only index access is supported for table. 
+// txns only access rows through the index. The table also keeps every row
+// it created in a directory, indexed by row id, for sequential scans.
 class Catalog;
 class row_t;
 
+// the directory has TABLE_SEG_CNT segments of TABLE_SEG_SIZE rows each.
+#define TABLE_SEG_SIZE	(1UL << 16)
+#define TABLE_SEG_CNT	(1UL << 14)
+
 class table_t
 {
 public:
-	void init(Catalog * schema);
+	void init(Catalog * schema, uint32_t table_id);
 	// row lookup should be done with index. But index does not have
 	// records for new rows. get_new_row returns the pointer to a 
 	// new row.	
 	RC get_new_row(row_t *& row); // this is equivalent to insert()
-	RC get_new_row(row_t *& row, uint64_t part_id, uint64_t &row_id);
+	// a txn creates the rows it inserts with publish = false. They enter
+	// the directory with publish_row() when the txn commits, so a scan
+	// never finds an uncommitted or aborted row.
+	RC get_new_row(row_t *& row, uint64_t part_id, uint64_t &row_id,
+		bool publish = true);
+	void publish_row(row_t * row);
 
 	void delete_row(); // TODO delete_row is not supportet yet
+	// unlink a row from the directory before it is freed.
+	void remove_row(row_t * row);
+	// the row with row_id < get_table_size(). NULL if it was removed, or
+	// is still being created.
+	row_t * get_row(uint64_t row_id) {
+		row_t ** seg = _segs[row_id / TABLE_SEG_SIZE];
+		return (seg == NULL)? NULL : seg[row_id % TABLE_SEG_SIZE];
+	};
 
 	uint64_t get_table_size() { return cur_tab_size; };
 	Catalog * get_schema() { return schema; };
 	const char * get_table_name() { return table_name; };
+	uint32_t get_table_id() { return table_id; };
 
 	Catalog * 		schema;
 private:
 	const char * 	table_name;
 	uint64_t  		cur_tab_size;
-	char 			pad[CL_SIZE - sizeof(void *)*3];
+	uint32_t 		table_id;
+	row_t ** volatile * _segs;
+	char 			pad[CL_SIZE - sizeof(void *)*5];
 };
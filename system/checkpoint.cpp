@@ -0,0 +1,301 @@
+#include "checkpoint.h"
+#include "manager.h"
+#include "wl.h"
+#include "table.h"
+#include "catalog.h"
+#include "row.h"
+#include "epoch.h"
+#include <fcntl.h>
+#include <unistd.h>
+
+#if CHECKPOINT
+
+// the rows the scan copies between two epoch announcements.
+#define CKPT_SCAN_BATCH		1024
+
+void
+CkptMan::init(workload * wl) {
+	// the scan copies the base row, which is not the latest committed 
+	// version under the multi-version schemes.
+	M_ASSERT(CC_ALG != MVCC && CC_ALG != HEKATON, "CHECKPOINT does not support MVCC or HEKATON\n");
+#if CKPT_MODE == CKPT_CONSISTENT
+	// these workers wait for each other between txns, so they cannot stop
+	// one by one.
+	assert(CC_ALG != CALVIN && !(CC_ALG == HSTORE && PART_ROUTING));
+	assert(g_interleave_cnt == 1);
+#endif
+	_wl = wl;
+	_buf = (char *) _mm_malloc(CKPT_WRITE_SIZE, PAGE_SIZE);
+	_buf_size = 0;
+	_stop = false;
+	_pause = false;
+	_paused_cnt = 0;
+	_done_cnt = 0;
+	_in_ckpt = false;
+	_ckpt_seen = false;
+	_ckpt_cnt = 0;
+	_row_cnt = 0;
+	_write_bytes = 0;
+	_time_ckpt = 0;
+	_time_cpu = 0;
+	_time_write = 0;
+	_time_sync = 0;
+	_time_throttle = 0;
+	_time_pause = 0;
+}
+
+void
+CkptMan::start() {
+	// the workers of the warmup run are done.
+	_done_cnt = 0;
+	_run_start = get_server_clock();
+	_last_sample = _run_start;
+	_last_txn_cnt = get_txn_cnt();
+	pthread_create(&_thd, NULL, run_ckpt, NULL);
+}
+
+void
+CkptMan::stop() {
+	_stop = true;
+	pthread_join(_thd, NULL);
+}
+
+void *
+CkptMan::run_ckpt(void * ptr) {
+	ckpt_man.run();
+	return NULL;
+}
+
+void
+CkptMan::run() {
+	uint64_t next = _run_start + CKPT_INTVL * 1000000UL;
+	while (true) {
+		wait_until(next);
+		if (_stop)
+			break;
+		checkpoint();
+		// a checkpoint that takes longer than CKPT_INTVL is followed by the
+		// next one right away.
+		next += CKPT_INTVL * 1000000UL;
+		uint64_t now = get_server_clock();
+		if (next < now)
+			next = now;
+	}
+}
+
+bool
+CkptMan::checkpoint() {
+	char path[256];
+	sprintf(path, "%s/ckpt_%ld.dat", CKPT_DIR, _ckpt_cnt % 2);
+	int fd = open(path, O_WRONLY | O_CREAT | O_TRUNC, 0644);
+	if (fd < 0) {
+		printf("ERROR; cannot open checkpoint file %s\n", path);
+		exit(-1);
+	}
+	timespec cpu_start;
+	clock_gettime(CLOCK_THREAD_CPUTIME_ID, &cpu_start);
+	_ckpt_start = get_server_clock();
+	_ckpt_bytes = 0;
+	_in_ckpt = true;
+	_ckpt_seen = true;
+#if CKPT_MODE == CKPT_CONSISTENT
+	_pause = true;
+	__sync_synchronize();
+	while (_paused_cnt + _done_cnt < g_thread_cnt && !_stop)
+		wait_until(get_server_clock() + 10000);
+#endif
+
+	CkptHeader header;
+	header.ckpt_id = _ckpt_cnt;
+	header.epoch = glob_manager->get_epoch();
+	header.table_cnt = _wl->tables.size();
+	memcpy(_buf, &header, sizeof(header));
+	_buf_size = sizeof(header);
+	uint64_t row_cnt = 0;
+	bool done = true;
+	for (map<string, table_t *>::iterator it = _wl->tables.begin();
+		done && it != _wl->tables.end(); it ++)
+	{
+		table_t * table = it->second;
+		uint64_t size = table->get_schema()->get_tuple_size();
+		assert(sizeof(CkptRow) + size <= CKPT_WRITE_SIZE);
+		uint64_t table_size = table->get_table_size();
+		for (uint64_t row_id = 0; row_id < table_size; row_id ++) {
+			if (row_id % CKPT_SCAN_BATCH == 0) {
+				epoch_man.quiesce(g_thread_cnt);
+				if (_stop) {
+					done = false;
+					break;
+				}
+				if (get_server_clock() >= _last_sample + CKPT_SAMPLE_INTVL * 1000000UL)
+					sample();
+				epoch_man.announce(g_thread_cnt, epoch_man.get_epoch());
+			}
+			row_t * row = table->get_row(row_id);
+			if (row == NULL)
+				continue;
+			if (_buf_size + sizeof(CkptRow) + size > CKPT_WRITE_SIZE) {
+				// no row is held while the buffer is written out.
+				epoch_man.quiesce(g_thread_cnt);
+				write_buf(fd);
+				epoch_man.announce(g_thread_cnt, epoch_man.get_epoch());
+				// the row may be gone now.
+				row = table->get_row(row_id);
+				if (row == NULL)
+					continue;
+			}
+			CkptRow ckpt_row;
+			ckpt_row.table_id = table->get_table_id();
+			ckpt_row.size = size;
+			ckpt_row.primary_key = row->get_primary_key();
+			ckpt_row.part_id = row->get_part_id();
+			memcpy(_buf + _buf_size, &ckpt_row, sizeof(ckpt_row));
+			memcpy(_buf + _buf_size + sizeof(ckpt_row), row->get_data(), size);
+			_buf_size += sizeof(ckpt_row) + size;
+			row_cnt ++;
+		}
+		epoch_man.quiesce(g_thread_cnt);
+	}
+#if CKPT_MODE == CKPT_CONSISTENT
+	// every row is copied or in the file.
+	_pause = false;
+	while (_paused_cnt > 0)
+		PAUSE
+	_time_pause += get_server_clock() - _ckpt_start;
+#endif
+	if (done) {
+		write_buf(fd);
+		uint64_t starttime = get_server_clock();
+		fdatasync(fd);
+		_time_sync += get_server_clock() - starttime;
+		_ckpt_cnt ++;
+		_row_cnt += row_cnt;
+	}
+	_buf_size = 0;
+	close(fd);
+	_in_ckpt = false;
+	_time_ckpt += get_server_clock() - _ckpt_start;
+	timespec cpu_end;
+	clock_gettime(CLOCK_THREAD_CPUTIME_ID, &cpu_end);
+	_time_cpu += (cpu_end.tv_sec - cpu_start.tv_sec) * 1000000000UL
+		+ cpu_end.tv_nsec - cpu_start.tv_nsec;
+	return done;
+}
+
+void
+CkptMan::write_buf(int fd) {
+	uint64_t starttime = get_server_clock();
+	uint64_t off = 0;
+	while (off < _buf_size) {
+		ssize_t bytes = write(fd, _buf + off, _buf_size - off);
+		assert(bytes > 0);
+		off += bytes;
+	}
+	_time_write += get_server_clock() - starttime;
+	_write_bytes += _buf_size;
+	_ckpt_bytes += _buf_size;
+	_buf_size = 0;
+#if CKPT_RATE_LIMIT > 0
+	// 1 MB/s is 1 byte per 1000 ns.
+	uint64_t due = _ckpt_start + _ckpt_bytes * 1000 / CKPT_RATE_LIMIT;
+	uint64_t now = get_server_clock();
+	if (due > now) {
+		wait_until(due);
+		_time_throttle += get_server_clock() - now;
+	}
+#endif
+}
+
+void
+CkptMan::wait_until(uint64_t time) {
+	while (!_stop) {
+		uint64_t now = get_server_clock();
+		uint64_t next_sample = _last_sample + CKPT_SAMPLE_INTVL * 1000000UL;
+		if (now >= next_sample) {
+			sample();
+			continue;
+		}
+		if (now >= time)
+			break;
+		uint64_t wake = (time < next_sample)? time : next_sample;
+		usleep((wake - now) / 1000 + 1);
+	}
+}
+
+void
+CkptMan::sample() {
+	uint64_t now = get_server_clock();
+	uint64_t txn_cnt = get_txn_cnt();
+	Sample s;
+	s.time = now - _run_start;
+	s.intvl = now - _last_sample;
+	s.txn_cnt = txn_cnt - _last_txn_cnt;
+	s.in_ckpt = _ckpt_seen;
+	_samples.push_back(s);
+	_ckpt_seen = _in_ckpt;
+	_last_sample = now;
+	_last_txn_cnt = txn_cnt;
+}
+
+uint64_t
+CkptMan::get_txn_cnt() {
+	if (!STATS_ENABLE)
+		return 0;
+	uint64_t txn_cnt = 0;
+	// a worker allocates its stats when it starts to run.
+	for (UInt32 i = 0; i < g_thread_cnt; i++)
+		if (stats._stats[i] != NULL)
+			txn_cnt += stats._stats[i]->txn_cnt;
+	return txn_cnt;
+}
+
+void
+CkptMan::thd_pause() {
+	if (!_pause)
+		return;
+	ATOM_ADD(_paused_cnt, 1);
+	while (_pause)
+		usleep(10);
+	ATOM_SUB(_paused_cnt, 1);
+}
+
+void
+CkptMan::thd_done() {
+	ATOM_ADD(_done_cnt, 1);
+}
+
+void
+CkptMan::print() {
+	uint64_t ckpt_txn_cnt = 0;
+	uint64_t ckpt_time = 0;
+	uint64_t idle_txn_cnt = 0;
+	uint64_t idle_time = 0;
+	for (UInt32 i = 0; i < _samples.size(); i++) {
+		Sample * s = &_samples[i];
+		printf("[tput] time=%f, txn_cnt=%ld, tput=%f, ckpt=%d\n",
+			s->time / 1e9, s->txn_cnt,
+			s->intvl == 0? 0 : s->txn_cnt / (s->intvl / 1e9),
+			s->in_ckpt
+		);
+		if (s->in_ckpt) {
+			ckpt_txn_cnt += s->txn_cnt;
+			ckpt_time += s->intvl;
+		} else {
+			idle_txn_cnt += s->txn_cnt;
+			idle_time += s->intvl;
+		}
+	}
+	printf("[ckpt] ckpt_cnt=%ld, row_cnt=%ld, write_bytes=%ld, time_ckpt=%f, time_cpu=%f, time_write=%f, time_sync=%f, time_throttle=%f, time_pause=%f, tput_ckpt=%f, tput_idle=%f\n",
+		_ckpt_cnt, _row_cnt, _write_bytes,
+		_time_ckpt / 1e9,
+		_time_cpu / 1e9,
+		_time_write / 1e9,
+		_time_sync / 1e9,
+		_time_throttle / 1e9,
+		_time_pause / 1e9,
+		ckpt_time == 0? 0 : ckpt_txn_cnt / (ckpt_time / 1e9),
+		idle_time == 0? 0 : idle_txn_cnt / (idle_time / 1e9)
+	);
+}
+
+#endif
@@ -0,0 +1,101 @@
+#pragma once
+
+#include "global.h"
+#include "helper.h"
+
+class workload;
+
+// [CHECKPOINT] Online checkpointing.
+// A background thread wakes up every CKPT_INTVL ms and scans the row
+// directory of every table, copying the tuples into a CKPT_WRITE_SIZE
+// buffer that is written to the checkpoint file whenever it fills up, at
+// most CKPT_RATE_LIMIT MB/s. The file is fdatasynced at the end.
+// - CKPT_FUZZY copies the rows while txns update them, so the image is
+//   only consistent after the redo log is replayed from the epoch in its
+//   header.
+// - CKPT_CONSISTENT stops the workers at their next txn boundary and only
+//   lets them go once every row is copied.
+// The scan announces itself to epoch_man, so the rows it reads are not
+// freed under it. It copies the base rows, so MVCC and HEKATON are not
+// supported. The same thread samples the committed txns every
+// CKPT_SAMPLE_INTVL ms, so the throughput dip during a checkpoint shows in
+// the [tput] time series.
+class CkptMan {
+public:
+	void 			init(workload * wl);
+	// the checkpointer runs from start() until stop().
+	void 			start();
+	void 			stop();
+	// [CKPT_CONSISTENT] a worker is between txns. Waits while a checkpoint
+	// is copying.
+	void 			thd_pause();
+	// the worker stops running txns.
+	void 			thd_done();
+	// the time series and the cpu and i/o spent on checkpoints.
+	void 			print();
+private:
+	struct CkptHeader {
+		uint64_t 	ckpt_id;
+		// [LOGGING] the global epoch when the checkpoint started.
+		uint64_t 	epoch;
+		uint64_t 	table_cnt;
+	};
+	struct CkptRow {
+		uint32_t 	table_id;
+		// the bytes of the tuple that follow.
+		uint32_t 	size;
+		uint64_t 	primary_key;
+		uint64_t 	part_id;
+	};
+	// the txns committed in [time - intvl, time), since the run started.
+	struct Sample {
+		uint64_t 	time;
+		uint64_t 	intvl;
+		uint64_t 	txn_cnt;
+		// a checkpoint ran during the interval.
+		bool 		in_ckpt;
+	};
+	static void * 	run_ckpt(void * ptr);
+	void 			run();
+	// returns false if the checkpointer stopped before it was done.
+	bool 			checkpoint();
+	// writes the buffer out, then waits if the checkpoint is ahead of
+	// CKPT_RATE_LIMIT.
+	void 			write_buf(int fd);
+	// sleeps until time, sampling the throughput on the way.
+	void 			wait_until(uint64_t time);
+	void 			sample();
+	uint64_t 		get_txn_cnt();
+
+	workload * 		_wl;
+	pthread_t 		_thd;
+	volatile bool 	_stop;
+	volatile bool 	_pause;
+	volatile uint64_t _paused_cnt;
+	volatile uint64_t _done_cnt;
+	bool 			_in_ckpt;
+	// a checkpoint ran since the last sample.
+	bool 			_ckpt_seen;
+
+	char * 			_buf;
+	uint64_t 		_buf_size;
+	// the bytes written by the current checkpoint, and when it started.
+	uint64_t 		_ckpt_bytes;
+	uint64_t 		_ckpt_start;
+
+	uint64_t 		_run_start;
+	uint64_t 		_last_sample;
+	uint64_t 		_last_txn_cnt;
+	vector<Sample> 	_samples;
+
+	uint64_t 		_ckpt_cnt;
+	uint64_t 		_row_cnt;
+	uint64_t 		_write_bytes;
+	uint64_t 		_time_ckpt;
+	uint64_t 		_time_cpu;
+	uint64_t 		_time_write;
+	uint64_t 		_time_sync;
+	uint64_t 		_time_throttle;
+	// [CKPT_CONSISTENT] the time the workers were stopped.
+	uint64_t 		_time_pause;
+};
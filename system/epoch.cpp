@@ -0,0 +1,123 @@
+#include "epoch.h"
+#include "mem_alloc.h"
+#include "row.h"
+
+void EpochMan::init() {
+	_epoch = 1;
+	_thds = new EpochThd * [g_thread_cnt + 1];
+	for (UInt32 i = 0; i <= g_thread_cnt; i++) {
+		_thds[i] = (EpochThd *) _mm_malloc(sizeof(EpochThd), 64);
+		_thds[i]->epoch = UINT64_MAX;
+		_thds[i]->size = EPOCH_RECLAIM_BATCH * 4;
+		_thds[i]->limbo = (RetireEntry *)
+			_mm_malloc(sizeof(RetireEntry) * _thds[i]->size, 64);
+		_thds[i]->head = 0;
+		_thds[i]->tail = 0;
+		_thds[i]->since_reclaim = 0;
+		_thds[i]->retire_cnt = 0;
+		_thds[i]->reclaim_cnt = 0;
+	}
+}
+
+void EpochMan::announce(uint64_t thd_id, uint64_t epoch) {
+	_thds[thd_id]->epoch = epoch;
+	// the announcement must be visible before any shared pointer is loaded.
+	__sync_synchronize();
+}
+
+void EpochMan::quiesce(uint64_t thd_id) {
+	COMPILER_BARRIER
+	_thds[thd_id]->epoch = UINT64_MAX;
+}
+
+void EpochMan::retire(uint64_t thd_id, void * ptr, retire_t type) {
+	EpochThd * thd = _thds[thd_id];
+	if (thd->tail == thd->size) {
+		if (thd->head >= thd->size / 2) {
+			memmove(thd->limbo, &thd->limbo[thd->head],
+				sizeof(RetireEntry) * (thd->tail - thd->head));
+		} else {
+			RetireEntry * limbo = (RetireEntry *)
+				_mm_malloc(sizeof(RetireEntry) * thd->size * 2, 64);
+			memcpy(limbo, &thd->limbo[thd->head],
+				sizeof(RetireEntry) * (thd->tail - thd->head));
+			_mm_free(thd->limbo);
+			thd->limbo = limbo;
+			thd->size *= 2;
+		}
+		thd->tail -= thd->head;
+		thd->head = 0;
+	}
+	RetireEntry * entry = &thd->limbo[thd->tail ++];
+	entry->ptr = ptr;
+	entry->type = type;
+	entry->epoch = _epoch;
+	thd->retire_cnt ++;
+	if (++ thd->since_reclaim >= EPOCH_RECLAIM_BATCH) {
+		thd->since_reclaim = 0;
+		try_advance();
+		reclaim(thd_id);
+	}
+}
+
+void EpochMan::reclaim(uint64_t thd_id) {
+	EpochThd * thd = _thds[thd_id];
+	uint64_t min = min_epoch();
+	while (thd->head < thd->tail && thd->limbo[thd->head].epoch < min) {
+		free_entry(&thd->limbo[thd->head]);
+		thd->head ++;
+		thd->reclaim_cnt ++;
+	}
+	if (thd->head == thd->tail) {
+		thd->head = 0;
+		thd->tail = 0;
+	}
+}
+
+// the epoch can move forward once every active thread has seen it.
+void EpochMan::try_advance() {
+	uint64_t epoch = _epoch;
+	if (min_epoch() >= epoch)
+		ATOM_CAS(_epoch, epoch, epoch + 1);
+}
+
+uint64_t EpochMan::min_epoch() {
+	uint64_t min = _epoch;
+	for (UInt32 i = 0; i <= g_thread_cnt; i++) {
+		uint64_t epoch = _thds[i]->epoch;
+		if (epoch < min)
+			min = epoch;
+	}
+	return min;
+}
+
+void EpochMan::free_entry(RetireEntry * entry) {
+	if (entry->type == RETIRE_ROW) {
+		row_t * row = (row_t *) entry->ptr;
+#if CC_ALG != HSTORE
+		mem_allocator.free(row->manager, 0);
+#endif
+		row->free_row();
+		mem_allocator.free(row, sizeof(row_t));
+	} else if (entry->type == RETIRE_VERSION) {
+		// [HEKATON, MVCC] a version has no manager of its own.
+		row_t * row = (row_t *) entry->ptr;
+		row->free_row();
+		_mm_free(row);
+	} else
+		mem_allocator.free(entry->ptr, 0);
+}
+
+uint64_t EpochMan::get_retire_cnt() {
+	uint64_t cnt = 0;
+	for (UInt32 i = 0; i < g_thread_cnt; i++)
+		cnt += _thds[i]->retire_cnt;
+	return cnt;
+}
+
+uint64_t EpochMan::get_reclaim_cnt() {
+	uint64_t cnt = 0;
+	for (UInt32 i = 0; i < g_thread_cnt; i++)
+		cnt += _thds[i]->reclaim_cnt;
+	return cnt;
+}
@@ -0,0 +1,57 @@
+#pragma once
+
+#include "global.h"
+#include "helper.h"
+
+class row_t;
+
+// what a retired pointer is. Determines how it is freed.
+enum retire_t {RETIRE_BLOCK, RETIRE_ROW, RETIRE_VERSION};
+
+// Epoch-based reclamation.
+// A worker announces the global epoch before it touches shared index/row
+// memory (i.e., when a txn starts) and quiesces when it is done. Memory
+// unlinked from the index is retired in the current epoch and only freed
+// when every active worker has announced a later epoch, so a concurrent
+// reader never touches freed memory.
+// Slot g_thread_cnt is for the checkpointer, which scans the tables but
+// never retires anything.
+class EpochMan {
+public:
+	void 			init();
+	uint64_t 		get_epoch() { return _epoch; };
+	void 			announce(uint64_t thd_id, uint64_t epoch);
+	void 			quiesce(uint64_t thd_id);
+	// ptr must already be unreachable for txns that start from now on.
+	void 			retire(uint64_t thd_id, void * ptr, retire_t type);
+	// free whatever is safe to free in thd_id's limbo list.
+	void 			reclaim(uint64_t thd_id);
+
+	uint64_t 		get_retire_cnt();
+	uint64_t 		get_reclaim_cnt();
+private:
+	struct RetireEntry {
+		void * 		ptr;
+		retire_t 	type;
+		uint64_t 	epoch;
+	};
+	struct EpochThd {
+		// epoch announced by the thread. UINT64_MAX if quiescent.
+		volatile uint64_t epoch;
+		// limbo list. entries in [head, tail) are ordered by epoch.
+		RetireEntry * limbo;
+		uint32_t 	head;
+		uint32_t 	tail;
+		uint32_t 	size;
+		uint32_t 	since_reclaim;
+		uint64_t 	retire_cnt;
+		uint64_t 	reclaim_cnt;
+		char 		_pad[CL_SIZE];
+	};
+	void 			try_advance();
+	uint64_t 		min_epoch();
+	void 			free_entry(RetireEntry * entry);
+
+	volatile uint64_t _epoch;
+	EpochThd ** 	_thds;
+};
@@ -7,6 +7,13 @@
 #include "plock.h"
 #include "occ.h"
 #include "vll.h"
+#include "calvin.h"
+#include "part_router.h"
+#include "epoch.h"
+#include "version_gc.h"
+#include "topology.h"
+#include "logger.h"
+#include "checkpoint.h"
 
 mem_alloc mem_allocator;
 Stats stats;
@@ -15,8 +22,21 @@ Manager * glob_manager;
 Query_queue * query_queue;
 Plock part_lock_man;
 OptCC occ_man;
+EpochMan epoch_man;
+VersionGC version_gc;
+Topology topology;
+#if LOGGING
+LogMan log_man;
+#endif
+#if CHECKPOINT
+CkptMan ckpt_man;
+#endif
 #if CC_ALG == VLL
 VLLMan vll_man;
+#elif CC_ALG == CALVIN
+Calvin calvin_man;
+#elif CC_ALG == HSTORE && PART_ROUTING
+PartRouter part_router;
 #endif 
 
 bool volatile warmup_finish = false;
@@ -27,6 +47,7 @@ carbon_barrier_t enable_barrier;
 #endif
 
 ts_t g_abort_penalty = ABORT_PENALTY;
+UInt32 g_abort_backoff = ABORT_BACKOFF;
 bool g_central_man = CENTRAL_MAN;
 UInt32 g_ts_alloc = TS_ALLOC;
 bool g_key_order = KEY_ORDER;
@@ -35,6 +56,7 @@ ts_t g_timeout = TIMEOUT;
 ts_t g_dl_loop_detect = DL_LOOP_DETECT;
 bool g_ts_batch_alloc = TS_BATCH_ALLOC;
 UInt32 g_ts_batch_num = TS_BATCH_NUM;
+char * g_ts_bench = NULL;
 
 bool g_part_alloc = PART_ALLOC;
 bool g_mem_pad = MEM_PAD;
@@ -44,18 +66,27 @@ UInt32 g_part_per_txn = PART_PER_TXN;
 double g_perc_multi_part = PERC_MULTI_PART;
 double g_read_perc = READ_PERC;
 double g_write_perc = WRITE_PERC;
+double g_rmw_perc = RMW_PERC;
+double g_insert_perc = INSERT_PERC;
+bool g_scan_len_uniform = SCAN_LEN_UNIFORM;
+UInt32 g_request_dist = REQUEST_DIST;
+const char * g_ycsb_workload = YCSB_WORKLOAD;
 double g_zipf_theta = ZIPF_THETA;
 bool g_prt_lat_distr = PRT_LAT_DISTR;
 UInt32 g_part_cnt = PART_CNT;
 UInt32 g_virtual_part_cnt = VIRTUAL_PART_CNT;
 UInt32 g_thread_cnt = THREAD_CNT;
+UInt32 g_pin_policy = PIN_POLICY;
+UInt32 g_interleave_cnt = INTERLEAVE_CNT;
 UInt64 g_synth_table_size = SYNTH_TABLE_SIZE;
 UInt32 g_req_per_query = REQ_PER_QUERY;
 UInt32 g_field_per_tuple = FIELD_PER_TUPLE;
 UInt32 g_init_parallelism = INIT_PARALLELISM;
+UInt32 g_key_space = KEY_SPACE;
 
 UInt32 g_num_wh = NUM_WH;
 double g_perc_payment = PERC_PAYMENT;
+const char * g_tpcc_mix = TPCC_MIX;
 bool g_wh_update = WH_UPDATE;
 char * output_file = NULL;
 
@@ -39,6 +39,13 @@ class Query_queue;
 class Plock;
 class OptCC;
 class VLLMan;
+class Calvin;
+class PartRouter;
+class EpochMan;
+class VersionGC;
+class Topology;
+class LogMan;
+class CkptMan;
 
 typedef uint32_t UInt32;
 typedef int32_t SInt32;
@@ -57,8 +64,17 @@ extern Manager * glob_manager;
 extern Query_queue * query_queue;
 extern Plock part_lock_man;
 extern OptCC occ_man;
+extern EpochMan epoch_man;
+extern VersionGC version_gc;
+extern Topology topology;
+extern LogMan log_man;
+extern CkptMan ckpt_man;
 #if CC_ALG == VLL
 extern VLLMan vll_man;
+#elif CC_ALG == CALVIN
+extern Calvin calvin_man;
+#elif CC_ALG == HSTORE && PART_ROUTING
+extern PartRouter part_router;
 #endif
 
 extern bool volatile warmup_finish;
@@ -77,7 +93,10 @@ extern bool g_prt_lat_distr;
 extern UInt32 g_part_cnt;
 extern UInt32 g_virtual_part_cnt;
 extern UInt32 g_thread_cnt;
+extern UInt32 g_pin_policy;
+extern UInt32 g_interleave_cnt;
 extern ts_t g_abort_penalty; 
+extern UInt32 g_abort_backoff;
 extern bool g_central_man;
 extern UInt32 g_ts_alloc;
 extern bool g_key_order;
@@ -86,6 +105,8 @@ extern ts_t g_timeout;
 extern ts_t g_dl_loop_detect;
 extern bool g_ts_batch_alloc;
 extern UInt32 g_ts_batch_num;
+// [-Gs] thread counts to run the timestamp allocator benchmark with, e.g. "1,2,4"
+extern char * g_ts_bench;
 
 extern map<string, string> g_params;
 
@@ -96,15 +117,22 @@ extern UInt32 g_part_per_txn;
 extern double g_perc_multi_part;
 extern double g_read_perc;
 extern double g_write_perc;
+extern double g_rmw_perc;
+extern double g_insert_perc;
+extern bool g_scan_len_uniform;
+extern UInt32 g_request_dist;
+extern const char * g_ycsb_workload;
 extern double g_zipf_theta;
 extern UInt64 g_synth_table_size;
 extern UInt32 g_req_per_query;
 extern UInt32 g_field_per_tuple;
 extern UInt32 g_init_parallelism;
+extern UInt32 g_key_space;
 
 // TPCC
 extern UInt32 g_num_wh;
 extern double g_perc_payment;
+extern const char * g_tpcc_mix;
 extern bool g_wh_update;
 extern char * output_file;
 extern UInt32 g_max_items;
@@ -121,18 +149,31 @@ typedef uint64_t txn_t;
 /* Table and Row */
 typedef uint64_t rid_t; // row id
 typedef uint64_t pgid_t; // page id
+// a set of columns, bit i for column i. only tables with at most 64
+// columns can be projected; COLS_ALL always means the whole tuple.
+typedef uint64_t cols_t;
+#define COLS_ALL 		((cols_t) -1)
 
 
 
 /* INDEX */
 enum latch_t {LATCH_EX, LATCH_SH, LATCH_NONE};
 // accessing type determines the latch type on nodes
-enum idx_acc_t {INDEX_INSERT, INDEX_READ, INDEX_NONE};
+enum idx_acc_t {INDEX_INSERT, INDEX_READ, INDEX_REMOVE, INDEX_NONE};
 typedef uint64_t idx_key_t; // key id for index
 typedef uint64_t (*func_ptr)(idx_key_t);	// part_id func_ptr(index_key);
 
 /* general concurrency control */
 enum access_t {RD, WR, XP, SCAN};
+// [ROLL_BACK] lock-based schemes write the shared row in place. The old bytes
+// of every row_t::set_value() are logged and replayed on abort.
+#define UNDO_LOG 		(ROLL_BACK && (CC_ALG == DL_DETECT || CC_ALG == NO_WAIT || CC_ALG == WAIT_DIE || CC_ALG == WOUND_WAIT))
+// [LOCK_VIOLATION] lock-based schemes that let a txn retire a lock before it
+// commits.
+#define LOCK_RETIRE 	(LOCK_VIOLATION && (CC_ALG == DL_DETECT || CC_ALG == NO_WAIT || CC_ALG == WAIT_DIE))
+// [LOG_REDO, LOG_COMMAND] committed txns are logged and acknowledged once
+// durable.
+#define LOGGING 		(LOG_REDO || LOG_COMMAND)
 /* LOCK */
 enum lock_t {LOCK_EX, LOCK_SH, LOCK_NONE };
 /* TIMESTAMP */
@@ -147,6 +188,10 @@ enum TsType {R_REQ, W_REQ, P_REQ, XP_REQ};
 // index structure for specific purposes. (e.g. non-primary key access should use hash)
 #if (INDEX_STRUCT == IDX_BTREE)
 #define INDEX		index_btree
+#elif (INDEX_STRUCT == IDX_MBTREE)
+#define INDEX		IndexMBTree
+#elif (INDEX_STRUCT == IDX_ARRAY)
+#define INDEX		IndexArray
 #else  // IDX_HASH
 #define INDEX		IndexHash
 #endif
@@ -1,6 +1,7 @@
 #include "global.h"
 #include "helper.h"
 #include "mem_alloc.h"
+#include "topology.h"
 #include "time.h"
 
 bool itemid_t::operator==(const itemid_t &other) const {
@@ -33,6 +34,14 @@ uint64_t get_part_id(void * addr) {
 	return ((uint64_t)addr / PAGE_SIZE) % g_part_cnt; 
 }
 
+void set_affinity(uint64_t thd_id) {
+	topology.pin(thd_id);
+}
+
+void set_part_affinity(uint64_t part_id) {
+	topology.pin_part(part_id);
+}
+
 uint64_t key_to_part(uint64_t key) {
 	if (g_part_alloc)
 		return key % g_part_cnt;
@@ -25,6 +25,7 @@
 
 #define COMPILER_BARRIER asm volatile("" ::: "memory");
 #define PAUSE { __asm__ ( "pause;" ); }
+#define PREFETCH(addr) __builtin_prefetch((const void *)(addr))
 //#define PAUSE usleep(1);
 
 /************************************************/
@@ -209,19 +210,8 @@ private:
 	uint64_t seed;
 };
 
-inline void set_affinity(uint64_t thd_id) {
-	return;
-	/*
-	// TOOD. the following mapping only works for swarm
-	// which has 4-socket, 10 physical core per socket, 
-	// 80 threads in total with hyper-threading
-	uint64_t a = thd_id % 40;
-	uint64_t processor_id = a / 10 + (a % 10) * 4;
-	processor_id += (thd_id / 40) * 40;
-	
-	cpu_set_t  mask;
-	CPU_ZERO(&mask);
-	CPU_SET(processor_id, &mask);
-	sched_setaffinity(0, sizeof(cpu_set_t), &mask);
-	*/
-}
+// pin the calling thread to the cpu of worker thd_id under g_pin_policy.
+void set_affinity(uint64_t thd_id);
+// pin the calling thread like the owner of part_id, so the memory it
+// touches first is on the owner's NUMA node.
+void set_part_affinity(uint64_t part_id);
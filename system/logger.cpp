@@ -0,0 +1,335 @@
+#include "logger.h"
+#include "manager.h"
+#include "txn.h"
+#include "row.h"
+#include "table.h"
+#include "query.h"
+#include <fcntl.h>
+#include <unistd.h>
+
+#if LOGGING
+
+// the epochs a worker may have commits waiting in.
+#define LOG_ACK_SLOTS	64
+
+void
+LogMan::init() {
+	assert(!(LOG_REDO && LOG_COMMAND));
+	_thds = new LogThd * [g_thread_cnt];
+	for (UInt32 i = 0; i < g_thread_cnt; i++) {
+		LogThd * lt = (LogThd *) _mm_malloc(sizeof(LogThd), 64);
+		lt->buf = (char *) _mm_malloc(LOG_BUF_SIZE, 64);
+		lt->head = 0;
+		lt->tail = 0;
+		lt->epoch = UINT64_MAX;
+		lt->acks = (AckEntry *) _mm_malloc(sizeof(AckEntry) * LOG_ACK_SLOTS, 64);
+		lt->ack_head = 0;
+		lt->ack_tail = 0;
+		lt->cmd_size = 1024;
+		lt->cmd_buf = (char *) _mm_malloc(lt->cmd_size, 64);
+		_thds[i] = lt;
+	}
+	_loggers = new Logger * [LOG_THD_CNT];
+	for (UInt32 i = 0; i < LOG_THD_CNT; i++) {
+		Logger * logger = (Logger *) _mm_malloc(sizeof(Logger), 64);
+		char path[256];
+		sprintf(path, "%s/log_%d.dat", LOG_DIR, i);
+		logger->fd = open(path, O_WRONLY | O_CREAT | O_TRUNC, 0644);
+		if (logger->fd < 0) {
+			printf("ERROR; cannot open log file %s\n", path);
+			exit(-1);
+		}
+		logger->durable = 0;
+		logger->synced_epoch = 0;
+		logger->flush_cnt = 0;
+		logger->write_bytes = 0;
+		logger->time_sync = 0;
+		_loggers[i] = logger;
+	}
+	_stop = false;
+}
+
+void
+LogMan::start() {
+	for (uint64_t i = 0; i < LOG_THD_CNT; i++)
+		pthread_create(&_loggers[i]->thd, NULL, run_logger, (void *)i);
+}
+
+void
+LogMan::stop() {
+	_stop = true;
+	for (UInt32 i = 0; i < LOG_THD_CNT; i++) {
+		pthread_join(_loggers[i]->thd, NULL);
+		close(_loggers[i]->fd);
+	}
+}
+
+void *
+LogMan::run_logger(void * id) {
+	log_man.flush((uint64_t) id);
+	return NULL;
+}
+
+void
+LogMan::flush(uint32_t logger_id) {
+	Logger * logger = _loggers[logger_id];
+	while (true) {
+		// the round that sees the stop writes everything that is left.
+		bool stop = _stop;
+		if (logger_id == 0)
+			glob_manager->update_epoch();
+		uint64_t epoch = glob_manager->get_epoch();
+		bool sync = stop || epoch > logger->synced_epoch;
+		// a worker's records below the epoch it announced are before the
+		// tail read after it.
+		uint64_t durable = epoch;
+		bool written = false;
+		for (UInt32 i = logger_id; i < g_thread_cnt; i += LOG_THD_CNT) {
+			LogThd * lt = _thds[i];
+			uint64_t thd_epoch = lt->epoch;
+			if (thd_epoch < durable)
+				durable = thd_epoch;
+			COMPILER_BARRIER
+			if (lt->tail != lt->head) {
+				write_buf(logger, lt);
+				written = true;
+			}
+		}
+		// the buffers are drained every round, but only synced and made
+		// durable once per epoch.
+		if (sync) {
+			uint64_t starttime = get_sys_clock();
+			fdatasync(logger->fd);
+			if (warmup_finish) {
+				logger->flush_cnt ++;
+				logger->time_sync += get_sys_clock() - starttime;
+			}
+			logger->synced_epoch = epoch;
+			if (durable > logger->durable)
+				logger->durable = durable;
+		}
+		if (stop)
+			break;
+		if (!written)
+			usleep(LOG_BATCH_TIME * 100);
+	}
+}
+
+void
+LogMan::write_buf(Logger * logger, LogThd * lt) {
+	uint64_t head = lt->head;
+	uint64_t tail = lt->tail;
+	COMPILER_BARRIER
+	while (head < tail) {
+		uint64_t pos = head % LOG_BUF_SIZE;
+		uint64_t size = tail - head;
+		if (size > LOG_BUF_SIZE - pos)
+			size = LOG_BUF_SIZE - pos;
+		ssize_t bytes = write(logger->fd, lt->buf + pos, size);
+		assert(bytes > 0);
+		head += bytes;
+		if (warmup_finish)
+			logger->write_bytes += bytes;
+	}
+	COMPILER_BARRIER
+	lt->head = head;
+}
+
+uint64_t
+LogMan::announce(uint64_t thd_id) {
+	LogThd * lt = _thds[thd_id];
+	lt->epoch = glob_manager->get_epoch();
+	// a logger that missed the store above reads the global epoch before
+	// the load below, so the txn's epoch is not below what it made durable.
+	__sync_synchronize();
+	return glob_manager->get_epoch();
+}
+
+void
+LogMan::abort_txn(uint64_t thd_id) {
+	_thds[thd_id]->epoch = UINT64_MAX;
+}
+
+void
+LogMan::copy_in(LogThd * lt, uint64_t pos, const void * src, uint64_t size) {
+	uint64_t off = pos % LOG_BUF_SIZE;
+	uint64_t first = size;
+	if (first > LOG_BUF_SIZE - off)
+		first = LOG_BUF_SIZE - off;
+	memcpy(lt->buf + off, src, first);
+	if (first < size)
+		memcpy(lt->buf, (char *)src + first, size - first);
+}
+
+void
+LogMan::log_txn(txn_man * txn, uint64_t epoch) {
+	uint64_t thd_id = txn->get_thd_id();
+	LogThd * lt = _thds[thd_id];
+	LogHeader header;
+	header.row_cnt = 0;
+	header.txn_id = txn->get_txn_id();
+	header.epoch = epoch;
+	uint64_t size = sizeof(LogHeader);
+#if LOG_REDO
+	for (int rid = 0; rid < txn->row_cnt; rid ++)
+		if (txn->accesses[rid]->type == WR) {
+			header.row_cnt ++;
+			size += sizeof(LogRow) + txn->accesses[rid]->orig_row->get_tuple_size();
+		}
+	for (UInt32 i = 0; i < txn->get_insert_cnt(); i ++) {
+		header.row_cnt ++;
+		size += sizeof(LogRow) + txn->get_insert_row(i)->get_tuple_size();
+	}
+	// a read-only txn is not logged, but still waits for its epoch.
+	bool logged = (header.row_cnt > 0);
+#else
+	bool logged = !txn->read_only;
+	uint32_t cmd_size = 0;
+	// [HTAP_THD_CNT] a scan txn has no query.
+	if (logged) {
+		base_query * query = txn->log_query;
+		cmd_size = query->get_log_size();
+		if (cmd_size > lt->cmd_size) {
+			_mm_free(lt->cmd_buf);
+			while (cmd_size > lt->cmd_size)
+				lt->cmd_size *= 2;
+			lt->cmd_buf = (char *) _mm_malloc(lt->cmd_size, 64);
+		}
+		query->write_log(lt->cmd_buf);
+		size += cmd_size;
+	}
+#endif
+	if (logged) {
+		assert(size <= LOG_BUF_SIZE);
+		header.size = size;
+		uint64_t tail = lt->tail;
+		if (tail + size - lt->head > LOG_BUF_SIZE) {
+			uint64_t starttime = get_sys_clock();
+			while (tail + size - lt->head > LOG_BUF_SIZE)
+				PAUSE
+			INC_STATS(thd_id, time_log_wait, get_sys_clock() - starttime);
+		}
+		uint64_t pos = tail;
+		copy_in(lt, pos, &header, sizeof(header));
+		pos += sizeof(header);
+#if LOG_REDO
+		for (int rid = 0; rid < txn->row_cnt; rid ++) {
+			Access * access = txn->accesses[rid];
+			if (access->type != WR)
+				continue;
+			row_t * row = access->orig_row;
+			LogRow log_row;
+			log_row.table_id = row->get_table()->get_table_id();
+			log_row.size = row->get_tuple_size();
+			log_row.primary_key = row->get_primary_key();
+			log_row.part_id = row->get_part_id();
+  #if CC_ALG == TICTOC || CC_ALG == SILO
+			log_row.cols = access->cols;
+  #else
+			log_row.cols = COLS_ALL;
+  #endif
+			copy_in(lt, pos, &log_row, sizeof(log_row));
+			pos += sizeof(log_row);
+			// the committed image. the local copy, or the row itself for
+			// the schemes that write in place.
+			row_t * data = (access->data == NULL)? row : access->data;
+			copy_in(lt, pos, data->get_data(), log_row.size);
+			pos += log_row.size;
+		}
+		for (UInt32 i = 0; i < txn->get_insert_cnt(); i ++) {
+			row_t * row = txn->get_insert_row(i);
+			LogRow log_row;
+			log_row.table_id = row->get_table()->get_table_id();
+			log_row.size = row->get_tuple_size();
+			log_row.primary_key = row->get_primary_key();
+			log_row.part_id = row->get_part_id();
+			log_row.cols = COLS_ALL;
+			copy_in(lt, pos, &log_row, sizeof(log_row));
+			pos += sizeof(log_row);
+			copy_in(lt, pos, row->get_data(), log_row.size);
+			pos += log_row.size;
+		}
+#else
+		copy_in(lt, pos, lt->cmd_buf, cmd_size);
+		pos += cmd_size;
+#endif
+		assert(pos == tail + size);
+		COMPILER_BARRIER
+		lt->tail = pos;
+		INC_STATS(thd_id, log_cnt, 1);
+		INC_STATS(thd_id, log_bytes, size);
+	}
+	// a logger that reads the reset below also reads the tail above.
+	COMPILER_BARRIER
+	lt->epoch = UINT64_MAX;
+	// queue the ack. commits of one epoch share an entry.
+	uint64_t now = get_sys_clock();
+	AckEntry * last = &lt->acks[(lt->ack_tail - 1) % LOG_ACK_SLOTS];
+	if (lt->ack_tail - lt->ack_head == LOG_ACK_SLOTS) {
+		// the txn may hold locks, so it does not wait for a free slot.
+		// the commits of the newest entry are acknowledged with it instead.
+		last->epoch = epoch;
+	} else if (lt->ack_tail == lt->ack_head || last->epoch != epoch) {
+		last = &lt->acks[lt->ack_tail % LOG_ACK_SLOTS];
+		last->epoch = epoch;
+		last->txn_cnt = 0;
+		last->commit_time = 0;
+		lt->ack_tail ++;
+	}
+	last->txn_cnt ++;
+	last->commit_time += now;
+	ack(thd_id, true);
+}
+
+uint64_t
+LogMan::get_durable() {
+	uint64_t durable = UINT64_MAX;
+	for (UInt32 i = 0; i < LOG_THD_CNT; i++)
+		if (_loggers[i]->durable < durable)
+			durable = _loggers[i]->durable;
+	return durable;
+}
+
+void
+LogMan::ack(uint64_t thd_id, bool count) {
+	LogThd * lt = _thds[thd_id];
+	if (lt->ack_head == lt->ack_tail)
+		return;
+	uint64_t durable = get_durable();
+	uint64_t now = get_sys_clock();
+	while (lt->ack_head < lt->ack_tail) {
+		AckEntry * entry = &lt->acks[lt->ack_head % LOG_ACK_SLOTS];
+		if (entry->epoch >= durable)
+			break;
+		if (count) {
+			INC_STATS(thd_id, log_ack_cnt, entry->txn_cnt);
+			INC_STATS(thd_id, time_log_ack, entry->txn_cnt * now - entry->commit_time);
+		}
+		lt->ack_head ++;
+	}
+}
+
+void
+LogMan::thd_done(uint64_t thd_id) {
+	LogThd * lt = _thds[thd_id];
+	lt->epoch = UINT64_MAX;
+	// the stats of the warmup run were cleared when it ended.
+	while (lt->ack_head < lt->ack_tail) {
+		usleep(LOG_BATCH_TIME * 100);
+		ack(thd_id, warmup_finish);
+	}
+}
+
+void
+LogMan::print() {
+	for (UInt32 i = 0; i < LOG_THD_CNT; i++) {
+		Logger * logger = _loggers[i];
+		printf("[logger] logger_id=%d, flush_cnt=%ld, write_bytes=%ld, time_sync=%f, avg_sync_time=%f\n",
+			i, logger->flush_cnt, logger->write_bytes,
+			logger->time_sync / 1e9,
+			logger->flush_cnt == 0? 0 : logger->time_sync / 1e9 / logger->flush_cnt
+		);
+	}
+}
+
+#endif
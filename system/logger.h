@@ -0,0 +1,102 @@
+#pragma once
+
+#include "global.h"
+#include "helper.h"
+
+class txn_man;
+
+// [LOG_REDO, LOG_COMMAND] Parallel logging with epoch group commit.
+// At commit a worker appends the txn's record to its own log buffer: the
+// rows it wrote (LOG_REDO) or its input (LOG_COMMAND). Each record carries
+// the global epoch the txn read when it entered finish(), before its writes
+// were visible, so a txn that sees them has the same epoch or a later one.
+// Manager::update_epoch() advances the epoch every LOG_BATCH_TIME ms.
+// Logger i writes the buffers of workers i, i + LOG_THD_CNT, ... to its own
+// file, and fdatasyncs once per epoch. Epochs below the smallest epoch a
+// worker may still log in are then durable on every logger, and the
+// workers acknowledge the commits of those epochs.
+class LogMan {
+public:
+	void 			init();
+	// the logger threads run from start() until stop().
+	void 			start();
+	void 			stop();
+	// a worker enters the commit of a txn. Returns the txn's epoch.
+	uint64_t 		announce(uint64_t thd_id);
+	// appends the record of a txn that committed at epoch, and queues its
+	// acknowledgment.
+	void 			log_txn(txn_man * txn, uint64_t epoch);
+	// the txn the worker announced aborted.
+	void 			abort_txn(uint64_t thd_id);
+	// the worker stops running txns. Waits for its commits to be durable.
+	void 			thd_done(uint64_t thd_id);
+	// fsyncs and bytes written per logger.
+	void 			print();
+private:
+	// the commits of a worker in one epoch.
+	struct AckEntry {
+		uint64_t 	epoch;
+		uint64_t 	txn_cnt;
+		// the sum of their commit times.
+		uint64_t 	commit_time;
+	};
+	struct LogThd {
+		// a ring of LOG_BUF_SIZE bytes. The logger writes [head, tail).
+		char * 		buf;
+		volatile uint64_t head;
+		volatile uint64_t tail;
+		// the records the worker appends from now on have an epoch at
+		// least this. UINT64_MAX unless the worker is committing a txn,
+		// so a worker that waits or runs a long txn does not hold back
+		// the durable epoch.
+		volatile uint64_t epoch;
+		// commits waiting for their epoch, oldest first.
+		AckEntry * 	acks;
+		uint32_t 	ack_head;
+		uint32_t 	ack_tail;
+		// [LOG_COMMAND] the txn input is serialized here first.
+		char * 		cmd_buf;
+		uint32_t 	cmd_size;
+		char 		_pad[CL_SIZE];
+	};
+	struct Logger {
+		pthread_t 	thd;
+		int 		fd;
+		// epochs below this are durable for the workers of this logger.
+		volatile uint64_t durable;
+		uint64_t 	synced_epoch;
+		uint64_t 	flush_cnt;
+		uint64_t 	write_bytes;
+		uint64_t 	time_sync;
+		char 		_pad[CL_SIZE];
+	};
+	struct LogHeader {
+		// the bytes of the record, with this header.
+		uint32_t 	size;
+		// [LOG_REDO] the # of LogRow that follow. 0 for LOG_COMMAND,
+		// where the txn input follows.
+		uint32_t 	row_cnt;
+		uint64_t 	txn_id;
+		uint64_t 	epoch;
+	};
+	struct LogRow {
+		uint32_t 	table_id;
+		// the bytes of the tuple that follow.
+		uint32_t 	size;
+		uint64_t 	primary_key;
+		uint64_t 	part_id;
+		// [TICTOC, SILO] only these columns of the tuple were written.
+		cols_t 		cols;
+	};
+	static void * 	run_logger(void * id);
+	void 			flush(uint32_t logger_id);
+	void 			write_buf(Logger * logger, LogThd * lt);
+	// copies size bytes to the ring at pos.
+	void 			copy_in(LogThd * lt, uint64_t pos, const void * src, uint64_t size);
+	void 			ack(uint64_t thd_id, bool count);
+	uint64_t 		get_durable();
+
+	LogThd ** 		_thds;
+	Logger ** 		_loggers;
+	volatile bool 	_stop;
+};
@@ -9,6 +9,13 @@
 #include "plock.h"
 #include "occ.h"
 #include "vll.h"
+#include "calvin.h"
+#include "part_router.h"
+#include "epoch.h"
+#include "version_gc.h"
+#include "topology.h"
+#include "logger.h"
+#include "checkpoint.h"
 
 void * f(void *);
 
@@ -16,17 +23,29 @@ thread_t ** m_thds;
 
 // defined in parser.cpp
 void parser(int argc, char * argv[]);
+// defined in ts_bench.cpp
+void ts_bench();
 
 int main(int argc, char* argv[])
 {
 	parser(argc, argv);
+	topology.init();
+	if (g_ts_bench != NULL) {
+		ts_bench();
+		return 0;
+	}
 	
 	mem_allocator.init(g_part_cnt, MEM_SIZE / g_part_cnt); 
 	stats.init();
 	glob_manager = (Manager *) _mm_malloc(sizeof(Manager), 64);
 	glob_manager->init();
-	if (g_cc_alg == DL_DETECT) 
+	epoch_man.init();
+	if (g_cc_alg == HEKATON || g_cc_alg == MVCC)
+		version_gc.init();
+	if (g_cc_alg == DL_DETECT) {
 		dl_detector.init();
+		dl_detector.start();
+	}
 	printf("mem_allocator initialized!\n");
 	workload * m_wl;
 	switch (WORKLOAD) {
@@ -58,14 +77,26 @@ int main(int argc, char* argv[])
 	printf("query_queue initialized!\n");
 #if CC_ALG == HSTORE
 	part_lock_man.init();
+  #if PART_ROUTING
+	part_router.init();
+  #endif
 #elif CC_ALG == OCC
 	occ_man.init();
 #elif CC_ALG == VLL
 	vll_man.init();
+#elif CC_ALG == CALVIN
+	calvin_man.init();
 #endif
 
 	for (uint32_t i = 0; i < thd_cnt; i++) 
 		m_thds[i]->init(i, m_wl);
+#if LOGGING
+	log_man.init();
+	log_man.start();
+#endif
+#if CHECKPOINT
+	ckpt_man.init(m_wl);
+#endif
 
 	if (WARMUP > 0){
 		printf("WARMUP start!\n");
@@ -86,6 +117,9 @@ int main(int argc, char* argv[])
 	pthread_barrier_init( &warmup_bar, NULL, g_thread_cnt );
 
 	// spawn and run txns again.
+#if CHECKPOINT
+	ckpt_man.start();
+#endif
 	int64_t starttime = get_server_clock();
 	for (uint32_t i = 0; i < thd_cnt - 1; i++) {
 		uint64_t vid = i;
@@ -95,11 +129,29 @@ int main(int argc, char* argv[])
 	for (uint32_t i = 0; i < thd_cnt - 1; i++) 
 		pthread_join(p_thds[i], NULL);
 	int64_t endtime = get_server_clock();
+#if LOGGING
+	log_man.stop();
+#endif
+#if CHECKPOINT
+	ckpt_man.stop();
+#endif
+	if (g_cc_alg == DL_DETECT)
+		dl_detector.stop();
 	
 	if (WORKLOAD != TEST) {
 		printf("PASS! SimTime = %ld\n", endtime - starttime);
 		if (STATS_ENABLE)
 			stats.print();
+		topology.print();
+#if LOGGING
+		log_man.print();
+#endif
+#if CHECKPOINT
+		ckpt_man.print();
+#endif
+#if CC_ALG == HSTORE && PART_ROUTING
+		part_router.print();
+#endif
 	} else {
 		((TestWorkload *)m_wl)->summarize();
 	}
@@ -109,5 +161,11 @@ int main(int argc, char* argv[])
 void * f(void * id) {
 	uint64_t tid = (uint64_t)id;
 	m_thds[tid]->run();
+#if LOGGING
+	log_man.thd_done(tid);
+#endif
+#if CHECKPOINT
+	ckpt_man.thd_done();
+#endif
 	return NULL;
 }
@@ -3,15 +3,31 @@
 #include "txn.h"
 #include "pthread.h"
 
+// bits of the per-thread sequence under each clock tick. An epoch holds
+// many timestamps; the physical clock (in ns) ticks about once per call.
+#define TS_EPOCH_SEQ_BITS	24
+#define TS_HLC_SEQ_BITS		8
+
 void Manager::init() {
 	timestamp = (uint64_t *) _mm_malloc(sizeof(uint64_t), 64);
 	*timestamp = 1;
+	pthread_mutex_init( &ts_mutex, NULL );
 	_last_min_ts_time = 0;
 	_min_ts = 0;
 	_epoch = (uint64_t *) _mm_malloc(sizeof(uint64_t), 64);
 	_last_epoch_update_time = (ts_t *) _mm_malloc(sizeof(uint64_t), 64);
-	_epoch = 0;
-	_last_epoch_update_time = 0;
+	*_epoch = 0;
+	*_last_epoch_update_time = 0;
+	_ts_local = (TsLocal *) _mm_malloc(sizeof(TsLocal) * g_thread_cnt, 64);
+	for (uint32_t i = 0; i < g_thread_cnt; i++) {
+		_ts_local[i].clock = 0;
+		_ts_local[i].seq = 0;
+	}
+	// epoch 0 would hand out timestamp 0.
+	_ts_epoch = (uint64_t *) _mm_malloc(sizeof(uint64_t), 64);
+	*_ts_epoch = 1;
+	_ts_epoch_time = get_sys_clock();
+	_ts_start = _ts_epoch_time;
 	all_ts = (ts_t volatile **) _mm_malloc(sizeof(ts_t *) * g_thread_cnt, 64);
 	for (uint32_t i = 0; i < g_thread_cnt; i++) 
 		all_ts[i] = (ts_t *) _mm_malloc(sizeof(ts_t), 64);
@@ -53,6 +69,17 @@ Manager::get_ts(uint64_t thread_id) {
 	case TS_CLOCK :
 		time = get_sys_clock() * g_thread_cnt + thread_id;
 		break;
+	case TS_EPOCH :
+		if (thread_id == 0 && starttime - _ts_epoch_time > TS_EPOCH_INTVL) {
+			_ts_epoch_time = starttime;
+			*_ts_epoch = *_ts_epoch + 1;
+		}
+		time = next_local_ts(thread_id, *_ts_epoch, TS_EPOCH_SEQ_BITS);
+		break;
+	case TS_HLC :
+		// +1 so that the first timestamp is not 0.
+		time = next_local_ts(thread_id, starttime - _ts_start + 1, TS_HLC_SEQ_BITS);
+		break;
 	default :
 		assert(false);
 	}
@@ -60,10 +87,29 @@ Manager::get_ts(uint64_t thread_id) {
 	return time;
 }
 
+// the local clock follows the given clock when that moves ahead. Otherwise
+// the sequence number is bumped; when it runs out the local clock moves
+// one tick ahead of the given clock. So a thread's timestamps always grow
+// and there is no shared write.
+ts_t
+Manager::next_local_ts(uint64_t thread_id, ts_t clock, uint32_t seq_bits) {
+	TsLocal * local = &_ts_local[thread_id];
+	if (clock > local->clock) {
+		local->clock = clock;
+		local->seq = 0;
+	} else if (++ local->seq == (1UL << seq_bits)) {
+		local->clock ++;
+		local->seq = 0;
+	}
+	return ((local->clock << seq_bits) | local->seq) * g_thread_cnt + thread_id;
+}
+
+// any thread may refresh the low-water mark once it is MIN_TS_INTVL old.
 ts_t Manager::get_min_ts(uint64_t tid) {
 	uint64_t now = get_sys_clock();
 	uint64_t last_time = _last_min_ts_time; 
-	if (tid == 0 && now - last_time > MIN_TS_INTVL)
+	if (now - last_time > MIN_TS_INTVL
+		&& ATOM_CAS(_last_min_ts_time, last_time, now))
 	{ 
 		ts_t min = UINT64_MAX;
     		for (UInt32 i = 0; i < g_thread_cnt; i++)
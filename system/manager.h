@@ -27,17 +27,32 @@ public:
 	uint64_t 		get_epoch() { return *_epoch; };
 	void 	 		update_epoch();
 private:
-	// for SILO
+	// [LOGGING] the group commit epoch, advanced by logger 0.
 	volatile uint64_t * _epoch;		
 	ts_t * 			_last_epoch_update_time;
 
 	pthread_mutex_t ts_mutex;
 	uint64_t *		timestamp;
+	// [TS_EPOCH, TS_HLC] each thread counts on top of a coarse clock: the
+	// global epoch for TS_EPOCH, the physical clock for TS_HLC. A
+	// timestamp is (clock, seq) with the thread id in the low digits.
+	struct TsLocal {
+		ts_t 		clock;
+		uint64_t 	seq;
+		char 		pad[CL_SIZE - sizeof(ts_t) - sizeof(uint64_t)];
+	};
+	ts_t 			next_local_ts(uint64_t thread_id, ts_t clock, uint32_t seq_bits);
+	TsLocal *		_ts_local;
+	// [TS_EPOCH] advanced by thread 0 every TS_EPOCH_INTVL.
+	volatile uint64_t * _ts_epoch;
+	ts_t 			_ts_epoch_time;
+	// [TS_HLC] the physical clock counts from here.
+	ts_t 			_ts_start;
 	pthread_mutex_t mutexes[BUCKET_CNT];
 	uint64_t 		hash(row_t * row);
 	ts_t volatile * volatile * volatile all_ts;
 	txn_man ** 		_all_txns;
 	// for MVCC 
 	volatile ts_t	_last_min_ts_time;
-	ts_t			_min_ts;
+	volatile ts_t	_min_ts;
 };
@@ -11,6 +11,7 @@ void print_usage() {
 	printf("\t-aINT       ; PART_ALLOC (0 or 1)\n");
 	printf("\t-mINT       ; MEM_PAD (0 or 1)\n");
 	printf("\t-GaINT      ; ABORT_PENALTY (in ms)\n");
+	printf("\t-GrINT      ; ABORT_BACKOFF (1 fixed, 2 exponential, 3 adaptive)\n");
 	printf("\t-GcINT      ; CENTRAL_MAN\n");
 	printf("\t-GtINT      ; TS_ALLOC\n");
 	printf("\t-GkINT      ; KEY_ORDER\n");
@@ -20,6 +21,9 @@ void print_usage() {
 	
 	printf("\t-GbINT      ; TS_BATCH_ALLOC\n");
 	printf("\t-GuINT      ; TS_BATCH_NUM\n");
+	printf("\t-GsLIST     ; benchmark the timestamp allocators with LIST threads (e.g. 1,2,4) and exit\n");
+	printf("\t-GiINT      ; INTERLEAVE_CNT\n");
+	printf("\t-GpINT      ; PIN_POLICY (1 none, 2 compact, 3 scatter, 4 core)\n");
 	
 	printf("\t-o STRING   ; output file\n\n");
 	printf("  [YCSB]:\n");
@@ -31,10 +35,13 @@ void print_usage() {
 	printf("\t-sINT       ; SYNTH_TABLE_SIZE\n");
 	printf("\t-RINT       ; REQ_PER_QUERY\n");
 	printf("\t-fINT       ; FIELD_PER_TUPLE\n");
+	printf("\t-kINT       ; KEY_SPACE (1 dense, 2 fnv, 3 sparse, 4 rand64)\n");
+	printf("\t-yCHAR      ; YCSB_WORKLOAD (A to F)\n");
 	printf("  [TPCC]:\n");
 	printf("\t-nINT       ; NUM_WH\n");
 	printf("\t-TpFLOAT    ; PERC_PAYMENT\n");
 	printf("\t-TuINT      ; WH_UPDATE\n");
+	printf("\t-TmLIST     ; TPCC_MIX (e.g. 45,43,4,4,4)\n");
 	printf("  [TEST]:\n");
 	printf("\t-Ar         ; Test READ_WRITE\n");
 	printf("\t-Ac         ; Test CONFLIT\n");
@@ -79,11 +86,17 @@ void parser(int argc, char * argv[]) {
 			g_req_per_query = atoi( &argv[i][2] );
 		else if (argv[i][1] == 'f')
 			g_field_per_tuple = atoi( &argv[i][2] );
+		else if (argv[i][1] == 'k')
+			g_key_space = atoi( &argv[i][2] );
+		else if (argv[i][1] == 'y')
+			g_ycsb_workload = &argv[i][2];
 		else if (argv[i][1] == 'n')
 			g_num_wh = atoi( &argv[i][2] );
 		else if (argv[i][1] == 'G') {
 			if (argv[i][2] == 'a')
 				g_abort_penalty = atoi( &argv[i][3] );
+			else if (argv[i][2] == 'r')
+				g_abort_backoff = atoi( &argv[i][3] );
 			else if (argv[i][2] == 'c')
 				g_central_man = atoi( &argv[i][3] );
 			else if (argv[i][2] == 't')
@@ -100,11 +113,19 @@ void parser(int argc, char * argv[]) {
 				g_ts_batch_alloc = atoi( &argv[i][3] );
 			else if (argv[i][2] == 'u')
 				g_ts_batch_num = atoi( &argv[i][3] );
+			else if (argv[i][2] == 's')
+				g_ts_bench = &argv[i][3];
+			else if (argv[i][2] == 'i')
+				g_interleave_cnt = atoi( &argv[i][3] );
+			else if (argv[i][2] == 'p')
+				g_pin_policy = atoi( &argv[i][3] );
 		} else if (argv[i][1] == 'T') {
 			if (argv[i][2] == 'p')
 				g_perc_payment = atof( &argv[i][3] );
 			if (argv[i][2] == 'u')
 				g_wh_update = atoi( &argv[i][3] );
+			if (argv[i][2] == 'm')
+				g_tpcc_mix = &argv[i][3];
 		} else if (argv[i][1] == 'A') {
 			if (argv[i][2] == 'r')
 				g_test_case = READ_WRITE;
@@ -7,9 +7,15 @@ class workload;
 class ycsb_query;
 class tpcc_query;
 
+// [LOG_COMMAND] appends a field of the query to buf.
+#define LOG_FIELD(buf, field) { memcpy(buf, &(field), sizeof(field)); buf += sizeof(field); }
+
 class base_query {
 public:
 	virtual void init(uint64_t thd_id, workload * h_wl) = 0;
+	// [LOG_COMMAND] the txn input as it is written to the log.
+	virtual uint32_t get_log_size() = 0;
+	virtual void write_log(char * buf) = 0;
 	uint64_t waiting_time;
 	uint64_t part_num;
 	uint64_t * part_to_access;
@@ -30,6 +30,37 @@ void Stats_thd::clear() {
 	time_ts_alloc = 0;
 	latency = 0;
 	time_query = 0;
+	retry_cnt = 0;
+	time_retry = 0;
+	ver_create_cnt = 0;
+	ver_reclaim_cnt = 0;
+	ver_read_cnt = 0;
+	ver_chain_len = 0;
+	wound_cnt = 0;
+	self_abort_cnt = 0;
+	hybrid_opt_cnt = 0;
+	hybrid_lock_cnt = 0;
+	hybrid_lock_abort_cnt = 0;
+	occ_validate_cnt = 0;
+	occ_validate_abort_cnt = 0;
+	retire_cnt = 0;
+	retire_follow_cnt = 0;
+	retire_cascade_cnt = 0;
+	log_cnt = 0;
+	log_bytes = 0;
+	log_ack_cnt = 0;
+	time_log_ack = 0;
+	time_log_wait = 0;
+	scan_cnt = 0;
+	scan_row_cnt = 0;
+	scan_bytes = 0;
+	scan_abort_cnt = 0;
+	time_scan = 0;
+	for (int i = 0; i <= TPCC_STOCK_LEVEL; i ++) {
+		tpcc_txn_cnt[i] = 0;
+		tpcc_abort_cnt[i] = 0;
+		tpcc_time[i] = 0;
+	}
 }
 
 void Stats_tmp::init() {
@@ -47,6 +78,8 @@ void Stats::init() {
 		return;
 	_stats = (Stats_thd**) 
 			_mm_malloc(sizeof(Stats_thd*) * g_thread_cnt, 64);
+	// [CHECKPOINT] the throughput sampler skips threads that did not start.
+	memset(_stats, 0, sizeof(Stats_thd*) * g_thread_cnt);
 	tmp_stats = (Stats_tmp**) 
 			_mm_malloc(sizeof(Stats_tmp*) * g_thread_cnt, 64);
 	dl_detect_time = 0;
@@ -121,6 +154,32 @@ void Stats::print() {
 	double total_time_ts_alloc = 0;
 	double total_latency = 0;
 	double total_time_query = 0;
+	uint64_t total_retry_cnt = 0;
+	double total_time_retry = 0;
+	uint64_t total_ver_create_cnt = 0;
+	uint64_t total_ver_reclaim_cnt = 0;
+	uint64_t total_ver_read_cnt = 0;
+	uint64_t total_ver_chain_len = 0;
+	uint64_t total_wound_cnt = 0;
+	uint64_t total_self_abort_cnt = 0;
+	uint64_t total_hybrid_opt_cnt = 0;
+	uint64_t total_hybrid_lock_cnt = 0;
+	uint64_t total_hybrid_lock_abort_cnt = 0;
+	uint64_t total_occ_validate_cnt = 0;
+	uint64_t total_occ_validate_abort_cnt = 0;
+	uint64_t total_retire_cnt = 0;
+	uint64_t total_retire_follow_cnt = 0;
+	uint64_t total_retire_cascade_cnt = 0;
+	uint64_t total_log_cnt = 0;
+	uint64_t total_log_bytes = 0;
+	uint64_t total_log_ack_cnt = 0;
+	double total_time_log_ack = 0;
+	double total_time_log_wait = 0;
+	uint64_t total_scan_cnt = 0;
+	uint64_t total_scan_row_cnt = 0;
+	uint64_t total_scan_bytes = 0;
+	uint64_t total_scan_abort_cnt = 0;
+	double total_time_scan = 0;
 	for (uint64_t tid = 0; tid < g_thread_cnt; tid ++) {
 		total_txn_cnt += _stats[tid]->txn_cnt;
 		total_abort_cnt += _stats[tid]->abort_cnt;
@@ -138,6 +197,32 @@ void Stats::print() {
 		total_time_ts_alloc += _stats[tid]->time_ts_alloc;
 		total_latency += _stats[tid]->latency;
 		total_time_query += _stats[tid]->time_query;
+		total_retry_cnt += _stats[tid]->retry_cnt;
+		total_time_retry += _stats[tid]->time_retry;
+		total_ver_create_cnt += _stats[tid]->ver_create_cnt;
+		total_ver_reclaim_cnt += _stats[tid]->ver_reclaim_cnt;
+		total_ver_read_cnt += _stats[tid]->ver_read_cnt;
+		total_ver_chain_len += _stats[tid]->ver_chain_len;
+		total_wound_cnt += _stats[tid]->wound_cnt;
+		total_self_abort_cnt += _stats[tid]->self_abort_cnt;
+		total_hybrid_opt_cnt += _stats[tid]->hybrid_opt_cnt;
+		total_hybrid_lock_cnt += _stats[tid]->hybrid_lock_cnt;
+		total_hybrid_lock_abort_cnt += _stats[tid]->hybrid_lock_abort_cnt;
+		total_occ_validate_cnt += _stats[tid]->occ_validate_cnt;
+		total_occ_validate_abort_cnt += _stats[tid]->occ_validate_abort_cnt;
+		total_retire_cnt += _stats[tid]->retire_cnt;
+		total_retire_follow_cnt += _stats[tid]->retire_follow_cnt;
+		total_retire_cascade_cnt += _stats[tid]->retire_cascade_cnt;
+		total_log_cnt += _stats[tid]->log_cnt;
+		total_log_bytes += _stats[tid]->log_bytes;
+		total_log_ack_cnt += _stats[tid]->log_ack_cnt;
+		total_time_log_ack += _stats[tid]->time_log_ack;
+		total_time_log_wait += _stats[tid]->time_log_wait;
+		total_scan_cnt += _stats[tid]->scan_cnt;
+		total_scan_row_cnt += _stats[tid]->scan_row_cnt;
+		total_scan_bytes += _stats[tid]->scan_bytes;
+		total_scan_abort_cnt += _stats[tid]->scan_abort_cnt;
+		total_time_scan += _stats[tid]->time_scan;
 		
 		printf("[tid=%ld] txn_cnt=%ld,abort_cnt=%ld\n", 
 			tid,
@@ -202,6 +287,90 @@ void Stats::print() {
 		total_debug4, // / BILLION,
 		total_debug5  // / BILLION 
 	);
+	printf("[retry] retry_cnt=%ld, time_retry=%f, avg_retry_delay=%f\n",
+		total_retry_cnt,
+		total_time_retry / BILLION,
+		total_retry_cnt == 0? 0 : total_time_retry / BILLION / total_retry_cnt
+	);
+	if (CC_ALG == HEKATON || CC_ALG == MVCC)
+		printf("[version] ver_create_cnt=%ld, ver_reclaim_cnt=%ld, avg_chain_len=%f\n",
+			total_ver_create_cnt,
+			total_ver_reclaim_cnt,
+			total_ver_read_cnt == 0? 0 : (double) total_ver_chain_len / total_ver_read_cnt
+		);
+	if (CC_ALG == WOUND_WAIT)
+		printf("[wound] wound_cnt=%ld, self_abort_cnt=%ld\n",
+			total_wound_cnt,
+			total_self_abort_cnt
+		);
+	if (CC_ALG == SILO && SILO_HYBRID)
+		printf("[hybrid] opt_cnt=%ld, lock_cnt=%ld, lock_abort_cnt=%ld\n",
+			total_hybrid_opt_cnt,
+			total_hybrid_lock_cnt,
+			total_hybrid_lock_abort_cnt
+		);
+	if (CC_ALG == OCC)
+		printf("[occ] validate_cnt=%ld, validate_abort_cnt=%ld\n",
+			total_occ_validate_cnt,
+			total_occ_validate_abort_cnt
+		);
+	if (LOCK_RETIRE)
+		printf("[retire] retire_cnt=%ld, follow_cnt=%ld, cascade_cnt=%ld\n",
+			total_retire_cnt,
+			total_retire_follow_cnt,
+			total_retire_cascade_cnt
+		);
+	if (LOG_REDO || LOG_COMMAND)
+		printf("[log] log_cnt=%ld, log_bytes=%ld, ack_cnt=%ld, avg_ack_delay=%f, time_log_wait=%f\n",
+			total_log_cnt,
+			total_log_bytes,
+			total_log_ack_cnt,
+			total_log_ack_cnt == 0? 0 : total_time_log_ack / BILLION / total_log_ack_cnt,
+			total_time_log_wait / BILLION
+		);
+	if (WORKLOAD == TPCC) {
+		// throughput per second of wall time, and the average time a 
+		// commit or abort of the type spent in run_txn.
+		const char * names[] = {"all", "payment", "new_order", "order_status", 
+			"delivery", "stock_level"};
+		double wall_time = total_run_time / BILLION / g_thread_cnt;
+		printf("[tpcc]");
+		for (int type = TPCC_PAYMENT; type <= TPCC_STOCK_LEVEL; type ++) {
+			uint64_t txn_cnt = 0;
+			uint64_t abort_cnt = 0;
+			double time = 0;
+			for (uint64_t tid = 0; tid < g_thread_cnt; tid ++) {
+				txn_cnt += _stats[tid]->tpcc_txn_cnt[type];
+				abort_cnt += _stats[tid]->tpcc_abort_cnt[type];
+				time += _stats[tid]->tpcc_time[type];
+			}
+			printf("%s %s_cnt=%ld, %s_abort_cnt=%ld, %s_tput=%f, %s_latency=%f",
+				type == TPCC_PAYMENT? "" : ",",
+				names[type], txn_cnt,
+				names[type], abort_cnt,
+				names[type], wall_time == 0? 0 : txn_cnt / wall_time,
+				names[type], txn_cnt + abort_cnt == 0? 0 : 
+					time / BILLION / (txn_cnt + abort_cnt));
+		}
+		printf("\n");
+	}
+#if HTAP_THD_CNT > 0
+	// bandwidth and throughput per second of wall time, with the time
+	// of each side averaged over its threads.
+	double scan_time = total_time_scan / BILLION / HTAP_THD_CNT;
+	double oltp_time = total_run_time / BILLION / (g_thread_cnt - HTAP_THD_CNT);
+	printf("[htap] scan_cnt=%ld, scan_row_cnt=%ld, scan_bytes=%ld, scan_abort_cnt=%ld, time_scan=%f, scan_bw=%f, oltp_tput=%f, oltp_abort_rate=%f\n",
+		total_scan_cnt,
+		total_scan_row_cnt,
+		total_scan_bytes,
+		total_scan_abort_cnt,
+		total_time_scan / BILLION,
+		scan_time == 0? 0 : total_scan_bytes / scan_time / 1e6,
+		oltp_time == 0? 0 : total_txn_cnt / oltp_time,
+		total_txn_cnt + total_abort_cnt == 0? 0 :
+			(double) total_abort_cnt / (total_txn_cnt + total_abort_cnt)
+	);
+#endif
 	if (g_prt_lat_distr)
 		print_lat_distr();
 }
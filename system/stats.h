@@ -17,6 +17,50 @@ public:
 	uint64_t time_ts_alloc;
 	double time_query;
 	uint64_t wait_cnt;
+	// restarts of aborted txns and the time from abort to restart.
+	uint64_t retry_cnt;
+	double time_retry;
+	// [HEKATON, MVCC] versions committed and reclaimed, and the # of
+	// versions a row held summed over ver_read_cnt reads.
+	uint64_t ver_create_cnt;
+	uint64_t ver_reclaim_cnt;
+	uint64_t ver_read_cnt;
+	uint64_t ver_chain_len;
+	// [WOUND_WAIT] aborts caused by an older txn, and all the others.
+	uint64_t wound_cnt;
+	uint64_t self_abort_cnt;
+	// [SILO_HYBRID] accesses that were only validated, accesses that locked
+	// a hot row, and the lock attempts that aborted the txn.
+	uint64_t hybrid_opt_cnt;
+	uint64_t hybrid_lock_cnt;
+	uint64_t hybrid_lock_abort_cnt;
+	// [OCC] validation rounds, and the ones that aborted the txn.
+	uint64_t occ_validate_cnt;
+	uint64_t occ_validate_abort_cnt;
+	// [LOCK_VIOLATION] locks retired before commit, locks taken past a
+	// retired owner, and txns aborted because a retired owner aborted.
+	uint64_t retire_cnt;
+	uint64_t retire_follow_cnt;
+	uint64_t retire_cascade_cnt;
+	// [LOG_REDO, LOG_COMMAND] records and bytes appended to the log, commits
+	// acknowledged once their epoch was durable and their summed delay from
+	// commit to ack, and the time spent waiting for log buffer space.
+	uint64_t log_cnt;
+	uint64_t log_bytes;
+	uint64_t log_ack_cnt;
+	double time_log_ack;
+	double time_log_wait;
+	// [HTAP_THD_CNT] full scans of a table, the rows and column bytes they
+	// read, the scan txns that aborted and the time spent scanning.
+	uint64_t scan_cnt;
+	uint64_t scan_row_cnt;
+	uint64_t scan_bytes;
+	uint64_t scan_abort_cnt;
+	double time_scan;
+	// [TPCC] commits, aborts and the time spent in run_txn per TPCCTxnType.
+	uint64_t tpcc_txn_cnt[TPCC_STOCK_LEVEL + 1];
+	uint64_t tpcc_abort_cnt[TPCC_STOCK_LEVEL + 1];
+	double tpcc_time[TPCC_STOCK_LEVEL + 1];
 	uint64_t debug1;
 	uint64_t debug2;
 	uint64_t debug3;
@@ -4,14 +4,22 @@
 #include "thread.h"
 #include "txn.h"
 #include "wl.h"
+#include "table.h"
 #include "query.h"
 #include "plock.h"
 #include "occ.h"
 #include "vll.h"
+#include "calvin.h"
+#include "part_router.h"
 #include "ycsb_query.h"
 #include "tpcc_query.h"
 #include "mem_alloc.h"
 #include "test.h"
+#include "epoch.h"
+#include "checkpoint.h"
+
+// [BACKOFF_ADAPTIVE] weight of the latest txn in the moving abort rate.
+#define ABORT_RATE_WEIGHT	(1.0 / 16)
 
 void thread_t::init(uint64_t thd_id, workload * workload) {
 	_thd_id = thd_id;
@@ -19,10 +27,9 @@ void thread_t::init(uint64_t thd_id, workload * workload) {
 	srand48_r((_thd_id + 1) * get_sys_clock(), &buffer);
 	_abort_buffer_size = ABORT_BUFFER_SIZE;
 	_abort_buffer = (AbortBufferEntry *) _mm_malloc(sizeof(AbortBufferEntry) * _abort_buffer_size, 64); 
-	for (int i = 0; i < _abort_buffer_size; i++)
-		_abort_buffer[i].query = NULL;
 	_abort_buffer_empty_slots = _abort_buffer_size;
 	_abort_buffer_enable = (g_params["abort_buffer_enable"] == "true");
+	_abort_rate = 0;
 }
 
 uint64_t thread_t::get_thd_id() { return _thd_id; }
@@ -44,6 +51,11 @@ RC thread_t::run() {
 
 	set_affinity(get_thd_id());
 
+	if (_thd_id >= g_thread_cnt - HTAP_THD_CNT)
+		return run_scan();
+	if (g_interleave_cnt > 1)
+		return run_interleaved();
+
 	myrand rdm;
 	rdm.init(get_thd_id());
 	RC rc = RCOK;
@@ -51,53 +63,59 @@ RC thread_t::run() {
 	rc = _wl->get_txn_man(m_txn, this);
 	assert (rc == RCOK);
 	glob_manager->set_txn_man(m_txn);
+#if CC_ALG == CALVIN
+	return calvin_man.run(this, m_txn);
+#elif CC_ALG == HSTORE && PART_ROUTING
+	return part_router.run(this, m_txn);
+#endif
 
 	base_query * m_query = NULL;
 	uint64_t thd_txn_id = 0;
 	UInt64 txn_cnt = 0;
 
 	while (true) {
+#if CHECKPOINT && CKPT_MODE == CKPT_CONSISTENT
+		// no txn is running, so the checkpoint sees no partial writes.
+		ckpt_man.thd_pause();
+#endif
 		ts_t starttime = get_sys_clock();
 		if (WORKLOAD != TEST) {
-			int trial = 0;
 			if (_abort_buffer_enable) {
-				m_query = NULL;
-				while (trial < 2) {
-					ts_t curr_time = get_sys_clock();
-					ts_t min_ready_time = UINT64_MAX;
-					if (_abort_buffer_empty_slots < _abort_buffer_size) {
-						for (int i = 0; i < _abort_buffer_size; i++) {
-							if (_abort_buffer[i].query != NULL && curr_time > _abort_buffer[i].ready_time) {
-								m_query = _abort_buffer[i].query;
-								_abort_buffer[i].query = NULL;
-								_abort_buffer_empty_slots ++;
-								break;
-							} else if (_abort_buffer_empty_slots == 0 
-									  && _abort_buffer[i].ready_time < min_ready_time) 
-								min_ready_time = _abort_buffer[i].ready_time;
-						}
-					}
-					if (m_query == NULL && _abort_buffer_empty_slots == 0) {
-						assert(trial == 0);
-						M_ASSERT(min_ready_time >= curr_time, "min_ready_time=%ld, curr_time=%ld\n", min_ready_time, curr_time);
-						usleep((min_ready_time - curr_time) / 1000);
-					}
-					else if (m_query == NULL) {
-						m_query = query_queue->get_next_query( _thd_id );
-					#if CC_ALG == WAIT_DIE
-						m_txn->set_ts(get_next_ts());
-					#endif
-					}
-					if (m_query != NULL)
-						break;
+				// a ready retry goes first. Otherwise a free slot lets a new
+				// txn run while the retries back off.
+				uint64_t abort_cnt;
+				ts_t ts;
+				m_query = abort_buffer_pop(starttime, abort_cnt, ts);
+				if (m_query == NULL && _abort_buffer_empty_slots == 0) {
+					ts_t min_ready_time = _abort_buffer[0].ready_time;
+					usleep((min_ready_time - starttime) / 1000);
+					m_query = abort_buffer_pop(UINT64_MAX, abort_cnt, ts);
+				}
+				if (m_query != NULL) {
+					m_txn->abort_cnt = abort_cnt;
+				#if CC_ALG == WAIT_DIE || CC_ALG == WOUND_WAIT
+					m_txn->set_ts(ts);
+				#endif
+				} else {
+					m_query = query_queue->get_next_query( _thd_id );
+					m_txn->abort_cnt = 0;
+				#if CC_ALG == WAIT_DIE || CC_ALG == WOUND_WAIT
+					m_txn->set_ts(get_next_ts());
+				#endif
 				}
 			} else {
-				if (rc == RCOK)
+				if (rc == RCOK) {
 					m_query = query_queue->get_next_query( _thd_id );
+					m_txn->abort_cnt = 0;
+				#if CC_ALG == WAIT_DIE || CC_ALG == WOUND_WAIT
+					// a restarted txn keeps its ts, so it gets older than
+					// the others until it wins.
+					m_txn->set_ts(get_next_ts());
+				#endif
+				}
 			}
 		}
 		INC_STATS(_thd_id, time_query, get_sys_clock() - starttime);
-		m_txn->abort_cnt = 0;
 //#if CC_ALG == VLL
 //		_wl->get_txn_man(m_txn, this);
 //#endif
@@ -110,6 +128,7 @@ RC thread_t::run() {
 				|| CC_ALG == TIMESTAMP) 
 			m_txn->set_ts(get_next_ts());
 
+		epoch_man.announce(get_thd_id(), epoch_man.get_epoch());
 		rc = RCOK;
 #if CC_ALG == HSTORE
 		if (WORKLOAD == TEST) {
@@ -124,8 +143,9 @@ RC thread_t::run() {
 #elif CC_ALG == OCC
 		// In the original OCC paper, start_ts only reads the current ts without advancing it.
 		// But we advance the global ts here to simplify the implementation. However, the final
-		// results should be the same.
-		m_txn->start_ts = get_next_ts(); 
+		// results should be the same. Central validation compares start_ts
+		// with the txn numbers in the history instead.
+		m_txn->start_ts = PER_ROW_VALID? get_next_ts() : occ_man.get_tn(); 
 #endif
 		if (rc == RCOK) 
 		{
@@ -143,26 +163,16 @@ RC thread_t::run() {
 				part_lock_man.unlock(m_txn, m_query->part_to_access, m_query->part_num);
 #endif
 		}
+		epoch_man.quiesce(get_thd_id());
+		update_abort_rate(rc);
 		if (rc == Abort) {
-			uint64_t penalty = 0;
-			if (ABORT_PENALTY != 0)  {
-				double r;
-				drand48_r(&buffer, &r);
-				penalty = r * ABORT_PENALTY;
-			}
-			if (!_abort_buffer_enable)
+			uint64_t penalty = get_abort_penalty(m_txn->abort_cnt + 1);
+			if (!_abort_buffer_enable) {
 				usleep(penalty / 1000);
-			else {
-				assert(_abort_buffer_empty_slots > 0);
-				for (int i = 0; i < _abort_buffer_size; i ++) {
-					if (_abort_buffer[i].query == NULL) {
-						_abort_buffer[i].query = m_query;
-						_abort_buffer[i].ready_time = get_sys_clock() + penalty;
-						_abort_buffer_empty_slots --;
-						break;
-					}
-				}
-			}
+				INC_STATS(get_thd_id(), retry_cnt, 1);
+				INC_STATS(get_thd_id(), time_retry, penalty);
+			} else
+				abort_buffer_push(m_query, m_txn->abort_cnt + 1, m_txn->get_ts(), penalty);
 		}
 
 		ts_t endtime = get_sys_clock();
@@ -201,6 +211,298 @@ RC thread_t::run() {
 	assert(false);
 }
 
+RC thread_t::run_scan() {
+	// the scan threads must take part in neither the query routing nor the
+	// batches of these schemes.
+	assert(WORKLOAD != TEST);
+	assert(HTAP_THD_CNT < g_thread_cnt);
+	assert(CC_ALG != CALVIN && CC_ALG != VLL && !(CC_ALG == HSTORE && PART_ROUTING));
+	assert(HTAP_SCAN_BATCH <= MAX_ROW_PER_TXN);
+	// only the OLTP threads warm up.
+	if (!warmup_finish)
+		return FINISH;
+	txn_man * m_txn;
+	RC rc = _wl->get_txn_man(m_txn, this);
+	assert (rc == RCOK);
+	glob_manager->set_txn_man(m_txn);
+	m_txn->read_only = true;
+#if CC_ALG == HSTORE
+	// a scan txn is a multi-partition txn over every partition.
+	uint64_t * parts = new uint64_t [g_part_cnt];
+	for (UInt32 i = 0; i < g_part_cnt; i++)
+		parts[i] = i;
+#endif
+	uint64_t thd_txn_id = 0;
+	// the scan threads start at different tables.
+	uint64_t scan_id = _thd_id - (g_thread_cnt - HTAP_THD_CNT);
+	while (!_wl->sim_done) {
+		workload::ScanDef * scan = &_wl->scans[scan_id % _wl->scans.size()];
+		scan_id ++;
+		ts_t scan_start = get_sys_clock();
+		double sum = 0;
+		uint64_t row_cnt = 0;
+		uint64_t table_size = scan->table->get_table_size();
+		uint64_t row_id = 0;
+		m_txn->abort_cnt = 0;
+		while (row_id < table_size && !_wl->sim_done) {
+#if CHECKPOINT && CKPT_MODE == CKPT_CONSISTENT
+			ckpt_man.thd_pause();
+#endif
+			uint64_t end = min(row_id + HTAP_SCAN_BATCH, table_size);
+			m_txn->set_txn_id(get_thd_id() + thd_txn_id * g_thread_cnt);
+			thd_txn_id ++;
+#if CC_ALG == WAIT_DIE || CC_ALG == WOUND_WAIT
+			// a restarted batch keeps its ts.
+			if (m_txn->abort_cnt == 0)
+				m_txn->set_ts(get_next_ts());
+#endif
+			if ((CC_ALG == HSTORE && !HSTORE_LOCAL_TS)
+					|| CC_ALG == MVCC 
+					|| CC_ALG == HEKATON
+					|| CC_ALG == TIMESTAMP) 
+				m_txn->set_ts(get_next_ts());
+			epoch_man.announce(get_thd_id(), epoch_man.get_epoch());
+			rc = RCOK;
+#if CC_ALG == HSTORE
+			rc = part_lock_man.lock(m_txn, parts, g_part_cnt);
+#elif CC_ALG == MVCC || CC_ALG == HEKATON
+			glob_manager->add_ts(get_thd_id(), m_txn->get_ts());
+#elif CC_ALG == OCC
+			m_txn->start_ts = PER_ROW_VALID? get_next_ts() : occ_man.get_tn(); 
+#endif
+			if (rc == RCOK) {
+				rc = m_txn->scan(scan->table, row_id, end, scan->cols, sum, row_cnt);
+#if CC_ALG == HSTORE
+				part_lock_man.unlock(m_txn, parts, g_part_cnt);
+#endif
+			}
+			epoch_man.quiesce(get_thd_id());
+			if (rc == Abort) {
+				INC_STATS(get_thd_id(), scan_abort_cnt, 1);
+				m_txn->abort_cnt ++;
+				usleep(get_abort_penalty(m_txn->abort_cnt) / 1000);
+			} else {
+				m_txn->abort_cnt = 0;
+				row_id = end;
+			}
+		}
+		INC_STATS(get_thd_id(), time_scan, get_sys_clock() - scan_start);
+		INC_STATS(get_thd_id(), scan_row_cnt, row_cnt);
+		INC_STATS(get_thd_id(), scan_bytes, row_cnt * scan->col_size);
+		if (row_id >= table_size) {
+			INC_STATS(get_thd_id(), scan_cnt, 1);
+			_scan_sum = sum;
+		}
+	}
+	return FINISH;
+}
+
+RC thread_t::run_interleaved() {
+	// a coroutine must never block on a lock held by a sibling on the same
+	// thread, so only CC algorithms that do not wait inside get_row are allowed.
+	assert(WORKLOAD != TEST);
+	assert(CC_ALG == NO_WAIT || CC_ALG == OCC || CC_ALG == TICTOC || CC_ALG == SILO);
+	// [SILO_HYBRID] hybrid_lock() spins on a hot row's lock.
+	assert(!(CC_ALG == SILO && SILO_HYBRID));
+	RC rc = RCOK;
+	uint32_t slot_cnt = g_interleave_cnt;
+	CoSlot * slots = (CoSlot *) _mm_malloc(sizeof(CoSlot) * slot_cnt, 64);
+	for (uint32_t i = 0; i < slot_cnt; i++) {
+		rc = _wl->get_txn_man(slots[i].txn, this);
+		assert (rc == RCOK);
+		slots[i].query = NULL;
+		slots[i].start_time = 0;
+		slots[i].ready_time = 0;
+		slots[i].running = false;
+	}
+	glob_manager->set_txn_man(slots[0].txn);
+
+	uint64_t thd_txn_id = 0;
+	UInt64 txn_cnt = 0;
+	uint32_t running_cnt = 0;
+	uint32_t next_slot = 0;
+	bool done = false;
+
+	while (!done && !_wl->sim_done) {
+		CoSlot * slot = &slots[next_slot];
+		next_slot = (next_slot + 1) % slot_cnt;
+		ts_t starttime = get_sys_clock();
+		if (!slot->running) {
+			if (_abort_buffer_enable) {
+				uint64_t abort_cnt;
+				ts_t ts;
+				slot->query = abort_buffer_pop(starttime, abort_cnt, ts);
+				if (slot->query != NULL)
+					slot->txn->abort_cnt = abort_cnt;
+				// every running txn may still need an abort buffer entry.
+				else if (_abort_buffer_empty_slots > (int)running_cnt) {
+					slot->query = query_queue->get_next_query( _thd_id );
+					slot->txn->abort_cnt = 0;
+				}
+			} else if (slot->query == NULL) {
+				slot->query = query_queue->get_next_query( _thd_id );
+				slot->txn->abort_cnt = 0;
+			} else if (starttime < slot->ready_time) {
+				INC_STATS(_thd_id, run_time, get_sys_clock() - starttime);
+				continue;
+			}
+			INC_STATS(_thd_id, time_query, get_sys_clock() - starttime);
+			if (slot->query == NULL) {
+				INC_STATS(_thd_id, run_time, get_sys_clock() - starttime);
+				continue;
+			}
+			slot->txn->set_txn_id(get_thd_id() + thd_txn_id * g_thread_cnt);
+			thd_txn_id ++;
+#if CC_ALG == OCC
+			slot->txn->start_ts = PER_ROW_VALID? get_next_ts() : occ_man.get_tn(); 
+#endif
+			slot->start_time = starttime;
+			slot->epoch = epoch_man.get_epoch();
+			slot->running = true;
+			// an older slot, if any, already holds back the epoch.
+			if (running_cnt == 0)
+				epoch_man.announce(get_thd_id(), slot->epoch);
+			running_cnt ++;
+		}
+
+		rc = slot->txn->run_txn_co(slot->query);
+
+		ts_t endtime = get_sys_clock();
+		INC_STATS(get_thd_id(), run_time, endtime - starttime);
+		if (rc == WAIT)
+			continue;
+
+		slot->running = false;
+		running_cnt --;
+		if (running_cnt == 0)
+			epoch_man.quiesce(get_thd_id());
+		else {
+			uint64_t min_epoch = UINT64_MAX;
+			for (uint32_t i = 0; i < slot_cnt; i++)
+				if (slots[i].running && slots[i].epoch < min_epoch)
+					min_epoch = slots[i].epoch;
+			epoch_man.announce(get_thd_id(), min_epoch);
+		}
+		uint64_t timespan = endtime - slot->start_time;
+		INC_STATS(get_thd_id(), latency, timespan);
+		update_abort_rate(rc);
+		if (rc == RCOK) {
+			INC_STATS(get_thd_id(), txn_cnt, 1);
+			stats.commit(get_thd_id());
+			slot->query = NULL;
+			txn_cnt ++;
+		} else if (rc == Abort) {
+			uint64_t penalty = get_abort_penalty(slot->txn->abort_cnt + 1);
+			if (!_abort_buffer_enable) {
+				slot->ready_time = endtime + penalty;
+				INC_STATS(get_thd_id(), retry_cnt, 1);
+				INC_STATS(get_thd_id(), time_retry, penalty);
+			} else {
+				abort_buffer_push(slot->query, slot->txn->abort_cnt + 1,
+					slot->txn->get_ts(), penalty);
+				slot->query = NULL;
+			}
+			INC_STATS(get_thd_id(), time_abort, timespan);
+			INC_STATS(get_thd_id(), abort_cnt, 1);
+			stats.abort(get_thd_id());
+			slot->txn->abort_cnt ++;
+		}
+
+		if (!warmup_finish && txn_cnt >= WARMUP / g_thread_cnt) {
+			stats.clear( get_thd_id() );
+			done = true;
+		}
+		if (warmup_finish && txn_cnt >= MAX_TXN_PER_PART) {
+			assert(txn_cnt == MAX_TXN_PER_PART);
+			if( !ATOM_CAS(_wl->sim_done, false, true) )
+				assert( _wl->sim_done);
+		}
+	}
+	// abort the txns still in flight so that they release their locks.
+	for (uint32_t i = 0; i < slot_cnt; i++)
+		if (slots[i].running)
+			slots[i].txn->finish(Abort);
+	epoch_man.quiesce(get_thd_id());
+	return FINISH;
+}
+
+void
+thread_t::abort_buffer_push(base_query * query, uint64_t abort_cnt, ts_t ts,
+		uint64_t penalty) {
+	assert(_abort_buffer_empty_slots > 0);
+	ts_t now = get_sys_clock();
+	int i = _abort_buffer_size - _abort_buffer_empty_slots;
+	_abort_buffer_empty_slots --;
+	AbortBufferEntry entry;
+	entry.ready_time = now + penalty;
+	entry.abort_time = now;
+	entry.query = query;
+	entry.abort_cnt = abort_cnt;
+	entry.ts = ts;
+	while (i > 0 && _abort_buffer[(i - 1) / 2].ready_time > entry.ready_time) {
+		_abort_buffer[i] = _abort_buffer[(i - 1) / 2];
+		i = (i - 1) / 2;
+	}
+	_abort_buffer[i] = entry;
+}
+
+base_query *
+thread_t::abort_buffer_pop(ts_t now, uint64_t &abort_cnt, ts_t &ts) {
+	int cnt = _abort_buffer_size - _abort_buffer_empty_slots;
+	if (cnt == 0 || _abort_buffer[0].ready_time > now)
+		return NULL;
+	base_query * query = _abort_buffer[0].query;
+	abort_cnt = _abort_buffer[0].abort_cnt;
+	ts = _abort_buffer[0].ts;
+	INC_STATS(get_thd_id(), retry_cnt, 1);
+	INC_STATS(get_thd_id(), time_retry, get_sys_clock() - _abort_buffer[0].abort_time);
+	// sift the last entry down from the root.
+	AbortBufferEntry last = _abort_buffer[--cnt];
+	_abort_buffer_empty_slots ++;
+	int i = 0;
+	while (2 * i + 1 < cnt) {
+		int child = 2 * i + 1;
+		if (child + 1 < cnt && _abort_buffer[child + 1].ready_time < _abort_buffer[child].ready_time)
+			child ++;
+		if (last.ready_time <= _abort_buffer[child].ready_time)
+			break;
+		_abort_buffer[i] = _abort_buffer[child];
+		i = child;
+	}
+	_abort_buffer[i] = last;
+	return query;
+}
+
+uint64_t
+thread_t::get_abort_penalty(uint64_t abort_cnt) {
+	if (g_abort_penalty == 0)
+		return 0;
+	double r;
+	drand48_r(&buffer, &r);
+	double scale = 1;
+	double max_scale = 1UL << ABORT_BACKOFF_MAX_EXP;
+	switch (g_abort_backoff) {
+	case BACKOFF_FIXED :
+		break;
+	case BACKOFF_EXP :
+		scale = 1UL << min(abort_cnt - 1, (uint64_t) ABORT_BACKOFF_MAX_EXP);
+		break;
+	case BACKOFF_ADAPTIVE :
+		// the expected # of aborts per commit at the recent abort rate.
+		scale = (_abort_rate < 1)? _abort_rate / (1 - _abort_rate) : max_scale;
+		break;
+	default :
+		assert(false);
+	}
+	return r * g_abort_penalty * min(scale, max_scale);
+}
+
+void
+thread_t::update_abort_rate(RC rc) {
+	if (rc != RCOK && rc != Abort)
+		return;
+	_abort_rate += ABORT_RATE_WEIGHT * ((rc == Abort? 1 : 0) - _abort_rate);
+}
 
 ts_t
 thread_t::get_next_ts() {
@@ -224,7 +526,7 @@ RC thread_t::runTest(txn_man * txn)
 	if (g_test_case == READ_WRITE) {
 		rc = ((TestTxnMan *)txn)->run_txn(g_test_case, 0);
 #if CC_ALG == OCC
-		txn->start_ts = get_next_ts(); 
+		txn->start_ts = PER_ROW_VALID? get_next_ts() : occ_man.get_tn(); 
 #endif
 		rc = ((TestTxnMan *)txn)->run_txn(g_test_case, 1);
 		printf("READ_WRITE TEST PASSED\n");
@@ -30,15 +30,49 @@ private:
 	ts_t 		get_next_ts();
 
 	RC	 		runTest(txn_man * txn);
+	// [INTERLEAVE_CNT > 1] runs g_interleave_cnt txns as coroutines.
+	RC 			run_interleaved();
+	// [HTAP_THD_CNT] scans the tables in _wl->scans, one batch of rows per
+	// read-only txn, until the run is done.
+	RC 			run_scan();
+	// the aggregate of the last full scan.
+	double 		_scan_sum;
 	drand48_data buffer;
 
-	// A restart buffer for aborted txns.
+	// A restart buffer for aborted txns. A min-heap on ready_time.
 	struct AbortBufferEntry	{
 		ts_t ready_time;
+		ts_t abort_time;
 		base_query * query;
+		uint64_t abort_cnt;
+		// the txn's ts, kept across restarts for WAIT_DIE and WOUND_WAIT.
+		ts_t ts;
 	};
 	AbortBufferEntry * _abort_buffer;
 	int _abort_buffer_size;
 	int _abort_buffer_empty_slots;
 	bool _abort_buffer_enable;
+	void 		abort_buffer_push(base_query * query, uint64_t abort_cnt, ts_t ts,
+					uint64_t penalty);
+	// returns the retry with the earliest ready time if it is ready at now,
+	// or NULL. abort_cnt and ts are set to those of the returned query.
+	base_query * abort_buffer_pop(ts_t now, uint64_t &abort_cnt, ts_t &ts);
+	// the time an aborted txn waits before it restarts (g_abort_backoff).
+	uint64_t 	get_abort_penalty(uint64_t abort_cnt);
+	// [BACKOFF_ADAPTIVE] moving average of the fraction of txns that abort.
+	double 		_abort_rate;
+	void 		update_abort_rate(RC rc);
+
+	// An in-flight txn of run_interleaved().
+	struct CoSlot {
+		txn_man * txn;
+		base_query * query;
+		ts_t start_time;
+		// without the abort buffer, an aborted query is retried by
+		// the same slot after the penalty.
+		ts_t ready_time;
+		// epoch announced when the txn started.
+		uint64_t epoch;
+		bool running;
+	};
 };
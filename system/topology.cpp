@@ -0,0 +1,179 @@
+#include "topology.h"
+#include <sched.h>
+#include <dirent.h>
+#include <unistd.h>
+#include <algorithm>
+
+struct RawCpu {
+	uint32_t cpu_id;
+	uint32_t node;
+	int 	package;
+	int 	core_id;
+	uint32_t core;
+	uint32_t smt;
+};
+
+static bool by_location(const RawCpu & a, const RawCpu & b) {
+	if (a.node != b.node) return a.node < b.node;
+	if (a.package != b.package) return a.package < b.package;
+	if (a.core_id != b.core_id) return a.core_id < b.core_id;
+	return a.cpu_id < b.cpu_id;
+}
+
+static bool by_core(const RawCpu & a, const RawCpu & b) {
+	if (a.smt != b.smt) return a.smt < b.smt;
+	if (a.node != b.node) return a.node < b.node;
+	return a.core < b.core;
+}
+
+static bool by_scatter(const RawCpu & a, const RawCpu & b) {
+	if (a.smt != b.smt) return a.smt < b.smt;
+	if (a.core != b.core) return a.core < b.core;
+	return a.node < b.node;
+}
+
+static const char * pin_names[] = {"none", "compact", "scatter", "core"};
+
+int
+Topology::read_int(const char * path) {
+	FILE * file = fopen(path, "r");
+	if (file == NULL)
+		return -1;
+	int val;
+	if (fscanf(file, "%d", &val) != 1)
+		val = -1;
+	fclose(file);
+	return val;
+}
+
+void
+Topology::init() {
+	assert(g_pin_policy >= PIN_NONE && g_pin_policy <= PIN_CORE);
+	// only the cpus this process may run on, e.g. inside a cpuset.
+	cpu_set_t mask;
+	CPU_ZERO(&mask);
+	sched_getaffinity(0, sizeof(mask), &mask);
+	uint32_t max_cpu = sysconf(_SC_NPROCESSORS_CONF);
+	RawCpu * raw = new RawCpu [max_cpu];
+	uint32_t cnt = 0;
+	char path[256];
+	for (uint32_t cpu = 0; cpu < max_cpu && cpu < CPU_SETSIZE; cpu++) {
+		if (!CPU_ISSET(cpu, &mask))
+			continue;
+		RawCpu * c = &raw[cnt ++];
+		c->cpu_id = cpu;
+		sprintf(path, "/sys/devices/system/cpu/cpu%d/topology/physical_package_id", cpu);
+		c->package = read_int(path);
+		sprintf(path, "/sys/devices/system/cpu/cpu%d/topology/core_id", cpu);
+		c->core_id = read_int(path);
+		// without sysfs, every cpu is a core of its own.
+		if (c->core_id == -1)
+			c->core_id = cpu;
+		c->node = 0;
+		sprintf(path, "/sys/devices/system/cpu/cpu%d", cpu);
+		DIR * dir = opendir(path);
+		if (dir != NULL) {
+			struct dirent * ent;
+			while ((ent = readdir(dir)) != NULL) {
+				if (strncmp(ent->d_name, "node", 4) == 0
+					&& ent->d_name[4] >= '0' && ent->d_name[4] <= '9')
+					c->node = atoi(&ent->d_name[4]);
+			}
+			closedir(dir);
+		}
+	}
+	assert(cnt > 0);
+	std::sort(raw, raw + cnt, by_location);
+	_core_cnt = 0;
+	_node_cnt = 0;
+	uint32_t node_core_cnt = 0;
+	for (uint32_t i = 0; i < cnt; i++) {
+		if (i == 0 || raw[i].node != raw[i - 1].node) {
+			_node_cnt ++;
+			node_core_cnt = 0;
+		}
+		if (i > 0 && raw[i].node == raw[i - 1].node
+			&& raw[i].package == raw[i - 1].package
+			&& raw[i].core_id == raw[i - 1].core_id)
+		{
+			raw[i].core = raw[i - 1].core;
+			raw[i].smt = raw[i - 1].smt + 1;
+		} else {
+			raw[i].core = node_core_cnt ++;
+			raw[i].smt = 0;
+			_core_cnt ++;
+		}
+	}
+	if (g_pin_policy == PIN_CORE)
+		std::sort(raw, raw + cnt, by_core);
+	else if (g_pin_policy == PIN_SCATTER)
+		std::sort(raw, raw + cnt, by_scatter);
+	_cpu_cnt = cnt;
+	_cpus = new CpuInfo [cnt];
+	for (uint32_t i = 0; i < cnt; i++) {
+		_cpus[i].cpu_id = raw[i].cpu_id;
+		_cpus[i].node = raw[i].node;
+		_cpus[i].core = raw[i].core;
+		_cpus[i].smt = raw[i].smt;
+	}
+	delete [] raw;
+}
+
+void
+Topology::pin(uint64_t thd_id) {
+	if (g_pin_policy == PIN_NONE)
+		return;
+	cpu_set_t mask;
+	CPU_ZERO(&mask);
+	CPU_SET(get_cpu(thd_id), &mask);
+	sched_setaffinity(0, sizeof(mask), &mask);
+}
+
+void
+Topology::pin_part(uint64_t part_id) {
+	pin(part_id % g_thread_cnt);
+}
+
+void
+Topology::unpin() {
+	if (g_pin_policy == PIN_NONE)
+		return;
+	cpu_set_t mask;
+	CPU_ZERO(&mask);
+	for (uint32_t i = 0; i < _cpu_cnt; i++)
+		CPU_SET(_cpus[i].cpu_id, &mask);
+	sched_setaffinity(0, sizeof(mask), &mask);
+}
+
+uint32_t
+Topology::get_cpu(uint64_t thd_id) {
+	return _cpus[thd_id % _cpu_cnt].cpu_id;
+}
+
+uint32_t
+Topology::get_node(uint64_t thd_id) {
+	return _cpus[thd_id % _cpu_cnt].node;
+}
+
+void
+Topology::print() {
+	print(stdout);
+	if (output_file != NULL) {
+		FILE * outf = fopen(output_file, "a");
+		print(outf);
+		fclose(outf);
+	}
+}
+
+void
+Topology::print(FILE * outf) {
+	fprintf(outf, "[topology] policy=%s, cpu_cnt=%d, core_cnt=%d, node_cnt=%d\n",
+		pin_names[g_pin_policy - 1], _cpu_cnt, _core_cnt, _node_cnt);
+	if (g_pin_policy == PIN_NONE)
+		return;
+	for (UInt32 i = 0; i < g_thread_cnt; i++) {
+		CpuInfo * c = &_cpus[i % _cpu_cnt];
+		fprintf(outf, "[pin] thd_id=%d, cpu=%d, node=%d, core=%d, smt=%d\n",
+			i, c->cpu_id, c->node, c->core, c->smt);
+	}
+}
@@ -0,0 +1,47 @@
+#pragma once
+
+#include "global.h"
+#include "helper.h"
+
+// CPU and NUMA layout of the machine, read from sysfs, and the mapping of
+// threads to cpus under g_pin_policy.
+// - PIN_COMPACT fills the hyperthreads of a core, then the cores of a node,
+//   then the next node.
+// - PIN_SCATTER deals threads round robin over the nodes, one per physical
+//   core, and only then uses the hyperthread siblings.
+// - PIN_CORE gives each thread its own physical core, filling a node before
+//   the next one, and only then uses the siblings.
+// Partition p is owned by worker p % g_thread_cnt. The threads that load a
+// partition are pinned like its owner, so the rows, index nodes and
+// cc metadata they allocate are first touched on the owner's node.
+class Topology {
+public:
+	void 			init();
+	// pin the calling thread to the cpu of worker thd_id.
+	void 			pin(uint64_t thd_id);
+	// pin the calling thread like the owner of part_id.
+	void 			pin_part(uint64_t part_id);
+	// let the calling thread run on any cpu again.
+	void 			unpin();
+	uint32_t 		get_cpu(uint64_t thd_id);
+	uint32_t 		get_node(uint64_t thd_id);
+	// the policy and the thread to cpu mapping, also appended to
+	// output_file.
+	void 			print();
+private:
+	struct CpuInfo {
+		uint32_t 	cpu_id;
+		uint32_t 	node;
+		// rank of its physical core within the node.
+		uint32_t 	core;
+		// rank among the hyperthreads of its core.
+		uint32_t 	smt;
+	};
+	static int 		read_int(const char * path);
+	void 			print(FILE * outf);
+	// cpus in the order threads are pinned to them.
+	CpuInfo * 		_cpus;
+	uint32_t 		_cpu_cnt;
+	uint32_t 		_core_cnt;
+	uint32_t 		_node_cnt;
+};
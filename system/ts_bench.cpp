@@ -0,0 +1,88 @@
+#include "global.h"
+#include "helper.h"
+#include "manager.h"
+
+// rundb -Gs1,2,4,8 times Manager::get_ts() alone, under every allocator
+// and for each thread count, then exits. No workload is loaded.
+
+#define TS_BENCH_OPS 		(1000 * 1000)
+#define BILLION 			1000000000UL
+
+struct ts_bench_thd_t {
+	uint64_t 	thd_id;
+	bool 		monotonic;
+	char 		pad[CL_SIZE - sizeof(uint64_t) - sizeof(bool)];
+};
+
+static pthread_barrier_t ts_bench_bar;
+
+static void * ts_bench_run(void * arg) {
+	ts_bench_thd_t * thd = (ts_bench_thd_t *) arg;
+	set_affinity(thd->thd_id);
+	bool monotonic = true;
+	ts_t last = 0;
+	pthread_barrier_wait( &ts_bench_bar );
+	for (uint64_t i = 0; i < TS_BENCH_OPS; i++) {
+		ts_t ts = glob_manager->get_ts(thd->thd_id);
+		if (ts <= last)
+			monotonic = false;
+		last = ts;
+	}
+	pthread_barrier_wait( &ts_bench_bar );
+	thd->monotonic = monotonic;
+	return NULL;
+}
+
+void ts_bench() {
+	vector<UInt32> thd_cnts;
+	UInt32 max_thd_cnt = 0;
+	stringstream ss(g_ts_bench);
+	string item;
+	while (getline(ss, item, ',')) {
+		UInt32 thd_cnt = atoi(item.c_str());
+		assert(thd_cnt > 0);
+		thd_cnts.push_back(thd_cnt);
+		if (thd_cnt > max_thd_cnt)
+			max_thd_cnt = thd_cnt;
+	}
+	// the per-thread state of the manager and stats is sized by g_thread_cnt.
+	g_thread_cnt = max_thd_cnt;
+	stats.init();
+	for (UInt32 i = 0; i < max_thd_cnt; i++)
+		stats.init(i);
+	glob_manager = (Manager *) _mm_malloc(sizeof(Manager), 64);
+
+	UInt32 allocs[] = {TS_MUTEX, TS_CAS, TS_CLOCK, TS_EPOCH, TS_HLC};
+	const char * names[] = {"MUTEX", "CAS", "CLOCK", "EPOCH", "HLC"};
+	ts_bench_thd_t * thds = (ts_bench_thd_t *)
+		_mm_malloc(sizeof(ts_bench_thd_t) * max_thd_cnt, 64);
+	pthread_t p_thds[max_thd_cnt];
+	for (UInt32 a = 0; a < sizeof(allocs) / sizeof(allocs[0]); a++) {
+		for (UInt32 n = 0; n < thd_cnts.size(); n++) {
+			UInt32 thd_cnt = thd_cnts[n];
+			g_ts_alloc = allocs[a];
+			glob_manager->init();
+			pthread_barrier_init( &ts_bench_bar, NULL, thd_cnt + 1 );
+			for (UInt32 i = 0; i < thd_cnt; i++) {
+				thds[i].thd_id = i;
+				pthread_create(&p_thds[i], NULL, ts_bench_run, &thds[i]);
+			}
+			pthread_barrier_wait( &ts_bench_bar );
+			uint64_t starttime = get_server_clock();
+			pthread_barrier_wait( &ts_bench_bar );
+			uint64_t endtime = get_server_clock();
+			bool monotonic = true;
+			for (UInt32 i = 0; i < thd_cnt; i++) {
+				pthread_join(p_thds[i], NULL);
+				monotonic = monotonic && thds[i].monotonic;
+			}
+			pthread_barrier_destroy( &ts_bench_bar );
+			double run_time = (double) (endtime - starttime) / BILLION;
+			double tput = (double) TS_BENCH_OPS * thd_cnt / run_time;
+			// ns_per_ts is the latency seen by one thread.
+			printf("[ts_bench] alloc=%s, thd_cnt=%d, tput=%f, ns_per_ts=%f, monotonic=%s\n",
+				names[a], thd_cnt, tput, run_time * BILLION / TS_BENCH_OPS,
+				monotonic? "true" : "false");
+		}
+	}
+}
@@ -5,24 +5,53 @@
 #include "thread.h"
 #include "mem_alloc.h"
 #include "occ.h"
+#include "row_silo.h"
+#include "row_lock.h"
 #include "table.h"
 #include "catalog.h"
 #include "index_btree.h"
+#include "index_mbtree.h"
+#include "index_array.h"
 #include "index_hash.h"
+#include "epoch.h"
+#include "logger.h"
+#include "calvin.h"
+#include <algorithm>
 
 void txn_man::init(thread_t * h_thd, workload * h_wl, uint64_t thd_id) {
 	this->h_thd = h_thd;
 	this->h_wl = h_wl;
 	pthread_mutex_init(&txn_lock, NULL);
 	lock_ready = false;
+	lock_abort = false;
+#if LOCK_RETIRE
+	lv_follow = false;
+#endif
 	ready_part = 0;
+	read_only = false;
 	row_cnt = 0;
 	wr_cnt = 0;
 	insert_cnt = 0;
+	insert_idx_cnt = 0;
+	remove_idx_cnt = 0;
+	remove_cnt = 0;
+	_access_pool = (Access *) _mm_malloc(sizeof(Access) * MAX_ROW_PER_TXN, 64);
 	accesses = (Access **) _mm_malloc(sizeof(Access *) * MAX_ROW_PER_TXN, 64);
-	for (int i = 0; i < MAX_ROW_PER_TXN; i++)
-		accesses[i] = NULL;
-	num_accesses_alloc = 0;
+	for (int i = 0; i < MAX_ROW_PER_TXN; i++) {
+		accesses[i] = &_access_pool[i];
+#if CC_ALG == SILO || CC_ALG == TICTOC || CC_ALG == CALVIN
+		accesses[i]->data = (row_t *) _mm_malloc(sizeof(row_t), 64);
+		accesses[i]->data->init(MAX_TUPLE_SIZE);
+#endif
+	}
+	// at most half full, so probes stay short.
+	uint64_t map_size = 1;
+	while (map_size < 2 * MAX_ROW_PER_TXN)
+		map_size *= 2;
+	_access_map = (AccessSlot *) _mm_malloc(sizeof(AccessSlot) * map_size, 64);
+	memset(_access_map, 0, sizeof(AccessSlot) * map_size);
+	_access_map_mask = map_size - 1;
+	_access_gen = 1;
 #if CC_ALG == TICTOC || CC_ALG == SILO
 	_pre_abort = (g_params["pre_abort"] == "true");
 	if (g_params["validation_lock"] == "no-wait")
@@ -34,12 +63,23 @@ void txn_man::init(thread_t * h_thd, workload * h_wl, uint64_t thd_id) {
 #endif
 #if CC_ALG == TICTOC
 	_max_wts = 0;
+	snapshot_ts = 0;
 	_write_copy_ptr = (g_params["write_copy_form"] == "ptr");
 	_atomic_timestamp = (g_params["atomic_timestamp"] == "true");
 #elif CC_ALG == SILO
 	_cur_tid = 0;
+  #if SILO_HYBRID
+	_hybrid_last = NULL;
+  #endif
+#elif CC_ALG == CALVIN
+	calvin_recon = false;
+	calvin_stale = false;
+#endif
+#if UNDO_LOG
+	_undo_buf_size = UNDO_BUF_INIT_SIZE;
+	_undo_buf = (char *) _mm_malloc(_undo_buf_size, 64);
+	_undo_len = 0;
 #endif
-
 }
 
 void txn_man::set_txn_id(txnid_t txn_id) {
@@ -67,17 +107,57 @@ ts_t txn_man::get_ts() {
 }
 
 void txn_man::cleanup(RC rc) {
+#if LOGGING
+	// the rows the txn wrote are still locked or private.
+	if (rc != Abort)
+		log_man.log_txn(this, log_epoch);
+	else 
+		log_man.abort_txn(get_thd_id());
+#endif
+	if (rc != Abort) {
+		apply_inserts();
+		apply_removes();
+	}
+	insert_idx_cnt = 0;
+	remove_idx_cnt = 0;
+	remove_cnt = 0;
+#if CC_ALG == TICTOC
+	snapshot_ts = 0;
+#elif CC_ALG == SILO && SILO_HYBRID
+	_hybrid_last = NULL;
+#endif
 #if CC_ALG == HEKATON
 	row_cnt = 0;
 	wr_cnt = 0;
 	insert_cnt = 0;
+	clear_accesses();
 	return;
+#endif
+#if LOCK_RETIRE
+	// the txns that took a retired lock have seen this txn's write.
+	if (rc == Abort)
+		for (int rid = 0; rid < row_cnt; rid ++)
+			if (accesses[rid]->retired)
+				accesses[rid]->orig_row->manager->cascade_abort(this);
+	lv_follow = false;
+#endif
+#if UNDO_LOG
+	// restore the rows while the locks are still held.
+	if (rc == Abort)
+		rollback();
+	_undo_len = 0;
 #endif
 	for (int rid = row_cnt - 1; rid >= 0; rid --) {
 		row_t * orig_r = accesses[rid]->orig_row;
 		access_t type = accesses[rid]->type;
 		if (type == WR && rc == Abort)
 			type = XP;
+#if UNDO_LOG
+		// a retired row may be logged by the txn that took the lock, which
+		// can set undo_txn at any time.
+		if (type == WR || type == XP)
+			ATOM_CAS(orig_r->undo_txn, this, NULL);
+#endif
 
 #if (CC_ALG == NO_WAIT || CC_ALG == DL_DETECT) && ISOLATION_LEVEL == REPEATABLE_READ
 		if (type == RD) {
@@ -86,60 +166,103 @@ void txn_man::cleanup(RC rc) {
 		}
 #endif
 
-		if (ROLL_BACK && type == XP &&
-					(CC_ALG == DL_DETECT || 
-					CC_ALG == NO_WAIT || 
-					CC_ALG == WAIT_DIE)) 
-		{
-			orig_r->return_row(type, this, accesses[rid]->orig_data);
-		} else {
-			orig_r->return_row(type, this, accesses[rid]->data);
-		}
-#if CC_ALG != TICTOC && CC_ALG != SILO
+		orig_r->return_row(type, this, accesses[rid]->data);
+#if CC_ALG == SILO && SILO_HYBRID
+		if (accesses[rid]->hlock != LOCK_NONE)
+			orig_r->manager->hybrid_release(accesses[rid]->hlock);
+#endif
+#if CC_ALG != TICTOC && CC_ALG != SILO && CC_ALG != CALVIN
 		accesses[rid]->data = NULL;
 #endif
 	}
 
 	if (rc == Abort) {
+		// the rows were never published in the table directory.
 		for (UInt32 i = 0; i < insert_cnt; i ++) {
 			row_t * row = insert_rows[i];
 			assert(g_part_alloc == false);
-#if CC_ALG != HSTORE && CC_ALG != OCC
+#if CHECKPOINT || HTAP_THD_CNT > 0
+			// a checkpointer or scan thread may still hold the row.
+			epoch_man.retire(get_thd_id(), row, RETIRE_ROW);
+#else
+  #if CC_ALG != HSTORE && CC_ALG != OCC
 			mem_allocator.free(row->manager, 0);
-#endif
+  #endif
 			row->free_row();
 			mem_allocator.free(row, sizeof(row));
+#endif
 		}
 	}
 	row_cnt = 0;
 	wr_cnt = 0;
 	insert_cnt = 0;
+	clear_accesses();
 #if CC_ALG == DL_DETECT
 	dl_detector.clear_dep(get_txn_id());
 #endif
 }
 
-row_t * txn_man::get_row(row_t * row, access_t type) {
-	if (CC_ALG == HSTORE)
-		return row;
+row_t * txn_man::get_row(row_t * row, access_t type, cols_t cols) {
+#if CC_ALG == HSTORE
+  #if LOG_REDO
+	// the rows are only tracked to be logged at commit.
+	if (type == WR && find_access(row) == -1) {
+		assert(row_cnt < MAX_ROW_PER_TXN);
+		accesses[row_cnt]->type = WR;
+		accesses[row_cnt]->orig_row = row;
+		accesses[row_cnt]->data = row;
+		add_access(row, row_cnt);
+		row_cnt ++;
+		wr_cnt ++;
+	}
+  #endif
+	return row;
+#endif
+#if CC_ALG == CALVIN
+	// the locks of the read/write set were granted before the txn started.
+	if (!calvin_recon && !calvin_man.covers(this, row, type)) {
+		calvin_stale = true;
+		return NULL;
+	}
+#endif
 	uint64_t starttime = get_sys_clock();
 	RC rc = RCOK;
-	if (accesses[row_cnt] == NULL) {
-		Access * access = (Access *) _mm_malloc(sizeof(Access), 64);
-		accesses[row_cnt] = access;
-#if (CC_ALG == SILO || CC_ALG == TICTOC)
-		access->data = (row_t *) _mm_malloc(sizeof(row_t), 64);
-		access->data->init(MAX_TUPLE_SIZE);
-		access->orig_data = (row_t *) _mm_malloc(sizeof(row_t), 64);
-		access->orig_data->init(MAX_TUPLE_SIZE);
-#elif (CC_ALG == DL_DETECT || CC_ALG == NO_WAIT || CC_ALG == WAIT_DIE)
-		access->orig_data = (row_t *) _mm_malloc(sizeof(row_t), 64);
-		access->orig_data->init(MAX_TUPLE_SIZE);
-#endif
-		num_accesses_alloc ++;
+#if CC_ALG == WOUND_WAIT || LOCK_RETIRE
+	if (lock_abort)
+		return NULL;
+#endif
+	int idx = find_access(row);
+	if (idx != -1) {
+		// the row was accessed before. reuse the access if it covers this
+		// one. otherwise fall through to the cc manager.
+		Access * access = accesses[idx];
+#if CC_ALG == TICTOC || CC_ALG == SILO
+		bool covered = ((cols & ~access->cols) == 0);
+#else
+		bool covered = true;
+#endif
+#if CC_ALG == OCC || CC_ALG == TICTOC || CC_ALG == SILO || CC_ALG == CALVIN
+		// optimistic schemes check a write at validation, so a read can be
+		// upgraded in place. [CALVIN] the upgrade is in the read/write set.
+		if (covered && access->type == RD && type == WR) {
+			access->type = WR;
+			wr_cnt ++;
+		}
+#endif
+		if (covered && (access->type == WR || type != WR)) {
+			INC_TMP_STATS(get_thd_id(), time_man, get_sys_clock() - starttime);
+			return access->data;
+		}
 	}
+	assert(row_cnt < MAX_ROW_PER_TXN);
+#if CC_ALG == SILO && SILO_HYBRID
+	// a row accessed again keeps the lock of its first access.
+	lock_t hlock = LOCK_NONE;
+	if (idx == -1 && hybrid_lock(row, type, hlock) == Abort)
+		return NULL;
+#endif
 	
-	rc = row->get_row(type, this, accesses[ row_cnt ]->data);
+	rc = row->get_row(type, this, accesses[ row_cnt ]->data, cols);
 
 
 	if (rc == Abort) {
@@ -147,20 +270,27 @@ row_t * txn_man::get_row(row_t * row, access_t type) {
 	}
 	accesses[row_cnt]->type = type;
 	accesses[row_cnt]->orig_row = row;
+#if CC_ALG == TICTOC || CC_ALG == SILO
+	accesses[row_cnt]->cols = cols;
+#endif
 #if CC_ALG == TICTOC
 	accesses[row_cnt]->wts = last_wts;
 	accesses[row_cnt]->rts = last_rts;
 #elif CC_ALG == SILO
 	accesses[row_cnt]->tid = last_tid;
+  #if SILO_HYBRID
+	accesses[row_cnt]->hlock = hlock;
+  #endif
 #elif CC_ALG == HEKATON
 	accesses[row_cnt]->history_entry = history_entry;
 #endif
+#if LOCK_RETIRE
+	accesses[row_cnt]->retired = false;
+#endif
 
-#if ROLL_BACK && (CC_ALG == DL_DETECT || CC_ALG == NO_WAIT || CC_ALG == WAIT_DIE)
-	if (type == WR) {
-		accesses[row_cnt]->orig_data->table = row->get_table();
-		accesses[row_cnt]->orig_data->copy(row);
-	}
+#if UNDO_LOG
+	if (type == WR)
+		row->undo_txn = this;
 #endif
 
 #if (CC_ALG == NO_WAIT || CC_ALG == DL_DETECT) && ISOLATION_LEVEL == REPEATABLE_READ
@@ -168,6 +298,7 @@ row_t * txn_man::get_row(row_t * row, access_t type) {
 		row->return_row(type, this, accesses[ row_cnt ]->data);
 #endif
 	
+	add_access(row, row_cnt);
 	row_cnt ++;
 	if (type == WR)
 		wr_cnt ++;
@@ -177,13 +308,182 @@ row_t * txn_man::get_row(row_t * row, access_t type) {
 	return accesses[row_cnt - 1]->data;
 }
 
+// a number for any column: numbers as they are, strings by their first
+// 8 bytes.
+static double col_value(Catalog * schema, row_t * row, uint64_t fid) {
+	char * data = row->get_value(fid);
+	char * type = schema->get_field_type(fid);
+	if (strcmp(type, "double") == 0)
+		return *(double *)data;
+	else if (strcmp(type, "int64_t") == 0)
+		return *(int64_t *)data;
+	uint64_t val = 0;
+	uint64_t size = schema->get_field_size(fid);
+	memcpy(&val, data, size < sizeof(val)? size : sizeof(val));
+	return val;
+}
+
+RC txn_man::scan(table_t * table, uint64_t start, uint64_t end, cols_t cols,
+	double & sum, uint64_t & row_cnt)
+{
+	assert(end - start <= MAX_ROW_PER_TXN);
+	Catalog * schema = table->get_schema();
+	double batch_sum = 0;
+	uint64_t batch_cnt = 0;
+	RC rc = RCOK;
+	for (uint64_t row_id = start; row_id < end; row_id ++) {
+		row_t * row = table->get_row(row_id);
+		if (row == NULL)
+			continue;
+		row_t * row_local = get_row(row, RD, cols);
+		if (row_local == NULL) {
+			rc = Abort;
+			break;
+		}
+		for (UInt32 fid = 0; fid < schema->get_field_cnt(); fid ++)
+			if (cols & (1UL << fid))
+				batch_sum += col_value(schema, row_local, fid);
+		batch_cnt ++;
+	}
+	rc = finish(rc);
+	if (rc == RCOK) {
+		sum += batch_sum;
+		row_cnt += batch_cnt;
+	}
+	return rc;
+}
+
+static inline uint64_t access_hash(row_t * row) {
+	return ((uint64_t) row >> 6) * 0x9E3779B97F4A7C15UL;
+}
+
+int txn_man::find_access(row_t * row) {
+	uint64_t slot = (access_hash(row) >> 32) & _access_map_mask;
+	while (_access_map[slot].gen == _access_gen) {
+		if (_access_map[slot].row == row)
+			return _access_map[slot].idx;
+		slot = (slot + 1) & _access_map_mask;
+	}
+	return -1;
+}
+
+void txn_man::add_access(row_t * row, int idx) {
+	uint64_t slot = (access_hash(row) >> 32) & _access_map_mask;
+	// a row accessed again maps to its latest access.
+	while (_access_map[slot].gen == _access_gen && _access_map[slot].row != row)
+		slot = (slot + 1) & _access_map_mask;
+	_access_map[slot].row = row;
+	_access_map[slot].gen = _access_gen;
+	_access_map[slot].idx = idx;
+}
+
+// bumping the generation empties the map. the slots are only wiped when
+// the generation wraps around.
+void txn_man::clear_accesses() {
+	_access_gen ++;
+	if (_access_gen == 0) {
+		memset(_access_map, 0, sizeof(AccessSlot) * (_access_map_mask + 1));
+		_access_gen = 1;
+	}
+}
+
+struct AccessOrder {
+	Access ** accesses;
+	bool operator()(int a, int b) const {
+		return row_t::order_lt(accesses[a]->orig_row, accesses[b]->orig_row);
+	}
+};
+
+void txn_man::sort_accesses(int * set, int cnt) {
+	AccessOrder order = { accesses };
+	std::sort(set, set + cnt, order);
+}
+
+#if UNDO_LOG
+void txn_man::log_undo(row_t * row, uint64_t pos, uint64_t size) {
+	uint64_t padded = (size + 7) & ~7UL;
+	uint64_t len = padded + sizeof(UndoEntry);
+	if (_undo_len + len > _undo_buf_size) {
+		uint64_t buf_size = _undo_buf_size * 2;
+		while (_undo_len + len > buf_size)
+			buf_size *= 2;
+		char * buf = (char *) _mm_malloc(buf_size, 64);
+		memcpy(buf, _undo_buf, _undo_len);
+		_mm_free(_undo_buf);
+		_undo_buf = buf;
+		_undo_buf_size = buf_size;
+	}
+	memcpy(&_undo_buf[_undo_len], &row->data[pos], size);
+	UndoEntry * entry = (UndoEntry *) &_undo_buf[_undo_len + padded];
+	entry->row = row;
+	entry->pos = pos;
+	entry->size = size;
+	_undo_len += len;
+}
+
+// undo in reverse order, so a column written twice gets its oldest image.
+void txn_man::rollback() {
+	uint64_t len = _undo_len;
+	while (len > 0) {
+		UndoEntry * entry = (UndoEntry *) &_undo_buf[len - sizeof(UndoEntry)];
+		uint64_t padded = (entry->size + 7) & ~7UL;
+		len -= sizeof(UndoEntry) + padded;
+		memcpy(&entry->row->data[entry->pos], &_undo_buf[len], entry->size);
+	}
+}
+#endif
+
 void txn_man::insert_row(row_t * row, table_t * table) {
-	if (CC_ALG == HSTORE)
-		return;
 	assert(insert_cnt < MAX_ROW_PER_TXN);
 	insert_rows[insert_cnt ++] = row;
 }
 
+void txn_man::insert_index(INDEX * index, idx_key_t key, row_t * row, int part_id) {
+	assert(insert_idx_cnt < MAX_ROW_PER_TXN);
+	IndexInsert * entry = &insert_idxs[insert_idx_cnt ++];
+	entry->index = index;
+	entry->key = key;
+	entry->row = row;
+	entry->part_id = part_id;
+}
+
+void txn_man::remove_index(index_base * index, idx_key_t key, itemid_t * item, int part_id) {
+	assert(remove_idx_cnt < MAX_ROW_PER_TXN);
+	IndexRemove * entry = &remove_idxs[remove_idx_cnt ++];
+	entry->index = index;
+	entry->key = key;
+	entry->item = item;
+	entry->part_id = part_id;
+}
+
+void txn_man::remove_row(row_t * row) {
+	assert(remove_cnt < MAX_ROW_PER_TXN);
+	remove_rows[remove_cnt ++] = row;
+}
+
+void txn_man::apply_inserts() {
+	for (UInt32 i = 0; i < insert_cnt; i ++)
+		insert_rows[i]->get_table()->publish_row(insert_rows[i]);
+	for (UInt32 i = 0; i < insert_idx_cnt; i ++) {
+		IndexInsert * entry = &insert_idxs[i];
+		h_wl->index_insert(entry->index, entry->key, entry->row, entry->part_id);
+	}
+}
+
+// unlink first so that no new txn can find the rows, then retire them.
+void txn_man::apply_removes() {
+	for (UInt32 i = 0; i < remove_idx_cnt; i ++) {
+		IndexRemove * entry = &remove_idxs[i];
+		RC rc = entry->index->index_remove(entry->key, entry->item, 
+			entry->part_id, get_thd_id());
+		assert(rc == RCOK);
+	}
+	for (UInt32 i = 0; i < remove_cnt; i ++) {
+		remove_rows[i]->get_table()->remove_row(remove_rows[i]);
+		epoch_man.retire(get_thd_id(), remove_rows[i], RETIRE_ROW);
+	}
+}
+
 itemid_t *
 txn_man::index_read(INDEX * index, idx_key_t key, int part_id) {
 	uint64_t starttime = get_sys_clock();
@@ -200,8 +500,40 @@ txn_man::index_read(INDEX * index, idx_key_t key, int part_id, itemid_t *& item)
 	INC_TMP_STATS(get_thd_id(), time_index, get_sys_clock() - starttime);
 }
 
+void
+txn_man::index_read_range(INDEX * index, idx_key_t min_key, idx_key_t max_key,
+	int part_id, itemid_t ** items, uint64_t &count)
+{
+	uint64_t starttime = get_sys_clock();
+	index->index_read_range(min_key, max_key, items, count, part_id);
+	INC_TMP_STATS(get_thd_id(), time_index, get_sys_clock() - starttime);
+}
+
 RC txn_man::finish(RC rc) {
+#if LOGGING && !LOCK_RETIRE
+	// the txn's writes are not visible to other txns yet, so a txn that
+	// sees them takes this epoch or a later one.
+	log_epoch = log_man.announce(get_thd_id());
+#endif
 #if CC_ALG == HSTORE
+  #if LOGGING
+	// the partition locks are still held.
+	if (rc != Abort)
+		log_man.log_txn(this, log_epoch);
+	else 
+		log_man.abort_txn(get_thd_id());
+	row_cnt = 0;
+	wr_cnt = 0;
+	clear_accesses();
+  #endif
+	if (rc != Abort) {
+		apply_inserts();
+		apply_removes();
+	}
+	insert_cnt = 0;
+	insert_idx_cnt = 0;
+	remove_idx_cnt = 0;
+	remove_cnt = 0;
 	return RCOK;
 #endif
 	uint64_t starttime = get_sys_clock();
@@ -223,6 +555,33 @@ RC txn_man::finish(RC rc) {
 #elif CC_ALG == HEKATON
 	rc = validate_hekaton(rc);
 	cleanup(rc);
+#elif CC_ALG == CALVIN
+	// Calvin::recon() takes the read/write set before the cleanup.
+	if (!calvin_recon)
+		cleanup(rc);
+#elif CC_ALG == WOUND_WAIT
+	if (rc == Abort) {
+		if (lock_abort) {
+			INC_STATS(get_thd_id(), wound_cnt, 1);
+		} else {
+			INC_STATS(get_thd_id(), self_abort_cnt, 1);
+		}
+	}
+	cleanup(rc);
+	// no owner list holds this txn any more, so no new wound can arrive.
+	lock_abort = false;
+#elif LOCK_RETIRE
+	if (rc == RCOK)
+		rc = wait_retired();
+  #if LOGGING
+	// the txns whose writes this txn saw have committed, so their epochs
+	// are not above this one. A txn that saw this txn's writes through a 
+	// retired lock announces only after this txn committed.
+	log_epoch = log_man.announce(get_thd_id());
+  #endif
+	cleanup(rc);
+	// a cascade from a retired owner stays set until the txn finishes.
+	lock_abort = false;
 #else 
 	cleanup(rc);
 #endif
@@ -232,9 +591,59 @@ RC txn_man::finish(RC rc) {
 	return rc;
 }
 
+void
+txn_man::retire_row(row_t * row) {
+#if LOCK_RETIRE
+	// a txn that waits for a retired lock on this thread would block the
+	// txn it waits for.
+	if (g_interleave_cnt > 1)
+		return;
+	int idx = find_access(row);
+	assert(idx != -1);
+	Access * access = accesses[idx];
+	if (access->type != WR || access->retired)
+		return;
+	row->manager->lock_retire(this);
+	access->retired = true;
+	INC_STATS(get_thd_id(), retire_cnt, 1);
+#endif
+}
+
+#if LOCK_RETIRE
+RC
+txn_man::wait_retired() {
+	if (!lv_follow)
+		return lock_abort? Abort : RCOK;
+	uint64_t starttime = get_sys_clock();
+	for (int rid = 0; rid < row_cnt && !lock_abort; rid ++) {
+		row_t * row = accesses[rid]->orig_row;
+		uint64_t txnid;
+		if (!row->manager->retired_ahead(this, txnid))
+			continue;
+#if CC_ALG == DL_DETECT
+		// the retired owner may be waiting for a lock of this txn.
+		dl_detector.add_dep(get_txn_id(), &txnid, 1, row_cnt);
+#endif
+		while (!lock_abort && row->manager->retired_ahead(this, txnid))
+			PAUSE
+#if CC_ALG == DL_DETECT
+		dl_detector.clear_dep(get_txn_id());
+#endif
+	}
+	INC_TMP_STATS(get_thd_id(), time_wait, get_sys_clock() - starttime);
+	return lock_abort? Abort : RCOK;
+}
+#endif
+
 void
 txn_man::release() {
-	for (int i = 0; i < num_accesses_alloc; i++)
-		mem_allocator.free(accesses[i], 0);
-	mem_allocator.free(accesses, 0);
+#if CC_ALG == SILO || CC_ALG == TICTOC
+	for (int i = 0; i < MAX_ROW_PER_TXN; i++) {
+		_access_pool[i].data->free_row();
+		_mm_free(_access_pool[i].data);
+	}
+#endif
+	_mm_free(_access_pool);
+	_mm_free(accesses);
+	_mm_free(_access_map);
 }
@@ -9,6 +9,7 @@ class row_t;
 class table_t;
 class base_query;
 class INDEX;
+class index_base;
 
 // each thread has a txn_man. 
 // a txn_man corresponds to a single transaction.
@@ -21,17 +22,28 @@ public:
 	access_t 	type;
 	row_t * 	orig_row;
 	row_t * 	data;
-	row_t * 	orig_data;
 	void cleanup();
+#if CC_ALG == TICTOC || CC_ALG == SILO
+	// the columns copied into data, and installed at commit for WR.
+	cols_t 		cols;
+#endif
 #if CC_ALG == TICTOC
 	ts_t 		wts;
 	ts_t 		rts;
 #elif CC_ALG == SILO
 	ts_t 		tid;
 	ts_t 		epoch;
+  #if SILO_HYBRID
+	// the row lock taken at access, or LOCK_NONE.
+	lock_t 		hlock;
+  #endif
 #elif CC_ALG == HEKATON
 	void * 		history_entry;	
 #endif
+#if LOCK_RETIRE
+	// the txn retired its lock on the row.
+	bool 		retired;
+#endif
 
 };
 
@@ -46,6 +58,9 @@ public:
 	uint64_t abort_cnt;
 
 	virtual RC 		run_txn(base_query * m_query) = 0;
+	// [INTERLEAVE_CNT > 1] resumable form of run_txn. Returns WAIT when the
+	// txn yields and should be resumed later; by default it never yields.
+	virtual RC 		run_txn_co(base_query * m_query) { return run_txn(m_query); }
 	uint64_t 		get_thd_id();
 	workload * 		get_wl();
 	void 			set_txn_id(txnid_t txn_id);
@@ -59,9 +74,15 @@ public:
 #if CC_ALG == HEKATON
 	void * volatile history_entry;
 #endif
-	// [DL_DETECT, NO_WAIT, WAIT_DIE]
+	// [DL_DETECT, NO_WAIT, WAIT_DIE, WOUND_WAIT]
 	bool volatile 	lock_ready;
-	bool volatile 	lock_abort; // forces another waiting txn to abort.
+	// forces another waiting txn to abort. [WOUND_WAIT] the wound from an
+	// older txn, checked at the next get_row() and while waiting.
+	bool volatile 	lock_abort;
+#if LOCK_RETIRE
+	// the txn took a lock another txn retired, so it commits after that txn.
+	bool 			lv_follow;
+#endif
 	// [TIMESTAMP, MVCC]
 	bool volatile 	ts_ready; 
 	// [HSTORE]
@@ -73,10 +94,16 @@ public:
 	void 			update_max_wts(ts_t max_wts);
 	ts_t 			last_wts;
 	ts_t 			last_rts;
+	// [TICTOC_MV] the ts a read-only txn reads at; 0 until its first read.
+	ts_t 			snapshot_ts;
 #elif CC_ALG == SILO
 	ts_t 			last_tid;
 #endif
 	
+	// set by the workload when the txn does not write. [TICTOC_MV] such a
+	// txn reads a snapshot and commits without validation.
+	bool 			read_only;
+
 	// For OCC
 	uint64_t 		start_ts;
 	uint64_t 		end_ts;
@@ -84,19 +111,116 @@ public:
 	int 			row_cnt;
 	int	 			wr_cnt;
 	Access **		accesses;
-	int 			num_accesses_alloc;
+	// orders set[0..cnt) of indexes into accesses by row_t::order_lt.
+	void 			sort_accesses(int * set, int cnt);
 
 	// For VLL
 	TxnType 		vll_txn_type;
+#if CC_ALG == CALVIN
+	// the txn only collects its read/write set, on private row copies.
+	bool 			calvin_recon;
+	// [OLLP] the txn accessed a row outside its read/write set.
+	bool 			calvin_stale;
+#endif
 	itemid_t *		index_read(INDEX * index, idx_key_t key, int part_id);
 	void 			index_read(INDEX * index, idx_key_t key, int part_id, itemid_t *& item);
-	row_t * 		get_row(row_t * row, access_t type);
+	// reads up to count items with key in [min_key, max_key]. count is set
+	// to the number read.
+	void 			index_read_range(INDEX * index, idx_key_t min_key, idx_key_t max_key,
+						int part_id, itemid_t ** items, uint64_t &count);
+	// cols declares the columns the txn reads (or writes for WR). the
+	// local copy of optimistic schemes only holds these columns.
+	row_t * 		get_row(row_t * row, access_t type, cols_t cols = COLS_ALL);
+	// [HTAP_THD_CNT] reads rows [start, end) of table and sums the cols of
+	// each, then commits. sum and row_cnt are only set if the txn commits.
+	RC 				scan(table_t * table, uint64_t start, uint64_t end, cols_t cols,
+						double & sum, uint64_t & row_cnt);
+	// [LOCK_VIOLATION] the txn will not access the row again. Its exclusive
+	// lock on the row is handed to later txns before the txn commits.
+	void 			retire_row(row_t * row);
+#if UNDO_LOG
+	// saves size bytes at pos of the row before they are overwritten.
+	void 			log_undo(row_t * row, uint64_t pos, uint64_t size);
+#endif
+#if LOGGING
+	// the epoch the txn commits in, taken when it enters finish().
+	uint64_t 		log_epoch;
+#endif
+#if LOG_COMMAND
+	// the input of the running txn, set by the workload.
+	base_query * 	log_query;
+#endif
+	uint64_t 		get_insert_cnt() { return insert_cnt; }
+	row_t * 		get_insert_row(uint64_t i) { return insert_rows[i]; }
 protected:	
 	void 			insert_row(row_t * row, table_t * table);
+	// the index entry of an inserted row is added at commit, so no other
+	// txn finds the row before then.
+	void 			insert_index(INDEX * index, idx_key_t key, row_t * row, int part_id);
+	// deletes are deferred to commit. The caller should hold the row, but
+	// not in WR under HEKATON and MVCC, whose version GC still visits the
+	// rows a txn wrote after they are retired.
+	void 			remove_index(index_base * index, idx_key_t key, itemid_t * item, int part_id);
+	void 			remove_row(row_t * row);
 private:
+	void 			apply_inserts();
+	void 			apply_removes();
+#if LOCK_RETIRE
+	// wait until the txns whose retired locks this txn took have committed.
+	RC 				wait_retired();
+#endif
+	// the access slots, allocated once in init().
+	Access * 		_access_pool;
+	// maps each row the txn accessed to its index in accesses, so a row
+	// accessed twice reuses its first access. Open addressing on the row
+	// address. A slot is live only if its gen is the current txn's.
+	struct AccessSlot {
+		row_t * 	row;
+		uint32_t 	gen;
+		int32_t 	idx;
+	};
+	AccessSlot * 	_access_map;
+	uint64_t 		_access_map_mask;
+	uint32_t 		_access_gen;
+	int 			find_access(row_t * row);
+	void 			add_access(row_t * row, int idx);
+	void 			clear_accesses();
+#if UNDO_LOG
+	// each entry is the old bytes followed by an UndoEntry, so the log
+	// can be walked backwards.
+	struct UndoEntry {
+		row_t * 	row;
+		uint64_t 	pos;
+		uint64_t 	size;
+	};
+	void 			rollback();
+	char * 			_undo_buf;
+	uint64_t 		_undo_buf_size;
+	uint64_t 		_undo_len;
+#endif
 	// insert rows
 	uint64_t 		insert_cnt;
 	row_t * 		insert_rows[MAX_ROW_PER_TXN];
+	// index entries of the insert rows
+	struct IndexInsert {
+		INDEX * 	index;
+		idx_key_t 	key;
+		row_t * 	row;
+		int 		part_id;
+	};
+	uint64_t 		insert_idx_cnt;
+	IndexInsert 	insert_idxs[MAX_ROW_PER_TXN];
+	// remove rows and index entries
+	struct IndexRemove {
+		index_base * index;
+		idx_key_t 	key;
+		itemid_t * 	item;
+		int 		part_id;
+	};
+	uint64_t 		remove_idx_cnt;
+	IndexRemove 	remove_idxs[MAX_ROW_PER_TXN];
+	uint64_t 		remove_cnt;
+	row_t * 		remove_rows[MAX_ROW_PER_TXN];
 	txnid_t 		txn_id;
 	ts_t 			timestamp;
 
@@ -113,6 +237,12 @@ private:
 #elif CC_ALG == SILO
 	ts_t 			_cur_tid;
 	RC				validate_silo();
+  #if SILO_HYBRID
+	// the last row locked at access in row order. Rows after it are waited
+	// for; the others are only tried, so the lock waits cannot form a loop.
+	row_t * 		_hybrid_last;
+	RC 				hybrid_lock(row_t * row, access_t type, lock_t &hlock);
+  #endif
 #elif CC_ALG == HEKATON
 	RC 				validate_hekaton(RC rc);
 #endif
@@ -0,0 +1,60 @@
+#include "version_gc.h"
+#include "manager.h"
+#include "row.h"
+#include "row_mvcc.h"
+#include "row_hekaton.h"
+
+void VersionGC::init() {
+	_thds = new GCThd * [g_thread_cnt];
+	for (UInt32 i = 0; i < g_thread_cnt; i++) {
+		_thds[i] = (GCThd *) _mm_malloc(sizeof(GCThd), 64);
+		_thds[i]->size = EPOCH_RECLAIM_BATCH * 4;
+		_thds[i]->queue = (GCEntry *)
+			_mm_malloc(sizeof(GCEntry) * _thds[i]->size, 64);
+		_thds[i]->head = 0;
+		_thds[i]->tail = 0;
+		_thds[i]->since_collect = 0;
+	}
+}
+
+void VersionGC::add(uint64_t thd_id, row_t * row, ts_t ts) {
+	GCThd * thd = _thds[thd_id];
+	if (thd->tail == thd->size) {
+		if (thd->head >= thd->size / 2) {
+			memmove(thd->queue, &thd->queue[thd->head],
+				sizeof(GCEntry) * (thd->tail - thd->head));
+		} else {
+			GCEntry * queue = (GCEntry *)
+				_mm_malloc(sizeof(GCEntry) * thd->size * 2, 64);
+			memcpy(queue, &thd->queue[thd->head],
+				sizeof(GCEntry) * (thd->tail - thd->head));
+			_mm_free(thd->queue);
+			thd->queue = queue;
+			thd->size *= 2;
+		}
+		thd->tail -= thd->head;
+		thd->head = 0;
+	}
+	GCEntry * entry = &thd->queue[thd->tail ++];
+	entry->row = row;
+	entry->ts = ts;
+	if (++ thd->since_collect >= EPOCH_RECLAIM_BATCH) {
+		thd->since_collect = 0;
+		collect(thd_id);
+	}
+}
+
+void VersionGC::collect(uint64_t thd_id) {
+#if CC_ALG == HEKATON || CC_ALG == MVCC
+	GCThd * thd = _thds[thd_id];
+	ts_t min_ts = glob_manager->get_min_ts(thd_id);
+	while (thd->head < thd->tail && thd->queue[thd->head].ts < min_ts) {
+		thd->queue[thd->head].row->manager->gc(thd_id, min_ts);
+		thd->head ++;
+	}
+	if (thd->head == thd->tail) {
+		thd->head = 0;
+		thd->tail = 0;
+	}
+#endif
+}
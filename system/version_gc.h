@@ -0,0 +1,37 @@
+#pragma once
+
+#include "global.h"
+#include "helper.h"
+
+class row_t;
+
+// [HEKATON, MVCC] Version garbage collection.
+// A committed write hides the row's older versions from every txn whose
+// timestamp is above the write's. The writer queues the row with that ts.
+// Once the low-water mark of the timestamps announced by the workers
+// (Manager::get_min_ts) passes it, the row's old versions are dropped and
+// their memory is retired to epoch_man. A thread drains its own queue once
+// every EPOCH_RECLAIM_BATCH writes.
+class VersionGC {
+public:
+	void 			init();
+	// row has a new version that hides the older ones from txns after ts.
+	void 			add(uint64_t thd_id, row_t * row, ts_t ts);
+	// trim the queued rows whose ts is below the low-water mark.
+	void 			collect(uint64_t thd_id);
+private:
+	struct GCEntry {
+		row_t * 	row;
+		ts_t 		ts;
+	};
+	struct GCThd {
+		// entries in [head, tail) are ordered by ts.
+		GCEntry * 	queue;
+		uint32_t 	head;
+		uint32_t 	tail;
+		uint32_t 	size;
+		uint32_t 	since_collect;
+		char 		_pad[CL_SIZE];
+	};
+	GCThd ** 		_thds;
+};
@@ -5,6 +5,8 @@
 #include "table.h"
 #include "index_hash.h"
 #include "index_btree.h"
+#include "index_mbtree.h"
+#include "index_array.h"
 #include "catalog.h"
 #include "mem_alloc.h"
 
@@ -60,7 +62,7 @@ RC workload::init_schema(string schema_file) {
 				col_count ++;
 			}
 			table_t * cur_tab = (table_t *) _mm_malloc(sizeof(table_t), CL_SIZE);
-			cur_tab->init(schema);
+			cur_tab->init(schema, tables.size());
 			tables[tname] = cur_tab;
         } else if (!line.compare(0, 6, "INDEX=")) {
 			string iname;
@@ -92,6 +94,11 @@ RC workload::init_schema(string schema_file) {
 			assert(tables[tname] != NULL);
 			index->init(part_cnt, tables[tname], stoi( items[1] ) * part_cnt);
 	#endif
+#elif INDEX_STRUCT == IDX_ARRAY
+			// keys are used as offsets, which only works for dense keys.
+			M_ASSERT(WORKLOAD == YCSB, "IDX_ARRAY only supports YCSB\n");
+			M_ASSERT(g_key_space == KEY_DENSE, "IDX_ARRAY only supports KEY_DENSE\n");
+			index->init(part_cnt, tables[tname], g_synth_table_size);
 #else
 			index->init(part_cnt, tables[tname]);
 #endif
@@ -121,16 +128,33 @@ void workload::index_insert(INDEX * index, uint64_t key, row_t * row, int64_t pa
 	m_item->location = row;
 	m_item->valid = true;
 
-	RC rc;
-	do {
-		rc = index->index_insert(key, m_item, pid);
-		if (rc != RCOK) {
-			printf("rc failed on key=%ld, pid=%ld\n", key, pid);
-			sleep(1);
-		}
-	} while (rc != RCOK);
+	// the btree fails an insert on a latch conflict. The latch is only held
+	// for the traversal, so retry right away.
+	while (index->index_insert(key, m_item, pid) != RCOK)
+		PAUSE
 
     // assert( index->index_insert(key, m_item, pid) == RCOK );
 }
 
 
+
+void workload::add_scan(string table_name, int col_cnt, const char ** col_names) {
+	ScanDef scan;
+	scan.table = tables[table_name];
+	assert(scan.table != NULL);
+	Catalog * schema = scan.table->get_schema();
+	scan.cols = 0;
+	scan.col_size = 0;
+	if (col_cnt == 0) {
+		assert(schema->get_field_cnt() <= 64);
+		for (UInt32 fid = 0; fid < schema->get_field_cnt(); fid ++)
+			scan.cols |= 1UL << fid;
+	} else {
+		for (int i = 0; i < col_cnt; i ++)
+			scan.cols |= 1UL << schema->get_field_id(col_names[i]);
+	}
+	for (UInt32 fid = 0; fid < schema->get_field_cnt(); fid ++)
+		if (scan.cols & (1UL << fid))
+			scan.col_size += schema->get_field_size(fid);
+	scans.push_back(scan);
+}
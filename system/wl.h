@@ -6,6 +6,8 @@ class row_t;
 class table_t;
 class IndexHash;
 class index_btree;
+class IndexMBTree;
+class IndexArray;
 class Catalog;
 class lock_man;
 class txn_man;
@@ -21,6 +23,15 @@ public:
 	// tables indexed by table name
 	map<string, table_t *> tables;
 	map<string, INDEX *> indexes;
+	// [HTAP_THD_CNT] a table the analytical threads scan, and the columns
+	// they sum.
+	struct ScanDef {
+		table_t * 	table;
+		cols_t 		cols;
+		// the bytes of those columns in a row.
+		uint64_t 	col_size;
+	};
+	vector<ScanDef> scans;
 
 	
 	// initialize the tables and indexes.
@@ -30,8 +41,11 @@ public:
 	virtual RC get_txn_man(txn_man *& txn_manager, thread_t * h_thd)=0;
 	
 	bool sim_done;
+	// also adds the index entries of the rows a txn inserted, at commit.
+	void index_insert(INDEX * index, uint64_t key, row_t * row, int64_t part_id = -1);
 protected:
 	void index_insert(string index_name, uint64_t key, row_t * row);
-	void index_insert(INDEX * index, uint64_t key, row_t * row, int64_t part_id = -1);
+	// scan col_names of table_name, or all its columns if col_cnt is 0.
+	void add_scan(string table_name, int col_cnt, const char ** col_names);
 };
 
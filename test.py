@@ -66,7 +66,7 @@ def test_run(name, job, result_dir):
 
 
 def main():
-    algs = ["DL_DETECT", "NO_WAIT", "HEKATON", "SILO", "TICTOC"]
+    algs = ["DL_DETECT", "NO_WAIT", "WOUND_WAIT", "HEKATON", "SILO", "TICTOC", "CALVIN"]
     indices = ["IDX_BTREE", "IDX_HASH"]
     num_threads_lst = [2 ** n for n in range(1, 10)]
     # workloads = ["YCSB", "TPCC"]
@@ -0,0 +1,401 @@
+// indexbench drives the index structures directly, without transactions or
+// concurrency control. For every (fanout, thread count) pair it builds a new
+// index, bulk loads it, runs the workload and prints per-thread throughput
+// and latency percentiles.
+#include "global.h"
+#include "helper.h"
+#include "mem_alloc.h"
+#include "catalog.h"
+#include "table.h"
+#include "epoch.h"
+#include "topology.h"
+#include "index_hash.h"
+#include "index_btree.h"
+#include "index_mbtree.h"
+#include "index_array.h"
+#include <algorithm>
+
+#define BILLION 1000000000UL
+
+enum ib_wl_t {IB_LOAD, IB_READ, IB_INSERT, IB_MIXED, IB_SCAN};
+enum ib_dist_t {IB_UNIFORM, IB_ZIPF, IB_SEQ};
+
+static const char * wl_names[] = {"load", "read", "insert", "mixed", "scan"};
+static const char * dist_names[] = {"uniform", "zipf", "seq"};
+static const char * idx_names[] = {"", "hash", "btree", "mbtree", "array"};
+
+// parameters
+static int 			ib_idx = INDEX_STRUCT;
+static ib_wl_t 		ib_wl = IB_READ;
+static ib_dist_t 	ib_dist = IB_UNIFORM;
+static double 		ib_theta = 0.9;
+static uint64_t 	ib_keys = 1000000;
+static uint64_t 	ib_ops = 1000000; // per thread
+static double 		ib_read_perc = 0.5;
+static uint64_t 	ib_scan_len = SCAN_LEN;
+static UInt32 		ib_thds[64] = {1};
+static UInt32 		ib_thd_runs = 1;
+static UInt32 		ib_orders[64] = {BTREE_ORDER};
+static UInt32 		ib_order_runs = 1;
+
+// state of the current run
+static index_base * the_index;
+static table_t * 	the_table;
+static UInt32 		run_thd_cnt;
+static uint64_t 	run_ins_cnt;
+static uint64_t 	zipf_n;
+static double 		zipf_zetan;
+static double 		zipf_zeta2;
+static pthread_barrier_t ib_bar;
+
+struct ib_thd_t {
+	pthread_t 	pthd;
+	UInt32 		id;
+	myrand 		rand;
+	itemid_t * 	items; 		// for inserts in the run phase
+	uint64_t * 	lats;
+	uint64_t 	op_cnt;
+	uint64_t 	run_time;
+	uint64_t 	miss_cnt;
+	char 		pad[CL_SIZE];
+};
+static ib_thd_t * 	thds;
+static itemid_t * 	load_items;
+
+static void ib_print_usage() {
+	printf("[usage]: indexbench\n");
+	printf("\t-iSTRING    ; index: hash, btree, array, mbtree (default INDEX_STRUCT)\n");
+	printf("\t-wSTRING    ; workload: load, read, insert, mixed, scan\n");
+	printf("\t-dSTRING    ; key distribution: uniform, zipf, seq\n");
+	printf("\t-zFLOAT     ; zipf theta\n");
+	printf("\t-nINT       ; # of keys bulk loaded\n");
+	printf("\t-oINT       ; # of operations per thread\n");
+	printf("\t-rFLOAT     ; read ratio of the mixed workload\n");
+	printf("\t-lINT       ; scan length\n");
+	printf("\t-tINT,...   ; thread counts to sweep\n");
+	printf("\t-fINT,...   ; btree fanouts to sweep (>= 3)\n");
+}
+
+static int lookup(const char * name, const char ** names, int cnt) {
+	for (int i = 0; i < cnt; i++)
+		if (strcmp(name, names[i]) == 0)
+			return i;
+	printf("unknown option value %s\n", name);
+	ib_print_usage();
+	exit(1);
+}
+
+static UInt32 parse_list(char * str, UInt32 * list) {
+	UInt32 cnt = 0;
+	for (char * tok = strtok(str, ","); tok != NULL; tok = strtok(NULL, ",")) {
+		assert(cnt < 64);
+		list[cnt ++] = atoi(tok);
+	}
+	return cnt;
+}
+
+static void ib_parser(int argc, char * argv[]) {
+	for (int i = 1; i < argc; i++) {
+		assert(argv[i][0] == '-');
+		if (argv[i][1] == 'i')
+			ib_idx = lookup(&argv[i][2], idx_names, 5);
+		else if (argv[i][1] == 'w')
+			ib_wl = (ib_wl_t) lookup(&argv[i][2], wl_names, 5);
+		else if (argv[i][1] == 'd')
+			ib_dist = (ib_dist_t) lookup(&argv[i][2], dist_names, 3);
+		else if (argv[i][1] == 'z')
+			ib_theta = atof(&argv[i][2]);
+		else if (argv[i][1] == 'n')
+			ib_keys = atoll(&argv[i][2]);
+		else if (argv[i][1] == 'o')
+			ib_ops = atoll(&argv[i][2]);
+		else if (argv[i][1] == 'r')
+			ib_read_perc = atof(&argv[i][2]);
+		else if (argv[i][1] == 'l')
+			ib_scan_len = atoll(&argv[i][2]);
+		else if (argv[i][1] == 't')
+			ib_thd_runs = parse_list(&argv[i][2], ib_thds);
+		else if (argv[i][1] == 'f')
+			ib_order_runs = parse_list(&argv[i][2], ib_orders);
+		else if (argv[i][1] == 'h') {
+			ib_print_usage();
+			exit(0);
+		} else {
+			ib_print_usage();
+			exit(1);
+		}
+	}
+#if INDEX_STRUCT != IDX_MBTREE
+	M_ASSERT(ib_idx != IDX_MBTREE, "mbtree is only built with INDEX_STRUCT=IDX_MBTREE\n");
+#endif
+	if (ib_wl == IB_SCAN && (ib_idx == IDX_HASH || ib_idx == IDX_ARRAY)) {
+		printf("%s does not support scans\n", idx_names[ib_idx]);
+		exit(1);
+	}
+	if (ib_idx != IDX_BTREE)
+		ib_order_runs = 1;
+}
+
+static double zeta(uint64_t n, double theta) {
+	double sum = 0;
+	for (uint64_t i = 1; i <= n; i++)
+		sum += pow(1.0 / i, theta);
+	return sum;
+}
+
+// same generator as ycsb_query::zipf(). returns a value in [1, zipf_n].
+static uint64_t zipf(ib_thd_t * thd) {
+	uint64_t n = zipf_n;
+	double alpha = 1 / (1 - ib_theta);
+	double eta = (1 - pow(2.0 / n, 1 - ib_theta)) / (1 - zipf_zeta2 / zipf_zetan);
+	double u = (double)(thd->rand.next() % 1000000000) / 1000000000;
+	double uz = u * zipf_zetan;
+	if (uz < 1) return 1;
+	if (uz < 1 + pow(0.5, ib_theta)) return 2;
+	return 1 + (uint64_t)(n * pow(eta * u - eta + 1, alpha));
+}
+
+// the key of the i-th lookup of a thread.
+static idx_key_t read_key(ib_thd_t * thd, uint64_t i) {
+	switch (ib_dist) {
+	case IB_UNIFORM : return thd->rand.next() % ib_keys;
+	case IB_ZIPF : return (zipf(thd) - 1) % ib_keys;
+	case IB_SEQ : return (thd->id * ib_ops + i) % ib_keys;
+	default : assert(false);
+	}
+	return 0;
+}
+
+// the key of the i-th insert of a thread. inserted keys follow the loaded
+// ones. under zipf the inserts go to the hot end of the key space.
+static idx_key_t insert_key(ib_thd_t * thd, uint64_t i) {
+	uint64_t n = i * run_thd_cnt + thd->id;
+	switch (ib_dist) {
+	case IB_UNIFORM : return ib_keys + thd->rand.next() % run_ins_cnt;
+	case IB_ZIPF : return ib_keys + (zipf_n - zipf(thd)) % run_ins_cnt;
+	case IB_SEQ : return ib_keys + n;
+	default : assert(false);
+	}
+	return 0;
+}
+
+static void insert(idx_key_t key, itemid_t * item) {
+	item->init();
+	item->location = (void *) key;
+	item->valid = true;
+	// the btree returns Abort if it runs into a latched node.
+	while (the_index->index_insert(key, item, 0) != RCOK)
+		PAUSE
+}
+
+static index_base * make_index(UInt32 order) {
+	uint64_t size = ib_keys + run_ins_cnt;
+	switch (ib_idx) {
+	case IDX_HASH : {
+		IndexHash * index = (IndexHash *) _mm_malloc(sizeof(IndexHash), 64);
+		new (index) IndexHash();
+		index->init(1, the_table, size * 2);
+		return index;
+	}
+	case IDX_BTREE : {
+		index_btree * index = (index_btree *) _mm_malloc(sizeof(index_btree), 64);
+		new (index) index_btree();
+		index->init(1, order);
+		index->table = the_table;
+		return index;
+	}
+	case IDX_ARRAY : {
+		IndexArray * index = (IndexArray *) _mm_malloc(sizeof(IndexArray), 64);
+		new (index) IndexArray();
+		index->init(1, the_table, size);
+		return index;
+	}
+#if INDEX_STRUCT == IDX_MBTREE
+	case IDX_MBTREE : {
+		IndexMBTree * index = (IndexMBTree *) _mm_malloc(sizeof(IndexMBTree), 64);
+		new (index) IndexMBTree();
+		index->init(1, the_table);
+		return index;
+	}
+#endif
+	default :
+		assert(false);
+	}
+	return NULL;
+}
+
+// runs one scan starting at key. returns the # of items visited.
+static uint64_t scan(ib_thd_t * thd, idx_key_t key) {
+	itemid_t * item;
+#if INDEX_STRUCT == IDX_MBTREE
+	if (ib_idx == IDX_MBTREE) {
+		itemid_t * items[ib_scan_len];
+		uint64_t cnt = ib_scan_len;
+		((IndexMBTree *)the_index)->index_read_range(key, UINT64_MAX - 1,
+			items, cnt, 0);
+		return cnt;
+	}
+#endif
+	if (the_index->index_read(key, item, 0, thd->id) != RCOK)
+		return 0;
+	uint64_t cnt = 1;
+	while (cnt < ib_scan_len) {
+		((index_btree *)the_index)->index_next(thd->id, item);
+		if (item == NULL)
+			break;
+		cnt ++;
+	}
+	return cnt;
+}
+
+static void * load_thd(void * arg) {
+	ib_thd_t * thd = (ib_thd_t *) arg;
+	mem_allocator.register_thread(thd->id);
+	// each thread loads a contiguous range. the non-sequential
+	// distributions load it in a scrambled order.
+	uint64_t per_thd = (ib_keys + run_thd_cnt - 1) / run_thd_cnt;
+	uint64_t start = thd->id * per_thd;
+	uint64_t end = std::min(start + per_thd, ib_keys);
+	pthread_barrier_wait(&ib_bar);
+	uint64_t t1 = get_server_clock();
+	for (uint64_t i = start; i < end; i++) {
+		uint64_t n = i - start;
+		uint64_t key = (ib_dist == IB_SEQ)? i :
+			start + (n * 2654435761UL) % (end - start);
+		insert(key, &load_items[key]);
+	}
+	thd->run_time = get_server_clock() - t1;
+	thd->op_cnt = (end > start)? end - start : 0;
+	return NULL;
+}
+
+static void * run_thd(void * arg) {
+	ib_thd_t * thd = (ib_thd_t *) arg;
+	mem_allocator.register_thread(thd->id);
+	thd->miss_cnt = 0;
+	uint64_t ins_cnt = 0;
+	pthread_barrier_wait(&ib_bar);
+	uint64_t t1 = get_server_clock();
+	for (uint64_t i = 0; i < ib_ops; i++) {
+		bool do_read = (ib_wl == IB_READ) || (ib_wl == IB_MIXED
+			&& (double)(thd->rand.next() % 10000) / 10000 < ib_read_perc);
+		uint64_t t2 = get_server_clock();
+		epoch_man.announce(thd->id, epoch_man.get_epoch());
+		if (ib_wl == IB_SCAN) {
+			if (scan(thd, read_key(thd, i)) == 0)
+				thd->miss_cnt ++;
+		} else if (do_read) {
+			itemid_t * item;
+			idx_key_t key = read_key(thd, i);
+			if (the_index->index_read(key, item, 0, thd->id) != RCOK)
+				thd->miss_cnt ++;
+			else
+				assert((idx_key_t) item->location == key);
+		} else {
+			insert(insert_key(thd, ins_cnt), &thd->items[ins_cnt]);
+			ins_cnt ++;
+		}
+		epoch_man.quiesce(thd->id);
+		thd->lats[i] = get_server_clock() - t2;
+	}
+	thd->run_time = get_server_clock() - t1;
+	thd->op_cnt = ib_ops;
+	return NULL;
+}
+
+// runs f on run_thd_cnt threads and returns the aggregate throughput in Mops/s.
+static double run_threads(void * (*f)(void *), bool verbose) {
+	pthread_barrier_init(&ib_bar, NULL, run_thd_cnt);
+	for (UInt32 i = 1; i < run_thd_cnt; i++)
+		pthread_create(&thds[i].pthd, NULL, f, &thds[i]);
+	f(&thds[0]);
+	for (UInt32 i = 1; i < run_thd_cnt; i++)
+		pthread_join(thds[i].pthd, NULL);
+	pthread_barrier_destroy(&ib_bar);
+	mem_allocator.unregister();
+	uint64_t total_ops = 0;
+	uint64_t max_time = 1;
+	for (UInt32 i = 0; i < run_thd_cnt; i++) {
+		total_ops += thds[i].op_cnt;
+		if (thds[i].run_time > max_time)
+			max_time = thds[i].run_time;
+		if (verbose)
+			printf("[tid=%d] op_cnt=%ld, miss_cnt=%ld, run_time=%f, tput=%f\n",
+				i, thds[i].op_cnt, thds[i].miss_cnt,
+				(double) thds[i].run_time / BILLION,
+				thds[i].op_cnt * 1000.0 / std::max(thds[i].run_time, (uint64_t)1));
+	}
+	return total_ops * 1000.0 / max_time;
+}
+
+static uint64_t percentile(uint64_t * lats, uint64_t cnt, double p) {
+	uint64_t idx = (uint64_t)(cnt * p);
+	return lats[std::min(idx, cnt - 1)];
+}
+
+int main(int argc, char * argv[]) {
+	ib_parser(argc, argv);
+	UInt32 max_thd_cnt = *std::max_element(ib_thds, ib_thds + ib_thd_runs);
+	g_thread_cnt = max_thd_cnt;
+	g_part_cnt = 1;
+	topology.init();
+	mem_allocator.init(g_part_cnt, MEM_SIZE / g_part_cnt);
+	epoch_man.init();
+	warmup_finish = true;
+
+	Catalog * schema = new Catalog;
+	schema->init("INDEXBENCH", 1);
+	schema->add_col((char *)"KEY", sizeof(uint64_t), (char *)"int64_t");
+	the_table = (table_t *) _mm_malloc(sizeof(table_t), CL_SIZE);
+	the_table->init(schema, 0);
+
+	bool inserts = (ib_wl == IB_INSERT || ib_wl == IB_MIXED);
+	thds = (ib_thd_t *) _mm_malloc(sizeof(ib_thd_t) * max_thd_cnt, 64);
+	for (UInt32 i = 0; i < max_thd_cnt; i++) {
+		thds[i].id = i;
+		thds[i].lats = new uint64_t [ib_ops];
+		thds[i].items = inserts? new itemid_t [ib_ops] : NULL;
+	}
+	load_items = new itemid_t [ib_keys];
+	uint64_t * lats = new uint64_t [ib_ops * max_thd_cnt];
+
+	for (UInt32 o = 0; o < ib_order_runs; o++) {
+		for (UInt32 t = 0; t < ib_thd_runs; t++) {
+			run_thd_cnt = ib_thds[t];
+			assert(run_thd_cnt > 0);
+			run_ins_cnt = inserts? ib_ops * run_thd_cnt : 0;
+			if (ib_dist == IB_ZIPF) {
+				zipf_n = (ib_wl == IB_INSERT)? run_ins_cnt : ib_keys;
+				zipf_zetan = zeta(zipf_n, ib_theta);
+				zipf_zeta2 = zeta(2, ib_theta);
+			}
+			for (UInt32 i = 0; i < run_thd_cnt; i++)
+				thds[i].rand.init(get_server_clock() + i);
+			// every run starts from a new index. the old ones are leaked.
+			the_index = make_index(ib_orders[o]);
+			double load_tput = run_threads(load_thd, false);
+			double tput = 0;
+			uint64_t cnt = 0;
+			if (ib_wl != IB_LOAD) {
+				tput = run_threads(run_thd, true);
+				for (UInt32 i = 0; i < run_thd_cnt; i++) {
+					memcpy(&lats[cnt], thds[i].lats, sizeof(uint64_t) * ib_ops);
+					cnt += ib_ops;
+				}
+				std::sort(lats, lats + cnt);
+			}
+			printf("[summary] index=%s, workload=%s, dist=%s, fanout=%d, thd_cnt=%d, "
+				"key_cnt=%ld, load_tput=%f, tput=%f, lat_p50=%ld, lat_p90=%ld, "
+				"lat_p99=%ld, lat_p999=%ld, lat_max=%ld\n",
+				idx_names[ib_idx], wl_names[ib_wl], dist_names[ib_dist],
+				(ib_idx == IDX_BTREE)? ib_orders[o] : 0, run_thd_cnt, ib_keys,
+				load_tput, tput,
+				cnt? percentile(lats, cnt, 0.5) : 0,
+				cnt? percentile(lats, cnt, 0.9) : 0,
+				cnt? percentile(lats, cnt, 0.99) : 0,
+				cnt? percentile(lats, cnt, 0.999) : 0,
+				cnt? lats[cnt - 1] : 0);
+		}
+	}
+	return 0;
+}